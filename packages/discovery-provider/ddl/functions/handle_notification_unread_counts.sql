@@ -0,0 +1,71 @@
+-- Counts a new notification as an unread group for each of its users that has
+-- a notification_unread_counts row, unless the user already has an unread
+-- notification in the same group. Announcements go to every user, so they are
+-- not kept per user and get_unread_notification_count counts them on read.
+create or replace function handle_notification_unread_counts() returns trigger as $$
+begin
+  if new.type != 'announcement' then
+    update notification_unread_counts nuc
+    set counts = jsonb_set(
+      nuc.counts,
+      array[new.type],
+      to_jsonb(coalesce((nuc.counts->>new.type)::int, 0) + 1)
+    )
+    where nuc.user_id = any(new.user_ids)
+      and new.timestamp > nuc.seen_at
+      and not exists (
+        select 1
+        from notification n
+        where n.group_id = new.group_id
+          and n.type = new.type
+          and n.id != new.id
+          and n.user_ids && array[nuc.user_id]
+          and n.timestamp > nuc.seen_at
+      );
+  end if;
+
+  return null;
+
+exception
+    when others then
+      raise warning 'An error occurred in %: %', tg_name, sqlerrm;
+      return null;
+end;
+$$ language plpgsql;
+
+
+-- Viewing notifications marks everything before seen_at as read. Notifications
+-- already counted may be timestamped after seen_at, so the row is marked dirty
+-- for reconcile_notification_unread_counts to recount.
+create or replace function handle_notification_seen_unread_counts() returns trigger as $$
+begin
+  update notification_unread_counts
+  set seen_at = new.seen_at, counts = '{}', dirty_at = coalesce(dirty_at, now())
+  where user_id = new.user_id
+    and seen_at < new.seen_at;
+
+  return null;
+
+exception
+    when others then
+      raise warning 'An error occurred in %: %', tg_name, sqlerrm;
+      return null;
+end;
+$$ language plpgsql;
+
+
+do $$ begin
+  create trigger on_notification_unread_counts
+  after insert on notification
+  for each row execute procedure handle_notification_unread_counts();
+exception
+  when others then null;
+end $$;
+
+do $$ begin
+  create trigger on_notification_seen_unread_counts
+  after insert on notification_seen
+  for each row execute procedure handle_notification_seen_unread_counts();
+exception
+  when others then null;
+end $$;
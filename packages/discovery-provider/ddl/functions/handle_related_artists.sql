@@ -0,0 +1,78 @@
+-- An artist that is already stale keeps its stale_at, and its place in the
+-- refresh queue. changed_at is bumped on every mark, so that a refresh that
+-- selected the artist before this mark leaves them stale.
+create or replace function mark_related_artists_stale(artist_id int) returns void as $$
+begin
+  insert into related_artists_state (user_id, stale_at, changed_at)
+  values (artist_id, now(), now())
+  on conflict (user_id) do update set
+    is_stale = true,
+    stale_at = case
+      when related_artists_state.is_stale then related_artists_state.stale_at
+      else now()
+    end,
+    changed_at = now();
+end;
+$$ language plpgsql;
+
+
+-- An artist's related artists depend on the genres of their public tracks
+create or replace function handle_related_artists_track() returns trigger as $$
+begin
+  if tg_op = 'UPDATE'
+    and old.genre is not distinct from new.genre
+    and old.is_current = new.is_current
+    and track_is_public(old) = track_is_public(new) then
+    return null;
+  end if;
+
+  perform mark_related_artists_stale(new.owner_id);
+  return null;
+
+exception
+    when others then
+      raise warning 'An error occurred in %: %', tg_name, sqlerrm;
+      return null;
+end;
+$$ language plpgsql;
+
+
+-- ...and on their follower count, which bounds the follower counts of the
+-- related artists
+create or replace function handle_related_artists_aggregate_user() returns trigger as $$
+begin
+  perform mark_related_artists_stale(new.user_id);
+  return null;
+
+exception
+    when others then
+      raise warning 'An error occurred in %: %', tg_name, sqlerrm;
+      return null;
+end;
+$$ language plpgsql;
+
+
+do $$ begin
+  create trigger on_related_artists_track
+  after insert or update on tracks
+  for each row execute procedure handle_related_artists_track();
+exception
+  when others then null;
+end $$;
+
+do $$ begin
+  create trigger on_related_artists_aggregate_user
+  after update on aggregate_user
+  for each row
+  when (
+    new.track_count > 0
+    and (
+      old.follower_count is distinct from new.follower_count
+      or old.dominant_genre is distinct from new.dominant_genre
+      or old.track_count is distinct from new.track_count
+    )
+  )
+  execute procedure handle_related_artists_aggregate_user();
+exception
+  when others then null;
+end $$;
@@ -0,0 +1,33 @@
+begin;
+
+-- One row per (user, track) replacing the user_listening_history JSON array.
+CREATE TABLE IF NOT EXISTS user_track_listens (
+    user_id INTEGER NOT NULL,
+    track_id INTEGER NOT NULL,
+    last_listened_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    play_count INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (user_id, track_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_user_track_listens_user_recency
+ON user_track_listens (user_id, last_listened_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_user_track_listens_user_play_count
+ON user_track_listens (user_id, play_count DESC, last_listened_at DESC);
+
+-- Backfill from the JSON form. Existing rows win so the migration is safe to re-run
+-- after the indexer has started writing to user_track_listens.
+INSERT INTO user_track_listens (user_id, track_id, last_listened_at, play_count)
+SELECT
+    h.user_id,
+    (listen->>'track_id')::integer AS track_id,
+    max((listen->>'timestamp')::timestamp) AS last_listened_at,
+    sum(coalesce((listen->>'play_count')::integer, 1)) AS play_count
+FROM user_listening_history h
+CROSS JOIN LATERAL jsonb_array_elements(h.listening_history) AS listen
+WHERE listen->>'track_id' IS NOT NULL
+AND listen->>'timestamp' IS NOT NULL
+GROUP BY h.user_id, (listen->>'track_id')::integer
+ON CONFLICT (user_id, track_id) DO NOTHING;
+
+commit;
@@ -0,0 +1,54 @@
+begin;
+
+-- Per (track, user) count of distinct hours with a play, used for top listeners.
+CREATE TABLE IF NOT EXISTS aggregate_track_listeners (
+    track_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    listen_count INTEGER NOT NULL,
+    last_listened_hour TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    PRIMARY KEY (track_id, user_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_aggregate_track_listeners_top
+ON aggregate_track_listeners (track_id, listen_count DESC, user_id);
+
+-- Tracks with plays for hours before a listener's last counted hour, which
+-- index_aggregate_track_listeners cannot count incrementally.
+-- reconcile_aggregate_track_listeners recomputes them from plays, oldest first.
+CREATE TABLE IF NOT EXISTS aggregate_track_listeners_dirty (
+    track_id INTEGER PRIMARY KEY,
+    marked_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_aggregate_track_listeners_dirty_marked_at
+ON aggregate_track_listeners_dirty (marked_at, track_id);
+
+-- One-time backfill up to the current max play id. The checkpoint row marks
+-- the backfill as done and is where index_aggregate_track_listeners resumes.
+DO $$
+DECLARE
+    max_play_id INTEGER;
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM indexing_checkpoints WHERE tablename = 'aggregate_track_listeners'
+    ) THEN
+        SELECT coalesce(max(id), 0) INTO max_play_id FROM plays;
+
+        INSERT INTO aggregate_track_listeners (track_id, user_id, listen_count, last_listened_hour)
+        SELECT
+            play_item_id,
+            user_id,
+            count(DISTINCT date_trunc('hour', created_at)),
+            max(date_trunc('hour', created_at))
+        FROM plays
+        WHERE user_id IS NOT NULL
+        AND id <= max_play_id
+        GROUP BY play_item_id, user_id
+        ON CONFLICT (track_id, user_id) DO NOTHING;
+
+        INSERT INTO indexing_checkpoints (tablename, last_checkpoint)
+        VALUES ('aggregate_track_listeners', max_play_id);
+    END IF;
+END $$;
+
+commit;
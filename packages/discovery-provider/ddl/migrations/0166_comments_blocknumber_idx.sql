@@ -0,0 +1,8 @@
+begin;
+
+-- Lets update_aggregates find comments changed since its last checkpoint
+-- and recount only the tracks they belong to.
+CREATE INDEX IF NOT EXISTS idx_comments_blocknumber ON comments (blocknumber);
+CREATE INDEX IF NOT EXISTS idx_comments_entity ON comments (entity_id, entity_type);
+
+commit;
@@ -0,0 +1,22 @@
+begin;
+
+-- Unread notification group counts by type per user, kept up to date by the
+-- triggers in handle_notification_unread_counts.sql. Rows are only created
+-- for users that poll their unread count, by reconcile_notification_unread_counts.
+-- Announcements are not stored here, they are counted on read.
+CREATE TABLE IF NOT EXISTS notification_unread_counts (
+    user_id INTEGER NOT NULL PRIMARY KEY,
+    seen_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+    counts JSONB NOT NULL DEFAULT '{}',
+    reconciled_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+    -- set when counts may have drifted, e.g. reset by a view that is older
+    -- than notifications already counted. reconcile_notification_unread_counts
+    -- recounts these rows, oldest first, instead of walking every row.
+    dirty_at TIMESTAMP WITHOUT TIME ZONE
+);
+
+CREATE INDEX IF NOT EXISTS idx_notification_unread_counts_dirty_at
+ON notification_unread_counts (dirty_at)
+WHERE dirty_at IS NOT NULL;
+
+commit;
@@ -0,0 +1,35 @@
+begin;
+
+-- related_artists now holds each artist's genre based related artists in
+-- request order, maintained by the refresh_related_artists task. Rows from
+-- the old similarity job are dropped, they are recomputed from scratch.
+TRUNCATE related_artists;
+
+ALTER TABLE related_artists ADD COLUMN IF NOT EXISTS rank INTEGER NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_related_artists_user_id_rank
+ON related_artists (user_id, rank, related_artist_user_id);
+
+-- Artists whose related artists are out of date, marked by the triggers in
+-- handle_related_artists.sql. refreshed_at is null until the first refresh.
+CREATE TABLE IF NOT EXISTS related_artists_state (
+    user_id INTEGER NOT NULL PRIMARY KEY,
+    is_stale BOOLEAN NOT NULL DEFAULT true,
+    -- when the artist was marked stale, stale artists are refreshed in order
+    stale_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+    -- when the artist was last marked, even if they were already stale
+    changed_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT now(),
+    refreshed_at TIMESTAMP WITHOUT TIME ZONE
+);
+
+CREATE INDEX IF NOT EXISTS idx_related_artists_state_stale_at
+ON related_artists_state (stale_at, user_id) WHERE is_stale;
+
+CREATE INDEX IF NOT EXISTS idx_related_artists_state_refreshed_at
+ON related_artists_state (refreshed_at);
+
+INSERT INTO related_artists_state (user_id)
+SELECT user_id FROM aggregate_user WHERE track_count > 0
+ON CONFLICT DO NOTHING;
+
+commit;
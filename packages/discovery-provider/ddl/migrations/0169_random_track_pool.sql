@@ -0,0 +1,29 @@
+begin;
+
+-- Tracks eligible for get_random_tracks, numbered by a dense ordinal in
+-- descending owner follower count order. The tracks whose owners have at
+-- least n followers are then ordinals 1..k, so a uniform sample is k random
+-- ordinals looked up by index instead of sorting every eligible track.
+-- Ordinals shift whenever a track is added or an owner's follower count
+-- changes, so rather than being updated in place, the pool is rebuilt and
+-- swapped in by the refresh_random_track_pool task. Its query is
+-- RANDOM_TRACK_POOL_QUERY.
+CREATE TABLE IF NOT EXISTS random_track_pool AS
+SELECT
+    row_number() OVER (ORDER BY au.follower_count DESC, t.track_id ASC) AS ordinal,
+    t.track_id,
+    au.follower_count
+FROM tracks t
+JOIN aggregate_user au ON au.user_id = t.owner_id
+WHERE t.is_current IS TRUE
+    AND t.is_delete IS FALSE
+    AND t.is_unlisted IS FALSE
+    AND t.stem_of IS NULL;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_random_track_pool_ordinal
+ON random_track_pool (ordinal);
+
+CREATE INDEX IF NOT EXISTS idx_random_track_pool_follower_count
+ON random_track_pool (follower_count, ordinal DESC);
+
+commit;
@@ -1,10 +1,11 @@
 from datetime import datetime, timezone
 from typing import Any, Dict, List
 
-from integration_tests.utils import populate_mock_db
+from integration_tests.utils import count_queries, populate_mock_db
 from src.gated_content.content_access_checker import ContentAccessChecker
 from src.models.playlists.playlist import Playlist
 from src.models.tracks.track import Track
+from src.models.users.aggregate_user_tips import AggregateUserTip
 from src.utils.db_session import get_db_read_replica
 
 # Data for tests
@@ -930,3 +931,97 @@ def test_access_conditions_update(app):
             )
             assert not result["has_stream_access"]
             assert not result["has_download_access"]
+
+
+def test_batch_access_query_count(app):
+    """A page of mixed gated tracks is checked in a constant number of queries"""
+    with app.app_context():
+        db = get_db_read_replica()
+
+    gates = [
+        {"is_stream_gated": True, "stream_conditions": {"follow_user_id": 1}},
+        {"is_stream_gated": True, "stream_conditions": {"tip_user_id": 1}},
+        {
+            "is_stream_gated": True,
+            "stream_conditions": usdc_gate_1,
+            "playlists_containing_track": [1],
+        },
+        {"is_download_gated": True, "download_conditions": {"follow_user_id": 1}},
+        # stem of track 100
+        {},
+        # not gated
+        {},
+    ]
+    page_track_ids = list(range(101, 201))
+    populate_mock_db(
+        db,
+        {
+            "users": [{"user_id": i + 1} for i in range(6)],
+            "tracks": [
+                {"track_id": 100, "owner_id": 1, **gates[0]},
+                *[
+                    {"track_id": track_id, "owner_id": 1, **gates[track_id % 6]}
+                    for track_id in page_track_ids
+                ],
+            ],
+            "playlists": [{"playlist_id": 1, "playlist_owner_id": 1, "is_album": True}],
+            "follows": [{"follower_user_id": 2, "followee_user_id": 1}],
+            "usdc_purchases": [
+                {"buyer_user_id": 4, "content_id": 1, "content_type": "album"},
+                {"buyer_user_id": 5, "content_id": 104, "content_type": "track"},
+            ],
+        },
+    )
+    with db.scoped_session() as session:
+        session.add(AggregateUserTip(sender_user_id=3, receiver_user_id=1, amount=1))
+        session.query(Track).filter(
+            Track.track_id.in_([id for id in page_track_ids if id % 6 == 4])
+        ).update(
+            {"stem_of": {"category": "SAMPLE", "parent_track_id": 100}},
+            synchronize_session=False,
+        )
+
+    content_access_checker = ContentAccessChecker()
+    user_ids = [2, 3, 4, 5, 6]
+
+    def check_page(session, track_ids):
+        return content_access_checker.check_access_for_batch(
+            session,
+            [
+                {"user_id": user_id, "content_id": track_id, "content_type": "track"}
+                for user_id in user_ids
+                for track_id in track_ids
+            ],
+        )
+
+    with db.scoped_session() as session:
+        _, small_page_queries = count_queries(
+            session, lambda: check_page(session, page_track_ids[:10])
+        )
+        result, page_queries = count_queries(
+            session, lambda: check_page(session, page_track_ids)
+        )
+        # tracks, albums, stem parents, follows, tips and purchases
+        assert small_page_queries == page_queries == 6
+
+        # every pair matches the single item check
+        for track in session.query(Track).filter(Track.track_id.in_(page_track_ids)):
+            for user_id in user_ids:
+                assert result["track"][user_id][
+                    track.track_id
+                ] == content_access_checker.check_access(
+                    session=session,
+                    user_id=user_id,
+                    content_type="track",
+                    content_entity=track,
+                )
+
+        # spot check each kind of condition
+        assert result["track"][2][102]["has_stream_access"]  # follows
+        assert not result["track"][3][102]["has_stream_access"]
+        assert result["track"][3][103]["has_stream_access"]  # tipped
+        assert result["track"][4][104]["has_stream_access"]  # purchased album
+        assert result["track"][5][104]["has_stream_access"]  # purchased track
+        assert not result["track"][6][104]["has_stream_access"]
+        assert result["track"][2][106]["has_download_access"]  # stem of followed
+        assert not result["track"][6][106]["has_download_access"]
@@ -1,4 +1,5 @@
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 from jsonschema import ValidationError
 
@@ -65,6 +66,37 @@ def test_one_field_schema_empty_object():
         assert True
 
 
+def test_validator_is_reused():
+    validator = ModelValidator.get_validator("title", "Track")
+    ModelValidator.validate(to_validate={"title": "ok"}, field="title", model="Track")
+    assert ModelValidator.get_validator("title", "Track") is validator
+    assert ModelValidator.get_validator("genre", "Track") is not validator
+
+
+def test_concurrent_validation_across_models():
+    """Concurrent validations of different models use their own schemas"""
+    cases = [
+        ("Track", "field_visibility", {"genre": True}, True),
+        ("Track", "field_visibility", "not an object", False),
+        ("User", "artist_pick_track_id", 1, True),
+        ("User", "artist_pick_track_id", "not an integer", False),
+    ] * 50
+
+    def is_valid(case):
+        model, field, value, _ = case
+        try:
+            ModelValidator.validate(
+                to_validate={field: value}, field=field, model=model
+            )
+            return True
+        except ValidationError:
+            return False
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(is_valid, cases))
+    assert results == [expected for *_, expected in cases]
+
+
 # #### Testing field validation with variation of schemas ##### #
 def test_schema_missing():
     try:
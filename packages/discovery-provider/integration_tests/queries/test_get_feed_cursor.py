@@ -0,0 +1,155 @@
+import logging
+import os
+import subprocess
+import time
+from datetime import datetime, timedelta
+
+from integration_tests.utils import populate_mock_db
+from src.queries.get_feed_cursor import get_feed_cursor
+from src.utils.db_session import get_db
+from src.utils.feed_inbox import FEED_FANOUT_MAX_FOLLOWERS, get_feed_inbox_entries
+from src.utils.redis_connection import get_redis
+
+logger = logging.getLogger(__name__)
+
+now = datetime.utcnow().replace(microsecond=0)
+
+# User 1 follows user 2, whose activity is fanned out to inboxes, and user 3,
+# who has too many followers and whose activity is pulled on read.
+feed_entities = {
+    "users": [
+        {"user_id": user_id, "handle": f"user{user_id}"} for user_id in range(1, 5)
+    ],
+    "aggregate_user": [
+        {"user_id": 3, "follower_count": FEED_FANOUT_MAX_FOLLOWERS + 1},
+    ],
+    "follows": [
+        {"follower_user_id": 1, "followee_user_id": 2},
+        {"follower_user_id": 1, "followee_user_id": 3},
+    ],
+    "tracks": [
+        {"track_id": 1, "owner_id": 2, "created_at": now - timedelta(hours=4)},
+        {"track_id": 2, "owner_id": 2, "created_at": now - timedelta(hours=3)},
+        {"track_id": 3, "owner_id": 3, "created_at": now - timedelta(hours=2)},
+        # user 4 is not followed
+        {"track_id": 4, "owner_id": 4, "created_at": now - timedelta(hours=6)},
+    ],
+    "playlists": [
+        {
+            "playlist_id": 1,
+            "playlist_owner_id": 2,
+            "playlist_contents": {"track_ids": [{"track": 2, "time": 1}]},
+            "created_at": now - timedelta(hours=5),
+        },
+    ],
+    "reposts": [
+        # track 1 is already in the inbox as an original of user 2
+        {
+            "user_id": 3,
+            "repost_item_id": 1,
+            "repost_type": "track",
+            "created_at": now - timedelta(hours=1),
+        },
+        {
+            "user_id": 3,
+            "repost_item_id": 4,
+            "repost_type": "track",
+            "created_at": now - timedelta(minutes=30),
+        },
+    ],
+}
+
+
+def populate_feed(db):
+    populate_mock_db(db, feed_entities)
+
+    # run indexer catchup
+    time.sleep(1)
+    logs = subprocess.run(
+        ["npm", "run", "catchup:ci"],
+        env=os.environ,
+        capture_output=True,
+        text=True,
+        cwd="es-indexer",
+        timeout=30,
+    )
+    logger.info(logs)
+
+
+def get_item_keys(page):
+    return [
+        f"playlist:{item['playlist_id']}"
+        if "playlist_id" in item
+        else f"track:{item['track_id']}"
+        for item in page
+    ]
+
+
+def test_get_feed_cursor_merges_inbox_and_pulled_entries(app):
+    with app.app_context():
+        db = get_db()
+    populate_feed(db)
+
+    with app.app_context():
+        page, next_cursor = get_feed_cursor({"user_id": "1"})
+
+    # the inbox is filled with the fanned out activity of user 2 only
+    redis = get_redis()
+    assert [key for _, key in get_feed_inbox_entries(redis, 1, None, 10)] == [
+        "track:2",
+        "track:1",
+        "playlist:1",
+    ]
+
+    # track 1 shows up once, at the time of user 3's repost
+    assert get_item_keys(page) == [
+        "track:4",
+        "track:1",
+        "track:3",
+        "track:2",
+        "playlist:1",
+    ]
+    assert page[1]["activity_timestamp"] == (now - timedelta(hours=1)).isoformat()
+    assert next_cursor is None
+
+
+def test_get_feed_cursor_pages(app):
+    with app.app_context():
+        db = get_db()
+    populate_feed(db)
+
+    item_keys = []
+    cursor = None
+    with app.app_context():
+        for _ in range(3):
+            page, cursor = get_feed_cursor({"user_id": "1", "cursor": cursor}, limit=2)
+            item_keys.append(get_item_keys(page))
+            if cursor is None:
+                break
+
+    assert item_keys == [
+        ["track:4", "track:1"],
+        ["track:3", "track:2"],
+        ["playlist:1"],
+    ]
+    assert cursor is None
+
+
+def test_get_feed_cursor_filters(app):
+    with app.app_context():
+        db = get_db()
+    populate_feed(db)
+
+    with app.app_context():
+        page, _ = get_feed_cursor({"user_id": "1", "filter": "original"})
+        assert get_item_keys(page) == ["track:1", "track:3", "track:2", "playlist:1"]
+
+        page, _ = get_feed_cursor({"user_id": "1", "filter": "repost"})
+        assert get_item_keys(page) == ["track:4"]
+
+        page, _ = get_feed_cursor({"user_id": "1", "tracks_only": True})
+        assert get_item_keys(page) == ["track:4", "track:1", "track:3", "track:2"]
+
+        # explicitly followed users are pulled on read
+        page, _ = get_feed_cursor({"user_id": "4", "followee_user_ids": [2]})
+        assert get_item_keys(page) == ["track:2", "track:1", "playlist:1"]
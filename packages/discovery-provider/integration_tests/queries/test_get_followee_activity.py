@@ -0,0 +1,169 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import event
+
+from integration_tests.utils import populate_mock_db
+from src.models.social.repost import RepostType
+from src.models.social.save import SaveType
+from src.queries import response_name_constants
+from src.queries.get_followee_activity import (
+    get_followee_ids,
+    get_followee_reposts,
+    get_followee_saves,
+)
+from src.queries.query_helpers import (
+    populate_playlist_metadata,
+    populate_track_metadata,
+)
+from src.utils.db_session import get_db
+
+NUM_FOLLOWEES = 300
+t0 = datetime(2024, 1, 1)
+
+
+def populate_followee_activity(db):
+    """
+    User 1 follows users 2 to 301. Track 1 is reposted and saved by every
+    followee and a few other users, playlist 1 by a couple of followees.
+    """
+    followee_ids = range(2, NUM_FOLLOWEES + 2)
+    other_user_ids = range(1000, 1005)
+    populate_mock_db(
+        db,
+        {
+            "tracks": [
+                {"track_id": 1, "owner_id": 1000},
+                {"track_id": 2, "owner_id": 1000},
+            ],
+            "playlists": [
+                {"playlist_id": 1, "playlist_owner_id": 1000},
+                {"playlist_id": 2, "playlist_owner_id": 1000, "is_album": True},
+            ],
+            "follows": [
+                {"follower_user_id": 1, "followee_user_id": user_id}
+                for user_id in followee_ids
+            ],
+            "reposts": [
+                {
+                    "repost_item_id": 1,
+                    "repost_type": "track",
+                    "user_id": user_id,
+                    "created_at": t0 + timedelta(minutes=user_id),
+                }
+                for user_id in list(followee_ids) + list(other_user_ids)
+            ]
+            + [
+                {"repost_item_id": 1, "repost_type": "playlist", "user_id": 2},
+                {"repost_item_id": 1, "repost_type": "playlist", "user_id": 3},
+                {"repost_item_id": 2, "repost_type": "album", "user_id": 4},
+            ],
+            "saves": [
+                {
+                    "save_item_id": 1,
+                    "save_type": "track",
+                    "user_id": user_id,
+                    "created_at": t0 + timedelta(minutes=user_id),
+                }
+                for user_id in list(followee_ids) + list(other_user_ids)
+            ]
+            + [
+                {"save_item_id": 1, "save_type": "playlist", "user_id": 5},
+                {"save_item_id": 1, "save_type": "playlist", "user_id": 1001},
+            ],
+        },
+    )
+
+
+def test_get_followee_activity(app):
+    with app.app_context():
+        db = get_db()
+
+    populate_followee_activity(db)
+
+    with db.scoped_session() as session:
+        reposts = get_followee_reposts(session, 1, [1, 2], [RepostType.track], 10)
+        # most recent first, capped per track
+        assert [repost["user_id"] for repost in reposts[1]] == list(
+            range(NUM_FOLLOWEES + 1, NUM_FOLLOWEES - 9, -1)
+        )
+        assert reposts[1][0] == {
+            "user_id": NUM_FOLLOWEES + 1,
+            "repost_item_id": 1,
+            "repost_type": RepostType.track,
+            "created_at": t0 + timedelta(minutes=NUM_FOLLOWEES + 1),
+        }
+        assert 2 not in reposts
+
+        saves = get_followee_saves(session, 1, [1, 2], [SaveType.track])
+        assert len(saves[1]) == 100
+        assert {save["user_id"] for save in saves[1]} == set(
+            range(NUM_FOLLOWEES - 98, NUM_FOLLOWEES + 2)
+        )
+        assert saves[1][0]["save_type"] == SaveType.track
+
+        reposts = get_followee_reposts(
+            session, 1, [1, 2], [RepostType.playlist, RepostType.album]
+        )
+        assert sorted(repost["user_id"] for repost in reposts[1]) == [2, 3]
+        assert [repost["user_id"] for repost in reposts[2]] == [4]
+        saves = get_followee_saves(session, 1, [1, 2], [SaveType.playlist])
+        assert [save["user_id"] for save in saves[1]] == [5]
+
+        # users who follow nobody
+        assert get_followee_reposts(session, 2, [1], [RepostType.track]) == {}
+        assert get_followee_saves(session, 2, [1], [SaveType.track]) == {}
+
+
+def test_followees_resolved_once_per_request(app):
+    with app.app_context():
+        db = get_db()
+
+    populate_followee_activity(db)
+
+    with db.scoped_session() as session, app.test_request_context():
+        follows_queries = []
+
+        def on_execute(conn, cursor, statement, parameters, context, executemany):
+            if "FROM follows" in statement:
+                follows_queries.append(statement)
+
+        engine = session.get_bind()
+        event.listen(engine, "before_cursor_execute", on_execute)
+        try:
+            tracks = populate_track_metadata(
+                session,
+                [1, 2],
+                [
+                    {
+                        "track_id": track_id,
+                        "stream_conditions": None,
+                        "download_conditions": None,
+                    }
+                    for track_id in [1, 2]
+                ],
+                1,
+                track_has_aggregates=True,
+            )
+            playlists = populate_playlist_metadata(
+                session,
+                [1, 2],
+                [
+                    {"playlist_id": 1, "playlist_contents": {"track_ids": []}},
+                    {"playlist_id": 2, "playlist_contents": {"track_ids": []}},
+                ],
+                [RepostType.playlist, RepostType.album],
+                [SaveType.playlist, SaveType.album],
+                1,
+            )
+        finally:
+            event.remove(engine, "before_cursor_execute", on_execute)
+
+        assert len(follows_queries) == 1
+        assert len(get_followee_ids(session, 1)) == NUM_FOLLOWEES
+
+    assert len(tracks[0][response_name_constants.followee_reposts]) == 100
+    assert len(tracks[0][response_name_constants.followee_saves]) == 100
+    assert tracks[1][response_name_constants.followee_reposts] == []
+    assert len(playlists[0][response_name_constants.followee_reposts]) == 2
+    assert len(playlists[0][response_name_constants.followee_saves]) == 1
+    assert len(playlists[1][response_name_constants.followee_reposts]) == 1
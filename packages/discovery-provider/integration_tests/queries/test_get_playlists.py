@@ -4,7 +4,10 @@ from datetime import datetime, timedelta
 import pytest
 
 from integration_tests.utils import populate_mock_db
-from src.queries.get_playlist_tracks import get_playlist_tracks
+from src.queries.get_playlist_tracks import (
+    get_playlist_track_counts,
+    get_playlist_tracks,
+)
 from src.queries.get_playlists import GetPlaylistsArgs, get_playlists
 from src.utils.db_session import get_db
 
@@ -324,6 +327,39 @@ def test_get_playlist_with_listed_and_unlisted_tracks(app, test_entities):
             assert t4_p4["is_unlisted"]
 
 
+def test_get_playlist_tracks_window(app, test_entities):
+    with app.app_context():
+        db = get_db()
+        populate_mock_db(db, test_entities)
+        with db.scoped_session() as session:
+            playlists = get_playlist_tracks(
+                session,
+                {"playlist_ids": [3], "current_user_id": 3, "offset": 1, "limit": 2},
+            )
+            assert [track["track_id"] for track in playlists[3]] == [2, 3]
+
+            playlists = get_playlist_tracks(
+                session, {"playlist_ids": [3], "current_user_id": 3, "offset": 3}
+            )
+            assert [track["track_id"] for track in playlists[3]] == [4]
+
+            # unlisted tracks 3 and 4 are only returned to the owner
+            playlists = get_playlist_tracks(
+                session, {"playlist_ids": [3], "offset": 1, "limit": 2}
+            )
+            assert [track["track_id"] for track in playlists[3]] == [2]
+
+            playlists = get_playlist_tracks(
+                session, {"playlist_ids": [3], "offset": -1, "limit": 1}
+            )
+            assert [track["track_id"] for track in playlists[3]] == [1]
+
+            assert get_playlist_track_counts(session, [1, 3]) == {1: 0, 3: 2}
+            assert get_playlist_track_counts(session, [3], current_user_id=3) == {3: 4}
+            # private playlists show their unlisted tracks
+            assert get_playlist_track_counts(session, [4]) == {4: 4}
+
+
 def test_get_playlist_with_autogenerated_image(app, test_entities):
     """Test getting playlists with autogenerated image"""
 
@@ -0,0 +1,114 @@
+from collections import Counter
+
+from integration_tests.utils import populate_mock_db
+from src.queries.get_random_tracks import _sample_tracks, get_random_tracks
+from src.tasks.refresh_random_track_pool import _refresh_random_track_pool
+from src.utils.db_session import get_db
+
+test_entities = {
+    "users": [{"user_id": i, "handle": f"user{i}"} for i in range(1, 5)],
+    "aggregate_user": [
+        {"user_id": 1, "follower_count": 10},
+        {"user_id": 2, "follower_count": 100},
+        {"user_id": 3, "follower_count": 200},
+        {"user_id": 4, "follower_count": 300},
+    ],
+    # 5 tracks per user, plus tracks that are never eligible
+    "tracks": [
+        {"track_id": i, "owner_id": 1 + (i - 1) // 5, "title": f"track{i}"}
+        for i in range(1, 21)
+    ]
+    + [
+        {"track_id": 21, "owner_id": 4, "is_unlisted": True},
+        {"track_id": 22, "owner_id": 4, "is_delete": True},
+    ],
+}
+
+
+def test_get_random_tracks(app):
+    with app.app_context():
+        db = get_db()
+        populate_mock_db(db, test_entities)
+        with db.scoped_session() as session:
+            _refresh_random_track_pool(session)
+
+        tracks = get_random_tracks({"limit": 5, "min_followers": 100})
+        track_ids = [track["track_id"] for track in tracks]
+        assert len(track_ids) == 5
+        assert len(set(track_ids)) == 5
+        assert all(6 <= track_id <= 20 for track_id in track_ids)
+
+        # all eligible tracks when asking for more than there are
+        tracks = get_random_tracks({"limit": 25, "min_followers": 200})
+        assert sorted(track["track_id"] for track in tracks) == list(range(11, 21))
+
+        tracks = get_random_tracks({"limit": 25, "min_followers": 1000})
+        assert tracks == []
+
+
+def test_sample_tracks_is_uniform(app):
+    with app.app_context():
+        db = get_db()
+        populate_mock_db(db, test_entities)
+
+    with db.scoped_session() as session:
+        _refresh_random_track_pool(session)
+
+    with db.scoped_session() as session:
+        counts: Counter = Counter()
+        for _ in range(600):
+            counts.update(track.track_id for track in _sample_tracks(session, 2, 200))
+        assert set(counts) == set(range(11, 21))
+        # each of the 10 tracks is expected 120 times
+        assert all(60 < count < 180 for count in counts.values())
+
+
+def test_sample_tracks_with_stale_pool(app):
+    with app.app_context():
+        db = get_db()
+        populate_mock_db(db, test_entities)
+
+    with db.scoped_session() as session:
+        _refresh_random_track_pool(session)
+        # changes after the refresh are honored before the next one
+        session.execute("UPDATE tracks SET is_delete = true WHERE track_id = 16")
+        session.execute("UPDATE tracks SET is_unlisted = true WHERE track_id = 17")
+        session.execute(
+            "UPDATE aggregate_user SET follower_count = 50 WHERE user_id = 3"
+        )
+
+    with db.scoped_session() as session:
+        for _ in range(20):
+            track_ids = [track.track_id for track in _sample_tracks(session, 3, 200)]
+            assert len(track_ids) == 3
+            assert all(track_id in [18, 19, 20] for track_id in track_ids)
+
+
+def test_refresh_random_track_pool_swaps_pool(app):
+    with app.app_context():
+        db = get_db()
+        populate_mock_db(db, test_entities)
+
+    with db.scoped_session() as session:
+        _refresh_random_track_pool(session)
+        # a new track of the most followed owner shifts every other ordinal
+        session.execute("UPDATE tracks SET is_unlisted = false WHERE track_id = 21")
+
+    with db.scoped_session() as session:
+        _refresh_random_track_pool(session)
+
+    with db.scoped_session() as session:
+        pool = session.execute(
+            "SELECT ordinal, track_id FROM random_track_pool ORDER BY ordinal"
+        ).fetchall()
+        assert [track_id for _, track_id in pool] == (
+            [16, 17, 18, 19, 20, 21]
+            + list(range(11, 16))
+            + list(range(6, 11))
+            + list(range(1, 6))
+        )
+        assert [ordinal for ordinal, _ in pool] == list(range(1, 22))
+        assert (
+            session.execute("SELECT to_regclass('random_track_pool_next')").scalar()
+            is None
+        )
@@ -1,13 +1,20 @@
 import logging
 from datetime import datetime
 
-from integration_tests.utils import populate_mock_db
+from integration_tests.utils import count_queries, populate_mock_db
+from src.models.comments.comment import Comment
 from src.models.comments.comment_report import COMMENT_KARMA_THRESHOLD
 from src.queries.comments import (
     COMMENT_ROOT_DEFAULT_LIMIT,
     get_replies,
     get_track_comments,
 )
+from src.queries.comments.utils import (
+    build_comments_query,
+    format_comments,
+    get_base_comments_query,
+    get_comment_replies,
+)
 from src.utils.db_session import get_db
 from src.utils.helpers import decode_string_id
 
@@ -864,3 +871,108 @@ def test_get_comment_reactions(app):
         assert reply["react_count"] == 1
         assert reply["is_current_user_reacted"] == True  # User 3 reacted
         assert reply["is_artist_reacted"] == False  # Artist didn't react
+
+
+def test_format_tombstone_comments_query_count(app):
+    num_parents = 30
+    entities = {
+        "comments": [
+            {  # deleted parents, the even ones have replies
+                "comment_id": i,
+                "user_id": 1,
+                "entity_id": 1,
+                "entity_type": "Track",
+                "created_at": datetime(2022, 1, 1),
+                "is_delete": True,
+            }
+            for i in range(1, num_parents + 1)
+        ]
+        + [
+            {  # replies
+                "comment_id": i + 100,
+                "user_id": 2,
+                "entity_id": 1,
+                "entity_type": "Track",
+                "created_at": datetime(2022, 1, 2),
+            }
+            for i in range(2, num_parents + 1, 2)
+        ],
+        "comment_threads": [
+            {"parent_comment_id": i, "comment_id": i + 100}
+            for i in range(2, num_parents + 1, 2)
+        ],
+        "tracks": [{"track_id": 1, "owner_id": 10}],
+    }
+
+    with app.app_context():
+        db = get_db()
+        populate_mock_db(db, entities)
+
+    with db.scoped_session() as session:
+        # page of deleted comments, as the user comments query would return them
+        def format_page(limit):
+            comments = (
+                session.query(Comment)
+                .filter(Comment.comment_id <= num_parents)
+                .order_by(Comment.comment_id)
+                .limit(limit)
+                .all()
+            )
+            return format_comments(
+                session,
+                [(comment, 0, None, []) for comment in comments],
+                current_user_id=1,
+            )
+
+        small_page, small_page_queries = count_queries(session, lambda: format_page(2))
+        page, page_queries = count_queries(session, lambda: format_page(num_parents))
+        assert page_queries == small_page_queries
+
+        assert len(page) == num_parents
+        for comment in page:
+            has_reply = decode_string_id(comment["id"]) % 2 == 0
+            assert comment["is_tombstone"] == has_reply
+            assert comment["reply_count"] == (1 if has_reply else 0)
+            assert comment["message"] == "[Removed]"
+
+        # tombstones on a track page, with their replies
+        def format_track_page(limit):
+            comments = build_comments_query(
+                session=session,
+                query_type="track",
+                base_query=get_base_comments_query(session, 1),
+                current_user_id=1,
+                artist_id=10,
+                entity_id=1,
+            ).limit(limit)
+            return format_comments(
+                session,
+                comments.all(),
+                current_user_id=1,
+                include_replies=True,
+                artist_id=10,
+            )
+
+        _, small_page_queries = count_queries(session, lambda: format_track_page(2))
+        page, page_queries = count_queries(
+            session, lambda: format_track_page(num_parents)
+        )
+        assert page_queries == small_page_queries
+        assert len(page) == num_parents // 2
+        for comment in page:
+            assert comment["is_tombstone"] == True
+            assert comment["reply_count"] == 1
+
+        # replies nobody reacted to are not checked for reactions one by one
+        _, small_page_queries = count_queries(
+            session,
+            lambda: get_comment_replies(session, list(range(1, 5)), 1, artist_id=10),
+        )
+        replies, page_queries = count_queries(
+            session,
+            lambda: get_comment_replies(
+                session, list(range(1, num_parents + 1)), 1, artist_id=10
+            ),
+        )
+        assert page_queries == small_page_queries
+        assert len(replies) == num_parents // 2
@@ -8,6 +8,7 @@ from src.queries.get_user_listening_history import (
     _get_user_listening_history,
 )
 from src.queries.query_helpers import SortDirection, SortMethod
+from src.tasks.index_aggregate_track_listeners import _index_aggregate_track_listeners
 from src.tasks.user_listening_history.index_user_listening_history import (
     _index_user_listening_history,
 )
@@ -319,6 +320,9 @@ def test_track_top_listeners(app):
 
     populate_mock_db(db, test_entities)
 
+    with db.scoped_session() as session:
+        _index_aggregate_track_listeners(session)
+
     with db.scoped_session() as session:
         top_listeners = _get_top_listeners_for_track(session, {"track_id": 2})
         assert len(top_listeners) == 2
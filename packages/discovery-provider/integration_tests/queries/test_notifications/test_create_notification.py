@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta
+
+from integration_tests.utils import count_queries, populate_mock_db
+from src.queries.get_notifications import NotificationType, get_notifications
+from src.utils.db_session import get_db
+
+t1 = datetime(2020, 10, 10, 10, 35, 0)
+
+usdc_gate = {
+    "usdc_purchase": {
+        "price": 100,
+        "splits": {"7gfRGGdp89N9g3mCsZjaGmDDRdcTnZh9u3vYyBab2tRy": 1000000},
+    }
+}
+
+
+def populate_create_notifications(db, num_tracks):
+    """Each track is released by its own artist, odd tracks are usdc gated"""
+    populate_mock_db(
+        db,
+        {
+            "users": [{"user_id": i + 1} for i in range(num_tracks + 1)],
+            "tracks": [
+                {
+                    "track_id": i + 1,
+                    "owner_id": i + 2,
+                    "is_stream_gated": i % 2 == 0,
+                    "stream_conditions": usdc_gate if i % 2 == 0 else None,
+                }
+                for i in range(num_tracks)
+            ],
+            "notification": [
+                {
+                    "user_ids": [1],
+                    "type": "create",
+                    "group_id": f"create:track:user_id:{i + 2}",
+                    "specifier": str(i + 1),
+                    "timestamp": t1 - timedelta(minutes=i),
+                    "data": {"track_id": i + 1},
+                }
+                for i in range(num_tracks)
+            ],
+        },
+    )
+
+
+def test_get_create_notifications_filters_usdc_tracks(app):
+    with app.app_context():
+        db = get_db()
+
+    populate_create_notifications(db, 20)
+
+    with db.scoped_session() as session:
+        notifications = get_notifications(session, {"user_id": 1, "limit": 20})
+        track_ids = [
+            notification["actions"][0]["data"]["track_id"]
+            for notification in notifications
+        ]
+        assert track_ids == list(range(2, 21, 2))
+
+        # usdc tracks are included once purchase notifications are requested
+        notifications = get_notifications(
+            session,
+            {
+                "user_id": 1,
+                "limit": 20,
+                "valid_types": [NotificationType.USDC_PURCHASE_BUYER],
+            },
+        )
+        assert len(notifications) == 20
+
+
+def test_get_create_notifications_query_count(app):
+    """The usdc filter costs one query per page, regardless of page size"""
+    with app.app_context():
+        db = get_db()
+
+    populate_create_notifications(db, 40)
+
+    with db.scoped_session() as session:
+        small_page, small_page_queries = count_queries(
+            session,
+            lambda: get_notifications(session, {"user_id": 1, "limit": 4}),
+        )
+        large_page, large_page_queries = count_queries(
+            session,
+            lambda: get_notifications(session, {"user_id": 1, "limit": 40}),
+        )
+
+    assert len(small_page) == 2
+    assert len(large_page) == 20
+    # notification groups, notifications and the usdc track filter
+    assert small_page_queries == 3
+    assert large_page_queries == 3
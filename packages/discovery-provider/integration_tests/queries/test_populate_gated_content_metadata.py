@@ -0,0 +1,62 @@
+from integration_tests.utils import populate_mock_db
+from src.gated_content.content_access_checker import ContentAccessChecker
+from src.queries import response_name_constants
+from src.queries.query_helpers import _populate_gated_content_metadata
+from src.utils.db_session import get_db
+
+follow_gate = {"follow_user_id": 1}
+usdc_gate = {
+    "usdc_purchase": {
+        "price": 100,
+        "splits": {"7gfRGGdp89N9g3mCsZjaGmDDRdcTnZh9u3vYyBab2tRy": 1000000},
+    }
+}
+
+
+def test_populate_gated_content_metadata_mixed_batch(app, mocker):
+    """Tracks and playlists sharing ids are checked in one batch"""
+    with app.app_context():
+        db = get_db()
+
+    populate_mock_db(
+        db,
+        {
+            "users": [{"user_id": 1}, {"user_id": 2}],
+            "follows": [{"follower_user_id": 2, "followee_user_id": 1}],
+            "tracks": [
+                {
+                    "track_id": 1,
+                    "owner_id": 1,
+                    "is_stream_gated": True,
+                    "stream_conditions": follow_gate,
+                },
+                {"track_id": 2, "owner_id": 1},
+            ],
+            "playlists": [
+                {
+                    "playlist_id": 1,
+                    "playlist_owner_id": 1,
+                    "is_album": True,
+                    "is_stream_gated": True,
+                    "stream_conditions": usdc_gate,
+                },
+            ],
+        },
+    )
+
+    entities = [
+        {"track_id": 1, "owner_id": 1, "stream_conditions": follow_gate},
+        {"track_id": 2, "owner_id": 1},
+        {"playlist_id": 1, "playlist_owner_id": 1, "stream_conditions": usdc_gate},
+    ]
+    check_access_for_batch = mocker.spy(ContentAccessChecker, "check_access_for_batch")
+    with db.scoped_session() as session:
+        _populate_gated_content_metadata(session, entities, 2)
+
+    assert check_access_for_batch.call_count == 1
+    access = [entity[response_name_constants.access] for entity in entities]
+    assert access == [
+        {"stream": True, "download": True},
+        {"stream": True, "download": True},
+        {"stream": False, "download": False},
+    ]
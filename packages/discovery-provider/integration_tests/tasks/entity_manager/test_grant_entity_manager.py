@@ -249,7 +249,7 @@ def test_index_grant(app, mocker):
 
     with db.scoped_session() as session:
         # index transactions
-        entity_manager_update(
+        _, changed_entity_ids = entity_manager_update(
             update_task,
             session,
             entity_manager_txs,
@@ -262,6 +262,16 @@ def test_index_grant(app, mocker):
         all_grants: List[Grant] = session.query(Grant).all()
         assert len(all_grants) == NUM_VALID_GRANTS
 
+        # changed grants are returned so their cached authority can be
+        # dropped once the session commits
+        assert {
+            (grantee_address.lower(), user_id)
+            for grantee_address, user_id in changed_entity_ids["Grant"]
+        } == {
+            (grant["grantee_address"].lower(), grant["user_id"])
+            for grant in new_grants_data
+        }
+
         for expected_grant in new_grants_data:
             found_matches = [
                 item
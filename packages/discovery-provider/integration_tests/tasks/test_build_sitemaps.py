@@ -0,0 +1,110 @@
+import gzip
+import json
+from unittest import mock
+
+from integration_tests.utils import populate_mock_db
+from src.queries.get_sitemap import (
+    get_sitemap_index_redis_key,
+    get_sitemap_manifest_redis_key,
+    get_sitemap_shard_redis_key,
+    get_track_page,
+    get_user_page,
+)
+from src.tasks.build_sitemaps import build_sitemap, build_sitemaps
+from src.utils.db_session import get_db
+
+
+def _seed_db(db, num_users=20, num_tracks=10):
+    test_entities = {
+        "tracks": [{"track_id": i, "owner_id": i} for i in range(num_tracks)],
+        "track_routes": [
+            {
+                "track_id": i,
+                "owner_id": i,
+                "slug": f"slug_{i}",
+                "title_slug": f"title_slug_{i}",
+            }
+            for i in range(num_tracks)
+        ],
+        "users": [{"user_id": i, "handle": f"user_{i}"} for i in range(num_users)],
+    }
+    populate_mock_db(
+        db,
+        {
+            "aggregate_user": [
+                {"user_id": i, "follower_count": 10} for i in range(num_users)
+            ]
+        },
+    )
+    populate_mock_db(db, test_entities)
+
+
+def _get_stored(redis, key):
+    return gzip.decompress(redis.get(key))
+
+
+@mock.patch("src.queries.get_sitemap.get_base_url")
+def test_build_sitemaps(mock_get_base_url, app, redis_mock):
+    """Tests that stored shards match the live sitemap pages"""
+    with app.app_context():
+        db = get_db()
+        mock_get_base_url.return_value = "https://audius.co"
+        _seed_db(db)
+
+        with db.scoped_session() as session:
+            build_sitemaps(session, redis_mock, limit=6)
+
+            assert _get_stored(
+                redis_mock, get_sitemap_shard_redis_key("track", 1)
+            ) == get_track_page(session, 1, 6)
+            assert _get_stored(
+                redis_mock, get_sitemap_shard_redis_key("track", 2)
+            ) == get_track_page(session, 2, 6)
+            assert redis_mock.get(get_sitemap_shard_redis_key("track", 3)) is None
+            for page in range(1, 5):
+                assert _get_stored(
+                    redis_mock, get_sitemap_shard_redis_key("user", page)
+                ) == get_user_page(session, page, 6)
+
+            track_index = _get_stored(redis_mock, get_sitemap_index_redis_key("track"))
+            assert b"https://audius.co/sitemaps/track/2.xml" in track_index
+            assert b"https://audius.co/sitemaps/track/3.xml" not in track_index
+
+            manifest = json.loads(
+                redis_mock.get(get_sitemap_manifest_redis_key("track"))
+            )
+            assert [(s["first_id"], s["last_id"], s["count"]) for s in manifest] == [
+                (0, 5, 6),
+                (6, 9, 4),
+            ]
+
+
+@mock.patch("src.queries.get_sitemap.get_base_url")
+def test_build_sitemaps_only_changed_shards(mock_get_base_url, app, redis_mock):
+    """Tests that a rebuild only rewrites shards whose id range changed"""
+    with app.app_context():
+        db = get_db()
+        mock_get_base_url.return_value = "https://audius.co"
+        _seed_db(db)
+
+        with db.scoped_session() as session:
+            assert build_sitemap(session, redis_mock, "user", limit=8) == (3, 3)
+            assert build_sitemap(session, redis_mock, "user", limit=8) == (3, 0)
+
+        # a new user lands in the last shard
+        populate_mock_db(
+            db,
+            {
+                "users": [{"user_id": 20, "handle": "user_20"}],
+                "aggregate_user": [{"user_id": 20, "follower_count": 10}],
+            },
+        )
+        with db.scoped_session() as session:
+            assert build_sitemap(session, redis_mock, "user", limit=8) == (3, 1)
+            assert _get_stored(
+                redis_mock, get_sitemap_shard_redis_key("user", 3)
+            ) == get_user_page(session, 3, 8)
+
+            # shards past the end are dropped when the pool shrinks
+            assert build_sitemap(session, redis_mock, "user", limit=16) == (2, 2)
+            assert redis_mock.get(get_sitemap_shard_redis_key("user", 3)) is None
@@ -0,0 +1,219 @@
+from datetime import datetime, timedelta
+
+from integration_tests.utils import populate_mock_db
+from src.models.tracks.aggregate_track_listener import AggregateTrackListener
+from src.tasks.index_aggregate_track_listeners import (
+    AGGREGATE_TRACK_LISTENERS_TABLE_NAME,
+    _index_aggregate_track_listeners,
+    _reconcile_aggregate_track_listeners,
+)
+from src.utils.db_session import get_db
+from src.utils.update_indexing_checkpoints import get_last_indexed_checkpoint
+
+TIMESTAMP = datetime(2023, 1, 1)
+
+entities = {
+    "tracks": [
+        {"track_id": 1, "title": "track 1"},
+        {"track_id": 2, "title": "track 2"},
+    ],
+    "users": [
+        {"user_id": 1, "handle": "user-1"},
+        {"user_id": 2, "handle": "user-2"},
+    ],
+    "plays": [
+        {"id": 1, "item_id": 1, "user_id": 1, "created_at": TIMESTAMP},
+        {
+            "id": 2,
+            "item_id": 1,
+            "user_id": 1,
+            "created_at": TIMESTAMP + timedelta(minutes=30),
+        },
+        {
+            "id": 3,
+            "item_id": 1,
+            "user_id": 1,
+            "created_at": TIMESTAMP + timedelta(hours=1),
+        },
+        {"id": 4, "item_id": 1, "user_id": 2, "created_at": TIMESTAMP},
+        {"id": 5, "item_id": 2, "user_id": 2, "created_at": TIMESTAMP},
+        # anonymous plays are not counted
+        {"id": 6, "item_id": 1, "user_id": None, "created_at": TIMESTAMP},
+    ],
+}
+
+
+def get_dirty_track_ids(session):
+    return [
+        track_id
+        for (track_id,) in session.execute(
+            "SELECT track_id FROM aggregate_track_listeners_dirty ORDER BY track_id"
+        )
+    ]
+
+
+def get_listen_counts(session):
+    return {
+        (row.track_id, row.user_id): row.listen_count
+        for row in session.query(AggregateTrackListener).all()
+    }
+
+
+def test_index_aggregate_track_listeners(app):
+    """Counts distinct hours per listener, incrementally across runs"""
+    with app.app_context():
+        db = get_db()
+
+    populate_mock_db(db, entities)
+
+    with db.scoped_session() as session:
+        _index_aggregate_track_listeners(session)
+
+    with db.scoped_session() as session:
+        assert get_listen_counts(session) == {(1, 1): 2, (1, 2): 1, (2, 2): 1}
+        assert (
+            get_last_indexed_checkpoint(session, AGGREGATE_TRACK_LISTENERS_TABLE_NAME)
+            == 6
+        )
+
+    populate_mock_db(
+        db,
+        {
+            "plays": [
+                # same hour as an already counted listen
+                {
+                    "id": 7,
+                    "item_id": 1,
+                    "user_id": 1,
+                    "created_at": TIMESTAMP + timedelta(hours=1, minutes=15),
+                },
+                # new hours
+                {
+                    "id": 8,
+                    "item_id": 1,
+                    "user_id": 1,
+                    "created_at": TIMESTAMP + timedelta(hours=2),
+                },
+                {
+                    "id": 9,
+                    "item_id": 2,
+                    "user_id": 1,
+                    "created_at": TIMESTAMP + timedelta(hours=2),
+                },
+            ]
+        },
+    )
+
+    with db.scoped_session() as session:
+        _index_aggregate_track_listeners(session)
+
+    with db.scoped_session() as session:
+        assert get_listen_counts(session) == {
+            (1, 1): 3,
+            (1, 2): 1,
+            (2, 2): 1,
+            (2, 1): 1,
+        }
+
+
+def test_reconcile_aggregate_track_listeners(app):
+    """Reconcile picks up late plays for hours before the last counted hour"""
+    with app.app_context():
+        db = get_db()
+
+    populate_mock_db(db, entities)
+
+    with db.scoped_session() as session:
+        _index_aggregate_track_listeners(session)
+
+    populate_mock_db(
+        db,
+        {
+            "plays": [
+                {
+                    "id": 7,
+                    "item_id": 1,
+                    "user_id": 1,
+                    "created_at": TIMESTAMP - timedelta(days=1),
+                },
+            ]
+        },
+    )
+
+    with db.scoped_session() as session:
+        _index_aggregate_track_listeners(session)
+
+    with db.scoped_session() as session:
+        # the late play is behind the last counted hour
+        assert get_listen_counts(session)[(1, 1)] == 2
+        assert get_dirty_track_ids(session) == [1]
+
+    with db.scoped_session() as session:
+        assert _reconcile_aggregate_track_listeners(session, batch_size=1) == 1
+
+    with db.scoped_session() as session:
+        assert get_listen_counts(session) == {(1, 1): 3, (1, 2): 1, (2, 2): 1}
+        assert get_dirty_track_ids(session) == []
+
+    with db.scoped_session() as session:
+        # only tracks with late plays are reconciled
+        assert _reconcile_aggregate_track_listeners(session, batch_size=1) == 0
+
+
+def test_reconcile_aggregate_track_listeners_after_prune(app):
+    """Reconcile keeps counts of listeners whose plays were pruned"""
+    with app.app_context():
+        db = get_db()
+
+    populate_mock_db(db, entities)
+
+    with db.scoped_session() as session:
+        _index_aggregate_track_listeners(session)
+        # pruned by prune_plays
+        session.execute("DELETE FROM plays WHERE id IN (1, 2, 4)")
+
+    populate_mock_db(
+        db,
+        {
+            "plays": [
+                {
+                    "id": 7,
+                    "item_id": 1,
+                    "user_id": 1,
+                    "created_at": TIMESTAMP - timedelta(days=1),
+                },
+            ]
+        },
+    )
+
+    with db.scoped_session() as session:
+        _index_aggregate_track_listeners(session)
+        assert _reconcile_aggregate_track_listeners(session) == 1
+
+    with db.scoped_session() as session:
+        # plays 3 and 7 are all that is left of listener 1, and nothing of
+        # listener 2
+        assert get_listen_counts(session) == {(1, 1): 2, (1, 2): 1, (2, 2): 1}
+
+
+def test_index_aggregate_track_listeners_max_plays_per_run(app):
+    """Catches up on a backlog of plays over several runs"""
+    with app.app_context():
+        db = get_db()
+
+    populate_mock_db(db, entities)
+
+    checkpoints = []
+    for _ in range(3):
+        with db.scoped_session() as session:
+            _index_aggregate_track_listeners(session, max_plays_per_run=4)
+        with db.scoped_session() as session:
+            checkpoints.append(
+                get_last_indexed_checkpoint(
+                    session, AGGREGATE_TRACK_LISTENERS_TABLE_NAME
+                )
+            )
+
+    assert checkpoints == [4, 6, 6]
+    with db.scoped_session() as session:
+        assert get_listen_counts(session) == {(1, 1): 2, (1, 2): 1, (2, 2): 1}
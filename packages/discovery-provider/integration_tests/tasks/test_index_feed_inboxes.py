@@ -0,0 +1,161 @@
+from datetime import datetime
+
+from integration_tests.utils import populate_mock_db
+from src.models.social.follow import Follow
+from src.tasks.aggregates import get_latest_blocknumber
+from src.tasks.index_feed_inboxes import (
+    FEED_INBOXES_CHECKPOINT_NAME,
+    _index_feed_inboxes,
+)
+from src.utils.db_session import get_db
+from src.utils.feed_inbox import (
+    fill_feed_inbox,
+    get_feed_inbox_entries,
+    get_feed_inbox_key,
+    to_feed_score,
+)
+from src.utils.redis_connection import get_redis
+from src.utils.update_indexing_checkpoints import get_last_indexed_checkpoint
+
+
+def get_inbox_keys(redis, user_id):
+    return {key for _, key in get_feed_inbox_entries(redis, user_id, None, 100)}
+
+
+def start_feed_inboxes(db, redis, entities, inbox_user_ids):
+    """Populates entities, starts the checkpoint and opens the given inboxes"""
+    populate_mock_db(db, entities)
+    with db.scoped_session() as session:
+        assert _index_feed_inboxes(session, redis) == 0
+        assert get_last_indexed_checkpoint(
+            session, FEED_INBOXES_CHECKPOINT_NAME
+        ) == get_latest_blocknumber(session)
+    for user_id in inbox_user_ids:
+        fill_feed_inbox(redis, user_id, [(to_feed_score(datetime.now()), "track:99")])
+
+
+def test_index_feed_inboxes_fans_out(app):
+    with app.app_context():
+        db = get_db()
+    redis = get_redis()
+
+    start_feed_inboxes(
+        db,
+        redis,
+        {
+            "users": [{"user_id": user_id} for user_id in range(1, 5)],
+            "follows": [
+                {"follower_user_id": 2, "followee_user_id": 1},
+                {"follower_user_id": 3, "followee_user_id": 1},
+                {"follower_user_id": 4, "followee_user_id": 1},
+            ],
+        },
+        [2, 3],
+    )
+
+    populate_mock_db(
+        db,
+        {
+            "tracks": [
+                {"track_id": 1, "owner_id": 1},
+                {"track_id": 2, "owner_id": 4},
+                {"track_id": 3, "owner_id": 1, "is_unlisted": True},
+            ],
+            "playlists": [{"playlist_id": 1, "playlist_owner_id": 1}],
+            "reposts": [
+                {"user_id": 1, "repost_item_id": 2, "repost_type": "track"},
+            ],
+        },
+    )
+    with db.scoped_session() as session:
+        # user 4 has no inbox, so nothing is fanned out to them
+        assert _index_feed_inboxes(session, redis) == 2
+        assert get_last_indexed_checkpoint(
+            session, FEED_INBOXES_CHECKPOINT_NAME
+        ) == get_latest_blocknumber(session)
+
+    expected = {"track:99", "track:1", "track:2", "playlist:1"}
+    assert get_inbox_keys(redis, 2) == expected
+    assert get_inbox_keys(redis, 3) == expected
+    assert not redis.exists(get_feed_inbox_key(4))
+
+
+def test_index_feed_inboxes_drops_inboxes_on_follow_changes(app):
+    with app.app_context():
+        db = get_db()
+    redis = get_redis()
+
+    start_feed_inboxes(
+        db,
+        redis,
+        {
+            "users": [{"user_id": user_id} for user_id in range(1, 6)],
+            "follows": [
+                {"follower_user_id": 2, "followee_user_id": 1},
+                {"follower_user_id": 3, "followee_user_id": 1},
+            ],
+        },
+        [2, 3, 4],
+    )
+
+    with db.scoped_session() as session:
+        session.query(Follow).filter(
+            Follow.follower_user_id == 3, Follow.followee_user_id == 1
+        ).update({"is_current": False})
+    populate_mock_db(
+        db,
+        {
+            "follows": [
+                # user 3 unfollows user 1
+                {"follower_user_id": 3, "followee_user_id": 1, "is_delete": True},
+                # user 4 follows user 5
+                {"follower_user_id": 4, "followee_user_id": 5},
+            ],
+        },
+    )
+    with db.scoped_session() as session:
+        _index_feed_inboxes(session, redis)
+
+    assert get_inbox_keys(redis, 2) == {"track:99"}
+    assert not redis.exists(get_feed_inbox_key(3))
+    assert not redis.exists(get_feed_inbox_key(4))
+
+
+def test_index_feed_inboxes_max_blocks_per_run(app):
+    with app.app_context():
+        db = get_db()
+    redis = get_redis()
+
+    start_feed_inboxes(
+        db,
+        redis,
+        {
+            "users": [{"user_id": 1}, {"user_id": 2}],
+            "follows": [{"follower_user_id": 2, "followee_user_id": 1}],
+        },
+        [2],
+    )
+    with db.scoped_session() as session:
+        prev_checkpoint = get_last_indexed_checkpoint(
+            session, FEED_INBOXES_CHECKPOINT_NAME
+        )
+
+    # each track is in its own block
+    populate_mock_db(
+        db,
+        {"tracks": [{"track_id": i, "owner_id": 1} for i in range(1, 4)]},
+    )
+    with db.scoped_session() as session:
+        _index_feed_inboxes(session, redis, max_blocks_per_run=1)
+        assert (
+            get_last_indexed_checkpoint(session, FEED_INBOXES_CHECKPOINT_NAME)
+            == prev_checkpoint + 1
+        )
+    assert get_inbox_keys(redis, 2) == {"track:99", "track:1"}
+
+    with db.scoped_session() as session:
+        _index_feed_inboxes(session, redis)
+        assert get_last_indexed_checkpoint(
+            session, FEED_INBOXES_CHECKPOINT_NAME
+        ) == get_latest_blocknumber(session)
+    assert get_inbox_keys(redis, 2) == {"track:99", "track:1", "track:2", "track:3"}
@@ -0,0 +1,222 @@
+import json
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from urllib.parse import urlparse
+
+from src.models.metrics.aggregate_daily_app_name_metrics import (
+    AggregateDailyAppNameMetric,
+)
+from src.models.metrics.aggregate_daily_total_users_metrics import (
+    AggregateDailyTotalUsersMetrics,
+)
+from src.models.metrics.aggregate_daily_unique_users_metrics import (
+    AggregateDailyUniqueUsersMetrics,
+)
+from src.models.metrics.aggregate_monthly_app_name_metrics import (
+    AggregateMonthlyAppNameMetric,
+)
+from src.models.metrics.aggregate_monthly_unique_users_metrics import (
+    AggregateMonthlyUniqueUsersMetric,
+)
+from src.tasks.index_metrics import (
+    consolidate_metrics_from_other_nodes,
+    synchronize_all_node_metrics,
+)
+from src.utils.config import shared_config
+from src.utils.db_session import get_db
+from src.utils.redis_connection import get_redis
+from src.utils.redis_metrics import metrics_visited_nodes
+
+NODE_METRICS = [
+    {
+        "routes": {
+            "deduped": {"1.1.1.1": 3, "2.2.2.2": 1},
+            "summed": {"daily": 2, "monthly": 2},
+        },
+        "apps": {"app": 2},
+    },
+    {
+        "routes": {
+            "deduped": {"2.2.2.2": 2, "3.3.3.3": 5},
+            "summed": {"daily": 2, "monthly": 3},
+        },
+        "apps": {"app": 1, "other": 4},
+    },
+    {
+        "routes": {"deduped": {"4.4.4.4": 1}, "summed": {"daily": 1, "monthly": 1}},
+        "apps": {"other": 1},
+    },
+]
+
+
+@contextmanager
+def stub_discovery_node(metrics, latency=0.0):
+    """Local discovery node serving the metrics endpoints with injected latency"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            path = urlparse(self.path).path
+            data = {
+                "/v1/metrics/routes/cached": metrics.get("routes"),
+                "/v1/metrics/apps/cached": metrics.get("apps"),
+                "/v1/metrics/aggregates/historical": metrics.get("historical"),
+            }.get(path)
+            if data is None:
+                self.send_response(404)
+                self.end_headers()
+                return
+            response = json.dumps({"data": data}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(response)))
+            self.end_headers()
+            self.wfile.write(response)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@contextmanager
+def stub_discovery_nodes(node_metrics, latencies):
+    with ExitStack() as stack:
+        endpoints = [
+            stack.enter_context(stub_discovery_node(metrics, latency))
+            for metrics, latency in zip(node_metrics, latencies)
+        ]
+        nodes = [
+            {"endpoint": endpoint, "delegateOwnerWallet": f"0x{i}"}
+            for i, endpoint in enumerate(endpoints)
+        ]
+        # this node is never asked for its own metrics
+        nodes.append(
+            {
+                "endpoint": "http://127.0.0.1:1",
+                "delegateOwnerWallet": shared_config["delegate"]["owner_wallet"],
+            }
+        )
+        with mock.patch(
+            "src.tasks.index_metrics.get_all_discovery_nodes_cached",
+            return_value=nodes,
+        ):
+            yield endpoints
+
+
+def test_consolidate_metrics_from_other_nodes(app):
+    with app.app_context():
+        db = get_db()
+    redis = get_redis()
+
+    # each node answers both of its requests after a second
+    with stub_discovery_nodes(NODE_METRICS, [1, 1, 1]) as endpoints:
+        start = time.monotonic()
+        consolidate_metrics_from_other_nodes(None, db, redis)
+        # bounded by the slowest node rather than the 6s of all nodes
+        assert time.monotonic() - start < 4
+
+    today = datetime.utcnow().date()
+    with db.scoped_session() as session:
+        unique_record = (
+            session.query(AggregateDailyUniqueUsersMetrics)
+            .filter(AggregateDailyUniqueUsersMetrics.timestamp == today)
+            .one()
+        )
+        assert unique_record.count == 4
+        assert unique_record.summed_count == 5
+        total_record = (
+            session.query(AggregateDailyTotalUsersMetrics)
+            .filter(AggregateDailyTotalUsersMetrics.timestamp == today)
+            .one()
+        )
+        assert total_record.count == 12
+        monthly_unique_record = session.query(AggregateMonthlyUniqueUsersMetric).one()
+        assert monthly_unique_record.count == 4
+        assert monthly_unique_record.summed_count == 6
+        app_counts = {
+            record.application_name: record.count
+            for record in session.query(AggregateDailyAppNameMetric).filter(
+                AggregateDailyAppNameMetric.timestamp == today
+            )
+        }
+        assert app_counts == {"app": 3, "other": 5}
+
+    cursors = redis.hgetall(metrics_visited_nodes)
+    assert {endpoint.decode() for endpoint in cursors} == set(endpoints)
+
+
+@mock.patch("src.tasks.index_metrics.FETCH_DEADLINE_SECONDS", 1)
+def test_consolidate_metrics_skips_unresponsive_nodes(app):
+    with app.app_context():
+        db = get_db()
+    redis = get_redis()
+
+    with stub_discovery_nodes(NODE_METRICS, [0, 0, 3]) as endpoints:
+        start = time.monotonic()
+        consolidate_metrics_from_other_nodes(None, db, redis)
+        assert time.monotonic() - start < 3
+
+    with db.scoped_session() as session:
+        total_record = session.query(AggregateDailyTotalUsersMetrics).one()
+        assert total_record.count == 11
+        app_counts = {
+            record.application_name: record.count
+            for record in session.query(AggregateDailyAppNameMetric)
+        }
+        assert app_counts == {"app": 3, "other": 4}
+
+    # the unresponsive node is retried from its old cursor next time
+    cursors = redis.hgetall(metrics_visited_nodes)
+    assert {endpoint.decode() for endpoint in cursors} == set(endpoints[:2])
+
+
+def test_synchronize_all_node_metrics(app):
+    with app.app_context():
+        db = get_db()
+    redis = get_redis()
+
+    def historical(unique_count, total_count, app_count):
+        route_values = {
+            "unique_count": unique_count,
+            "summed_unique_count": unique_count + 1,
+            "total_count": total_count,
+        }
+        return {
+            "historical": {
+                "routes": {
+                    "daily": {"2024-01-01": route_values},
+                    "monthly": {"2024-01-01": route_values},
+                },
+                "apps": {
+                    "daily": {"2024-01-01": {"app": app_count}},
+                    "monthly": {"2024-01-01": {"app": app_count}},
+                },
+            }
+        }
+
+    node_metrics = [historical(3, 10, 2), historical(5, 7, 4), historical(1, 1, 1)]
+    with stub_discovery_nodes(node_metrics, [1, 1, 1]):
+        start = time.monotonic()
+        synchronize_all_node_metrics(None, db, redis)
+        assert time.monotonic() - start < 3
+
+    with db.scoped_session() as session:
+        unique_record = session.query(AggregateDailyUniqueUsersMetrics).one()
+        assert unique_record.count == 5
+        assert unique_record.summed_count == 6
+        total_record = session.query(AggregateDailyTotalUsersMetrics).one()
+        assert total_record.count == 10
+        assert session.query(AggregateDailyAppNameMetric).one().count == 4
+        assert session.query(AggregateMonthlyAppNameMetric).one().count == 4
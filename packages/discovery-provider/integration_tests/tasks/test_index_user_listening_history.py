@@ -1,10 +1,13 @@
 import logging
+from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import List
+from typing import List, NamedTuple
+
+from sqlalchemy import desc
 
 from integration_tests.utils import populate_mock_db
 from src.models.indexing.indexing_checkpoints import IndexingCheckpoint
-from src.models.users.user_listening_history import UserListeningHistory
+from src.models.users.user_track_listen import UserTrackListen
 from src.tasks.user_listening_history.index_user_listening_history import (
     USER_LISTENING_HISTORY_TABLE_NAME,
     _index_user_listening_history,
@@ -23,6 +26,37 @@ TIMESTAMP_4 = datetime(2014, 4, 4)
 TIMESTAMP_5 = datetime(2015, 5, 5)
 
 
+class ListeningHistory(NamedTuple):
+    user_id: int
+    listening_history: List[dict]
+
+
+def get_listening_histories(session) -> List[ListeningHistory]:
+    """Groups user_track_listens rows per user, most recent listen first"""
+    listens = (
+        session.query(UserTrackListen)
+        .order_by(
+            UserTrackListen.user_id,
+            desc(UserTrackListen.last_listened_at),
+            desc(UserTrackListen.track_id),
+        )
+        .all()
+    )
+    histories = defaultdict(list)
+    for listen in listens:
+        histories[listen.user_id].append(
+            {
+                "track_id": listen.track_id,
+                "timestamp": str(listen.last_listened_at),
+                "play_count": listen.play_count,
+            }
+        )
+    return [
+        ListeningHistory(user_id=user_id, listening_history=history)
+        for user_id, history in histories.items()
+    ]
+
+
 # Tests
 def test_index_user_listening_history_populate_play_count(app):
     """Tests populating user_listening_history from empty"""
@@ -64,11 +98,7 @@ def test_index_user_listening_history_populate_play_count(app):
     with db.scoped_session() as session:
         _index_user_listening_history(session)
 
-        results: List[UserListeningHistory] = (
-            session.query(UserListeningHistory)
-            .order_by(UserListeningHistory.user_id)
-            .all()
-        )
+        results = get_listening_histories(session)
 
         assert len(results) == 3
 
@@ -152,11 +182,7 @@ def test_index_user_listening_history_update_play_count(app):
         _index_user_listening_history(session)
 
     with db.scoped_session() as session:
-        results: List[UserListeningHistory] = (
-            session.query(UserListeningHistory)
-            .order_by(UserListeningHistory.user_id)
-            .all()
-        )
+        results = get_listening_histories(session)
 
         assert len(results) == 2
 
@@ -218,11 +244,7 @@ def test_index_user_listening_history_populate(app):
     with db.scoped_session() as session:
         _index_user_listening_history(session)
 
-        results: List[UserListeningHistory] = (
-            session.query(UserListeningHistory)
-            .order_by(UserListeningHistory.user_id)
-            .all()
-        )
+        results = get_listening_histories(session)
 
         assert len(results) == 3
 
@@ -338,11 +360,7 @@ def test_index_user_listening_history_update(app):
         _index_user_listening_history(session)
 
     with db.scoped_session() as session:
-        results: List[UserListeningHistory] = (
-            session.query(UserListeningHistory)
-            .order_by(UserListeningHistory.user_id)
-            .all()
-        )
+        results = get_listening_histories(session)
 
         assert len(results) == 4
 
@@ -370,8 +388,8 @@ def test_index_user_listening_history_update(app):
         assert results[2].listening_history[2]["timestamp"] == str(TIMESTAMP_1)
 
         assert results[3].user_id == 4
-        assert len(results[3].listening_history) == 1000
-        for i in range(1000):
+        assert len(results[3].listening_history) == 2000
+        for i in range(2000):
             assert results[3].listening_history[i]["track_id"] == 2000 - i
             assert results[3].listening_history[i]["timestamp"] == str(
                 datetime.fromisoformat("2014-06-26 07:00:00") - timedelta(hours=i)
@@ -451,11 +469,7 @@ def test_index_user_listening_history_no_update(app):
     with db.scoped_session() as session:
         _index_user_listening_history(session)
 
-        results: List[UserListeningHistory] = (
-            session.query(UserListeningHistory)
-            .order_by(UserListeningHistory.user_id)
-            .all()
-        )
+        results = get_listening_histories(session)
 
         assert len(results) == 3
 
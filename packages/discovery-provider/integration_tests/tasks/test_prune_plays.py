@@ -1,7 +1,11 @@
+import csv
+import gzip
 import logging
 from datetime import datetime, timedelta
 from typing import List
 
+import pytest
+
 from integration_tests.utils import populate_mock_db
 from src.models.social.play import Play
 from src.tasks.prune_plays import _prune_plays
@@ -129,3 +133,85 @@ def test_prune_plays_skip_prune(app):
         # verify plays
         plays_result: List[Play] = session.query(Play).order_by(Play.id).all()
         assert len(plays_result) == 1
+
+
+def test_prune_plays_sliding_window(app):
+    """Test that the default cutoff is the retention window ending now"""
+    with app.app_context():
+        db = get_db()
+
+    entities = {
+        "tracks": [{"track_id": 1, "title": "track 1"}],
+        "plays": [
+            {"item_id": 1, "created_at": datetime.now() - timedelta(days=401)},
+            {"item_id": 1, "created_at": datetime.now() - timedelta(days=399)},
+        ],
+    }
+
+    populate_mock_db(db, entities)
+
+    with db.scoped_session() as session:
+        deleted_bytes = _prune_plays(session)
+        assert deleted_bytes > 0
+
+        plays_result: List[Play] = session.query(Play).order_by(Play.id).all()
+        assert [play.id for play in plays_result] == [2]
+
+
+def test_prune_plays_archive(app, tmp_path):
+    """Test that pruned plays are written to a gzip'd csv before removal"""
+    with app.app_context():
+        db = get_db()
+
+    entities = {
+        "tracks": [{"track_id": 1, "title": "track 1"}],
+        "plays": [
+            {"item_id": 1, "created_at": CURRENT_TIMESTAMP - timedelta(weeks=140)},
+            {"item_id": 1, "created_at": CURRENT_TIMESTAMP - timedelta(weeks=110)},
+            {"item_id": 1, "created_at": CURRENT_TIMESTAMP},
+        ],
+    }
+
+    populate_mock_db(db, entities)
+
+    with db.scoped_session() as session:
+        _prune_plays(
+            session,
+            cutoff_timestamp=datetime.now() - timedelta(weeks=6),
+            archive_dir=str(tmp_path),
+        )
+        assert session.query(Play).count() == 1
+
+    with gzip.open(tmp_path / "plays_1_2.csv.gz", "rt") as archive:
+        rows = list(csv.DictReader(archive))
+    assert [row["id"] for row in rows] == ["1", "2"]
+    assert [row["play_item_id"] for row in rows] == ["1", "1"]
+
+
+def test_prune_plays_archive_rollback(app, tmp_path):
+    """Test that no archive is left behind when the delete is rolled back"""
+    with app.app_context():
+        db = get_db()
+
+    entities = {
+        "tracks": [{"track_id": 1, "title": "track 1"}],
+        "plays": [
+            {"item_id": 1, "created_at": CURRENT_TIMESTAMP - timedelta(weeks=140)},
+            {"item_id": 1, "created_at": CURRENT_TIMESTAMP},
+        ],
+    }
+
+    populate_mock_db(db, entities)
+
+    with pytest.raises(RuntimeError):
+        with db.scoped_session() as session:
+            _prune_plays(
+                session,
+                cutoff_timestamp=datetime.now() - timedelta(weeks=6),
+                archive_dir=str(tmp_path),
+            )
+            raise RuntimeError("fail before commit")
+
+    assert list(tmp_path.iterdir()) == []
+    with db.scoped_session() as session:
+        assert session.query(Play).count() == 2
@@ -0,0 +1,178 @@
+from datetime import datetime, timedelta
+
+from integration_tests.utils import populate_mock_db
+from src.models.notifications.notification import NotificationUnreadCount
+from src.queries.get_notifications import (
+    NOTIFICATION_UNREAD_COUNTS_PENDING_KEY,
+    get_unread_notification_count,
+    get_unread_notification_counts_by_type,
+)
+from src.tasks.reconcile_notification_unread_counts import (
+    _reconcile_notification_unread_counts,
+)
+from src.utils.db_session import get_db
+from src.utils.redis_connection import get_redis
+
+t1 = datetime(2020, 10, 10, 10, 35, 0)
+t2 = t1 - timedelta(hours=1)
+t3 = t1 - timedelta(hours=2)
+t4 = t1 - timedelta(hours=3)
+
+
+def get_counts(session, user_id):
+    return (
+        session.query(NotificationUnreadCount.counts)
+        .filter(NotificationUnreadCount.user_id == user_id)
+        .scalar()
+    )
+
+
+def test_reconcile_notification_unread_counts(app):
+    """Counts are created on read, kept current by triggers and reset on view"""
+    with app.app_context():
+        db = get_db()
+    redis = get_redis()
+
+    populate_mock_db(
+        db,
+        {
+            "users": [{"user_id": i + 1} for i in range(5)],
+            "tracks": [{"track_id": 1, "owner_id": 1}],
+            "notification_seens": [{"user_id": 1, "seen_at": t3}],
+            "follows": [
+                {"follower_user_id": 2, "followee_user_id": 1, "created_at": t1}
+            ],
+        },
+    )
+
+    # first read counts from the notification table and queues the user
+    with db.scoped_session() as session:
+        assert get_unread_notification_count(session, {"user_id": 1}) == 1
+        assert get_counts(session, 1) is None
+    assert redis.sismember(NOTIFICATION_UNREAD_COUNTS_PENDING_KEY, 1)
+
+    with db.scoped_session() as session:
+        assert _reconcile_notification_unread_counts(session, redis) == 1
+    assert not redis.sismember(NOTIFICATION_UNREAD_COUNTS_PENDING_KEY, 1)
+
+    with db.scoped_session() as session:
+        assert get_counts(session, 1) == {"follow": 1}
+
+    # new notifications increment the counts through the triggers
+    populate_mock_db(
+        db,
+        {
+            "follows": [
+                {"follower_user_id": 3, "followee_user_id": 1, "created_at": t1}
+            ],
+            "reposts": [
+                {
+                    "user_id": 3,
+                    "repost_item_id": 1,
+                    "repost_type": "track",
+                    "created_at": t2,
+                }
+            ],
+            "saves": [
+                {
+                    "user_id": 4,
+                    "save_item_id": 1,
+                    "save_type": "track",
+                    "created_at": t4,
+                }
+            ],
+        },
+    )
+
+    with db.scoped_session() as session:
+        _, expected = get_unread_notification_counts_by_type(session, 1)
+        assert get_counts(session, 1) == expected
+        # the second follow is grouped with the first
+        assert get_unread_notification_count(session, {"user_id": 1}) == 2
+
+    # viewing notifications resets the counts
+    populate_mock_db(db, {"notification_seens": [{"user_id": 1, "seen_at": t1}]})
+
+    with db.scoped_session() as session:
+        assert get_counts(session, 1) == {}
+        assert get_unread_notification_count(session, {"user_id": 1}) == 0
+
+        # reconciling recomputes the same counts
+        _reconcile_notification_unread_counts(session, redis)
+        assert get_counts(session, 1) == {}
+
+
+def test_reconcile_notification_unread_counts_dirty(app):
+    """Announcements are counted on read and only dirty rows are recounted"""
+    with app.app_context():
+        db = get_db()
+    redis = get_redis()
+
+    populate_mock_db(
+        db,
+        {
+            "users": [
+                {"user_id": 1, "created_at": t4 - timedelta(days=1)},
+                {"user_id": 2, "created_at": t1 + timedelta(hours=1)},
+            ],
+            "notification_seens": [
+                {"user_id": 1, "seen_at": t3},
+                {"user_id": 2, "seen_at": t3},
+            ],
+            "notification": [
+                {"type": "announcement", "group_id": "announcement:1", "timestamp": t2}
+            ],
+        },
+    )
+
+    with db.scoped_session() as session:
+        assert get_unread_notification_count(session, {"user_id": 1}) == 1
+        assert get_unread_notification_count(session, {"user_id": 2}) == 0
+        # created dirty and recounted on the next run
+        assert _reconcile_notification_unread_counts(session, redis) == 2
+        assert _reconcile_notification_unread_counts(session, redis) == 2
+        assert _reconcile_notification_unread_counts(session, redis) == 0
+
+    populate_mock_db(
+        db,
+        {
+            "notification": [
+                {"type": "announcement", "group_id": "announcement:2", "timestamp": t1}
+            ]
+        },
+    )
+
+    with db.scoped_session() as session:
+        # announcements are not kept per user, only users created before
+        # them count them
+        assert get_counts(session, 1) == {}
+        assert get_counts(session, 2) == {}
+        assert get_unread_notification_count(session, {"user_id": 1}) == 2
+        assert get_unread_notification_count(session, {"user_id": 2}) == 0
+
+        # rows that are not dirty are left as is
+        session.execute(
+            "UPDATE notification_unread_counts SET counts = '{\"follow\": 5}'"
+        )
+        assert _reconcile_notification_unread_counts(session, redis) == 0
+        assert get_counts(session, 1) == {"follow": 5}
+
+        session.execute(
+            "UPDATE notification_unread_counts SET dirty_at = now() WHERE user_id = 1"
+        )
+        assert _reconcile_notification_unread_counts(session, redis) == 1
+        assert get_counts(session, 1) == {}
+        assert get_counts(session, 2) == {"follow": 5}
+
+    # viewing notifications marks the row dirty
+    populate_mock_db(db, {"notification_seens": [{"user_id": 2, "seen_at": t1}]})
+
+    with db.scoped_session() as session:
+        assert get_counts(session, 2) == {}
+        dirty_at = (
+            session.query(NotificationUnreadCount.dirty_at)
+            .filter(NotificationUnreadCount.user_id == 2)
+            .scalar()
+        )
+        assert dirty_at is not None
+        assert _reconcile_notification_unread_counts(session, redis) == 1
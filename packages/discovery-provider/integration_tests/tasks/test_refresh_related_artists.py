@@ -0,0 +1,265 @@
+from sqlalchemy import text
+
+from integration_tests.utils import populate_mock_db
+from src.models.users.related_artist import RelatedArtistsState
+from src.queries.get_related_artists import (
+    _genre_based_related_artists,
+    _precomputed_related_artist_ids,
+    _precomputed_sql,
+)
+from src.tasks.refresh_related_artists import (
+    _refresh_related_artists,
+    _refresh_related_artists_for,
+)
+from src.utils.db_session import get_db
+
+GENRES = ["Electronic", "Pop", "Hip-Hop/Rap", "Rock"]
+NUM_ARTISTS = 40
+
+
+def populate_artists(db):
+    """
+    Artists with a mix of genres and follower counts. Listener 100 follows
+    every third artist.
+    """
+    tracks = []
+    for user_id in range(1, NUM_ARTISTS + 1):
+        for i in range(user_id % 5 + 1):
+            tracks.append(
+                {
+                    "track_id": len(tracks) + 1,
+                    "owner_id": user_id,
+                    "genre": GENRES[(user_id + i * (i % 2)) % len(GENRES)],
+                }
+            )
+    # unlisted tracks don't count towards an artist's genres
+    tracks.append(
+        {
+            "track_id": len(tracks) + 1,
+            "owner_id": 1,
+            "genre": "Rock",
+            "is_unlisted": True,
+        }
+    )
+    populate_mock_db(
+        db,
+        {
+            "users": [
+                {"user_id": user_id, "handle": f"user{user_id}"}
+                for user_id in list(range(1, NUM_ARTISTS + 1)) + [100]
+            ],
+            "aggregate_user": [
+                {
+                    "user_id": user_id,
+                    "follower_count": (user_id * 37) % 200,
+                    "dominant_genre": GENRES[user_id % len(GENRES)],
+                }
+                for user_id in range(1, NUM_ARTISTS + 1)
+            ],
+            "tracks": tracks,
+            "follows": [
+                {"follower_user_id": 100, "followee_user_id": user_id}
+                for user_id in range(3, NUM_ARTISTS + 1, 3)
+            ],
+        },
+    )
+
+
+def get_related_artist_ids(session, *args):
+    return [user["user_id"] for user in _genre_based_related_artists(session, *args)]
+
+
+def test_refresh_related_artists_matches_query(app):
+    with app.app_context():
+        db = get_db()
+
+    populate_artists(db)
+
+    with db.scoped_session() as session:
+        assert _refresh_related_artists(session) == NUM_ARTISTS
+
+    with db.scoped_session() as session:
+        for user_id in range(1, NUM_ARTISTS + 1):
+            for current_user_id, limit, offset, filter_followed in [
+                (None, 100, 0, False),
+                (None, 3, 0, False),
+                (None, 3, 2, False),
+                (100, 100, 0, True),
+                (100, 2, 1, True),
+                (100, 100, 0, False),
+            ]:
+                args = (user_id, current_user_id, limit, offset, filter_followed)
+                precomputed = _precomputed_related_artist_ids(session, *args)
+                assert precomputed is not None
+                assert precomputed == get_related_artist_ids(session, *args), args
+
+        # artists with no related artists of their own are still refreshed
+        assert (
+            session.query(RelatedArtistsState)
+            .filter(RelatedArtistsState.refreshed_at == None)
+            .count()
+            == 0
+        )
+
+
+def test_refresh_related_artists_only_stale(app):
+    with app.app_context():
+        db = get_db()
+
+    populate_artists(db)
+
+    with db.scoped_session() as session:
+        _refresh_related_artists(session)
+
+    with db.scoped_session() as session:
+        assert (
+            session.query(RelatedArtistsState)
+            .filter(RelatedArtistsState.is_stale == True)
+            .count()
+            == 0
+        )
+        # a follower count change, a new genre and an unrelated change
+        session.execute(
+            text("UPDATE aggregate_user SET follower_count = 500 WHERE user_id = 5")
+        )
+        session.execute(
+            text("UPDATE aggregate_user SET repost_count = 10 WHERE user_id = 7")
+        )
+        session.execute(text("UPDATE tracks SET genre = 'Jazz' WHERE owner_id = 6"))
+
+    with db.scoped_session() as session:
+        stale_user_ids = [
+            user_id
+            for (user_id,) in session.query(RelatedArtistsState.user_id)
+            .filter(RelatedArtistsState.is_stale == True)
+            .order_by(RelatedArtistsState.user_id)
+        ]
+        assert stale_user_ids == [5, 6]
+        assert _refresh_related_artists(session, sweep_batch_size=0) == 2
+
+    with db.scoped_session() as session:
+        for user_id in [5, 6]:
+            args = (user_id, None, 100, 0, False)
+            assert _precomputed_related_artist_ids(
+                session, *args
+            ) == get_related_artist_ids(session, *args)
+        # artist 6 is the only Jazz artist
+        assert _precomputed_related_artist_ids(session, 6, None, 100, 0, False) == []
+
+
+def test_refresh_related_artists_oldest_stale_first(app):
+    with app.app_context():
+        db = get_db()
+
+    populate_artists(db)
+
+    with db.scoped_session() as session:
+        _refresh_related_artists(session)
+
+    # marked stale in separate transactions, highest user_id first
+    for user_id in [30, 20, 10]:
+        with db.scoped_session() as session:
+            session.execute(
+                text(
+                    "UPDATE aggregate_user SET follower_count = 500 WHERE user_id = :user_id"
+                ),
+                {"user_id": user_id},
+            )
+
+    # marking an artist that is already stale keeps its place
+    with db.scoped_session() as session:
+        session.execute(
+            text("UPDATE aggregate_user SET follower_count = 600 WHERE user_id = 30")
+        )
+
+    def get_stale_user_ids(session):
+        return {
+            user_id
+            for (user_id,) in session.query(RelatedArtistsState.user_id).filter(
+                RelatedArtistsState.is_stale == True
+            )
+        }
+
+    stale_user_ids = [30, 20, 10]
+    while stale_user_ids:
+        with db.scoped_session() as session:
+            assert get_stale_user_ids(session) == set(stale_user_ids)
+            assert (
+                _refresh_related_artists(
+                    session, stale_batch_size=1, sweep_batch_size=0
+                )
+                == 1
+            )
+        stale_user_ids.pop(0)
+
+    with db.scoped_session() as session:
+        assert get_stale_user_ids(session) == set()
+
+
+def test_refresh_related_artists_keeps_marks_made_during_refresh(app):
+    with app.app_context():
+        db = get_db()
+
+    populate_artists(db)
+
+    with db.scoped_session() as session:
+        _refresh_related_artists(session)
+
+    for user_id in [10, 20]:
+        with db.scoped_session() as session:
+            session.execute(
+                text(
+                    "UPDATE aggregate_user SET follower_count = 500 WHERE user_id = :user_id"
+                ),
+                {"user_id": user_id},
+            )
+
+    with db.scoped_session() as session:
+        artists = (
+            session.query(RelatedArtistsState.user_id, RelatedArtistsState.changed_at)
+            .filter(RelatedArtistsState.is_stale == True)
+            .all()
+        )
+        assert {user_id for user_id, _ in artists} == {10, 20}
+
+        # artist 20 is marked again after being selected for the refresh
+        with db.scoped_session() as other_session:
+            other_session.execute(
+                text(
+                    "UPDATE aggregate_user SET follower_count = 600 WHERE user_id = 20"
+                )
+            )
+
+        _refresh_related_artists_for(session, artists)
+
+    with db.scoped_session() as session:
+        stale_user_ids = [
+            user_id
+            for (user_id,) in session.query(RelatedArtistsState.user_id).filter(
+                RelatedArtistsState.is_stale == True
+            )
+        ]
+        assert stale_user_ids == [20]
+
+
+def test_precomputed_related_artists_plan(app):
+    with app.app_context():
+        db = get_db()
+
+    populate_artists(db)
+
+    with db.scoped_session() as session:
+        _refresh_related_artists(session)
+
+    with db.scoped_session() as session:
+        session.execute(text("SET LOCAL enable_seqscan = off"))
+        session.execute(text("SET LOCAL enable_bitmapscan = off"))
+        plan = "\n".join(
+            row[0]
+            for row in session.execute(
+                text(f"EXPLAIN {_precomputed_sql.text}"),
+                {"user_id": 1, "limit": 10, "offset": 10},
+            )
+        )
+        assert "Index Only Scan using idx_related_artists_user_id_rank" in plan
+        assert "Sort" not in plan
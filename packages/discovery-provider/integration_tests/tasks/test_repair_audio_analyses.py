@@ -0,0 +1,176 @@
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from integration_tests.utils import populate_mock_db
+from src.models.tracks.track import Track
+from src.tasks.repair_audio_analyses import fetch_analysis, repair
+from src.utils.db_session import get_db
+from src.utils.redis_connection import get_redis
+
+
+@contextmanager
+def fake_content_node(analyses, latency=0.0, fail=False):
+    """
+    Local content node serving audio analyses with injected latency/failures.
+    analyses maps an upload id or legacy track cid to its analysis response.
+    """
+    calls = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            calls.append(self.path)
+            time.sleep(latency)
+            match = re.match(
+                r"^/(?:uploads/(?P<upload_id>[^/]+)|tracks/legacy/(?P<cid>[^/]+)/analysis)$",
+                self.path,
+            )
+            id = match and (match.group("upload_id") or match.group("cid"))
+            if fail or id not in analyses:
+                self.send_response(500 if fail else 404)
+                self.end_headers()
+                return
+            response = json.dumps(analyses[id]).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(response)))
+            self.end_headers()
+            self.wfile.write(response)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}", calls
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def upload_analysis(i):
+    return {
+        "audio_analysis_results": {"key": "C major", "bpm": 100.0 + i},
+        "audio_analysis_error_count": 0,
+    }
+
+
+def make_track(i):
+    return Track(track_id=i, track_cid=f"cid{i}", audio_upload_id=f"upload{i}")
+
+
+@mock.patch("src.tasks.repair_audio_analyses.HEDGE_DELAY_SECONDS", 0.1)
+def test_fetch_analysis_hedges_slow_node():
+    analyses = {"upload1": upload_analysis(1)}
+    with fake_content_node(analyses, latency=2) as (slow, _,), fake_content_node(
+        analyses
+    ) as (fast, fast_calls):
+        executor = ThreadPoolExecutor(max_workers=4)
+        start = time.monotonic()
+        assert (
+            fetch_analysis(executor, make_track(1), [slow, fast]) == analyses["upload1"]
+        )
+        assert time.monotonic() - start < 1
+        assert fast_calls == ["/uploads/upload1"]
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def test_fetch_analysis_falls_over_failing_nodes():
+    analyses = {"upload1": upload_analysis(1)}
+    with fake_content_node(analyses, fail=True) as (
+        broken,
+        broken_calls,
+    ), fake_content_node(analyses) as (healthy, _):
+        executor = ThreadPoolExecutor(max_workers=4)
+        assert (
+            fetch_analysis(executor, make_track(1), [broken, healthy])
+            == analyses["upload1"]
+        )
+        assert fetch_analysis(executor, make_track(2), [broken, healthy]) is None
+        assert fetch_analysis(executor, make_track(1), [broken]) is None
+        assert len(broken_calls) == 3
+        executor.shutdown()
+
+
+@mock.patch("src.tasks.repair_audio_analyses.HEDGE_DELAY_SECONDS", 0.1)
+def test_repair_audio_analyses(app):
+    with app.app_context():
+        db = get_db()
+    redis = get_redis()
+
+    num_tracks = 40
+    populate_mock_db(
+        db,
+        {
+            "tracks": [
+                {
+                    "track_id": i,
+                    "owner_id": 1,
+                    "track_cid": f"cid{i}",
+                    "audio_upload_id": f"upload{i}" if i % 4 else None,
+                }
+                for i in range(1, num_tracks + 1)
+            ]
+            # not streamable, so never fetched
+            + [{"track_id": num_tracks + 1, "owner_id": 1}],
+        },
+    )
+    analyses = {}
+    for i in range(1, num_tracks + 1):
+        if i % 4 == 0:
+            # legacy tracks
+            analyses[f"cid{i}"] = {"results": {"Key": "A minor"}, "error_count": 1}
+        elif i % 5 == 0:
+            # failed analyses only bump the error count
+            analyses[f"upload{i}"] = {
+                "audio_analysis_results": None,
+                "audio_analysis_error_count": 2,
+            }
+        else:
+            analyses[f"upload{i}"] = upload_analysis(i)
+
+    # every request to the first node takes a second, and the second node is down
+    with fake_content_node(analyses, latency=1) as (slow, _,), fake_content_node(
+        analyses, fail=True
+    ) as (broken, _,), fake_content_node(analyses) as (
+        healthy,
+        _,
+    ):
+        with mock.patch(
+            "src.tasks.repair_audio_analyses.select_content_nodes",
+            return_value=[slow, broken, healthy],
+        ):
+            start = time.monotonic()
+            with db.scoped_session(expire_on_commit=False) as session:
+                repair(session, redis)
+            # sequentially this would take at least a second per track
+            assert time.monotonic() - start < 10
+
+    with db.scoped_session() as session:
+        tracks = {
+            track.track_id: track
+            for track in session.query(Track).filter(Track.is_current == True)
+        }
+
+    for i in range(1, num_tracks + 1):
+        track = tracks[i]
+        if i % 4 == 0:
+            assert track.musical_key == "A minor"
+            assert track.bpm is None
+            assert track.audio_analysis_error_count == 1
+        elif i % 5 == 0:
+            assert track.musical_key is None
+            assert track.bpm is None
+            assert track.audio_analysis_error_count == 2
+        else:
+            assert track.musical_key == "C major"
+            assert track.bpm == 100.0 + i
+            assert track.audio_analysis_error_count == 0
+    assert tracks[num_tracks + 1].musical_key is None
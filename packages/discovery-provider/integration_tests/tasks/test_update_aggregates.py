@@ -221,3 +221,55 @@ def test_update_aggregate_user(app):
         assert aggregate_user2.track_save_count == 0
         assert aggregate_user2.dominant_genre == "Pop"
         assert aggregate_user2.dominant_genre_count == 2
+
+
+def test_update_aggregate_track_incremental(app):
+    """Incremental mode only recounts tracks with saves, reposts or comments since the last run"""
+    with app.app_context():
+        db = get_db()
+
+    entities = {
+        "tracks": [
+            {"track_id": 1, "title": "track 1", "owner_id": 1},
+            {"track_id": 2, "title": "track 2", "owner_id": 1},
+        ],
+        "users": [{"user_id": 1}, {"user_id": 2}, {"user_id": 3}],
+        "saves": [
+            {"user_id": 2, "save_item_id": 1},
+            {"user_id": 2, "save_item_id": 2},
+        ],
+    }
+    populate_mock_db(db, entities)
+
+    with db.scoped_session() as session:
+        # sets the checkpoint for later incremental runs
+        _update_aggregates(session)
+
+        for aggregate_track in session.query(AggregateTrack).all():
+            aggregate_track.save_count = 0
+
+    populate_mock_db(
+        db,
+        {
+            "saves": [{"user_id": 3, "save_item_id": 2}],
+            "reposts": [{"user_id": 3, "repost_item_id": 2}],
+            "comments": [{"comment_id": 1, "user_id": 3, "entity_id": 2}],
+        },
+    )
+
+    with db.scoped_session() as session:
+        _update_aggregates(session, full_recompute=False)
+
+        track_1 = session.query(AggregateTrack).filter_by(track_id=1).first()
+        track_2 = session.query(AggregateTrack).filter_by(track_id=2).first()
+        # untouched since the last run, so the drift is left for the full recompute
+        assert track_1.save_count == 0
+        assert track_2.save_count == 2
+        assert track_2.repost_count == 1
+        assert track_2.comment_count == 1
+
+    with db.scoped_session() as session:
+        _update_aggregates(session)
+
+        track_1 = session.query(AggregateTrack).filter_by(track_id=1).first()
+        assert track_1.save_count == 1
@@ -2,7 +2,7 @@ import logging
 from datetime import datetime, timedelta
 from typing import List
 
-from sqlalchemy import desc
+from sqlalchemy import desc, event, func, text
 
 from src.models.indexing.indexing_checkpoints import IndexingCheckpoint
 from src.models.social.hourly_play_counts import HourlyPlayCount
@@ -340,3 +340,146 @@ def test_index_hourly_play_counts_empty_plays(app):
     # run
     with db.scoped_session() as session:
         _index_hourly_play_counts(session)
+
+
+def test_index_hourly_play_counts_catch_up_window(app):
+    """Test that a backlog of plays is counted across runs of bounded size"""
+
+    # setup
+    with app.app_context():
+        db = get_db()
+
+    entities = {
+        "tracks": [{"track_id": 1, "title": "track 1"}],
+        "plays": [
+            {"item_id": 1, "created_at": TIMESTAMP - timedelta(hours=2)},
+            {"item_id": 1, "created_at": TIMESTAMP - timedelta(hours=2)},
+            {"item_id": 1, "created_at": TIMESTAMP - timedelta(hours=1)},
+            {"item_id": 1, "created_at": TIMESTAMP - timedelta(hours=1)},
+            {"item_id": 1, "created_at": TIMESTAMP},
+        ],
+    }
+
+    populate_mock_db(db, entities)
+
+    # run
+    with db.scoped_session() as session:
+        _index_hourly_play_counts(session, max_plays_per_run=3)
+
+        counts = {
+            row.hourly_timestamp: row.play_count
+            for row in session.query(HourlyPlayCount).all()
+        }
+        assert counts == {
+            TIMESTAMP - timedelta(hours=2): 2,
+            TIMESTAMP - timedelta(hours=1): 1,
+        }
+
+        _index_hourly_play_counts(session, max_plays_per_run=3)
+
+        counts = {
+            row.hourly_timestamp: row.play_count
+            for row in session.query(HourlyPlayCount).all()
+        }
+        assert counts == {
+            TIMESTAMP - timedelta(hours=2): 2,
+            TIMESTAMP - timedelta(hours=1): 2,
+            TIMESTAMP: 1,
+        }
+
+        new_checkpoint = (
+            session.query(IndexingCheckpoint.last_checkpoint)
+            .filter(IndexingCheckpoint.tablename == HOURLY_PLAY_COUNTS_TABLE_NAME)
+            .scalar()
+        )
+        assert new_checkpoint == 5
+
+
+def test_index_hourly_play_counts_multi_year(app):
+    """Test that several years of plays are counted correctly in bounded batches"""
+
+    # setup
+    with app.app_context():
+        db = get_db()
+
+    populate_mock_db(db, {"tracks": [{"track_id": 1, "title": "track 1"}]})
+
+    years = 3
+    hours = years * 365 * 24
+    plays_per_hour = 4
+
+    with db.scoped_session() as session:
+        session.execute(
+            text(
+                """
+                INSERT INTO plays (id, play_item_id, created_at, updated_at)
+                SELECT
+                    i,
+                    1,
+                    :start - ((i - 1) / :plays_per_hour) * interval '1 hour',
+                    now()
+                FROM generate_series(1, :num_plays) AS i
+                """
+            ),
+            {
+                "start": TIMESTAMP,
+                "plays_per_hour": plays_per_hour,
+                "num_plays": hours * plays_per_hour,
+            },
+        )
+
+    # run, recording the play id range each upsert reads
+    upsert_ranges = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        if "INSERT INTO hourly_play_counts" in statement:
+            upsert_ranges.append(
+                (parameters["prev_checkpoint"], parameters["new_checkpoint"])
+            )
+
+    runs = 0
+    with db.scoped_session() as session:
+        event.listen(session.get_bind(), "before_cursor_execute", on_execute)
+        try:
+            while True:
+                runs += 1
+                before = (
+                    session.query(IndexingCheckpoint.last_checkpoint)
+                    .filter(
+                        IndexingCheckpoint.tablename == HOURLY_PLAY_COUNTS_TABLE_NAME
+                    )
+                    .scalar()
+                )
+                _index_hourly_play_counts(session, max_plays_per_run=10_000)
+                after = (
+                    session.query(IndexingCheckpoint.last_checkpoint)
+                    .filter(
+                        IndexingCheckpoint.tablename == HOURLY_PLAY_COUNTS_TABLE_NAME
+                    )
+                    .scalar()
+                )
+                if before == after:
+                    break
+        finally:
+            event.remove(session.get_bind(), "before_cursor_execute", on_execute)
+
+    with db.scoped_session() as session:
+        num_buckets, total_plays, min_count, max_count = session.query(
+            func.count(HourlyPlayCount.hourly_timestamp),
+            func.sum(HourlyPlayCount.play_count),
+            func.min(HourlyPlayCount.play_count),
+            func.max(HourlyPlayCount.play_count),
+        ).one()
+
+    assert num_buckets == hours
+    assert total_plays == hours * plays_per_hour
+    assert min_count == max_count == plays_per_hour
+    # 105,120 plays in 10,000 play batches, plus the final no-op run
+    assert runs == 12
+    # one upsert per run, each over its own contiguous batch of play ids
+    assert len(upsert_ranges) == 11
+    assert upsert_ranges[0][0] == 0
+    assert upsert_ranges[-1][1] == hours * plays_per_hour
+    for (prev, new), (next_prev, _) in zip(upsert_ranges, upsert_ranges[1:]):
+        assert new == next_prev
+    assert all(new - prev <= 10_000 for prev, new in upsert_ranges)
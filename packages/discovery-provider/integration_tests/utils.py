@@ -1,5 +1,7 @@
 from datetime import datetime
 
+from sqlalchemy import event
+
 from src.models.comments.comment import Comment
 from src.models.comments.comment_mention import CommentMention
 from src.models.comments.comment_notification_setting import CommentNotificationSetting
@@ -63,6 +65,7 @@ from src.models.users.user_bank import USDCUserBankAccount, UserBankAccount, Use
 from src.models.users.user_listening_history import UserListeningHistory
 from src.models.users.user_payout_wallet_history import UserPayoutWalletHistory
 from src.models.users.user_tip import UserTip
+from src.models.users.user_track_listen import UserTrackListen
 from src.tasks.aggregates import get_latest_blocknumber
 from src.trending_strategies.pnagD_trending_playlists_strategy import (
     TrendingType,
@@ -99,6 +102,22 @@ def to_bytes(val, length=32):
     return bytes(val, "utf-8")
 
 
+def count_queries(session, fn):
+    """Calls fn and returns its result along with the number of sql statements it ran"""
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = session.get_bind()
+    event.listen(engine, "before_cursor_execute", on_execute)
+    try:
+        result = fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+    return result, len(statements)
+
+
 def populate_mock_db_blocks(db, min, max, is_current=0):
     """
     Helper function to populate the mock DB with blocks
@@ -308,6 +327,7 @@ def populate_mock_db(db, entities, block_offset=None):
                 download_conditions=track_meta.get("download_conditions", None),
                 is_playlist_upload=track_meta.get("is_playlist_upload", False),
                 track_cid=track_meta.get("track_cid", None),
+                audio_upload_id=track_meta.get("audio_upload_id", None),
                 ai_attribution_user_id=track_meta.get("ai_attribution_user_id", None),
                 playlists_containing_track=track_meta.get(
                     "playlists_containing_track", []
@@ -570,6 +590,16 @@ def populate_mock_db(db, entities, block_offset=None):
                 ),
             )
             session.add(user_listening_history)
+            # mirror the user_track_listens backfill from the JSON form
+            for listen in user_listening_history.listening_history or []:
+                session.add(
+                    UserTrackListen(
+                        user_id=user_listening_history.user_id,
+                        track_id=listen["track_id"],
+                        last_listened_at=datetime.fromisoformat(listen["timestamp"]),
+                        play_count=listen.get("play_count", 1),
+                    )
+                )
 
         for i, hourly_play_count_meta in enumerate(hourly_play_counts):
             hourly_play_count = HourlyPlayCount(
@@ -874,6 +904,7 @@ def populate_mock_db(db, entities, block_offset=None):
                 track_timestamp_s=comment_meta.get("track_timestamp_s", None),
                 txhash=comment_meta.get("txhash", str(i + block_offset)),
                 blockhash=comment_meta.get("blockhash", str(i + block_offset)),
+                blocknumber=comment_meta.get("blocknumber", i + block_offset),
             )
             session.add(comment_record)
         for i, comment_threads_meta in enumerate(comment_threads):
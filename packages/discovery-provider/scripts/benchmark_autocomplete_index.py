@@ -0,0 +1,89 @@
+"""
+
+Measures autocomplete QPS and latency of the in-process autocomplete index
+on synthetic users, tracks and playlists. Queries are prefixes of random
+indexed names, like a user typing into the search bar.
+
+    PYTHONPATH=. python scripts/benchmark_autocomplete_index.py --docs 1000000
+
+"""
+
+import argparse
+import os
+import random
+import string
+import tempfile
+import time
+
+from src.utils.autocomplete_index import (
+    KIND_ALBUM,
+    KIND_PLAYLIST,
+    KIND_TRACK,
+    KIND_USER,
+    AutocompleteDoc,
+    AutocompleteIndex,
+    search_kinds,
+    write_autocomplete_index,
+)
+
+KINDS = [KIND_USER, KIND_TRACK, KIND_PLAYLIST, KIND_ALBUM]
+
+
+def random_word(rng: random.Random) -> str:
+    return "".join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10)))
+
+
+def synthetic_docs(num_docs: int, rng: random.Random):
+    # a shared vocabulary so that prefixes have realistic numbers of matches
+    vocabulary = [random_word(rng) for _ in range(max(num_docs // 10, 100))]
+    for id in range(num_docs):
+        words = rng.choices(vocabulary, k=rng.randint(1, 4))
+        # follower and repost counts are heavy tailed
+        score = int(rng.paretovariate(1.2))
+        yield AutocompleteDoc(rng.choice(KINDS), id, score, " ".join(words))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    docs = list(synthetic_docs(args.docs, rng))
+    path = os.path.join(tempfile.mkdtemp(), "autocomplete.idx")
+
+    start = time.perf_counter()
+    write_autocomplete_index(path, docs)
+    print(
+        f"built {args.docs} docs in {time.perf_counter() - start:.1f}s, "
+        f"{os.path.getsize(path) / 1e6:.1f}MB"
+    )
+
+    index = AutocompleteIndex.open(path)
+    queries = []
+    for _ in range(args.queries):
+        words = rng.choice(docs).text.split()
+        query = " ".join(words[: rng.randint(1, len(words))])
+        queries.append(query[: rng.randint(1, len(query))])
+
+    latencies = []
+    start = time.perf_counter()
+    for query in queries:
+        query_start = time.perf_counter()
+        index.search(query, list(search_kinds), limit=10)
+        latencies.append((time.perf_counter() - query_start) * 1000)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[int(len(latencies) * 0.99)]
+    print(
+        f"{len(queries) / elapsed:.0f} qps, p50 {p50:.2f}ms, "
+        f"p99 {p99:.2f}ms, max {latencies[-1]:.2f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+
+Compares bytes transferred and CPU time per indexed core block between the
+previous index_core path and the current one, without a running audiusd.
+
+Previously each indexed block fetched the chain tip block, the block being
+indexed, and the indexed block again after commit, and each fetch re-encoded
+every transaction into the legacy protocol types. Now the block being
+indexed is fetched once and read through CoreBlock, and the tip comes from
+GetNodeInfo. gRPC decoding is simulated by parsing the serialized response.
+
+    PYTHONPATH=. python scripts/benchmark_core_block.py --txs 500
+
+"""
+
+import argparse
+import statistics
+import time
+
+from google.protobuf.timestamp_pb2 import Timestamp
+
+from src.tasks.core.audiusd_gen.core.v1.types_pb2 import (
+    Block,
+    GetBlockResponse,
+    GetNodeInfoResponse,
+    ManageEntityLegacy,
+    SignedTransaction,
+    TrackPlay,
+    TrackPlays,
+    Transaction,
+)
+from src.tasks.core.core_client import CoreBlock
+from src.tasks.core.gen.protocol_pb2 import BlockResponse as LegacyBlockResponse
+from src.tasks.core.gen.protocol_pb2 import SignedTransaction as LegacySignedTransaction
+from src.tasks.core.gen.protocol_pb2 import TransactionResponse
+
+
+def make_block(num_txs, metadata_bytes):
+    transactions = []
+    for i in range(num_txs):
+        if i % 2:
+            signed_tx = SignedTransaction(
+                manage_entity=ManageEntityLegacy(
+                    user_id=i,
+                    entity_type="Track",
+                    entity_id=i,
+                    action="Create",
+                    metadata="x" * metadata_bytes,
+                    signature="0x" + "ab" * 65,
+                    signer="0x" + "cd" * 20,
+                    nonce="0x" + "ef" * 32,
+                )
+            )
+        else:
+            signed_tx = SignedTransaction(
+                plays=TrackPlays(
+                    plays=[
+                        TrackPlay(
+                            user_id=str(i),
+                            track_id=str(j),
+                            timestamp=Timestamp(seconds=1700000000),
+                            signature="0x" + "ab" * 65,
+                            city="Brooklyn",
+                            region="NY",
+                            country="US",
+                        )
+                        for j in range(10)
+                    ]
+                )
+            )
+        transactions.append(
+            Transaction(
+                hash=f"0x{i:064x}",
+                height=1000,
+                block_hash="0x" + "12" * 32,
+                transaction=signed_tx,
+            )
+        )
+    return GetBlockResponse(
+        block=Block(
+            height=1000,
+            hash="0x" + "12" * 32,
+            chain_id="audius-mainnet",
+            proposer="0x" + "34" * 20,
+            timestamp=Timestamp(seconds=1700000001),
+            transactions=transactions,
+        ),
+        current_height=1001,
+    )
+
+
+def legacy_get_block(payload):
+    # AudiusdClient.get_block before CoreBlock
+    res = GetBlockResponse.FromString(payload)
+    block = res.block
+    converted_transactions = []
+    for tx in block.transactions:
+        legacy_tx = LegacySignedTransaction()
+        legacy_tx.ParseFromString(tx.transaction.SerializeToString())
+        converted_transactions.append(
+            TransactionResponse(
+                txhash=tx.hash,
+                block_height=tx.height,
+                block_hash=tx.hash,
+                transaction=legacy_tx,
+            )
+        )
+    return LegacyBlockResponse(
+        blockhash=block.hash,
+        chainid=block.chain_id,
+        proposer=block.proposer,
+        height=block.height,
+        current_height=res.current_height,
+        timestamp=block.timestamp,
+        transaction_responses=converted_transactions,
+    )
+
+
+def read_block(block):
+    # what the indexers touch on every transaction
+    for tx in block.transaction_responses:
+        tx_type = tx.transaction.WhichOneof("transaction")
+        if tx_type == "manage_entity":
+            tx.transaction.manage_entity.metadata
+        elif tx_type == "plays":
+            for play in tx.transaction.plays.plays:
+                play.track_id
+
+
+def previous_path(block_payload, node_info_payload):
+    GetNodeInfoResponse.FromString(node_info_payload)
+    # update_latest_block_redis fetched the tip block
+    legacy_get_block(block_payload)
+    block = legacy_get_block(block_payload)
+    read_block(block)
+    # update_latest_indexed_block_redis fetched the indexed block again
+    legacy_get_block(block_payload)
+    return len(node_info_payload) + 3 * len(block_payload)
+
+
+def current_path(block_payload, node_info_payload):
+    GetNodeInfoResponse.FromString(node_info_payload)
+    block = CoreBlock(GetBlockResponse.FromString(block_payload))
+    read_block(block)
+    return len(node_info_payload) + len(block_payload)
+
+
+def measure(path, block_payload, node_info_payload, runs):
+    timings = []
+    num_bytes = 0
+    for _ in range(runs):
+        start = time.process_time()
+        num_bytes = path(block_payload, node_info_payload)
+        timings.append((time.process_time() - start) * 1000)
+    return num_bytes, statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--txs", type=int, default=500)
+    parser.add_argument("--metadata-bytes", type=int, default=1024)
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    block_payload = make_block(args.txs, args.metadata_bytes).SerializeToString()
+    node_info_payload = GetNodeInfoResponse(
+        chainid="audius-mainnet",
+        synced=True,
+        comet_address="0x" + "56" * 20,
+        eth_address="0x" + "78" * 20,
+        current_height=1001,
+    ).SerializeToString()
+
+    print(f"block with {args.txs} txs is {len(block_payload)} bytes")
+    for name, path in [("previous", previous_path), ("current", current_path)]:
+        num_bytes, cpu_ms = measure(path, block_payload, node_info_payload, args.runs)
+        print(f"{name:>10}: {num_bytes} bytes, {cpu_ms:.2f}ms cpu per block")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+
+Load tests /health_check on a running discovery node and reports latency
+percentiles. Run it against a local node while the indexer is busy, and
+again while it is idle, to compare p99 under write load:
+
+    PYTHONPATH=. python scripts/benchmark_health_check.py --url http://localhost:5000 --concurrency 32
+
+"""
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+def time_health_check(session, url):
+    start = time.perf_counter()
+    response = session.get(f"{url}/health_check", timeout=30)
+    return (time.perf_counter() - start) * 1000, response.status_code
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:5000")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=args.concurrency)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        results = list(
+            executor.map(
+                lambda _: time_health_check(session, args.url), range(args.requests)
+            )
+        )
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for latency, _ in results)
+    errors = sum(1 for _, status_code in results if status_code >= 500)
+    print(
+        f"{len(results) / elapsed:.0f} rps, "
+        f"p50 {statistics.median(latencies):.1f}ms, "
+        f"p99 {latencies[int(len(latencies) * 0.99)]:.1f}ms, "
+        f"max {latencies[-1]:.1f}ms, {errors} unhealthy"
+    )
+
+
+if __name__ == "__main__":
+    main()
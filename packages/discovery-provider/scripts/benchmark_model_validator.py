@@ -0,0 +1,87 @@
+"""
+
+Measures per field validation cost of ModelValidator when indexing a block
+of track updates, building a Draft7Validator per field as before against
+the cached validators.
+
+    PYTHONPATH=. python scripts/benchmark_model_validator.py --tracks 300
+
+"""
+
+import argparse
+import time
+
+from jsonschema import Draft7Validator, ValidationError
+
+from src.model_validator import ModelValidator
+
+MODEL = "Track"
+
+
+def synthetic_track(i):
+    return {
+        "title": f"track {i}",
+        "genre": "Electronic",
+        "mood": "Energizing",
+        "description": "a track " * 20,
+        "tags": "house,techno",
+        "license": "All rights reserved",
+        "field_visibility": {
+            "genre": True,
+            "mood": True,
+            "tags": True,
+            "share": True,
+            "play_count": True,
+        },
+        "is_unlisted": False,
+        "duration": 180,
+    }
+
+
+def validate_uncached(to_validate, model, field):
+    schema = ModelValidator.get_schema_for_field(field, model)
+    validator = Draft7Validator(schema)
+    list(validator.iter_errors(to_validate))
+
+
+def validate_cached(to_validate, model, field):
+    # invalid fields fall back to defaults in validate_field_helper
+    try:
+        ModelValidator.validate(to_validate=to_validate, model=model, field=field)
+    except ValidationError:
+        pass
+
+
+def time_block(validate, tracks, fields):
+    start = time.perf_counter()
+    for track in tracks:
+        for field in fields:
+            validate({field: track.get(field)}, MODEL, field)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tracks", type=int, default=300)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    ModelValidator.init_model_schemas(MODEL)
+    fields = ModelValidator.models_to_schema_and_fields_dict[MODEL]["fields"]
+    tracks = [synthetic_track(i) for i in range(args.tracks)]
+    num_validations = len(tracks) * len(fields)
+    print(f"{args.tracks} tracks x {len(fields)} fields per block")
+
+    for name, validate in [
+        ("uncached", validate_uncached),
+        ("cached", validate_cached),
+    ]:
+        elapsed = min(time_block(validate, tracks, fields) for _ in range(args.runs))
+        print(
+            f"{name:>10}: {elapsed * 1000:.1f}ms per block, "
+            f"{elapsed / num_validations * 1e6:.1f}us per field"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -32,10 +32,9 @@ from src.queries.query_helpers import (
     SortMethod,
 )
 from src.queries.reactions import ReactionResponse
-from src.utils.get_all_nodes import get_all_healthy_content_nodes_cached
+from src.utils.get_all_nodes import get_healthy_content_node_rendezvous
 from src.utils.helpers import decode_string_id, encode_int_id
 from src.utils.redis_connection import get_redis
-from src.utils.rendezvous import RendezvousHash
 from src.utils.spl_audio import to_wei_string
 
 redis = get_redis()
@@ -65,21 +64,23 @@ def make_legacy_image(endpoint, cid):
 def init_rendezvous(user, cid):
     if not cid:
         return ""
-    healthy_nodes = get_all_healthy_content_nodes_cached(redis)
-    if not healthy_nodes:
+    rendezvous = get_healthy_content_node_rendezvous(redis)
+    if not rendezvous:
         logger.error(
-            f"No healthy Content Nodes found for fetching cid for {user.user_id}: {cid}"
+            f"No healthy Content Nodes found for fetching cid for {user.get('user_id')}: {cid}"
         )
         return ""
-
-    return RendezvousHash(
-        *[re.sub("/$", "", node["endpoint"].lower()) for node in healthy_nodes]
-    )
+    return rendezvous
 
 
-def get_n_primary_endpoints(user, cid, n):
-    rendezvous = init_rendezvous(user, cid)
+def get_n_primary_endpoints(user, cid, n, rendezvous=None):
+    """
+    Pass a rendezvous from get_healthy_content_node_rendezvous to skip looking
+    up the healthy content nodes when generating urls for many items
+    """
     if not rendezvous:
+        rendezvous = init_rendezvous(user, cid)
+    if not rendezvous or not cid:
         return ""
     return rendezvous.get_n(n, cid)
 
@@ -131,10 +132,10 @@ def extend_search(resp):
     return resp
 
 
-def add_user_artwork(user):
+def add_user_artwork(user, rendezvous=None):
     if user.get("profile_picture_sizes"):
         profile_cid = user.get("profile_picture_sizes")
-        profile_endpoints = get_n_primary_endpoints(user, profile_cid, 3)
+        profile_endpoints = get_n_primary_endpoints(user, profile_cid, 3, rendezvous)
         profile_endpoint = profile_endpoints[0]
         profile_mirrors = profile_endpoints[1:]
         user["profile_picture"] = {
@@ -145,7 +146,7 @@ def add_user_artwork(user):
         }
     elif user.get("profile_picture") and type(user.get("profile_picture")) == str:
         profile_cid = user.get("profile_picture")
-        profile_endpoints = get_n_primary_endpoints(user, profile_cid, 3)
+        profile_endpoints = get_n_primary_endpoints(user, profile_cid, 3, rendezvous)
         profile_endpoint = profile_endpoints[0]
         profile_mirrors = profile_endpoints[1:]
         user["profile_picture"] = {
@@ -158,7 +159,7 @@ def add_user_artwork(user):
         user["profile_picture"] = None
     if user.get("cover_photo_sizes"):
         cover_cid = user.get("cover_photo_sizes")
-        cover_endpoints = get_n_primary_endpoints(user, cover_cid, 3)
+        cover_endpoints = get_n_primary_endpoints(user, cover_cid, 3, rendezvous)
         cover_endpoint = cover_endpoints[0]
         cover_mirrors = cover_endpoints[1:]
         user["cover_photo"] = {
@@ -168,7 +169,7 @@ def add_user_artwork(user):
         }
     elif user.get("cover_photo") and type(user.get("cover_photo")) == str:
         cover_cid = user.get("cover_photo")
-        cover_endpoints = get_n_primary_endpoints(user, cover_cid, 3)
+        cover_endpoints = get_n_primary_endpoints(user, cover_cid, 3, rendezvous)
         cover_endpoint = cover_endpoints[0]
         cover_mirrors = cover_endpoints[1:]
         user["cover_photo"] = {
@@ -181,7 +182,7 @@ def add_user_artwork(user):
     return user
 
 
-def extend_user(user, current_user_id=None):
+def extend_user(user, current_user_id=None, rendezvous=None):
     if not user.get("user_id"):
         return user
     user_id = encode_int_id(user["user_id"])
@@ -189,7 +190,7 @@ def extend_user(user, current_user_id=None):
     if user.get("artist_pick_track_id"):
         artist_pick_track_id = encode_int_id(user["artist_pick_track_id"])
         user["artist_pick_track_id"] = artist_pick_track_id
-    user = add_user_artwork(user)
+    user = add_user_artwork(user, rendezvous)
     # Do not surface playlist library in user response unless we are
     # that user specifically
     if "playlist_library" in user and (
@@ -300,12 +301,12 @@ def parse_unix_epoch_param_non_utc(time, default=0):
     return datetime.fromtimestamp(time)
 
 
-def add_track_artwork(track):
+def add_track_artwork(track, rendezvous=None):
     if "user" not in track:
         return track
     if track.get("cover_art_sizes"):
         cid = track["cover_art_sizes"]
-        endpoints = get_n_primary_endpoints(track["user"], cid, 3)
+        endpoints = get_n_primary_endpoints(track["user"], cid, 3, rendezvous)
         endpoint = endpoints[0]
         mirrors = endpoints[1:]
         track["artwork"] = {
@@ -316,7 +317,7 @@ def add_track_artwork(track):
         }
     elif track.get("cover_art"):
         cid = track["cover_art"]
-        endpoints = get_n_primary_endpoints(track["user"], cid, 3)
+        endpoints = get_n_primary_endpoints(track["user"], cid, 3, rendezvous)
         endpoint = endpoints[0]
         mirrors = endpoints[1:]
         track["artwork"] = {
@@ -330,7 +331,7 @@ def add_track_artwork(track):
     return track
 
 
-def extend_track(track, session=None):
+def extend_track(track, session=None, rendezvous=None):
     track_id = encode_int_id(track["track_id"])
     owner_id = encode_int_id(track["owner_id"])
     if "user" in track:
@@ -338,7 +339,7 @@ def extend_track(track, session=None):
             user = track["user"][0]
         else:
             user = track["user"]
-        track["user"] = extend_user(user)
+        track["user"] = extend_user(user, rendezvous=rendezvous)
     track["id"] = track_id
     track["user_id"] = owner_id
     if "followee_saves" in track:
@@ -350,7 +351,7 @@ def extend_track(track, session=None):
     if "remix_of" in track:
         track["remix_of"] = extend_remix_of(track["remix_of"])
 
-    track = add_track_artwork(track)
+    track = add_track_artwork(track, rendezvous)
 
     if "save_count" in track:
         track["favorite_count"] = track["save_count"]
@@ -391,13 +392,13 @@ def stem_from_track(track):
     }
 
 
-def add_playlist_artwork(playlist):
+def add_playlist_artwork(playlist, rendezvous=None):
     if "user" not in playlist:
         return playlist
 
     if playlist.get("playlist_image_sizes_multihash"):
         cid = playlist["playlist_image_sizes_multihash"]
-        endpoints = get_n_primary_endpoints(playlist["user"], cid, 3)
+        endpoints = get_n_primary_endpoints(playlist["user"], cid, 3, rendezvous)
         endpoint = endpoints[0]
         mirrors = endpoints[1:]
         playlist["artwork"] = {
@@ -408,7 +409,7 @@ def add_playlist_artwork(playlist):
         }
     elif playlist.get("playlist_image_multihash"):
         cid = playlist["playlist_image_multihash"]
-        endpoints = get_n_primary_endpoints(playlist["user"], cid, 3)
+        endpoints = get_n_primary_endpoints(playlist["user"], cid, 3, rendezvous)
         endpoint = endpoints[0]
         mirrors = endpoints[1:]
         playlist["artwork"] = {
@@ -422,17 +423,17 @@ def add_playlist_artwork(playlist):
     return playlist
 
 
-def extend_playlist(playlist):
+def extend_playlist(playlist, rendezvous=None):
     playlist_id = encode_int_id(playlist["playlist_id"])
     owner_id = encode_int_id(playlist["playlist_owner_id"])
     playlist["id"] = playlist_id
     playlist["user_id"] = owner_id
-    playlist = add_playlist_artwork(playlist)
+    playlist = add_playlist_artwork(playlist, rendezvous)
     if "user" in playlist:
         if isinstance(playlist["user"], list):
-            playlist["user"] = extend_user(playlist["user"][0])
+            playlist["user"] = extend_user(playlist["user"][0], rendezvous=rendezvous)
         else:
-            playlist["user"] = extend_user(playlist["user"])
+            playlist["user"] = extend_user(playlist["user"], rendezvous=rendezvous)
     if "followee_saves" in playlist:
         playlist["followee_favorites"] = list(
             map(extend_favorite, playlist["followee_saves"])
@@ -1193,8 +1194,10 @@ notifications_parser.add_argument(
 )
 
 
-def success_response(entity):
-    return api_helpers.success_response(entity, status=200, to_json=False)
+def success_response(entity, extras={}):
+    return api_helpers.success_response(
+        entity, status=200, to_json=False, extras=extras
+    )
 
 
 def success_response_with_related(entity):
@@ -22,12 +22,14 @@ from src.api.v1.helpers import (
     get_default_max,
     make_full_response,
     make_response,
+    pagination_parser,
     pagination_with_current_user_parser,
     parse_bool_param,
     playlist_search_parser,
     success_response,
     trending_parser,
 )
+from src.api.v1.models.common import full_response
 from src.api.v1.models.playlists import (
     album_access_info,
     full_playlist_model,
@@ -35,7 +37,10 @@ from src.api.v1.models.playlists import (
 )
 from src.api.v1.models.users import user_model_full
 from src.queries.get_extended_purchase_gate import get_extended_purchase_gate
-from src.queries.get_playlist_tracks import get_playlist_tracks
+from src.queries.get_playlist_tracks import (
+    get_playlist_track_counts,
+    get_playlist_tracks,
+)
 from src.queries.get_playlists import get_playlists
 from src.queries.get_reposters_for_playlist import get_reposters_for_playlist
 from src.queries.get_savers_for_playlist import get_savers_for_playlist
@@ -47,6 +52,7 @@ from src.queries.get_trending_playlists import (
 )
 from src.queries.get_unclaimed_id import get_unclaimed_id
 from src.queries.search_queries import SearchKind, search
+from src.tasks.entity_manager.utils import PLAYLIST_TRACK_LIMIT
 from src.trending_strategies.trending_strategy_factory import (
     DEFAULT_TRENDING_VERSIONS,
     TrendingStrategyFactory,
@@ -117,7 +123,9 @@ def get_playlist(
     return None
 
 
-def get_tracks_for_playlist(playlist_id, current_user_id=None, exclude_gated=False):
+def get_tracks_for_playlist(
+    playlist_id, current_user_id=None, exclude_gated=False, offset=0, limit=None
+):
     db = get_db_read_replica()
     with db.scoped_session() as session:
         args = {
@@ -125,6 +133,8 @@ def get_tracks_for_playlist(playlist_id, current_user_id=None, exclude_gated=Fal
             "populate_tracks": True,
             "current_user_id": current_user_id,
             "exclude_gated": exclude_gated,
+            "offset": offset,
+            "limit": limit,
         }
         playlist_tracks_map = get_playlist_tracks(session, args)
         playlist_tracks = playlist_tracks_map[playlist_id]
@@ -132,6 +142,16 @@ def get_tracks_for_playlist(playlist_id, current_user_id=None, exclude_gated=Fal
         return tracks
 
 
+def get_track_count_for_playlist(
+    playlist_id, current_user_id=None, exclude_gated=False
+):
+    db = get_db_read_replica()
+    with db.scoped_session() as session:
+        return get_playlist_track_counts(
+            session, [playlist_id], current_user_id, exclude_gated
+        ).get(playlist_id, 0)
+
+
 def get_bulk_playlists(
     current_user_id,
     playlist_ids=None,
@@ -339,14 +359,38 @@ class FullPlaylistByHandleAndSlug(Resource):
         return success_response(return_response)
 
 
-playlist_tracks_response = make_response(
-    "playlist_tracks_response", ns, fields.List(fields.Nested(track))
+playlist_tracks_total = fields.Integer(
+    description="The number of tracks in the playlist, across all pages"
+)
+playlist_tracks_response = ns.model(
+    "playlist_tracks_response",
+    {
+        "data": fields.List(fields.Nested(track)),
+        "total": playlist_tracks_total,
+    },
 )
-full_playlist_tracks_response = make_full_response(
-    "full_playlist_tracks_response", full_ns, fields.List(fields.Nested(track_full))
+full_playlist_tracks_response = full_ns.clone(
+    "full_playlist_tracks_response",
+    full_response,
+    {
+        "data": fields.List(fields.Nested(track_full)),
+        "total": playlist_tracks_total,
+    },
 )
 
 
+def get_playlist_tracks_page(playlist_id, args, exclude_gated=False):
+    """Returns the requested window of the playlist's tracks and its total"""
+    tracks = get_tracks_for_playlist(
+        playlist_id=playlist_id,
+        exclude_gated=exclude_gated,
+        offset=format_offset(args, max_offset=PLAYLIST_TRACK_LIMIT),
+        limit=format_limit(args, default_limit=None),
+    )
+    total = get_track_count_for_playlist(playlist_id, exclude_gated=exclude_gated)
+    return success_response(tracks, extras={"total": total})
+
+
 @ns.route("/<string:playlist_id>/tracks")
 class PlaylistTracks(Resource):
     @record_metrics
@@ -356,12 +400,13 @@ class PlaylistTracks(Resource):
         params={"playlist_id": "A Playlist ID"},
         responses={200: "Success", 400: "Bad request", 500: "Server error"},
     )
+    @ns.expect(pagination_parser)
     @ns.marshal_with(playlist_tracks_response)
     @cache(ttl_sec=5)
     def get(self, playlist_id):
         decoded_id = decode_with_abort(playlist_id, ns)
-        tracks = get_tracks_for_playlist(playlist_id=decoded_id, exclude_gated=True)
-        return success_response(tracks)
+        args = pagination_parser.parse_args()
+        return get_playlist_tracks_page(decoded_id, args, exclude_gated=True)
 
 
 @full_ns.route("/<string:playlist_id>/tracks")
@@ -373,12 +418,13 @@ class FullPlaylistTracks(Resource):
         params={"playlist_id": "A Playlist ID"},
         responses={200: "Success", 400: "Bad request", 500: "Server error"},
     )
+    @ns.expect(pagination_parser)
     @ns.marshal_with(full_playlist_tracks_response)
     @cache(ttl_sec=5)
     def get(self, playlist_id):
         decoded_id = decode_with_abort(playlist_id, ns)
-        tracks = get_tracks_for_playlist(decoded_id)
-        return success_response(tracks)
+        args = pagination_parser.parse_args()
+        return get_playlist_tracks_page(decoded_id, args)
 
 
 playlist_search_result = make_response(
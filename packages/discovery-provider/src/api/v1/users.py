@@ -4,7 +4,7 @@ from typing import Optional
 
 from eth_account import Account
 from eth_account.messages import encode_defunct
-from flask import Response, request
+from flask import Response, request, stream_with_context
 from flask_restx import Namespace, Resource, fields, inputs, reqparse
 from flask_restx.errors import abort
 
@@ -105,7 +105,7 @@ from src.api.v1.models.users import (
 )
 from src.api.v1.playlists import get_tracks_for_playlist
 from src.challenges.challenge_event_bus import setup_challenge_bus
-from src.exceptions import PermissionError
+from src.exceptions import ArgumentError, PermissionError
 from src.models.users.email import EmailAccess
 from src.queries.comments import get_muted_users, get_user_comments
 from src.queries.download_csv import (
@@ -130,7 +130,7 @@ from src.queries.get_developer_apps import (
     get_developer_apps_by_user,
     get_developer_apps_with_grant_for_user,
 )
-from src.queries.get_feed import get_feed
+from src.queries.get_feed import get_feed, get_feed_page
 from src.queries.get_follow_intersection_users import get_follow_intersection_users
 from src.queries.get_followees_for_user import get_followees_for_user
 from src.queries.get_followers_for_user import get_followers_for_user
@@ -2704,7 +2704,7 @@ class PurchasesDownload(Resource):
         check_authorized(decoded_id, authed_user_id)
         args = DownloadPurchasesArgs(buyer_user_id=decoded_id)
         purchases = download_purchases(args)
-        response = Response(purchases, content_type="text/csv")
+        response = Response(stream_with_context(purchases), content_type="text/csv")
         response.headers["Content-Disposition"] = "attachment; filename=purchases.csv"
         return response
 
@@ -2729,7 +2729,7 @@ class SalesDownload(Resource):
         download_args = DownloadSalesArgs(seller_user_id=decoded_id)
         sales = download_sales(download_args, return_json=False)
 
-        response = Response(sales, content_type="text/csv")
+        response = Response(stream_with_context(sales), content_type="text/csv")
         response.headers["Content-Disposition"] = "attachment; filename=sales.csv"
         return response
 
@@ -2794,7 +2794,7 @@ class WithdrawalsDownload(Resource):
         check_authorized(decoded_id, authed_user_id)
         args = DownloadWithdrawalsArgs(user_id=decoded_id)
         withdrawals = download_withdrawals(args)
-        response = Response(withdrawals, content_type="text/csv")
+        response = Response(stream_with_context(withdrawals), content_type="text/csv")
         response.headers["Content-Disposition"] = "attachment; filename=withdrawals.csv"
         return response
 
@@ -3116,6 +3116,61 @@ class FullUserFeed(Resource):
         return self._get(id, authed_user_id)
 
 
+USER_FEED_CURSOR_ROUTE = "/<string:id>/feed/cursor"
+user_feed_cursor_parser = user_feed_parser.copy()
+user_feed_cursor_parser.remove_argument("offset")
+user_feed_cursor_parser.add_argument(
+    "cursor",
+    description="The next_cursor of the previous page, omit for the first page",
+    required=False,
+    type=str,
+)
+
+user_feed_cursor_response = full_ns.clone(
+    "user_feed_cursor_response",
+    user_feed_response,
+    {"next_cursor": fields.String(required=False)},
+)
+
+
+@full_ns.route(USER_FEED_CURSOR_ROUTE)
+class FullUserFeedCursor(Resource):
+    @log_duration(logger)
+    @record_metrics
+    def _get(self, id, authed_user_id):
+        decoded_id = decode_with_abort(id, ns)
+        check_authorized(decoded_id, authed_user_id)
+
+        parsedArgs = user_feed_cursor_parser.parse_args()
+        args = {
+            "user_id": decoded_id,
+            "filter": parsedArgs.get("filter"),
+            "tracks_only": parsedArgs.get("tracks_only"),
+            "followee_user_ids": parsedArgs.get("followee_user_id"),
+            "cursor": parsedArgs.get("cursor"),
+        }
+
+        try:
+            feed_results, next_cursor = get_feed_page(args)
+        except ArgumentError:
+            abort_bad_request_param("cursor", full_ns)
+        response, status = success_response(list(map(extend_feed_item, feed_results)))
+        response["next_cursor"] = next_cursor
+        return response, status
+
+    @full_ns.doc(
+        id="""Get User Feed With Cursor""",
+        description="Gets the feed for the user, paginated with an opaque cursor",
+        params={"id": "A User ID"},
+        responses={200: "Success", 400: "Bad request", 500: "Server error"},
+    )
+    @full_ns.expect(user_feed_cursor_parser)
+    @full_ns.marshal_with(user_feed_cursor_response)
+    @auth_middleware(user_feed_cursor_parser, require_auth=True)
+    def get(self, id, authed_user_id):
+        return self._get(id, authed_user_id)
+
+
 muted_users_route_parser = reqparse.RequestParser(argument_class=DescriptiveArgument)
 
 MUTED_USERS_ROUTE = "/<string:id>/muted"
@@ -36,7 +36,16 @@ from src.queries import (
 )
 from src.solana.solana_client_manager import SolanaClientManager
 from src.tasks import celery_app
+from src.tasks.build_autocomplete_index import BUILD_AUTOCOMPLETE_INDEX_LOCK
+from src.tasks.build_sitemaps import BUILD_SITEMAPS_LOCK
+from src.tasks.index_aggregate_track_listeners import AGGREGATE_TRACK_LISTENERS_LOCK
 from src.tasks.index_core import index_core_lock_key
+from src.tasks.index_feed_inboxes import INDEX_FEED_INBOXES_LOCK
+from src.tasks.reconcile_notification_unread_counts import (
+    RECONCILE_NOTIFICATION_UNREAD_COUNTS_LOCK,
+)
+from src.tasks.refresh_random_track_pool import REFRESH_RANDOM_TRACK_POOL_LOCK
+from src.tasks.refresh_related_artists import REFRESH_RELATED_ARTISTS_LOCK
 from src.tasks.repair_audio_analyses import REPAIR_AUDIO_ANALYSES_LOCK
 from src.tasks.update_delist_statuses import UPDATE_DELIST_STATUSES_LOCK
 from src.utils import helpers, web3_provider
@@ -124,7 +133,12 @@ def create_celery(test_config=None):
     )
 
     # Initialize Solana web3 provider
-    solana_client_manager = SolanaClientManager(shared_config["solana"]["endpoint"])
+    solana_client_manager = SolanaClientManager(
+        shared_config["solana"]["endpoint"],
+        hedge_requests=shared_config.getboolean(
+            "solana", "hedge_requests", fallback=False
+        ),
+    )
 
     return create(test_config, mode="celery")
 
@@ -281,6 +295,7 @@ def configure_celery(celery, test_config=None):
         imports=[
             "src.tasks.index_metrics",
             "src.tasks.index_hourly_play_counts",
+            "src.tasks.index_aggregate_track_listeners",
             "src.tasks.vacuum_db",
             "src.tasks.update_clique_signers",
             "src.tasks.index_trending",
@@ -301,6 +316,12 @@ def configure_celery(celery, test_config=None):
             "src.tasks.cache_current_nodes",
             "src.tasks.update_aggregates",
             "src.tasks.cache_entity_counts",
+            "src.tasks.build_sitemaps",
+            "src.tasks.build_autocomplete_index",
+            "src.tasks.index_feed_inboxes",
+            "src.tasks.reconcile_notification_unread_counts",
+            "src.tasks.refresh_related_artists",
+            "src.tasks.refresh_random_track_pool",
             "src.tasks.publish_scheduled_releases",
             "src.tasks.create_engagement_notifications",
             "src.tasks.create_listen_streak_reminder_notifications",
@@ -320,6 +341,18 @@ def configure_celery(celery, test_config=None):
                 "task": "index_hourly_play_counts",
                 "schedule": timedelta(seconds=30),
             },
+            "index_feed_inboxes": {
+                "task": "index_feed_inboxes",
+                "schedule": timedelta(seconds=10),
+            },
+            "index_aggregate_track_listeners": {
+                "task": "index_aggregate_track_listeners",
+                "schedule": timedelta(seconds=30),
+            },
+            "reconcile_aggregate_track_listeners": {
+                "task": "reconcile_aggregate_track_listeners",
+                "schedule": timedelta(minutes=5),
+            },
             "vacuum_db": {
                 "task": "vacuum_db",
                 "schedule": timedelta(days=1),
@@ -376,6 +409,26 @@ def configure_celery(celery, test_config=None):
                 "task": "cache_entity_counts",
                 "schedule": timedelta(minutes=10),
             },
+            "build_sitemaps": {
+                "task": "build_sitemaps",
+                "schedule": timedelta(hours=1),
+            },
+            "build_autocomplete_index": {
+                "task": "build_autocomplete_index",
+                "schedule": timedelta(minutes=10),
+            },
+            "reconcile_notification_unread_counts": {
+                "task": "reconcile_notification_unread_counts",
+                "schedule": timedelta(minutes=1),
+            },
+            "refresh_related_artists": {
+                "task": "refresh_related_artists",
+                "schedule": timedelta(minutes=1),
+            },
+            "refresh_random_track_pool": {
+                "task": "refresh_random_track_pool",
+                "schedule": timedelta(minutes=10),
+            },
             "update_aggregates": {
                 "task": "update_aggregates",
                 "schedule": timedelta(minutes=10),
@@ -431,6 +484,7 @@ def configure_celery(celery, test_config=None):
     redis_inst.delete("update_metrics_lock")
     redis_inst.delete("update_play_count_lock")
     redis_inst.delete("index_hourly_play_counts_lock")
+    redis_inst.delete(AGGREGATE_TRACK_LISTENERS_LOCK)
     redis_inst.delete("update_discovery_lock")
     redis_inst.delete("aggregate_metrics_lock")
     redis_inst.delete("synchronize_metrics_lock")
@@ -452,9 +506,17 @@ def configure_celery(celery, test_config=None):
     redis_inst.delete("update_aggregates_lock")
     redis_inst.delete("publish_scheduled_releases_lock")
     redis_inst.delete("create_engagement_notifications")
+    redis_inst.delete(BUILD_SITEMAPS_LOCK)
+    redis_inst.delete(BUILD_AUTOCOMPLETE_INDEX_LOCK)
+    redis_inst.delete(INDEX_FEED_INBOXES_LOCK)
+    redis_inst.delete(RECONCILE_NOTIFICATION_UNREAD_COUNTS_LOCK)
+    redis_inst.delete(REFRESH_RELATED_ARTISTS_LOCK)
+    redis_inst.delete(REFRESH_RANDOM_TRACK_POOL_LOCK)
     redis_inst.delete(index_core_lock_key)
     # delete cached final_poa_block in case it has changed
     redis_inst.delete(final_poa_block_redis_key)
+    # index_metrics keeps its cursors in a hash under visited_nodes_cursors now
+    redis_inst.delete("visited_nodes")
 
     logger.info("Redis instance connected!")
 
@@ -490,6 +552,8 @@ def configure_celery(celery, test_config=None):
     # Start tasks that should fire upon startup
     celery.send_task("cache_current_nodes")
     celery.send_task("cache_entity_counts")
+    celery.send_task("build_sitemaps")
+    celery.send_task("build_autocomplete_index")
     celery.send_task("index_rewards_manager", queue="index_sol")
     celery.send_task("index_user_bank", queue="index_sol")
     celery.send_task("index_payment_router", queue="index_sol")
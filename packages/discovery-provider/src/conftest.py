@@ -9,7 +9,6 @@ import pytest
 import requests
 
 import src.utils.db_session
-import src.utils.elasticdsl
 import src.utils.redis_connection
 import src.utils.web3_provider
 from src.utils.session_manager import SessionManager
@@ -45,6 +44,10 @@ def redis_mock(monkeypatch):
 # Test fixture to mock an elasticsearch client
 @pytest.fixture()
 def esclient_mock(monkeypatch):
+    # Imported here since elasticdsl loads the eth registry on import, which
+    # unit tests that never touch elasticsearch should not depend on
+    import src.utils.elasticdsl
+
     esclient = MagicMock()
 
     def get_esclient():
@@ -57,6 +60,8 @@ def esclient_mock(monkeypatch):
 # Test fixture that mocks getting monitor values
 @pytest.fixture()
 def get_monitors_mock(monkeypatch):
+    import src.monitors.monitors
+
     mock_get_monitors = MagicMock()
 
     def get_monitors(monitors):
@@ -1,15 +1,23 @@
 import json
 import logging
-from typing import Dict, List, TypedDict, TypeGuard, Union, cast
+from typing import Dict, List, Optional, Set, TypedDict, TypeGuard, Union, cast
 
 from sqlalchemy.orm.session import Session
 from typing_extensions import Protocol
 
 from src.gated_content.helpers import (
+    GatedContentBatchData,
     does_user_follow_artist,
+    does_user_follow_artist_in_batch,
     does_user_have_nft_collection,
+    does_user_have_nft_collection_in_batch,
     does_user_have_usdc_access,
+    does_user_have_usdc_access_in_batch,
     does_user_support_artist,
+    does_user_support_artist_in_batch,
+    get_followed_artists_for_batch,
+    get_supported_artists_for_batch,
+    get_usdc_purchases_for_batch,
 )
 from src.gated_content.types import GatedContentConditions, GatedContentType
 from src.models.playlists.playlist import Playlist
@@ -63,6 +71,28 @@ GATED_CONDITION_TO_HANDLER_MAP: Dict[
 }
 
 
+class GatedContentBatchAccessHandler(Protocol):
+    def __call__(
+        self,
+        batch_data: GatedContentBatchData,
+        user_id: int,
+        content_id: int,
+        content_type: GatedContentType,
+        condition_options: Union[Dict, int],
+    ) -> bool:
+        pass
+
+
+GATED_CONDITION_TO_BATCH_HANDLER_MAP: Dict[
+    GatedContentConditions, GatedContentBatchAccessHandler
+] = {
+    "nft_collection": does_user_have_nft_collection_in_batch,
+    "follow_user_id": does_user_follow_artist_in_batch,
+    "tip_user_id": does_user_support_artist_in_batch,
+    "usdc_purchase": does_user_have_usdc_access_in_batch,
+}
+
+
 def is_track(
     entity: Union[Track, Playlist], content_type: GatedContentType
 ) -> TypeGuard[Track]:
@@ -203,6 +233,11 @@ class ContentAccessChecker:
         ]
         gated_album_data = self._get_gated_album_data_for_batch(session, album_ids)
 
+        self._add_stem_parents_for_batch(session, gated_track_data)
+        batch_data = self._get_access_data_for_batch(
+            session, args, gated_track_data, gated_album_data
+        )
+
         batch_access_result: ContentAccessBatchResponse = {"track": {}, "album": {}}
 
         for arg in args:
@@ -223,73 +258,15 @@ class ContentAccessChecker:
             if user_id not in batch_access_result[key_type]:
                 batch_access_result[key_type][user_id] = {}
 
-            # content owner has access to their own gated content
-            content_owner_id = entity["content_owner_id"]
-            if content_owner_id == user_id:
-                batch_access_result[key_type][user_id][content_id] = {
-                    "has_stream_access": True,
-                    "has_download_access": True,
-                }
-                continue
-
-            # if entity is not gated on either stream or download,
-            # then check if entity is a stem track and check parent track access,
-            # otherwise, user has access to stream and download.
-            # note that stem tracks do not have stream/download conditions.
-            # also note that albums only support stream_conditions.
-            stream_conditions = entity.get("stream_conditions")
-            download_conditions = entity.get("download_conditions")
-            if not stream_conditions and not download_conditions:
-                access = (
-                    self._check_stem_access(
-                        session=session,
-                        user_id=user_id,
-                        content_entity=entity,
-                    )
-                    if content_type == "track"
-                    else True
-                )
-                batch_access_result[key_type][user_id][content_id] = {
-                    "has_stream_access": access,
-                    "has_download_access": access,
-                }
-                continue
-
-            # if stream gated, check stream access which also determines download access
-            if stream_conditions:
-                has_access = self._evaluate_conditions(
-                    session=session,
-                    user_id=user_id,
-                    content_id=content_id,
-                    content_type=content_type,
-                    conditions=stream_conditions,
-                )
-                batch_access_result[key_type][user_id][content_id] = {
-                    "has_stream_access": has_access,
-                    "has_download_access": has_access,
-                }
-                continue
-
-            # if we reach here, it means that the
-            # content is download gated and not stream gated
-            if download_conditions:
-                has_download_access = self._evaluate_conditions(
-                    session=session,
-                    user_id=user_id,
-                    content_id=content_id,
-                    content_type=content_type,
-                    conditions=download_conditions,
-                )
-                batch_access_result[key_type][user_id][content_id] = {
-                    "has_stream_access": True,
-                    "has_download_access": has_download_access,
-                }
-                continue
-
-            batch_access_result[key_type][user_id][content_id] = {
-                "has_stream_access": True,
-                "has_download_access": True,
-            }
+            batch_access_result[key_type][user_id][
+                content_id
+            ] = self._check_access_in_batch(
+                batch_data=batch_data,
+                user_id=user_id,
+                content_id=content_id,
+                content_type=content_type,
+                entity=entity,
+            )
 
         return batch_access_result
 
@@ -313,10 +290,114 @@ class ContentAccessChecker:
                 "is_download_gated": track["is_download_gated"],  # type: ignore
                 "download_conditions": track["download_conditions"],  # type: ignore
                 "content_owner_id": track["owner_id"],  # type: ignore
+                "stem_of": track["stem_of"],  # type: ignore
+                "playlists_containing_track": track["playlists_containing_track"],  # type: ignore
+                "playlists_previously_containing_track": track[  # type: ignore
+                    "playlists_previously_containing_track"
+                ],
             }
             for track in tracks
         }
 
+    def _add_stem_parents_for_batch(self, session: Session, gated_track_data: Dict):
+        """
+        Adds the parents of the ungated stems in gated_track_data, and their
+        parents in turn, one query per level of stems.
+        """
+        missing_parent_ids: Set[int] = set()
+        while True:
+            parent_ids = set()
+            for track in gated_track_data.values():
+                if track["stream_conditions"] or track["download_conditions"]:
+                    continue
+                parent_id = (track["stem_of"] or {}).get("parent_track_id")
+                if (
+                    parent_id
+                    and parent_id not in gated_track_data
+                    and parent_id not in missing_parent_ids
+                ):
+                    parent_ids.add(parent_id)
+            if not parent_ids:
+                return
+            parents = self._get_gated_track_data_for_batch(session, list(parent_ids))
+            gated_track_data.update(parents)
+            missing_parent_ids.update(parent_ids - parents.keys())
+
+    def _get_access_data_for_batch(
+        self,
+        session: Session,
+        args: List[ContentAccessBatchArgs],
+        gated_track_data: Dict,
+        gated_album_data: Dict,
+    ) -> GatedContentBatchData:
+        """
+        Resolves the conditions of every (user, content) pair in args,
+        including the parents of stems, with one query per condition type.
+        """
+        user_ids: Set[int] = set()
+        followee_ids: Set[int] = set()
+        receiver_ids: Set[int] = set()
+        purchase_track_ids: Set[int] = set()
+        purchase_album_ids: Set[int] = set()
+
+        for arg in args:
+            user_id = arg["user_id"]
+            content_id: Optional[int] = arg["content_id"]
+            content_type = arg["content_type"]
+            entity = (
+                gated_track_data.get(content_id)
+                if content_type == "track"
+                else gated_album_data.get(content_id)
+            )
+            visited: Set[Optional[int]] = set()
+            while (
+                entity
+                and entity["content_owner_id"] != user_id
+                and content_id not in visited
+            ):
+                visited.add(content_id)
+                conditions = {
+                    **(entity.get("stream_conditions") or {}),
+                    **(entity.get("download_conditions") or {}),
+                }
+                if conditions:
+                    user_ids.add(user_id)
+                    for condition, condition_options in conditions.items():
+                        if condition == "follow_user_id":
+                            followee_ids.add(condition_options)
+                        elif condition == "tip_user_id":
+                            receiver_ids.add(condition_options)
+                    # failed conditions fall back to checking for a purchase
+                    if content_type == "track":
+                        purchase_track_ids.add(cast(int, content_id))
+                        purchase_album_ids.update(
+                            entity["playlists_containing_track"] or []
+                        )
+                        purchase_album_ids.update(
+                            map(
+                                int,
+                                entity["playlists_previously_containing_track"] or {},
+                            )
+                        )
+                    else:
+                        purchase_album_ids.add(cast(int, content_id))
+                    break
+                if content_type != "track":
+                    break
+                content_id = (entity.get("stem_of") or {}).get("parent_track_id")
+                entity = gated_track_data.get(content_id)
+
+        return {
+            "follows": get_followed_artists_for_batch(session, user_ids, followee_ids),
+            "supports": get_supported_artists_for_batch(
+                session, user_ids, receiver_ids
+            ),
+            "purchases": get_usdc_purchases_for_batch(
+                session, user_ids, purchase_track_ids, purchase_album_ids
+            ),
+            "tracks": gated_track_data,
+        }
+
     def _get_gated_album_data_for_batch(
         self, session: Session, playlist_ids: List[int]
     ):
@@ -341,6 +422,134 @@ class ContentAccessChecker:
             for album in albums
         }
 
+    def _check_access_in_batch(
+        self,
+        batch_data: GatedContentBatchData,
+        user_id: int,
+        content_id: int,
+        content_type: GatedContentType,
+        entity: dict,
+    ) -> ContentAccessResponse:
+        # content owner has access to their own gated content
+        if entity["content_owner_id"] == user_id:
+            return {"has_stream_access": True, "has_download_access": True}
+
+        # if entity is not gated on either stream or download,
+        # then check if entity is a stem track and check parent track access,
+        # otherwise, user has access to stream and download.
+        # note that stem tracks do not have stream/download conditions.
+        # also note that albums only support stream_conditions.
+        stream_conditions = entity.get("stream_conditions")
+        download_conditions = entity.get("download_conditions")
+        if not stream_conditions and not download_conditions:
+            access = (
+                self._check_stem_access_in_batch(
+                    batch_data=batch_data,
+                    user_id=user_id,
+                    content_entity=entity,
+                )
+                if content_type == "track"
+                else True
+            )
+            return {"has_stream_access": access, "has_download_access": access}
+
+        # if stream gated, check stream access which also determines download access
+        if stream_conditions:
+            has_access = self._evaluate_conditions_in_batch(
+                batch_data=batch_data,
+                user_id=user_id,
+                content_id=content_id,
+                content_type=content_type,
+                conditions=stream_conditions,
+            )
+            return {"has_stream_access": has_access, "has_download_access": has_access}
+
+        # if we reach here, it means that the
+        # content is download gated and not stream gated
+        has_download_access = self._evaluate_conditions_in_batch(
+            batch_data=batch_data,
+            user_id=user_id,
+            content_id=content_id,
+            content_type=content_type,
+            conditions=cast(dict, download_conditions),
+        )
+        return {
+            "has_stream_access": True,
+            "has_download_access": has_download_access,
+        }
+
+    def _evaluate_conditions_in_batch(
+        self,
+        batch_data: GatedContentBatchData,
+        user_id: int,
+        content_id: int,
+        content_type: GatedContentType,
+        conditions: dict,
+    ):
+        valid_conditions = set(GATED_CONDITION_TO_BATCH_HANDLER_MAP.keys())
+        for condition, condition_options in conditions.items():
+            if condition not in valid_conditions:
+                logging.info(
+                    f"gated_content_access_checker.py | _evaluate_conditions_in_batch | invalid condition: {json.dumps(conditions)}"
+                )
+                return False
+
+            handler = GATED_CONDITION_TO_BATCH_HANDLER_MAP[condition]
+            has_access = handler(
+                batch_data=batch_data,
+                user_id=user_id,
+                content_id=content_id,
+                content_type=content_type,
+                condition_options=condition_options,
+            )
+            if not has_access:
+                # perhaps content was previously (not currently) purchase gated
+                # so we check if user had previously purchased content
+                if condition == "usdc_purchase" or not (
+                    does_user_have_usdc_access_in_batch(
+                        batch_data=batch_data,
+                        user_id=user_id,
+                        content_id=content_id,
+                        content_type=content_type,
+                        condition_options=condition_options,
+                    )
+                ):
+                    return False
+        return True
+
+    def _check_stem_access_in_batch(
+        self,
+        batch_data: GatedContentBatchData,
+        user_id: int,
+        content_entity: dict,
+    ):
+        stem_of = content_entity.get("stem_of", None)
+        if not stem_of:
+            return True
+
+        parent_id = stem_of.get("parent_track_id")
+        if not parent_id:
+            logging.warn(
+                "gated_content_access_checker.py | _check_stem_access_in_batch | stem track has no parent track id."
+            )
+            return True
+
+        parent_track = batch_data["tracks"].get(parent_id)
+        if not parent_track:
+            logging.warn(
+                f"gated_content_access_checker.py | _check_stem_access_in_batch | parent track {parent_id} not found."
+            )
+            return True
+
+        parent_access = self._check_access_in_batch(
+            batch_data=batch_data,
+            user_id=user_id,
+            content_id=parent_id,
+            content_type="track",
+            entity=parent_track,
+        )
+        return parent_access["has_download_access"]
+
     def _evaluate_conditions(
         self,
         session: Session,
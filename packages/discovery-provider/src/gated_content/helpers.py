@@ -1,14 +1,15 @@
 import logging
 from datetime import datetime
-from typing import Dict, Union
+from typing import Dict, Set, Tuple, TypedDict, Union
 
+from sqlalchemy import and_, or_
 from sqlalchemy.orm.session import Session
 
 from src.gated_content.types import GatedContentType
 from src.models.social.follow import Follow
 from src.models.tracks.track import Track
 from src.models.users.aggregate_user_tips import AggregateUserTip
-from src.models.users.usdc_purchase import USDCPurchase
+from src.models.users.usdc_purchase import PurchaseType, USDCPurchase
 from src.utils import helpers
 
 logger = logging.getLogger(__name__)
@@ -148,3 +149,158 @@ def does_user_have_usdc_access(
             .first()
         )
         return bool(result)
+
+
+# Set based versions of the handlers above, for checking access to a batch of
+# content. Each resolves every (user, condition) pair of the batch in one query.
+
+
+def get_followed_artists_for_batch(
+    session: Session, user_ids: Set[int], artist_ids: Set[int]
+) -> Set[Tuple[int, int]]:
+    """Returns the (follower, followee) pairs among user_ids and artist_ids"""
+    if not user_ids or not artist_ids:
+        return set()
+    rows = (
+        session.query(Follow.follower_user_id, Follow.followee_user_id)
+        .filter(Follow.is_current == True)
+        .filter(Follow.is_delete == False)
+        .filter(Follow.follower_user_id.in_(user_ids))
+        .filter(Follow.followee_user_id.in_(artist_ids))
+        .all()
+    )
+    return {(follower, followee) for follower, followee in rows}
+
+
+def get_supported_artists_for_batch(
+    session: Session, user_ids: Set[int], artist_ids: Set[int]
+) -> Set[Tuple[int, int]]:
+    """Returns the (sender, receiver) tip pairs among user_ids and artist_ids"""
+    if not user_ids or not artist_ids:
+        return set()
+    rows = (
+        session.query(
+            AggregateUserTip.sender_user_id, AggregateUserTip.receiver_user_id
+        )
+        .filter(AggregateUserTip.sender_user_id.in_(user_ids))
+        .filter(AggregateUserTip.receiver_user_id.in_(artist_ids))
+        .filter(AggregateUserTip.amount >= 0)
+        .all()
+    )
+    return {(sender, receiver) for sender, receiver in rows}
+
+
+# (buyer user id, content type, content id) -> earliest purchase time
+UsdcPurchasesForBatch = Dict[Tuple[int, str, int], datetime]
+
+
+def get_usdc_purchases_for_batch(
+    session: Session, user_ids: Set[int], track_ids: Set[int], album_ids: Set[int]
+) -> UsdcPurchasesForBatch:
+    """Returns the purchases by user_ids of track_ids and album_ids"""
+    if not user_ids or (not track_ids and not album_ids):
+        return {}
+    rows = (
+        session.query(
+            USDCPurchase.buyer_user_id,
+            USDCPurchase.content_type,
+            USDCPurchase.content_id,
+            USDCPurchase.created_at,
+        )
+        .filter(USDCPurchase.buyer_user_id.in_(user_ids))
+        .filter(
+            or_(
+                and_(
+                    USDCPurchase.content_type == "track",
+                    USDCPurchase.content_id.in_(track_ids),
+                ),
+                and_(
+                    USDCPurchase.content_type == "album",
+                    USDCPurchase.content_id.in_(album_ids),
+                ),
+            )
+        )
+        .all()
+    )
+    purchases: UsdcPurchasesForBatch = {}
+    for buyer_user_id, content_type, content_id, created_at in rows:
+        key = (buyer_user_id, PurchaseType(content_type).value, content_id)
+        if key not in purchases or created_at < purchases[key]:
+            purchases[key] = created_at
+    return purchases
+
+
+class GatedContentBatchData(TypedDict):
+    # (follower, followee) pairs
+    follows: Set[Tuple[int, int]]
+    # (sender, receiver) tip pairs
+    supports: Set[Tuple[int, int]]
+    purchases: UsdcPurchasesForBatch
+    # track id -> gated track data, including stem parents
+    tracks: Dict[int, Dict]
+
+
+def does_user_have_nft_collection_in_batch(
+    batch_data: GatedContentBatchData,
+    user_id: int,
+    content_id: int,
+    content_type: GatedContentType,
+    condition_options: Union[Dict, int],
+):
+    return False
+
+
+def does_user_follow_artist_in_batch(
+    batch_data: GatedContentBatchData,
+    user_id: int,
+    content_id: int,
+    content_type: GatedContentType,
+    condition_options: Union[Dict, int],
+):
+    return (user_id, condition_options) in batch_data["follows"]
+
+
+def does_user_support_artist_in_batch(
+    batch_data: GatedContentBatchData,
+    user_id: int,
+    content_id: int,
+    content_type: GatedContentType,
+    condition_options: Union[Dict, int],
+):
+    return (user_id, condition_options) in batch_data["supports"]
+
+
+def does_user_have_usdc_access_in_batch(
+    batch_data: GatedContentBatchData,
+    user_id: int,
+    content_id: int,
+    content_type: GatedContentType,
+    condition_options: Union[Dict, int],
+):
+    purchases = batch_data["purchases"]
+    if (user_id, content_type, content_id) in purchases:
+        return True
+    if content_type != "track":
+        return False
+
+    track = batch_data["tracks"].get(content_id)
+
+    # Don't check album purchase if track is download-gated only
+    if not track or (track["is_download_gated"] and not track["is_stream_gated"]):
+        return False
+
+    # check if user has purchased an album currently containing the track
+    for playlist_id in track["playlists_containing_track"] or []:
+        if (user_id, "album", playlist_id) in purchases:
+            return True
+
+    # check if user has purchased an album previously containing the track
+    # and the purchase was made before the track was removed from the album
+    previously_containing = track["playlists_previously_containing_track"] or {}
+    for playlist_id, removal in previously_containing.items():
+        purchased_at = purchases.get((user_id, "album", int(playlist_id)))
+        if purchased_at and purchased_at <= datetime.utcfromtimestamp(
+            removal.get("time")
+        ):
+            return True
+    return False
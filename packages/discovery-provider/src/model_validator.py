@@ -2,7 +2,8 @@ import copy
 import json
 import logging  # pylint: disable=C0302
 import os.path
-from typing import Any, Dict
+import threading
+from typing import Any, Dict, Optional, Tuple
 
 from jsonschema import Draft7Validator, SchemaError, ValidationError
 
@@ -27,16 +28,16 @@ class ModelValidator:
     """
 
     models_to_schema_and_fields_dict: Dict[str, Any] = {}
+    # (model, field) -> validator, built once and shared across threads
+    validators: Dict[Tuple[str, Optional[str]], Draft7Validator] = {}
+    lock = threading.Lock()
     BASE_PATH = "./src/schemas/"
-    FILE_NAME = ""
 
     # Default field is set to None to validate the entire model
     @classmethod
     def validate(cls, to_validate, model, field=None):
-        cls.FILE_NAME = model.lower() + "_schema.json"
         try:
-            schema = cls.get_schema_for_field(field, model)
-            validator = Draft7Validator(schema)
+            validator = cls.get_validator(field, model)
 
             found_invalid_field = False
             errors = []
@@ -57,6 +58,21 @@ class ModelValidator:
             # one of many errors specified in helper methods
             raise e
 
+    # Validators are called for every field of every entity the indexer writes,
+    # so they are built on first use and reused
+    @classmethod
+    def get_validator(cls, field, model) -> Draft7Validator:
+        key = (model, field)
+        validator = cls.validators.get(key)
+        if validator:
+            return validator
+
+        with cls.lock:
+            if key not in cls.validators:
+                schema = cls.get_schema_for_field(field, model)
+                cls.validators[key] = Draft7Validator(schema)
+            return cls.validators[key]
+
     # If field is None, return the entire model schema
     @classmethod
     def get_schema_for_field(cls, field, model):
@@ -78,7 +94,6 @@ class ModelValidator:
 
     @classmethod
     def init_model_schemas(cls, model):
-        cls.FILE_NAME = model.lower() + "_schema.json"
         try:
             # Load in the model schema in /schemas
             schema = cls.load_schema_from_path(model)
@@ -104,7 +119,7 @@ class ModelValidator:
 
     @classmethod
     def load_schema_from_path(cls, model):
-        schema_path = cls.BASE_PATH + cls.FILE_NAME
+        schema_path = cls.BASE_PATH + model.lower() + "_schema.json"
 
         if not os.path.isfile(schema_path):
             raise FileNotFoundError(
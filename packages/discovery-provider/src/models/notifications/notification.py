@@ -62,3 +62,15 @@ class PlaylistSeen(Base, RepresentableMixin):
     txhash = Column(String)
     seen_at = Column(DateTime, nullable=False)
     PrimaryKeyConstraint(is_current, user_id, playlist_id, seen_at)
+
+
+# Unread notification group counts by type, maintained by db triggers on
+# notification and notification_seen and by reconcile_notification_unread_counts
+class NotificationUnreadCount(Base, RepresentableMixin):
+    __tablename__ = "notification_unread_counts"
+
+    user_id = Column(Integer, primary_key=True, nullable=False)
+    seen_at = Column(DateTime, nullable=False)
+    counts = Column(postgresql.JSONB(), nullable=False)  # type: ignore
+    reconciled_at = Column(DateTime, nullable=False)
+    dirty_at = Column(DateTime, nullable=True)
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, DateTime, Integer
+
+from src.models.base import Base
+from src.models.model_utils import RepresentableMixin
+
+
+# Per (track, user) count of distinct hours with a play,
+# maintained by index_aggregate_track_listeners
+class AggregateTrackListener(Base, RepresentableMixin):
+    __tablename__ = "aggregate_track_listeners"
+
+    track_id = Column(Integer, primary_key=True, nullable=False)
+    user_id = Column(Integer, primary_key=True, nullable=False)
+    listen_count = Column(Integer, nullable=False)
+    last_listened_hour = Column(DateTime, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, DateTime, Float, Index, Integer, text
+from sqlalchemy import Boolean, Column, DateTime, Float, Index, Integer, text
 
 from src.models.base import Base
 from src.models.model_utils import RepresentableMixin
@@ -10,11 +10,35 @@ class RelatedArtist(Base, RepresentableMixin):
         Index(
             "related_artists_related_artist_id_idx", "related_artist_user_id", "user_id"
         ),
+        Index(
+            "idx_related_artists_user_id_rank",
+            "user_id",
+            "rank",
+            "related_artist_user_id",
+        ),
     )
 
     user_id = Column(Integer, primary_key=True, nullable=False)
     related_artist_user_id = Column(Integer, primary_key=True, nullable=False)
     score = Column(Float(53), nullable=False)
+    # position of the related artist in user_id's related artists, from 1
+    rank = Column(Integer, nullable=False)
     created_at = Column(
         DateTime, nullable=False, server_default=text("CURRENT_TIMESTAMP")
     )
+
+
+class RelatedArtistsState(Base, RepresentableMixin):
+    __tablename__ = "related_artists_state"
+
+    user_id = Column(Integer, primary_key=True, nullable=False)
+    is_stale = Column(Boolean, nullable=False, server_default=text("true"))
+    # when the artist was last marked stale, stale artists are refreshed in order
+    stale_at = Column(
+        DateTime, nullable=False, server_default=text("CURRENT_TIMESTAMP")
+    )
+    # when the artist was last marked stale, even if they already were
+    changed_at = Column(
+        DateTime, nullable=False, server_default=text("CURRENT_TIMESTAMP")
+    )
+    refreshed_at = Column(DateTime)
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, DateTime, Integer
+
+from src.models.base import Base
+from src.models.model_utils import RepresentableMixin
+
+
+class UserTrackListen(Base, RepresentableMixin):
+    """
+    A user's listens of a single track, maintained by index_user_listening_history.
+    """
+
+    __tablename__ = "user_track_listens"
+
+    user_id = Column(Integer, primary_key=True, nullable=False)
+    track_id = Column(Integer, primary_key=True, nullable=False)
+    last_listened_at = Column(DateTime, nullable=False)
+    play_count = Column(Integer, nullable=False, default=1)
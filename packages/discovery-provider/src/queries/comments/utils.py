@@ -104,6 +104,34 @@ def get_reactions_batch(session, comment_ids, user_ids):
     return {(r.user_id, r.comment_id): True for r in reactions}
 
 
+def get_reply_counts_batch(session, comment_ids):
+    """
+    Batch fetch reply counts for multiple comments.
+
+    Args:
+        session: Database session
+        comment_ids: List of comment IDs to count replies for
+
+    Returns:
+        Dict mapping comment_id to its number of replies, omitting comments without replies
+    """
+    from src.models.comments.comment_thread import CommentThread
+
+    if not comment_ids:
+        return {}
+
+    reply_counts = (
+        session.query(
+            CommentThread.parent_comment_id,
+            func.count(CommentThread.comment_id),
+        )
+        .filter(CommentThread.parent_comment_id.in_(comment_ids))
+        .group_by(CommentThread.parent_comment_id)
+        .all()
+    )
+    return dict(reply_counts)
+
+
 def _format_comment_response(
     comment,
     react_count,
@@ -114,8 +142,14 @@ def _format_comment_response(
     artist_id=None,
     replies=None,
     reactions_map=None,
+    reply_counts=None,
 ):
-    """Common formatter for comment responses"""
+    """
+    Common formatter for comment responses.
+
+    reply_counts maps deleted comment ids to their reply counts, see
+    get_reply_counts_batch. It is only used when replies are not provided.
+    """
 
     def remove_delete(mention):
         del mention["is_delete"]
@@ -160,13 +194,9 @@ def _format_comment_response(
     # Even if no replies are provided, we need to set is_tombstone for deleted comments
     elif comment.is_delete:
         # Check if this comment has any replies in the database
-        from src.models.comments.comment_thread import CommentThread
-
-        reply_count = (
-            session.query(CommentThread)
-            .filter(CommentThread.parent_comment_id == comment.comment_id)
-            .count()
-        )
+        if reply_counts is None:
+            reply_counts = get_reply_counts_batch(session, [comment.comment_id])
+        reply_count = reply_counts.get(comment.comment_id, 0)
 
         response.update(
             {
@@ -603,6 +633,15 @@ def format_comments(
 
     # If we don't need to include replies, just format the comments directly
     if not include_replies:
+        # Deleted comments are tombstones if they have replies, count them all at once
+        reply_counts = get_reply_counts_batch(
+            session,
+            [
+                comment_data[0].comment_id
+                for comment_data in comments
+                if comment_data[0].is_delete
+            ],
+        )
         formatted_comments = []
         for comment_data in comments:
             # Handle different tuple structures from different queries
@@ -623,6 +662,7 @@ def format_comments(
                 artist_id=artist_id,
                 replies=None,
                 reactions_map=reactions_map,
+                reply_counts=reply_counts,
             )
             formatted_comments.append(formatted_comment)
         return formatted_comments
@@ -801,7 +841,7 @@ def get_comment_replies(
     replies_results = replies_query.all()
 
     # If we don't have a reactions map and we have replies, create one
-    if not reactions_map and replies_results:
+    if reactions_map is None and replies_results:
         # Collect reply IDs
         reply_ids = [reply.comment_id for reply, _, _, _ in replies_results]
 
@@ -842,7 +882,7 @@ def get_comment_replies(
             "react_count": react_count,
             "is_current_user_reacted": (
                 reactions_map.get((current_user_id, reply.comment_id), False)
-                if reactions_map
+                if reactions_map is not None
                 else get_is_reacted(session, current_user_id, reply.comment_id)
             ),
             "created_at": str(reply.created_at),
@@ -850,7 +890,7 @@ def get_comment_replies(
             "is_muted": False,  # Replies don't have mute status
             "is_artist_reacted": (
                 reactions_map.get((artist_id, reply.comment_id), False)
-                if reactions_map
+                if reactions_map is not None
                 else (
                     get_is_reacted(session, artist_id, reply.comment_id)
                     if artist_id
@@ -1,6 +1,7 @@
 from typing import Optional, TypedDict
 
 from sqlalchemy import and_, desc, or_
+from sqlalchemy.orm.session import Session
 
 from src.models.playlists.playlist import Playlist
 from src.models.playlists.playlist_route import PlaylistRoute
@@ -18,8 +19,9 @@ from src.models.users.user_bank import USDCUserBankAccount
 from src.models.users.user_pubkey import UserPubkey
 from src.solana.constants import USDC_DECIMALS
 from src.utils.config import shared_config
-from src.utils.csv_writer import write_csv_string
+from src.utils.csv_writer import stream_csv_string
 from src.utils.db_session import get_db_read_replica
+from src.utils.session_manager import SessionManager
 
 env = shared_config["discprov"]["env"]
 
@@ -41,112 +43,136 @@ class DownloadWithdrawalsArgs(TypedDict):
     user_id: int
 
 
-# Get all purchases or sales for a given artist.
-def get_purchases_or_sales(
-    user_id: int, is_purchases: bool, grantee_user_id: Optional[int] = None
+# Number of rows fetched per round trip when streaming from a server side cursor
+YIELD_PER = 1000
+
+
+def _get_purchases_or_sales_query(
+    session: Session,
+    user_id: int,
+    is_purchases: bool,
+    grantee_user_id: Optional[int] = None,
 ):
-    """Get all purchases or sales for a given artist."""
-    db = get_db_read_replica()
-    with db.scoped_session() as session:
-        if is_purchases:
-            # Get all purchases for the given user and include the seller name and handle
-            query = (
-                session.query(
-                    USDCPurchase.content_type.label("content_type"),
-                    USDCPurchase.created_at.label("created_at"),
-                    USDCPurchase.amount.label("amount"),
-                    USDCPurchase.extra_amount.label("extra_amount"),
-                    USDCPurchase.splits.label("splits"),
-                    User.handle.label("seller_handle"),
-                    User.name.label("seller_name"),
-                    USDCPurchase.seller_user_id,
-                )
-                .join(User, User.user_id == USDCPurchase.seller_user_id)
-                .filter(USDCPurchase.buyer_user_id == user_id)
-                .filter(User.is_current == True)
+    if is_purchases:
+        # Get all purchases for the given user and include the seller name and handle
+        query = (
+            session.query(
+                USDCPurchase.content_type.label("content_type"),
+                USDCPurchase.created_at.label("created_at"),
+                USDCPurchase.amount.label("amount"),
+                USDCPurchase.extra_amount.label("extra_amount"),
+                USDCPurchase.splits.label("splits"),
+                User.handle.label("seller_handle"),
+                User.name.label("seller_name"),
+                USDCPurchase.seller_user_id,
+            )
+            .join(User, User.user_id == USDCPurchase.seller_user_id)
+            .filter(USDCPurchase.buyer_user_id == user_id)
+            .filter(User.is_current == True)
+        )
+    else:
+        # Set email access conditions based on grantee_user_id
+        if grantee_user_id is not None:
+            email_access_condition = and_(
+                EmailAccess.email_owner_user_id == USDCPurchase.buyer_user_id,
+                EmailAccess.receiving_user_id == grantee_user_id,
+                EmailAccess.grantor_user_id == user_id,
             )
         else:
-            # Set email access conditions based on grantee_user_id
-            if grantee_user_id is not None:
-                email_access_condition = and_(
-                    EmailAccess.email_owner_user_id == USDCPurchase.buyer_user_id,
-                    EmailAccess.receiving_user_id == grantee_user_id,
-                    EmailAccess.grantor_user_id == user_id,
-                )
-            else:
-                # When seller is directly accessing buyer emails
-                email_access_condition = and_(
-                    EmailAccess.email_owner_user_id == USDCPurchase.buyer_user_id,
-                    EmailAccess.receiving_user_id == user_id,
-                    EmailAccess.grantor_user_id == USDCPurchase.buyer_user_id,
-                )
-
-            query = (
-                session.query(
-                    USDCPurchase.content_type.label("content_type"),
-                    USDCPurchase.created_at.label("created_at"),
-                    USDCPurchase.amount.label("amount"),
-                    USDCPurchase.extra_amount.label("extra_amount"),
-                    USDCPurchase.splits.label("splits"),
-                    USDCPurchase.country.label("country"),
-                    User.name.label("buyer_name"),
-                    User.user_id.label("buyer_user_id"),
-                    EncryptedEmail.encrypted_email.label("encrypted_email"),
-                    EmailAccess.encrypted_key.label("encrypted_key"),
-                    EmailAccess.is_initial.label("is_initial"),
-                    UserPubkey.pubkey_base64.label("pubkey_base64"),
-                )
-                .join(User, User.user_id == USDCPurchase.buyer_user_id)
-                .outerjoin(
-                    EncryptedEmail,
-                    EncryptedEmail.email_owner_user_id == USDCPurchase.buyer_user_id,
-                )
-                .outerjoin(
-                    EmailAccess,
-                    email_access_condition,
-                )
-                .outerjoin(
-                    UserPubkey,
-                    UserPubkey.user_id == USDCPurchase.buyer_user_id,
-                )
-                .filter(USDCPurchase.seller_user_id == user_id)
-                .filter(User.is_current == True)
+            # When seller is directly accessing buyer emails
+            email_access_condition = and_(
+                EmailAccess.email_owner_user_id == USDCPurchase.buyer_user_id,
+                EmailAccess.receiving_user_id == user_id,
+                EmailAccess.grantor_user_id == USDCPurchase.buyer_user_id,
             )
 
-        # Include playlist titles
-        playlists_query = (
-            query.filter(
-                or_(
-                    USDCPurchase.content_type == PurchaseType.playlist,
-                    USDCPurchase.content_type == PurchaseType.album,
-                )
+        query = (
+            session.query(
+                USDCPurchase.content_type.label("content_type"),
+                USDCPurchase.created_at.label("created_at"),
+                USDCPurchase.amount.label("amount"),
+                USDCPurchase.extra_amount.label("extra_amount"),
+                USDCPurchase.splits.label("splits"),
+                USDCPurchase.country.label("country"),
+                User.name.label("buyer_name"),
+                User.user_id.label("buyer_user_id"),
+                EncryptedEmail.encrypted_email.label("encrypted_email"),
+                EmailAccess.encrypted_key.label("encrypted_key"),
+                EmailAccess.is_initial.label("is_initial"),
+                UserPubkey.pubkey_base64.label("pubkey_base64"),
+            )
+            .join(User, User.user_id == USDCPurchase.buyer_user_id)
+            .outerjoin(
+                EncryptedEmail,
+                EncryptedEmail.email_owner_user_id == USDCPurchase.buyer_user_id,
+            )
+            .outerjoin(
+                EmailAccess,
+                email_access_condition,
             )
-            .join(Playlist, Playlist.playlist_id == USDCPurchase.content_id)
-            .join(PlaylistRoute, PlaylistRoute.playlist_id == USDCPurchase.content_id)
-            .filter(Playlist.is_current == True)
-            .add_columns(
-                Playlist.playlist_name.label("content_title"),
-                PlaylistRoute.slug.label("slug"),
+            .outerjoin(
+                UserPubkey,
+                UserPubkey.user_id == USDCPurchase.buyer_user_id,
             )
+            .filter(USDCPurchase.seller_user_id == user_id)
+            .filter(User.is_current == True)
         )
 
-        # Include track titles
-        tracks_query = (
-            query.filter(USDCPurchase.content_type == PurchaseType.track)
-            .join(Track, Track.track_id == USDCPurchase.content_id)
-            .join(TrackRoute, TrackRoute.track_id == USDCPurchase.content_id)
-            .filter(Track.is_current == True)
-            .add_columns(
-                Track.title.label("content_title"),
-                TrackRoute.slug.label("slug"),
+    # Include playlist titles
+    playlists_query = (
+        query.filter(
+            or_(
+                USDCPurchase.content_type == PurchaseType.playlist,
+                USDCPurchase.content_type == PurchaseType.album,
             )
         )
+        .join(Playlist, Playlist.playlist_id == USDCPurchase.content_id)
+        .join(PlaylistRoute, PlaylistRoute.playlist_id == USDCPurchase.content_id)
+        .filter(Playlist.is_current == True)
+        .add_columns(
+            Playlist.playlist_name.label("content_title"),
+            PlaylistRoute.slug.label("slug"),
+        )
+    )
 
-        return (
-            playlists_query.union(tracks_query)
-            .order_by(desc(USDCPurchase.created_at))
-            .all()
+    # Include track titles
+    tracks_query = (
+        query.filter(USDCPurchase.content_type == PurchaseType.track)
+        .join(Track, Track.track_id == USDCPurchase.content_id)
+        .join(TrackRoute, TrackRoute.track_id == USDCPurchase.content_id)
+        .filter(Track.is_current == True)
+        .add_columns(
+            Track.title.label("content_title"),
+            TrackRoute.slug.label("slug"),
         )
+    )
+
+    return playlists_query.union(tracks_query).order_by(desc(USDCPurchase.created_at))
+
+
+# Get all purchases or sales for a given artist.
+def get_purchases_or_sales(
+    user_id: int, is_purchases: bool, grantee_user_id: Optional[int] = None
+):
+    """Get all purchases or sales for a given artist."""
+    db = get_db_read_replica()
+    with db.scoped_session() as session:
+        return _get_purchases_or_sales_query(
+            session, user_id, is_purchases, grantee_user_id
+        ).all()
+
+
+def _stream_purchases_or_sales(
+    db: SessionManager,
+    user_id: int,
+    is_purchases: bool,
+    grantee_user_id: Optional[int] = None,
+):
+    """Yields purchases or sales from a server side cursor, YIELD_PER rows at a time."""
+    with db.scoped_session() as session:
+        yield from _get_purchases_or_sales_query(
+            session, user_id, is_purchases, grantee_user_id
+        ).yield_per(YIELD_PER)
 
 
 # Get link of purchased content
@@ -168,58 +194,55 @@ def get_dollar_amount(amount: str):
     return int(amount) / 10**USDC_DECIMALS
 
 
-# Returns USDC purchases for a given user in a CSV format
+def get_split_amounts(splits, seller_user_id: int):
+    """Returns the seller's and the network fee's split amounts in one pass over splits."""
+    seller_amount = None
+    network_fee_amount = None
+    for item in splits:
+        if seller_amount is None and item["user_id"] == seller_user_id:
+            seller_amount = item["amount"]
+        if (
+            network_fee_amount is None
+            and item["payout_wallet"] == staking_bridge_usdc_payout_wallet
+        ):
+            network_fee_amount = item["amount"]
+    return seller_amount, network_fee_amount
+
+
+def format_purchase_for_download(result):
+    """Format a purchase result into a CSV-friendly dictionary format."""
+    seller_amount, network_fee_amount = get_split_amounts(
+        result.splits, result.seller_user_id
+    )
+    return {
+        "title": result.content_title,
+        "link": get_link(result.content_type, result.seller_handle, result.slug),
+        "artist": result.seller_name,
+        "date": result.created_at,
+        "paid to artist": (
+            get_dollar_amount(seller_amount) if seller_amount is not None else None
+        ),
+        "network fee": (
+            get_dollar_amount(network_fee_amount)
+            if network_fee_amount is not None
+            else None
+        ),
+        "pay extra": get_dollar_amount(result.extra_amount),
+        "total": (
+            get_dollar_amount(str(int(result.amount) + int(result.extra_amount)))
+            if seller_amount is not None
+            else None
+        ),
+    }
+
+
+# Streams USDC purchases for a given user in a CSV format
 def download_purchases(args: DownloadPurchasesArgs):
     buyer_user_id = args["buyer_user_id"]
+    db = get_db_read_replica()
 
-    # Get purchases for user
-    results = get_purchases_or_sales(buyer_user_id, is_purchases=True)
-
-    # Build list of dictionary results
-    contents = list(
-        map(
-            lambda result: {
-                "title": result.content_title,
-                "link": get_link(
-                    result.content_type, result.seller_handle, result.slug
-                ),
-                "artist": result.seller_name,
-                "date": result.created_at,
-                "paid to artist": next(
-                    (
-                        get_dollar_amount(item["amount"])
-                        for item in result.splits
-                        if item["user_id"] == result.seller_user_id
-                    ),
-                    None,
-                ),
-                "network fee": next(
-                    (
-                        get_dollar_amount(item["amount"])
-                        for item in result.splits
-                        if item["payout_wallet"] == staking_bridge_usdc_payout_wallet
-                    ),
-                    None,
-                ),
-                "pay extra": get_dollar_amount(result.extra_amount),
-                "total": next(
-                    (
-                        get_dollar_amount(
-                            str(int(result.amount) + int(result.extra_amount))
-                        )
-                        for item in result.splits
-                        if item["user_id"] == result.seller_user_id
-                    ),
-                    None,
-                ),
-            },
-            results,
-        )
-    )
-
-    # Get results in CSV format
-    to_download = write_csv_string(contents)
-    return to_download
+    results = _stream_purchases_or_sales(db, buyer_user_id, is_purchases=True)
+    return stream_csv_string(format_purchase_for_download(result) for result in results)
 
 
 def format_sale_for_download(
@@ -228,6 +251,7 @@ def format_sale_for_download(
     """Format a sale result into a CSV-friendly dictionary format."""
     # Convert datetime to ISO format string
     created_at = result.created_at.isoformat() if result.created_at else None
+    seller_amount, network_fee_amount = get_split_amounts(result.splits, seller_user_id)
 
     # Base fields without underscores
     base_fields = {
@@ -236,22 +260,16 @@ def format_sale_for_download(
         "purchased by": result.buyer_name,
         "date": created_at,
         "sale price": get_dollar_amount(result.amount),
-        "network fee": next(
-            (
-                0 - get_dollar_amount(item["amount"])
-                for item in result.splits
-                if item["payout_wallet"] == staking_bridge_usdc_payout_wallet
-            ),
-            None,
+        "network fee": (
+            0 - get_dollar_amount(network_fee_amount)
+            if network_fee_amount is not None
+            else None
         ),
         "pay extra": get_dollar_amount(result.extra_amount),
-        "total": next(
-            (
-                get_dollar_amount(str(int(item["amount"]) + int(result.extra_amount)))
-                for item in result.splits
-                if item["user_id"] == seller_user_id
-            ),
-            None,
+        "total": (
+            get_dollar_amount(str(int(seller_amount) + int(result.extra_amount)))
+            if seller_amount is not None
+            else None
         ),
         "country": result.country,
     }
@@ -281,18 +299,7 @@ def format_sale_for_download(
     return base_fields
 
 
-def download_sales(args: DownloadSalesArgs, return_json: bool = False):
-    """Returns USDC sales for a given artist in CSV or JSON format."""
-    seller_user_id = args["seller_user_id"]
-    grantee_user_id = args.get("grantee_user_id")
-
-    # Get sales for artist
-    results = get_purchases_or_sales(
-        seller_user_id, is_purchases=False, grantee_user_id=grantee_user_id
-    )
-
-    # Get artist handle
-    db = get_db_read_replica()
+def get_seller_handle(db: SessionManager, seller_user_id: int):
     with db.scoped_session() as session:
         seller = (
             session.query(User.handle)
@@ -300,33 +307,58 @@ def download_sales(args: DownloadSalesArgs, return_json: bool = False):
             .filter(User.is_current == True)
             .first()
         )
-        seller_handle = seller.handle if seller else None
+        return seller.handle if seller else None
 
-    # Build list of results
-    contents = []
-    for result in results:
-        sale_data = format_sale_for_download(
-            result, seller_handle, seller_user_id, is_for_json_response=return_json
-        )
-        contents.append(sale_data)
+
+def download_sales(args: DownloadSalesArgs, return_json: bool = False):
+    """
+    Returns USDC sales for a given artist in JSON format, or streams them in
+    CSV format.
+    """
+    seller_user_id = args["seller_user_id"]
+    grantee_user_id = args.get("grantee_user_id")
+    db = get_db_read_replica()
+
+    # Get artist handle
+    seller_handle = get_seller_handle(db, seller_user_id)
 
     # Return JSON if requested
     if return_json:
+        results = get_purchases_or_sales(
+            seller_user_id, is_purchases=False, grantee_user_id=grantee_user_id
+        )
+        contents = [
+            format_sale_for_download(
+                result, seller_handle, seller_user_id, is_for_json_response=True
+            )
+            for result in results
+        ]
         return {"sales": contents}
 
-    # Get results in CSV format
-    to_download = write_csv_string(contents)
-    return to_download
+    results = _stream_purchases_or_sales(
+        db, seller_user_id, is_purchases=False, grantee_user_id=grantee_user_id
+    )
+    return stream_csv_string(
+        format_sale_for_download(result, seller_handle, seller_user_id)
+        for result in results
+    )
 
 
-def download_withdrawals(args: DownloadWithdrawalsArgs):
-    db = get_db_read_replica()
+def format_withdrawal_for_download(result):
+    return {
+        "destination wallet": result.tx_metadata,
+        "date": result.transaction_created_at,
+        "amount": get_dollar_amount(result.change),
+    }
+
+
+def _stream_withdrawals(db: SessionManager, user_id: int):
     with db.scoped_session() as session:
         # Get USDC withdrawals for user
-        results = (
+        yield from (
             session.query(USDCTransactionsHistory)
             .select_from(User)
-            .filter(User.user_id == args["user_id"])
+            .filter(User.user_id == user_id)
             .filter(User.is_current == True)
             .join(
                 USDCUserBankAccount, USDCUserBankAccount.ethereum_address == User.wallet
@@ -340,21 +372,14 @@ def download_withdrawals(args: DownloadWithdrawalsArgs):
             )
             .filter(USDCTransactionsHistory.method == USDCTransactionMethod.send)
             .order_by(desc(USDCTransactionsHistory.transaction_created_at))
-            .all()
+            .yield_per(YIELD_PER)
         )
 
-        # Build list of dictionary results
-        contents = list(
-            map(
-                lambda result: {
-                    "destination wallet": result.tx_metadata,
-                    "date": result.transaction_created_at,
-                    "amount": get_dollar_amount(result.change),
-                },
-                results,
-            )
-        )
 
-        # Get results in CSV format
-        to_download = write_csv_string(contents)
-        return to_download
+# Streams USDC withdrawals for a given user in a CSV format
+def download_withdrawals(args: DownloadWithdrawalsArgs):
+    db = get_db_read_replica()
+    results = _stream_withdrawals(db, args["user_id"])
+    return stream_csv_string(
+        format_withdrawal_for_download(result) for result in results
+    )
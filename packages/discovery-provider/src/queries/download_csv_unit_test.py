@@ -0,0 +1,94 @@
+import resource
+from collections import namedtuple
+from datetime import datetime
+
+import src.queries.download_csv as download_csv
+from src.models.users.usdc_purchase import PurchaseType
+from src.queries.download_csv import download_sales
+
+SaleRow = namedtuple(
+    "SaleRow",
+    [
+        "content_type",
+        "created_at",
+        "amount",
+        "extra_amount",
+        "splits",
+        "country",
+        "buyer_name",
+        "content_title",
+        "slug",
+    ],
+)
+
+SELLER_USER_ID = 1
+
+
+def synthetic_sales(num_rows):
+    for i in range(num_rows):
+        yield SaleRow(
+            content_type=PurchaseType.track,
+            created_at=datetime(2024, 1, 1),
+            amount="1000000",
+            extra_amount="0",
+            splits=[
+                {
+                    "user_id": SELLER_USER_ID,
+                    "amount": "900000",
+                    "payout_wallet": "seller",
+                },
+                {
+                    "user_id": None,
+                    "amount": "100000",
+                    "payout_wallet": download_csv.staking_bridge_usdc_payout_wallet,
+                },
+            ],
+            country="US",
+            buyer_name=f"buyer {i}",
+            content_title=f"track {i}",
+            slug=f"track-{i}",
+        )
+
+
+def stream_sales(monkeypatch, num_rows):
+    monkeypatch.setattr(download_csv, "get_db_read_replica", lambda: None)
+    monkeypatch.setattr(download_csv, "get_seller_handle", lambda *_: "seller")
+    monkeypatch.setattr(
+        download_csv,
+        "_stream_purchases_or_sales",
+        lambda *args, **kwargs: synthetic_sales(num_rows),
+    )
+    return download_sales({"seller_user_id": SELLER_USER_ID, "grantee_user_id": None})
+
+
+def test_download_sales_csv(monkeypatch):
+    csv_string = "".join(stream_sales(monkeypatch, 2))
+
+    assert csv_string.splitlines() == [
+        "title,link,purchased by,date,sale price,network fee,pay extra,total,country",
+        "track 0,/seller/track-0,buyer 0,2024-01-01T00:00:00,1.0,-0.1,0.0,0.9,US",
+        "track 1,/seller/track-1,buyer 1,2024-01-01T00:00:00,1.0,-0.1,0.0,0.9,US",
+    ]
+
+
+def test_download_sales_csv_empty(monkeypatch):
+    assert "".join(stream_sales(monkeypatch, 0)) == ""
+
+
+def test_download_sales_csv_constant_memory(monkeypatch):
+    """Memory of a 1M row export stays at the size of one chunk"""
+    # ru_maxrss is the process high water mark in kilobytes
+    max_rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    num_lines = 0
+    largest_chunk = 0
+    for chunk in stream_sales(monkeypatch, 1_000_000):
+        num_lines += chunk.count("\n")
+        largest_chunk = max(largest_chunk, len(chunk))
+
+    max_rss_growth = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - max_rss_before
+
+    assert num_lines == 1_000_001
+    assert largest_chunk < 200_000
+    # the full export is ~75MB of CSV
+    assert max_rss_growth < 20_000
@@ -3,6 +3,7 @@ from flask import has_request_context
 from src.models.grants.grant import Grant
 from src.utils import db_session
 from src.utils.auth_middleware import recover_authority_from_signature_headers
+from src.utils.authority_cache import get_cached_grant_authority
 
 
 def is_authorized_request(user_id: int):
@@ -33,16 +34,22 @@ def is_authorized_request(user_id: int):
     # Check the grants to see if a wallet has authority on behalf of the user.
     # Both managers and dev apps have grant entries.
     # Developer apps are approved by default.
-    db = db_session.get_db_read_replica()
-    with db.scoped_session() as session:
-        result = (
-            session.query(Grant.is_approved)
-            .filter(
-                Grant.is_current == True,
-                Grant.grantee_address == authority_wallet,
-                Grant.user_id == user_id,
-                Grant.is_revoked == False,
+    if not authority_wallet:
+        return False
+
+    def check_grant():
+        db = db_session.get_db_read_replica()
+        with db.scoped_session() as session:
+            result = (
+                session.query(Grant.is_approved)
+                .filter(
+                    Grant.is_current == True,
+                    Grant.grantee_address == authority_wallet,
+                    Grant.user_id == user_id,
+                    Grant.is_revoked == False,
+                )
+                .first()
             )
-            .first()
-        )
-        return result
+            return result is not None
+
+    return get_cached_grant_authority(authority_wallet, user_id, check_grant)
@@ -1,5 +1,6 @@
 import logging
 
+from src.queries.get_feed_cursor import get_feed_cursor
 from src.queries.get_feed_es import get_feed_es
 from src.queries.query_helpers import get_pagination_vars
 
@@ -12,3 +13,9 @@ def get_feed(args):
         return get_feed_es(args, limit, offset)
     except Exception as e:
         logger.error(f"elasticsearch get_feed_es failed: {e}")
+
+
+def get_feed_page(args):
+    """Returns a page of the cursor paginated feed and the next cursor"""
+    (limit, _) = get_pagination_vars()
+    return get_feed_cursor(args, limit)
@@ -0,0 +1,306 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import text
+from sqlalchemy.orm.session import Session
+
+from src.models.social.follow import Follow
+from src.models.users.aggregate_user import AggregateUser
+from src.queries.get_feed_es import hydrate_feed_items, item_key
+from src.queries.query_helpers import filter_hidden_tracks
+from src.utils import redis_connection
+from src.utils.db_session import get_db_read_replica
+from src.utils.elasticdsl import ES_PLAYLISTS, ES_TRACKS, get_esclient
+from src.utils.feed_inbox import (
+    FEED_FANOUT_MAX_FOLLOWERS,
+    FEED_INBOX_MAX_ITEMS,
+    FEED_WINDOW_DAYS,
+    FeedEntry,
+    decode_feed_cursor,
+    encode_feed_cursor,
+    fill_feed_inbox,
+    from_feed_score,
+    get_feed_inbox_entries,
+    is_after_cursor,
+    to_feed_score,
+    touch_feed_inbox,
+)
+
+logger = logging.getLogger(__name__)
+
+# Original tracks and playlists of user_ids and the first repost of each item
+# reposted by user_ids, newest first. Reposts of items that are also posted
+# by user_ids are dropped in favor of the original.
+PULL_FEED_ENTRIES_QUERY = """
+    with originals as (
+        (
+            select
+                'track:' || track_id as item_key,
+                created_at as activity_at
+            from tracks
+            where
+                owner_id = any(:user_ids)
+                and is_current
+                and not is_delete
+                and not is_unlisted
+                and stem_of is null
+                and created_at >= :since
+                and created_at <= :before
+            order by created_at desc
+            limit :limit
+        )
+        union all
+        (
+            select
+                'playlist:' || playlist_id as item_key,
+                created_at as activity_at
+            from playlists
+            where
+                playlist_owner_id = any(:user_ids)
+                and is_current
+                and not is_delete
+                and not is_private
+                and created_at >= :since
+                and created_at <= :before
+            order by created_at desc
+            limit :limit
+        )
+    ),
+    reposted as (
+        select
+            case when repost_type = 'track' then 'track:' else 'playlist:' end
+                || repost_item_id as item_key,
+            min(created_at) as activity_at
+        from reposts
+        where
+            user_id = any(:user_ids)
+            and is_current
+            and not is_delete
+            and created_at >= :since
+        group by repost_type, repost_item_id
+        having min(created_at) <= :before
+        order by activity_at desc
+        limit :limit
+    )
+    select item_key, activity_at from originals
+    union all
+    select item_key, activity_at from reposted
+    where item_key not in (select item_key from originals)
+    """
+
+
+def get_followee_ids(session: Session, user_id: int) -> List[int]:
+    rows = (
+        session.query(Follow.followee_user_id)
+        .filter(
+            Follow.follower_user_id == user_id,
+            Follow.is_current == True,
+            Follow.is_delete == False,
+        )
+        .all()
+    )
+    return [row[0] for row in rows]
+
+
+def get_fanout_skipped_ids(session: Session, user_ids: List[int]) -> List[int]:
+    """Users whose activity is not fanned out on write because of their follower count"""
+    if not user_ids:
+        return []
+    rows = (
+        session.query(AggregateUser.user_id)
+        .filter(
+            AggregateUser.user_id.in_(user_ids),
+            AggregateUser.follower_count > FEED_FANOUT_MAX_FOLLOWERS,
+        )
+        .all()
+    )
+    return [row[0] for row in rows]
+
+
+def pull_feed_entries(
+    session: Session,
+    user_ids: Iterable[int],
+    cursor: Optional[FeedEntry],
+    limit: int,
+) -> List[FeedEntry]:
+    """Fan-out on read: feed entries for the activity of user_ids after cursor"""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return []
+    rows = session.execute(
+        text(PULL_FEED_ENTRIES_QUERY),
+        {
+            "user_ids": user_ids,
+            "since": datetime.utcnow() - timedelta(days=FEED_WINDOW_DAYS),
+            "before": (from_feed_score(cursor[0]) if cursor else datetime.utcnow()),
+            "limit": limit,
+        },
+    ).fetchall()
+    entries = [(to_feed_score(row.activity_at), row.item_key) for row in rows]
+    return sorted(
+        [entry for entry in entries if is_after_cursor(entry, cursor)], reverse=True
+    )[:limit]
+
+
+def _is_hidden(item: dict) -> bool:
+    return bool(
+        item.get("is_delete")
+        or item.get("is_private")
+        or item.get("is_unlisted")
+        or item.get("stem_of")
+    )
+
+
+def _get_feed_docs(esclient, entries: List[FeedEntry]) -> Dict[str, dict]:
+    """Fetches the tracks and playlists of entries along with playlist tracks"""
+    mget_items = []
+    for _, key in entries:
+        (kind, id) = key.split(":")
+        mget_items.append(
+            {"_index": ES_TRACKS if kind == "track" else ES_PLAYLISTS, "_id": id}
+        )
+    if not mget_items:
+        return {}
+
+    docs_by_key = {}
+    playlist_track_ids = set()
+    for doc in esclient.mget(docs=mget_items)["docs"]:
+        if not doc["found"]:
+            continue
+        s = doc["_source"]
+        s["item_key"] = item_key(s)
+        docs_by_key[s["item_key"]] = s
+        if "playlist_id" in s:
+            for track in s.get("playlist_contents", {}).get("track_ids", []):
+                playlist_track_ids.add(track["track"])
+
+    playlist_tracks_by_id = {}
+    if playlist_track_ids:
+        playlist_tracks = esclient.mget(index=ES_TRACKS, ids=list(playlist_track_ids))
+        playlist_tracks_by_id = {
+            d["_id"]: d["_source"] for d in playlist_tracks["docs"] if d["found"]
+        }
+
+    for doc in docs_by_key.values():
+        if "playlist_id" not in doc:
+            continue
+        doc["tracks"] = [
+            playlist_tracks_by_id[str(track["track"])]
+            for track in doc.get("playlist_contents", {}).get("track_ids", [])
+            if str(track["track"]) in playlist_tracks_by_id
+        ]
+    return docs_by_key
+
+
+def _select_feed_page(
+    current_user_id: int,
+    docs_by_key: Dict[str, dict],
+    entries: List[FeedEntry],
+    followee_ids: Set[int],
+    limit: int,
+    feed_filter: str,
+    tracks_only: bool,
+):
+    """
+    Walks entries in order and returns up to limit visible items along with
+    the last entry looked at, which is where the next page starts.
+    """
+    page = []
+    last_entry = None
+    for entry in entries:
+        if len(page) == limit:
+            break
+        last_entry = entry
+        item = docs_by_key.get(entry[1])
+        if not item or _is_hidden(item):
+            continue
+
+        is_playlist = "playlist_id" in item
+        owner_id = item.get("playlist_owner_id", item.get("owner_id"))
+        is_original = owner_id in followee_ids
+        if tracks_only and is_playlist:
+            continue
+        if feed_filter == "original" and not is_original:
+            continue
+        if feed_filter == "repost" and is_original:
+            continue
+        # skip reposts of gated tracks and collectible gated tracks, as the
+        # offset feed does
+        if not is_original and item.get("is_stream_gated"):
+            continue
+        if "nft_collection" in (item.get("stream_conditions") or {}):
+            continue
+        if is_playlist:
+            if is_original:
+                filter_hidden_tracks(item, item["tracks"], current_user_id)
+            tracks = item["tracks"]
+            if not item.get("playlist_contents", {}).get("track_ids", []):
+                continue
+            if not tracks or all(t.get("is_unlisted") for t in tracks):
+                continue
+
+        item["activity_timestamp"] = from_feed_score(entry[0]).isoformat()
+        page.append(item)
+    return page, last_entry
+
+
+def get_feed_cursor(args, limit=10):
+    """
+    Returns a page of the feed of args["user_id"] after args["cursor"] and
+    the cursor of the next page, or None once the feed is exhausted.
+    """
+    current_user_id = int(args["user_id"])
+    cursor = decode_feed_cursor(args.get("cursor"))
+    feed_filter = args.get("filter") or "all"
+    tracks_only = bool(args.get("tracks_only"))
+    explicit_ids = args.get("followee_user_ids") or []
+    # soft limit, some entries are dropped when hydrated
+    fetch_size = limit * 2
+
+    redis = redis_connection.get_redis()
+    db = get_db_read_replica()
+    with db.scoped_session() as session:
+        followee_ids = get_followee_ids(session, current_user_id)
+        pull_ids = set(get_fanout_skipped_ids(session, followee_ids))
+        pull_ids.update(explicit_ids)
+
+        if not touch_feed_inbox(redis, current_user_id):
+            push_ids = [id for id in followee_ids if id not in pull_ids]
+            fill_feed_inbox(
+                redis,
+                current_user_id,
+                pull_feed_entries(session, push_ids, None, FEED_INBOX_MAX_ITEMS),
+            )
+
+        entries = get_feed_inbox_entries(redis, current_user_id, cursor, fetch_size)
+        entries += pull_feed_entries(session, pull_ids, cursor, fetch_size)
+
+    # merge the inbox with pulled entries, keeping the newest of duplicates
+    seen = set()
+    merged = []
+    for entry in sorted(entries, reverse=True):
+        if entry[1] in seen:
+            continue
+        seen.add(entry[1])
+        merged.append(entry)
+    merged = merged[:fetch_size]
+
+    esclient = get_esclient()
+    docs_by_key = _get_feed_docs(esclient, merged)
+    page, last_entry = _select_feed_page(
+        current_user_id,
+        docs_by_key,
+        merged,
+        set(followee_ids) | set(explicit_ids),
+        limit,
+        feed_filter,
+        tracks_only,
+    )
+    page = hydrate_feed_items(esclient, page, str(current_user_id))
+
+    is_exhausted = len(merged) < fetch_size and last_entry == (
+        merged[-1] if merged else None
+    )
+    next_cursor = None if is_exhausted else encode_feed_cursor(last_entry)
+    return page, next_cursor
@@ -257,6 +257,17 @@ def get_feed_es(args, limit=10, offset=0):
 
         sorted_feed.append(item)
 
+    sorted_feed = hydrate_feed_items(esclient, sorted_feed, current_user_id)
+
+    return sorted_feed[offset:size]
+
+
+def hydrate_feed_items(esclient, sorted_feed, current_user_id):
+    """
+    Attaches users and followee activity to feed items that already have
+    their playlist tracks, drops collectible gated tracks and populates
+    gated content and track / playlist metadata.
+    """
     # attach users
     user_id_set = set([str(id) for id in get_users_ids(sorted_feed)])
     user_id_set.add(current_user_id)
@@ -317,7 +328,7 @@ def get_feed_es(args, limit=10, offset=0):
         for item in sorted_feed
     ]
 
-    return sorted_feed[offset:size]
+    return sorted_feed
 
 
 def following_ids_terms_lookup(current_user_id, field, explicit_ids=None):
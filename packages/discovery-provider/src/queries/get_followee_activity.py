@@ -0,0 +1,185 @@
+"""
+Reposts and saves of tracks and playlists by the users the current user follows.
+
+Feeds hydrate tracks and playlists for the same user several times in one
+request, so the user's followees are resolved once per request (memoized on
+flask.g) and shared by populate_track_metadata and populate_playlist_metadata.
+Only the columns the API returns are fetched, capped per item.
+"""
+
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from flask import g, has_request_context
+from sqlalchemy import text
+from sqlalchemy.orm.session import Session
+
+from src.models.social.follow import Follow
+from src.models.social.repost import RepostType
+from src.models.social.save import SaveType
+
+# Max followee reposts and saves returned per track or playlist
+FOLLOWEE_ACTIVITY_LIMIT = 100
+
+FOLLOWEE_REPOSTS_QUERY = text(
+    """
+    SELECT user_id, repost_item_id, repost_type, created_at
+    FROM (
+        SELECT
+            r.user_id,
+            r.repost_item_id,
+            r.repost_type,
+            r.created_at,
+            row_number() OVER (
+                PARTITION BY r.repost_item_id
+                ORDER BY r.created_at DESC, r.user_id ASC
+            ) AS item_rank
+        FROM reposts r
+        JOIN unnest(cast(:followee_ids AS integer[])) AS f(user_id)
+            ON f.user_id = r.user_id
+        WHERE r.is_current IS TRUE
+            AND r.is_delete IS FALSE
+            AND r.repost_item_id = ANY(:item_ids)
+            AND r.repost_type = ANY(cast(:repost_types AS reposttype[]))
+    ) followee_reposts
+    WHERE item_rank <= :limit
+    ORDER BY repost_item_id, item_rank
+    """
+)
+
+FOLLOWEE_SAVES_QUERY = text(
+    """
+    SELECT user_id, save_item_id, save_type, created_at
+    FROM (
+        SELECT
+            s.user_id,
+            s.save_item_id,
+            s.save_type,
+            s.created_at,
+            row_number() OVER (
+                PARTITION BY s.save_item_id
+                ORDER BY s.created_at DESC, s.user_id ASC
+            ) AS item_rank
+        FROM saves s
+        JOIN unnest(cast(:followee_ids AS integer[])) AS f(user_id)
+            ON f.user_id = s.user_id
+        WHERE s.is_current IS TRUE
+            AND s.is_delete IS FALSE
+            AND s.save_item_id = ANY(:item_ids)
+            AND s.save_type = ANY(cast(:save_types AS savetype[]))
+    ) followee_saves
+    WHERE item_rank <= :limit
+    ORDER BY save_item_id, item_rank
+    """
+)
+
+
+def _get_request_memo() -> Optional[dict]:
+    if not has_request_context():
+        return None
+    if "followee_ids" not in g:
+        g.followee_ids = {}
+    return g.followee_ids
+
+
+def get_followee_ids(session: Session, current_user_id: int) -> List[int]:
+    """Returns the ids of the users current_user_id follows"""
+    memo = _get_request_memo()
+    if memo is not None and current_user_id in memo:
+        return memo[current_user_id]
+
+    followee_ids = [
+        followee_user_id
+        for (followee_user_id,) in session.query(Follow.followee_user_id)
+        .filter(
+            Follow.follower_user_id == current_user_id,
+            Follow.is_current == True,
+            Follow.is_delete == False,
+        )
+        .all()
+    ]
+    if memo is not None:
+        memo[current_user_id] = followee_ids
+    return followee_ids
+
+
+def get_followee_reposts(
+    session: Session,
+    current_user_id: int,
+    item_ids: List[int],
+    repost_types: List[RepostType],
+    limit: int = FOLLOWEE_ACTIVITY_LIMIT,
+) -> Dict[int, List[dict]]:
+    """
+    Returns a dict of item id --> most recent reposts of the item by users
+    current_user_id follows
+    """
+    if not item_ids:
+        return {}
+    followee_ids = get_followee_ids(session, current_user_id)
+    if not followee_ids:
+        return {}
+
+    rows = session.execute(
+        FOLLOWEE_REPOSTS_QUERY,
+        {
+            "followee_ids": followee_ids,
+            "item_ids": list(item_ids),
+            "repost_types": [
+                RepostType(repost_type).value for repost_type in repost_types
+            ],
+            "limit": limit,
+        },
+    ).fetchall()
+
+    followee_reposts: Dict[int, List[dict]] = defaultdict(list)
+    for user_id, repost_item_id, repost_type, created_at in rows:
+        followee_reposts[repost_item_id].append(
+            {
+                "user_id": user_id,
+                "repost_item_id": repost_item_id,
+                "repost_type": RepostType(repost_type),
+                "created_at": created_at,
+            }
+        )
+    return followee_reposts
+
+
+def get_followee_saves(
+    session: Session,
+    current_user_id: int,
+    item_ids: List[int],
+    save_types: List[SaveType],
+    limit: int = FOLLOWEE_ACTIVITY_LIMIT,
+) -> Dict[int, List[dict]]:
+    """
+    Returns a dict of item id --> most recent saves of the item by users
+    current_user_id follows
+    """
+    if not item_ids:
+        return {}
+    followee_ids = get_followee_ids(session, current_user_id)
+    if not followee_ids:
+        return {}
+
+    rows = session.execute(
+        FOLLOWEE_SAVES_QUERY,
+        {
+            "followee_ids": followee_ids,
+            "item_ids": list(item_ids),
+            "save_types": [SaveType(save_type).value for save_type in save_types],
+            "limit": limit,
+        },
+    ).fetchall()
+
+    followee_saves: Dict[int, List[dict]] = defaultdict(list)
+    for user_id, save_item_id, save_type, created_at in rows:
+        followee_saves[save_item_id].append(
+            {
+                "user_id": user_id,
+                "save_item_id": save_item_id,
+                "save_type": SaveType(save_type),
+                "created_at": created_at,
+            }
+        )
+    return followee_saves
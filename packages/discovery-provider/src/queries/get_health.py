@@ -3,7 +3,7 @@ import logging
 import os
 import time
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional, Tuple, TypedDict, cast
+from typing import Any, Dict, Optional, Tuple, TypedDict, Union, cast
 
 import requests
 from elasticsearch import Elasticsearch
@@ -20,6 +20,7 @@ from src.queries.get_latest_play import get_latest_play
 from src.queries.get_oldest_unarchived_play import get_oldest_unarchived_play
 from src.queries.get_sol_plays import get_sol_play_health_info
 from src.queries.get_trusted_notifier_discrepancies import get_delist_statuses_ok
+from src.solana.solana_client_manager import merge_endpoint_stats
 from src.tasks.index_core import (
     CoreHealth,
     core_health_check_cache_key,
@@ -33,6 +34,7 @@ from src.utils import (  # elasticdsl,
 )
 from src.utils.config import shared_config
 from src.utils.elasticdsl import ES_INDEXES
+from src.utils.health_redis_snapshot import HealthRedisSnapshot
 from src.utils.prometheus_metric import PrometheusMetric, PrometheusMetricNames
 from src.utils.redis_constants import (
     SolanaIndexerStatus,
@@ -45,6 +47,7 @@ from src.utils.redis_constants import (
     most_recent_indexed_block_redis_key,
     oldest_unarchived_play_key,
     redis_keys,
+    solana_endpoint_stats_redis_key,
     trending_playlists_last_completion_redis_key,
     trending_tracks_last_completion_redis_key,
     user_balances_refresh_last_completion_redis_key,
@@ -69,6 +72,61 @@ min_number_of_cpus: int = 8  # 8 cpu
 min_total_memory: int = 15500000000  # 15.5 GB of RAM
 min_filesystem_size: int = 240000000000  # 240 GB of file system storage
 
+# seconds the db derived parts of the health check are reused for
+DB_HEALTH_MEMO_TTL_SEC = 5
+
+SYS_INFO_MONITORS = [
+    MONITORS[monitor_names.database_size],
+    MONITORS[monitor_names.database_connections],
+    MONITORS[monitor_names.total_memory],
+    MONITORS[monitor_names.used_memory],
+    MONITORS[monitor_names.filesystem_size],
+    MONITORS[monitor_names.filesystem_used],
+    MONITORS[monitor_names.received_bytes_per_sec],
+    MONITORS[monitor_names.transferred_bytes_per_sec],
+    MONITORS[monitor_names.redis_total_memory],
+]
+
+# Every redis key read by get_health, besides the monitors
+HEALTH_REDIS_KEYS = [
+    most_recent_indexed_block_redis_key,
+    most_recent_indexed_block_hash_redis_key,
+    core_health_check_cache_key,
+    core_listens_health_check_cache_key,
+    latest_block_redis_key,
+    latest_block_hash_redis_key,
+    *[key for indexer in redis_keys.solana for key in indexer],
+    trending_tracks_last_completion_redis_key,
+    trending_playlists_last_completion_redis_key,
+    challenges_last_processed_event_redis_key,
+    user_balances_refresh_last_completion_redis_key,
+    eth_indexing_last_scanned_block_key,
+    index_eth_last_completion_redis_key,
+    get_all_nodes.ALL_DISCOVERY_NODES_CACHE_KEY,
+    get_all_nodes.ALL_HEALTHY_CONTENT_NODES_CACHE_KEY,
+]
+HEALTH_REDIS_SET_KEYS = [LAZY_REFRESH_REDIS_PREFIX, IMMEDIATE_REFRESH_REDIS_PREFIX]
+HEALTH_REDIS_HASH_KEYS = [solana_endpoint_stats_redis_key]
+
+
+RedisReader = Union[Redis, HealthRedisSnapshot]
+
+_db_health_memo: Dict[str, Tuple[float, Any]] = {}
+
+
+def _memoize_db_health(name: str, fn):
+    """
+    Returns fn(), reusing its result for DB_HEALTH_MEMO_TTL_SEC in this process
+    so that frequent health checks don't each query the db
+    """
+    now = time.monotonic()
+    memo = _db_health_memo.get(name)
+    if memo is not None and now - memo[0] < DB_HEALTH_MEMO_TTL_SEC:
+        return memo[1]
+    value = fn()
+    _db_health_memo[name] = (now, value)
+    return value
+
 
 def get_elapsed_time_redis(redis, redis_key):
     last_seen = redis.get(redis_key)
@@ -164,7 +222,12 @@ def get_health(args: GetHealthArgs, use_redis_cache: bool = True) -> Tuple[Dict,
 
     Returns a tuple of health results and a boolean indicating an error
     """
-    redis = redis_connection.get_redis()
+    redis = HealthRedisSnapshot(
+        redis_connection.get_redis(),
+        HEALTH_REDIS_KEYS,
+        HEALTH_REDIS_SET_KEYS,
+        HEALTH_REDIS_HASH_KEYS,
+    )
 
     bypass_errors = args.get("bypass_errors")
     verbose = args.get("verbose")
@@ -222,7 +285,11 @@ def get_health(args: GetHealthArgs, use_redis_cache: bool = True) -> Tuple[Dict,
         or latest_indexed_block_num is None
         or latest_indexed_block_hash is None
     ):
-        db_block_state = _get_db_block_state()
+        db_block_state = (
+            _memoize_db_health("db_block_state", _get_db_block_state)
+            if use_redis_cache
+            else _get_db_block_state()
+        )
         latest_indexed_block_num = db_block_state["number"] or 0
         latest_indexed_block_hash = db_block_state["blockhash"]
 
@@ -300,19 +367,7 @@ def get_health(args: GetHealthArgs, use_redis_cache: bool = True) -> Tuple[Dict,
     )
 
     # Get system information monitor values
-    sys_info = monitors.get_monitors(
-        [
-            MONITORS[monitor_names.database_size],
-            MONITORS[monitor_names.database_connections],
-            MONITORS[monitor_names.total_memory],
-            MONITORS[monitor_names.used_memory],
-            MONITORS[monitor_names.filesystem_size],
-            MONITORS[monitor_names.filesystem_used],
-            MONITORS[monitor_names.received_bytes_per_sec],
-            MONITORS[monitor_names.transferred_bytes_per_sec],
-            MONITORS[monitor_names.redis_total_memory],
-        ]
-    )
+    sys_info = monitors.get_monitors(SYS_INFO_MONITORS)
 
     url = shared_config["discprov"]["url"]
 
@@ -357,6 +412,7 @@ def get_health(args: GetHealthArgs, use_redis_cache: bool = True) -> Tuple[Dict,
             "user_bank": user_bank_health_info,
             "aggregate_tips": aggregate_tips_health_info,
         },
+        "solana_endpoints": get_solana_endpoint_stats(redis),
         "infra_setup": infra_setup,
         "url": url,
         # Temp
@@ -477,7 +533,9 @@ def get_health(args: GetHealthArgs, use_redis_cache: bool = True) -> Tuple[Dict,
     if not aggregate_tips_health_info["is_healthy"]:
         errors.append("unhealthy aggregate_tips indexer")
 
-    delist_statuses_ok = get_delist_statuses_ok()
+    delist_statuses_ok = _memoize_db_health(
+        "delist_statuses_ok", get_delist_statuses_ok
+    )
     if not delist_statuses_ok:
         errors.append("unhealthy delist statuses")
 
@@ -566,7 +624,7 @@ class SolanaIndexerHealth(TypedDict):
 
 
 def get_solana_indexer_status(
-    redis: Redis, keys: SolanaIndexerStatus, max_drift: Optional[int]
+    redis: RedisReader, keys: SolanaIndexerStatus, max_drift: Optional[int]
 ) -> SolanaIndexerHealth:
     last_completed_at = redis.get(keys.last_completed_at)
     last_completed_at = (
@@ -666,7 +724,7 @@ def get_play_health_info(
     }
 
 
-def get_core_listens_health(redis: Redis, plays_count_max_drift: Optional[int]):
+def get_core_listens_health(redis: RedisReader, plays_count_max_drift: Optional[int]):
     try:
         core_health = redis.get(core_listens_health_check_cache_key)
         if core_health:
@@ -684,7 +742,7 @@ def get_core_listens_health(redis: Redis, plays_count_max_drift: Optional[int]):
         return None
 
 
-def get_core_health(redis: Redis):
+def get_core_health(redis: RedisReader):
     try:
         core_health = redis.get(core_health_check_cache_key)
         if core_health:
@@ -695,6 +753,17 @@ def get_core_health(redis: Redis):
         return None
 
 
+def get_solana_endpoint_stats(redis: RedisReader):
+    try:
+        endpoint_stats = redis.hgetall(solana_endpoint_stats_redis_key)
+        if endpoint_stats:
+            return merge_endpoint_stats(endpoint_stats.values())
+        return None
+    except Exception as e:
+        logger.error(f"get_health.py | could not get solana endpoint stats {e}")
+        return None
+
+
 def get_latest_chain_block_set_if_nx(redis=None):
     """
     Retrieves the latest block number and blockhash from redis if the keys exist.
@@ -2,9 +2,13 @@ import json
 import os
 from datetime import datetime, timezone
 from time import time
+from unittest import mock
+
+import pytest
 
 from src.models.indexing.block import Block
 from src.models.indexing.indexing_checkpoints import IndexingCheckpoint
+from src.queries import get_health as get_health_module
 from src.queries.get_health import get_health
 from src.utils.core import (
     CoreHealth,
@@ -32,6 +36,12 @@ from src.utils.redis_constants import (
 )
 
 
+@pytest.fixture(autouse=True)
+def clear_db_health_memo():
+    """Each test sets up its own db state"""
+    get_health_module._db_health_memo.clear()
+
+
 def cache_core_health_vars(redis_mock, health: CoreHealth):
     redis_mock.set(core_health_check_cache_key, json.dumps(health))
 
@@ -541,6 +551,62 @@ def test_get_health_challenge_events_max_drift(redis_mock, db_mock, mock_request
     assert health_results["challenge_last_event_age_sec"] < int(time() - 49)
 
 
+def test_get_health_reads_redis_once(redis_mock, db_mock, mock_requests):
+    """Tests that the health check reads redis in one pipeline and reuses db state"""
+
+    cache_play_health_vars(redis_mock)
+    cache_trusted_notifier_discrepancies_vars(redis_mock)
+    redis_mock.set(latest_block_redis_key, "2")
+
+    cache_core_health_vars(
+        redis_mock=redis_mock,
+        health={
+            "chain_id": "audius-devnet",
+            "indexing_entity_manager": True,
+            "indexing_plays": True,
+            "latest_chain_block": 2,
+            "latest_indexed_block": 1,
+        },
+    )
+    cache_core_listens_health_vars(redis_mock, 2)
+
+    # Set up db state
+    with db_mock.scoped_session() as session:
+        Block.__table__.create(db_mock._engine)
+        session.add(
+            Block(
+                blockhash="0x01",
+                number=1,
+                parenthash="0x01",
+                is_current=True,
+            )
+        )
+
+    health_results, _ = get_health({})
+
+    with mock.patch.object(
+        redis_mock, "get", wraps=redis_mock.get
+    ) as redis_get, mock.patch.object(
+        redis_mock, "pipeline", wraps=redis_mock.pipeline
+    ) as redis_pipeline, mock.patch(
+        "src.queries.get_health._get_db_block_state"
+    ) as get_db_block_state, mock.patch(
+        "src.queries.get_health.get_delist_statuses_ok"
+    ) as get_delist_statuses_ok:
+        memoized_health_results, _ = get_health({})
+
+    assert redis_pipeline.call_count == 1
+    assert redis_get.call_count == 0
+    get_db_block_state.assert_not_called()
+    get_delist_statuses_ok.assert_not_called()
+
+    assert memoized_health_results.keys() == health_results.keys()
+    assert memoized_health_results["web"] == health_results["web"]
+    assert memoized_health_results["db"] == health_results["db"]
+    assert memoized_health_results["db"]["blockhash"] == "0x01"
+    assert memoized_health_results["errors"] == health_results["errors"]
+
+
 # re-enable when elastic search added back
 # def test_get_elasticsearch_health(
 #     web3_mock, redis_mock, db_mock, esclient_mock, mock_requests
@@ -2,12 +2,14 @@ import logging
 from collections import defaultdict
 from datetime import datetime
 from enum import Enum
-from typing import Dict, List, Optional, TypedDict, Union
+from typing import Dict, List, Optional, Set, Tuple, TypedDict, Union
 
 from sqlalchemy import bindparam, text
 from sqlalchemy.orm.session import Session
 
+from src.models.notifications.notification import NotificationUnreadCount
 from src.models.tracks.track import Track
+from src.utils import redis_connection
 
 logger = logging.getLogger(__name__)
 
@@ -82,9 +84,10 @@ notification_groups_sql = notification_groups_sql.bindparams(
     bindparam("valid_types", expanding=True)
 )
 
-unread_notification_count_sql = text(
+# Unread notification groups of a user by type, with the last time the user
+# viewed their notifications
+unread_notification_counts_by_type_sql = text(
     """
---- Create Intervals of user seen
 WITH user_created_at as (
   SELECT
     created_at
@@ -93,35 +96,59 @@ WITH user_created_at as (
   WHERE
     user_id = :user_id
   AND is_current
+), user_seen_at as (
+  SELECT
+    COALESCE(max(seen_at), '2016-01-01'::timestamp) as seen_at
+  FROM
+    notification_seen
+  WHERE
+    user_id = :user_id
 )
 SELECT
-    count(*)
-FROM (
-   select n.type, n.group_id
-   from
-       notification n
-  WHERE
-    ((ARRAY[:user_id] && n.user_ids) OR (n.type = 'announcement' AND n.timestamp > (SELECT created_at FROM user_created_at))) AND
-    (:valid_types is NOT NULL AND n.type in :valid_types) AND
-    n.timestamp > COALESCE((
-        SELECT
-            seen_at
-        FROM
-            notification_seen
-        WHERE
-            user_id = :user_id
-        ORDER BY seen_at desc
-        LIMIT 1
-    ), '2016-01-01'::timestamp)
-  GROUP BY
-    n.type, n.group_id
-) user_notifications;
+    user_seen_at.seen_at,
+    unread_groups.type,
+    unread_groups.count
+FROM user_seen_at
+LEFT JOIN (
+  SELECT
+      user_notifications.type,
+      count(*) as count
+  FROM (
+     select n.type, n.group_id
+     from
+         notification n
+    WHERE
+      ((ARRAY[:user_id] && n.user_ids) OR (n.type = 'announcement' AND n.timestamp > (SELECT created_at FROM user_created_at))) AND
+      n.timestamp > (SELECT seen_at FROM user_seen_at)
+    GROUP BY
+      n.type, n.group_id
+  ) user_notifications
+  GROUP BY user_notifications.type
+) unread_groups ON true;
 """
 )
-unread_notification_count_sql = unread_notification_count_sql.bindparams(
-    bindparam("valid_types", expanding=True)
+
+# Unread announcement groups of a user, which notification_unread_counts does
+# not keep since announcements go to every user
+unread_announcement_count_sql = text(
+    """
+SELECT
+  count(DISTINCT n.group_id)
+FROM
+  notification n
+WHERE
+  n.type = 'announcement'
+  AND n.timestamp > :seen_at
+  AND n.timestamp > (
+    SELECT created_at FROM users WHERE user_id = :user_id AND is_current
+  );
+"""
 )
 
+# users whose unread counts are read before they are maintained, picked up
+# by reconcile_notification_unread_counts
+NOTIFICATION_UNREAD_COUNTS_PENDING_KEY = "notification_unread_counts:pending"
+
 
 MAX_LIMIT = 50
 DEFAULT_LIMIT = 20
@@ -637,25 +664,32 @@ def get_notifications(session: Session, args: GetNotificationArgs):
 
     # TODO(PAY-1880): Remove this check after launch
     if NotificationType.USDC_PURCHASE_BUYER not in args["valid_types"]:  # type: ignore
-        # Filter out usdc create tracks
-        filtered: List[NotificationGroup] = []
-        for notification in notifications_and_actions:
-            is_track = "track_id" in notification["actions"][0]["data"]
-            if notification["type"] == NotificationType.CREATE and is_track:
-                res = (
-                    session.query(Track).filter(
-                        Track.track_id == notification["actions"][0]["data"]["track_id"]
-                    )
-                ).one_or_none()
-                if (
-                    res
-                    and res.stream_conditions
-                    and "usdc_purchase" in res.stream_conditions
-                ):
-                    # Filter out the notification
-                    continue
-            filtered.append(notification)
-        return filtered
+        # Filter out usdc create tracks, looked up in one query per page
+        create_track_ids = {
+            notification["actions"][0]["data"]["track_id"]
+            for notification in notifications_and_actions
+            if notification["type"] == NotificationType.CREATE
+            and "track_id" in notification["actions"][0]["data"]
+        }
+        usdc_track_ids: Set[int] = set()
+        if create_track_ids:
+            usdc_track_ids = {
+                track_id
+                for track_id, stream_conditions in session.query(
+                    Track.track_id, Track.stream_conditions
+                )
+                .filter(Track.track_id.in_(create_track_ids), Track.is_current == True)
+                .all()
+                if stream_conditions and "usdc_purchase" in stream_conditions
+            }
+        return [
+            notification
+            for notification in notifications_and_actions
+            if not (
+                notification["type"] == NotificationType.CREATE
+                and notification["actions"][0]["data"].get("track_id") in usdc_track_ids
+            )
+        ]
 
     return notifications_and_actions
 
@@ -665,13 +699,46 @@ class GetUnreadNotificationCount(TypedDict):
     valid_types: Optional[List[NotificationType]]
 
 
+def get_unread_notification_counts_by_type(
+    session: Session, user_id: int
+) -> Tuple[datetime, Dict[str, int]]:
+    """Counts the unread notification groups of user_id from the notification table"""
+    rows = session.execute(
+        unread_notification_counts_by_type_sql, {"user_id": user_id}
+    ).fetchall()
+    seen_at = rows[0][0]
+    return seen_at, {row[1]: row[2] for row in rows if row[1] is not None}
+
+
 def get_unread_notification_count(session: Session, args: GetUnreadNotificationCount):
+    """
+    Returns the number of unread notification groups of the valid types.
+    Read from notification_unread_counts plus unread announcements, or counted
+    from the notification table for users that do not have counts yet.
+    """
     args["valid_types"] = args.get("valid_types", []) + default_valid_notification_types  # type: ignore
-    resultproxy = session.execute(
-        unread_notification_count_sql,
-        {"user_id": args["user_id"], "valid_types": args.get("valid_types", None)},
+    valid_types = {str(type) for type in args["valid_types"]}  # type: ignore
+    user_id = args["user_id"]
+
+    unread_counts = (
+        session.query(NotificationUnreadCount.seen_at, NotificationUnreadCount.counts)
+        .filter(NotificationUnreadCount.user_id == user_id)
+        .first()
     )
-    unread_count = 0
-    for rowproxy in resultproxy:
-        unread_count = rowproxy[0]
-    return unread_count
+    if unread_counts is None:
+        _, counts = get_unread_notification_counts_by_type(session, user_id)
+        redis_connection.get_redis().sadd(
+            NOTIFICATION_UNREAD_COUNTS_PENDING_KEY, user_id
+        )
+    else:
+        seen_at, counts = unread_counts
+        if str(NotificationType.ANNOUNCEMENT) in valid_types:
+            counts = {
+                **counts,
+                str(NotificationType.ANNOUNCEMENT): session.execute(
+                    unread_announcement_count_sql,
+                    {"user_id": user_id, "seen_at": seen_at},
+                ).scalar(),
+            }
+
+    return sum(count for type, count in counts.items() if type in valid_types)
@@ -21,6 +21,10 @@ def get_playlist_tracks(session, args):
         "current_user_id": int
         "populate_tracks": boolean # whether to add users & metadata to tracks
         "exclude_gated": boolean # whether to filter out gated tracks
+
+        # optionally window each playlist's track_ids before fetching tracks
+        "offset": int
+        "limit": int
     }
 
     Returns: {
@@ -40,11 +44,34 @@ def get_playlist_tracks(session, args):
         if not playlists:
             return {}
 
+        # Only the window of each playlist is fetched and hydrated, so large
+        # playlists cost as much as the page the client renders
+        offset = max(args.get("offset") or 0, 0)
+        limit = args.get("limit")
+        if offset or limit is not None:
+            # windowed over the tracks that are returned, so that pages line
+            # up with get_playlist_track_counts
+            end = offset + limit if limit is not None else None
+            # { playlist_id => [track_id_dict]}
+            playlist_track_ids_map = {
+                playlist_id: track_id_dicts[offset:end]
+                for playlist_id, track_id_dicts in _get_visible_playlist_track_ids(
+                    session,
+                    playlists,
+                    args.get("current_user_id"),
+                    args.get("exclude_gated", False),
+                ).items()
+            }
+        else:
+            playlist_track_ids_map = {
+                playlist["playlist_id"]: playlist["playlist_contents"]["track_ids"]
+                for playlist in playlists
+            }
+
         # track_id -> [playlist_id]
         track_ids_set = set()
-        for playlist in playlists:
-            playlist_id = playlist["playlist_id"]
-            for track_id_dict in playlist["playlist_contents"]["track_ids"]:
+        for track_id_dicts in playlist_track_ids_map.values():
+            for track_id_dict in track_id_dicts:
                 track_id = track_id_dict["track"]
                 track_ids_set.add(track_id)
 
@@ -87,7 +114,7 @@ def get_playlist_tracks(session, args):
             playlist_is_public = not playlist["is_private"]
             playlists_map[playlist_id] = []
             is_owner = args.get("current_user_id") == playlist["playlist_owner_id"]
-            for track_id_dict in playlist["playlist_contents"]["track_ids"]:
+            for track_id_dict in playlist_track_ids_map[playlist_id]:
                 track_id = track_id_dict["track"]
                 track = track_ids_map[track_id]
                 track_is_public = not track["is_unlisted"]
@@ -102,3 +129,61 @@ def get_playlist_tracks(session, args):
 
     except sqlalchemy.orm.exc.NoResultFound:
         return {}
+
+
+def _get_visible_playlist_track_ids(session, playlists, current_user_id, exclude_gated):
+    """
+    Returns { playlist_id: [track_id_dict] } with the tracks get_playlist_tracks
+    returns for each playlist. Only track_id and is_unlisted are read, so
+    tracks are not loaded to window or count them.
+    """
+    track_ids = {
+        track_id_dict["track"]
+        for playlist in playlists
+        for track_id_dict in playlist["playlist_contents"]["track_ids"]
+    }
+    query = session.query(Track.track_id, Track.is_unlisted).filter(
+        Track.is_current == True, Track.track_id.in_(list(track_ids))
+    )
+    if exclude_gated:
+        query = query.filter(Track.is_stream_gated == False)
+    # { track_id => is_unlisted }
+    track_is_unlisted = dict(query.all())
+
+    visible_track_ids = {}
+    for playlist in playlists:
+        # unlisted tracks are only shown to the owner or in private playlists
+        show_unlisted = (
+            current_user_id == playlist["playlist_owner_id"] or playlist["is_private"]
+        )
+        visible_track_ids[playlist["playlist_id"]] = [
+            track_id_dict
+            for track_id_dict in playlist["playlist_contents"]["track_ids"]
+            if track_id_dict["track"] in track_is_unlisted
+            and (show_unlisted or not track_is_unlisted[track_id_dict["track"]])
+        ]
+    return visible_track_ids
+
+
+def get_playlist_track_counts(
+    session, playlist_ids, current_user_id=None, exclude_gated=False
+):
+    """
+    Returns { playlist_id: number of tracks get_playlist_tracks returns for
+    the playlist }, which leaves out removed, gated and hidden unlisted tracks
+    """
+    playlists = [
+        playlist._asdict()
+        for playlist in session.query(
+            Playlist.playlist_id,
+            Playlist.playlist_owner_id,
+            Playlist.is_private,
+            Playlist.playlist_contents,
+        ).filter(Playlist.is_current == True, Playlist.playlist_id.in_(playlist_ids))
+    ]
+    return {
+        playlist_id: len(track_id_dicts)
+        for playlist_id, track_id_dicts in _get_visible_playlist_track_ids(
+            session, playlists, current_user_id, exclude_gated
+        ).items()
+    }
@@ -1,4 +1,8 @@
-from sqlalchemy import func
+import random
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.orm.session import Session
 
 from src.models.tracks.track import Track
 from src.models.users.aggregate_user import AggregateUser
@@ -10,31 +14,104 @@ from src.queries.query_helpers import (
 from src.utils import helpers
 from src.utils.db_session import get_db_read_replica
 
+# Extra tracks drawn per round to make up for tracks deleted, unlisted or
+# whose owner lost followers since random_track_pool was last refreshed
+SAMPLE_OVERDRAW = 10
+MAX_SAMPLE_ROUNDS = 3
 
-def get_random_tracks(args):
-    limit = args.get("limit", 25)
+# random_track_pool orders tracks by descending owner follower count, so the
+# tracks whose owners have at least min_followers are ordinals 1..k
+ELIGIBLE_COUNT_QUERY = text(
+    """
+    SELECT ordinal
+    FROM random_track_pool
+    WHERE follower_count >= :min_followers
+    ORDER BY follower_count ASC, ordinal DESC
+    LIMIT 1
+    """
+)
 
-    current_user_id = args.get("user_id")
-    db = get_db_read_replica()
-    with db.scoped_session() as session:
-        # Query for random tracks
-        tracks_query = (
-            session.query(
-                Track,
+TRACK_IDS_BY_ORDINAL_QUERY = text(
+    """
+    SELECT ordinal, track_id
+    FROM random_track_pool
+    WHERE ordinal = ANY(:ordinals)
+    """
+)
+
+
+def _sample_tracks(session: Session, limit: int, min_followers: int) -> List[Track]:
+    """
+    Returns up to limit tracks drawn uniformly at random from the listed
+    tracks whose owners have at least min_followers, by drawing random
+    ordinals from random_track_pool instead of sorting every eligible track.
+    """
+    eligible_count = (
+        session.execute(ELIGIBLE_COUNT_QUERY, {"min_followers": min_followers}).scalar()
+        or 0
+    )
+
+    drawn_ordinals: set = set()
+    tracks: List[Track] = []
+    for _ in range(MAX_SAMPLE_ROUNDS):
+        remaining = eligible_count - len(drawn_ordinals)
+        if len(tracks) >= limit or remaining <= 0:
+            break
+
+        num_ordinals = min(limit - len(tracks) + SAMPLE_OVERDRAW, remaining)
+        ordinals = [
+            ordinal
+            for ordinal in random.sample(
+                range(1, eligible_count + 1),
+                min(num_ordinals + len(drawn_ordinals), eligible_count),
             )
+            if ordinal not in drawn_ordinals
+        ][:num_ordinals]
+        drawn_ordinals.update(ordinals)
+
+        track_id_by_ordinal = dict(
+            session.execute(
+                TRACK_IDS_BY_ORDINAL_QUERY, {"ordinals": ordinals}
+            ).fetchall()
+        )
+        track_ids = [
+            track_id_by_ordinal[ordinal]
+            for ordinal in ordinals
+            if ordinal in track_id_by_ordinal
+        ]
+
+        # the pool may be stale, so check eligibility again
+        tracks_by_id = {
+            track.track_id: track
+            for track in session.query(Track)
             .join(AggregateUser, Track.owner_id == AggregateUser.user_id)
             .filter(
+                Track.track_id.in_(track_ids),
                 Track.is_current == True,
                 Track.is_delete == False,
                 Track.is_unlisted == False,
                 Track.stem_of == None,
-                AggregateUser.follower_count >= args.get("min_followers", 100),
+                AggregateUser.follower_count >= min_followers,
             )
-            .order_by(func.random())
-            .limit(limit)
+            .all()
+        }
+        tracks.extend(
+            tracks_by_id[track_id] for track_id in track_ids if track_id in tracks_by_id
         )
 
-        tracks_query_results = tracks_query.all()
+    return tracks[:limit]
+
+
+def get_random_tracks(args):
+    limit = args.get("limit", 25)
+
+    current_user_id = args.get("user_id")
+    db = get_db_read_replica()
+    with db.scoped_session() as session:
+        # Query for random tracks
+        tracks_query_results = _sample_tracks(
+            session, limit, args.get("min_followers", 100)
+        )
         tracks = helpers.query_result_to_list(tracks_query_results)
         track_ids = list(map(lambda track: track["track_id"], tracks))
 
@@ -1,6 +1,9 @@
+from typing import List, Optional
+
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
+from src.models.users.related_artist import RelatedArtistsState
 from src.models.users.user import User
 from src.queries.query_helpers import helpers, populate_user_metadata
 from src.utils.db_session import get_db_read_replica
@@ -24,7 +27,7 @@ _genre_based_sql = text(
       and owner_id = :user_id
     group by
       genre
-    order by count(*) desc limit 5
+    order by count(*) desc, genre limit 5
   )
 
   -- find similar aritst based on similar top genre + follower count
@@ -48,13 +51,115 @@ _genre_based_sql = text(
       and f.followee_user_id = au.user_id
     )
   )
-  order by genre_rank asc, follower_count desc
+  order by genre_rank asc, follower_count desc, user_id asc
 
   limit :limit
   offset :offset
 """
 )
 
+# max number of related artists precomputed per artist, see refresh_related_artists
+MAX_RELATED_ARTISTS = 500
+
+_precomputed_sql = text(
+    """
+  select related_artist_user_id
+  from related_artists
+  where user_id = :user_id
+  and rank > :offset
+  order by rank asc
+  limit :limit
+"""
+)
+
+_precomputed_filter_followed_sql = text(
+    """
+  select related_artist_user_id
+  from related_artists ra
+  where ra.user_id = :user_id
+  and not exists (
+    select 1 from follows f
+    where f.is_current = true
+    and f.is_delete = false
+    and f.follower_user_id = :current_user_id
+    and f.followee_user_id = ra.related_artist_user_id
+  )
+  order by ra.rank asc
+  limit :limit
+  offset :offset
+"""
+)
+
+_precomputed_is_full_sql = text(
+    """
+  select exists (
+    select 1 from related_artists
+    where user_id = :user_id and rank = :max_related_artists
+  )
+"""
+)
+
+
+def _get_users_in_order(session: Session, user_ids: List[int]):
+    # Get all users in a single query
+    users_query = session.query(User).filter(User.user_id.in_(user_ids))
+    users = users_query.all()
+
+    # Convert to list and create a map of user_id -> user
+    users_list = helpers.query_result_to_list(users)
+    users_map = {user["user_id"]: user for user in users_list}
+
+    # Preserve order from original query by mapping user_ids back to users
+    return [users_map[user_id] for user_id in user_ids if user_id in users_map]
+
+
+def _precomputed_related_artist_ids(
+    session: Session,
+    user_id: int,
+    current_user_id: Optional[int],
+    limit=100,
+    offset=0,
+    filter_followed=False,
+) -> Optional[List[int]]:
+    """
+    Pages the related artists precomputed for user_id.
+    Returns None if they can't answer the request, i.e. the artist has not been
+    refreshed yet or the page may reach past the MAX_RELATED_ARTISTS stored.
+    """
+    if offset + limit > MAX_RELATED_ARTISTS:
+        return None
+    refreshed_at = (
+        session.query(RelatedArtistsState.refreshed_at)
+        .filter(RelatedArtistsState.user_id == user_id)
+        .scalar()
+    )
+    if refreshed_at is None:
+        return None
+
+    params = {
+        "user_id": user_id,
+        "current_user_id": current_user_id,
+        "limit": limit,
+        "offset": offset,
+    }
+    if not filter_followed or current_user_id is None:
+        return [row[0] for row in session.execute(_precomputed_sql, params).fetchall()]
+
+    related_artist_ids = [
+        row[0]
+        for row in session.execute(_precomputed_filter_followed_sql, params).fetchall()
+    ]
+    # Followed artists may have pushed the page past the stored related artists
+    if (
+        len(related_artist_ids) < limit
+        and session.execute(
+            _precomputed_is_full_sql,
+            {"user_id": user_id, "max_related_artists": MAX_RELATED_ARTISTS},
+        ).scalar()
+    ):
+        return None
+    return related_artist_ids
+
 
 def _genre_based_related_artists(
     session: Session,
@@ -75,18 +180,25 @@ def _genre_based_related_artists(
         },
     ).fetchall()
     user_ids = [r["user_id"] for r in result]
+    return _get_users_in_order(session, user_ids)
 
-    # Get all users in a single query
-    users_query = session.query(User).filter(User.user_id.in_(user_ids))
-    users = users_query.all()
-
-    # Convert to list and create a map of user_id -> user
-    users_list = helpers.query_result_to_list(users)
-    users_map = {user["user_id"]: user for user in users_list}
 
-    # Preserve order from original query by mapping user_ids back to users
-    ordered_users = [users_map[user_id] for user_id in user_ids]
-    return ordered_users
+def _related_artists(
+    session: Session,
+    user_id: int,
+    current_user_id: int,
+    limit=100,
+    offset=0,
+    filter_followed=False,
+):
+    user_ids = _precomputed_related_artist_ids(
+        session, user_id, current_user_id, limit, offset, filter_followed
+    )
+    if user_ids is None:
+        return _genre_based_related_artists(
+            session, user_id, current_user_id, limit, offset, filter_followed
+        )
+    return _get_users_in_order(session, user_ids)
 
 
 @time_method
@@ -100,7 +212,7 @@ def get_related_artists(
     db = get_db_read_replica()
     users = []
     with db.scoped_session() as session:
-        users = _genre_based_related_artists(
+        users = _related_artists(
             session, user_id, current_user_id, limit, offset, filter_followed
         )
         user_ids = list(map(lambda user: user["user_id"], users))
@@ -1,7 +1,7 @@
 import logging
 import os
 import urllib.parse
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 from lxml import etree
 from sqlalchemy import asc
@@ -166,6 +166,10 @@ def get_max_playlist_count(session: Session) -> int:
 
 def get_dynamic_root(max: int, base_route: str, limit: int = LIMIT):
     num_pages = (max // limit) + 1 if max % limit != 0 else int(max / limit)
+    return get_sitemap_index(num_pages, base_route)
+
+
+def get_sitemap_index(num_pages: int, base_route: str):
     root = etree.Element(
         "sitemapindex", xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
     )
@@ -190,10 +194,10 @@ def get_entity_page(slugs: List[str]):
     return etree.tostring(root, pretty_print=True)
 
 
-def get_track_slugs(session: Session, limit: int, offset: int):
-    slugs: List[str] = (
-        # Handle, not handle_lc is the cannonical URL
-        session.query(User.handle, TrackRoute.slug)
+def _track_slugs_query(session: Session):
+    # Handle, not handle_lc is the cannonical URL
+    return (
+        session.query(Track.track_id, User.handle, TrackRoute.slug)
         .join(Track, TrackRoute.track_id == Track.track_id)
         .join(User, TrackRoute.owner_id == User.user_id)
         .join(AggregateUser, User.user_id == AggregateUser.user_id)
@@ -207,18 +211,15 @@ def get_track_slugs(session: Session, limit: int, offset: int):
             TrackRoute.is_current == True,
         )
         .order_by(asc(Track.track_id))
-        .limit(limit)
-        .offset(offset)
-        .all()
     )
 
-    return [f"{slug[0]}/{slug[1]}" for slug in slugs]
 
-
-def get_playlist_slugs(session: Session, limit: int, offset: int):
-    slugs: List[Tuple[str, str, bool]] = (
-        # Handle, not handle_lc is the cannonical URL
-        session.query(User.handle, PlaylistRoute.slug, Playlist.is_album)
+def _playlist_slugs_query(session: Session):
+    # Handle, not handle_lc is the cannonical URL
+    return (
+        session.query(
+            Playlist.playlist_id, User.handle, PlaylistRoute.slug, Playlist.is_album
+        )
         .join(User, User.user_id == PlaylistRoute.owner_id)
         .join(Playlist, PlaylistRoute.playlist_id == Playlist.playlist_id)
         .join(AggregateUser, User.user_id == AggregateUser.user_id)
@@ -230,19 +231,13 @@ def get_playlist_slugs(session: Session, limit: int, offset: int):
             Playlist.is_private == False,
         )
         .order_by(asc(Playlist.playlist_id))
-        .limit(limit)
-        .offset(offset)
-        .all()
     )
-    return [
-        f"{slug[0]}/{'album' if slug[2] else 'playlist'}/{slug[1]}" for slug in slugs
-    ]
 
 
-def get_user_slugs(session: Session, limit: int, offset: int):
-    slugs = (
-        # Handle, not handle_lc is the cannonical URL
-        session.query(User.handle)
+def _user_slugs_query(session: Session):
+    # Handle, not handle_lc is the cannonical URL
+    return (
+        session.query(User.user_id, User.handle)
         .join(AggregateUser, User.user_id == AggregateUser.user_id)
         .filter(
             User.is_current == True,
@@ -253,12 +248,65 @@ def get_user_slugs(session: Session, limit: int, offset: int):
         )
         .filter(AggregateUser.follower_count >= 10)
         .order_by(User.user_id.asc())
+    )
+
+
+def _format_track_slug(row) -> str:
+    return f"{row[1]}/{row[2]}"
+
+
+def _format_playlist_slug(row) -> str:
+    return f"{row[1]}/{'album' if row[3] else 'playlist'}/{row[2]}"
+
+
+def _format_user_slug(row) -> str:
+    return row[1]
+
+
+def get_track_slugs(session: Session, limit: int, offset: int):
+    rows = _track_slugs_query(session).limit(limit).offset(offset).all()
+    return [_format_track_slug(row) for row in rows]
+
+
+def get_playlist_slugs(session: Session, limit: int, offset: int):
+    rows = _playlist_slugs_query(session).limit(limit).offset(offset).all()
+    return [_format_playlist_slug(row) for row in rows]
+
+
+def get_user_slugs(session: Session, limit: int, offset: int):
+    rows = _user_slugs_query(session).limit(limit).offset(offset).all()
+    return [_format_user_slug(row) for row in rows]
+
+
+def get_track_slugs_after(
+    session: Session, limit: int, after_id: int
+) -> List[Tuple[int, str]]:
+    """Keyset page of (track_id, slug) for tracks with id > after_id"""
+    rows = (
+        _track_slugs_query(session).filter(Track.track_id > after_id).limit(limit).all()
+    )
+    return [(row[0], _format_track_slug(row)) for row in rows]
+
+
+def get_playlist_slugs_after(
+    session: Session, limit: int, after_id: int
+) -> List[Tuple[int, str]]:
+    """Keyset page of (playlist_id, slug) for playlists with id > after_id"""
+    rows = (
+        _playlist_slugs_query(session)
+        .filter(Playlist.playlist_id > after_id)
         .limit(limit)
-        .offset(offset)
         .all()
     )
+    return [(row[0], _format_playlist_slug(row)) for row in rows]
+
 
-    return [slug[0] for slug in slugs]
+def get_user_slugs_after(
+    session: Session, limit: int, after_id: int
+) -> List[Tuple[int, str]]:
+    """Keyset page of (user_id, slug) for users with id > after_id"""
+    rows = _user_slugs_query(session).filter(User.user_id > after_id).limit(limit).all()
+    return [(row[0], _format_user_slug(row)) for row in rows]
 
 
 def get_track_root(session: Session, limit: int = LIMIT):
@@ -304,3 +352,30 @@ def get_user_page(session: Session, page: int, limit: int = LIMIT):
     offset = (page - 1) * limit
     slugs = get_user_slugs(session, limit, offset)
     return get_entity_page(slugs)
+
+
+# Pre-rendered sitemaps written by the build_sitemaps task. Shards are stored
+# gzip'd so the routes can hand them to crawlers without re-encoding.
+sitemap_types = ["track", "playlist", "user"]
+
+
+def get_sitemap_shard_redis_key(type: str, page: int) -> str:
+    return f"sitemap:{type}:{page}"
+
+
+def get_sitemap_index_redis_key(type: str) -> str:
+    return f"sitemap:{type}:index"
+
+
+def get_sitemap_manifest_redis_key(type: str) -> str:
+    return f"sitemap:{type}:manifest"
+
+
+def get_stored_sitemap_root(type: str) -> Optional[bytes]:
+    """Returns the gzip'd sitemap index for type if it has been built"""
+    return redis.get(get_sitemap_index_redis_key(type))
+
+
+def get_stored_sitemap_page(type: str, page: int) -> Optional[bytes]:
+    """Returns the gzip'd sitemap shard for type if it has been built"""
+    return redis.get(get_sitemap_shard_redis_key(type, page))
@@ -29,30 +29,21 @@ def _get_top_listeners_for_track(session, args):
     if track_entry is None:
         raise exceptions.NotFoundError("Resource not found for provided track id")
 
-    cid_source_res = text(
+    # aggregate_track_listeners holds the per-user count of distinct hours
+    # with a play of the track, see index_aggregate_track_listeners
+    top_listeners_query = text(
         """
-        with
-        deduped as (
-          select distinct play_item_id, user_id, date_trunc('hour', created_at) as created_at
-          from plays
-          where user_id is not null
-            and play_item_id = :track_id
-        ),
-        counted as (
-          select user_id, count(*) as play_count
-          from deduped
-          group by 1
-        )
-        select *
-        from counted
+        select atl.user_id, atl.listen_count as play_count
+        from aggregate_track_listeners atl
         left join aggregate_user using (user_id)
-        order by play_count desc, follower_count desc, counted.user_id asc
+        where atl.track_id = :track_id
+        order by atl.listen_count desc, follower_count desc, atl.user_id asc
         limit :limit
         offset :offset
         """
     )
     top_listener_rows = session.execute(
-        cid_source_res, {"track_id": track_id, "limit": limit, "offset": offset}
+        top_listeners_query, {"track_id": track_id, "limit": limit, "offset": offset}
     ).fetchall()
 
     top_listeners = {r["user_id"]: r["play_count"] for r in top_listener_rows}
@@ -1,6 +1,6 @@
 from typing import Optional, TypedDict
 
-from sqlalchemy import asc, desc, func, or_
+from sqlalchemy import and_, asc, desc, or_
 from sqlalchemy.orm.session import Session
 from sqlalchemy.sql.functions import coalesce
 
@@ -8,7 +8,7 @@ from src.models.social.aggregate_plays import AggregatePlay
 from src.models.tracks.aggregate_track import AggregateTrack
 from src.models.tracks.track_with_aggregates import TrackWithAggregates
 from src.models.users.user import User
-from src.models.users.user_listening_history import UserListeningHistory
+from src.models.users.user_track_listen import UserTrackListen
 from src.queries import response_name_constants
 from src.queries.query_helpers import (
     SortDirection,
@@ -64,32 +64,15 @@ def _get_user_listening_history(session: Session, args: GetUserListeningHistoryA
     sort_direction = args["sort_direction"]
     sort_fn = desc if sort_direction == SortDirection.desc else asc
 
-    listening_history_results = (
-        session.query(UserListeningHistory.listening_history).filter(
-            UserListeningHistory.user_id == user_id
-        )
-    ).scalar()
-
-    if not listening_history_results:
-        return []
-
-    # order listening history entries by their user's play counts so our track ids will be
-    # correct order when querying for track ids
-    if sort_method == SortMethod.most_listens_by_user:
-        listening_history_results = sort_listening_history_results_by_play_count_desc(
-            listening_history_results
-        )
-
-    # Map out all track ids and listen dates
-    track_ids = []
-    listen_dates = {}
-    for listen in listening_history_results:
-        track_ids.append(listen["track_id"])
-        listen_dates[listen["track_id"]] = listen["timestamp"]
-
     base_query = (
-        session.query(TrackWithAggregates)
-        .filter(TrackWithAggregates.track_id.in_(track_ids))
+        session.query(TrackWithAggregates, UserTrackListen.last_listened_at)
+        .join(
+            UserTrackListen,
+            and_(
+                UserTrackListen.track_id == TrackWithAggregates.track_id,
+                UserTrackListen.user_id == user_id,
+            ),
+        )
         .filter(TrackWithAggregates.is_current == True)
         .filter(TrackWithAggregates.is_delete == False)
         .join(TrackWithAggregates.user)
@@ -104,14 +87,20 @@ def _get_user_listening_history(session: Session, args: GetUserListeningHistoryA
             )
         )
 
-    base_query = sort_by_sort_method(sort_method, sort_fn, track_ids, base_query)
+    base_query = sort_by_sort_method(sort_method, sort_fn, base_query)
 
     # Add pagination
     base_query = add_query_pagination(base_query, limit, offset)
     query_results = base_query.all()
-    track_ids = track_ids[offset : offset + limit]
 
-    tracks = helpers.query_result_to_list(query_results)
+    if not query_results:
+        return []
+
+    tracks = helpers.query_result_to_list([result[0] for result in query_results])
+    listen_dates = {
+        result[0].track_id: str(result.last_listened_at) for result in query_results
+    }
+    track_ids = [track[response_name_constants.track_id] for track in tracks]
 
     # bundle peripheral info into track results
     tracks = populate_track_metadata(
@@ -127,18 +116,7 @@ def _get_user_listening_history(session: Session, args: GetUserListeningHistoryA
     return tracks
 
 
-def sort_listening_history_results_by_play_count_desc(listening_history_results):
-    listening_histories_by_plays = [
-        listening_history for listening_history in listening_history_results
-    ]
-    listening_histories_by_plays.sort(
-        key=lambda listen: listen.get("play_count", 1), reverse=True
-    )
-    listening_history_results = listening_histories_by_plays
-    return listening_history_results
-
-
-def sort_by_sort_method(sort_method, sort_fn, track_ids, base_query):
+def sort_by_sort_method(sort_method, sort_fn, base_query):
     if sort_method == SortMethod.title:
         return base_query.order_by(sort_fn(TrackWithAggregates.title))
     elif sort_method == SortMethod.artist_name:
@@ -154,10 +132,6 @@ def sort_by_sort_method(sort_method, sort_fn, track_ids, base_query):
                 )
             )
         )
-    elif sort_method == SortMethod.last_listen_date:
-        return base_query.order_by(
-            sort_fn(func.array_position(track_ids, TrackWithAggregates.track_id))
-        )
     elif sort_method == SortMethod.plays:
         return base_query.join(TrackWithAggregates.aggregate_play).order_by(
             sort_fn(AggregatePlay.count)
@@ -172,9 +146,15 @@ def sort_by_sort_method(sort_method, sort_fn, track_ids, base_query):
         )
     elif sort_method == SortMethod.most_listens_by_user:
         return base_query.order_by(
-            (func.array_position(track_ids, TrackWithAggregates.track_id))
+            desc(UserTrackListen.play_count),
+            desc(UserTrackListen.last_listened_at),
+            desc(UserTrackListen.track_id),
         )
     else:
+        # Listening history is ordered most recent first, so an ascending sort
+        # (the default) returns the most recent listens first
+        recency_fn = desc if sort_fn == asc else asc
         return base_query.order_by(
-            sort_fn(func.array_position(track_ids, TrackWithAggregates.track_id))
+            recency_fn(UserTrackListen.last_listened_at),
+            recency_fn(UserTrackListen.track_id),
         )
@@ -1,3 +1,4 @@
+import gzip
 import re
 
 from flask import Blueprint, Response, request
@@ -30,10 +31,13 @@ from src.queries.get_sitemap import (
     build_default,
     get_playlist_page,
     get_playlist_root,
+    get_stored_sitemap_page,
+    get_stored_sitemap_root,
     get_track_page,
     get_track_root,
     get_user_page,
     get_user_root,
+    sitemap_types,
 )
 from src.queries.get_sol_plays import (
     get_sol_play,
@@ -680,6 +684,16 @@ def get_user_history_route(user_id):
         return api_helpers.error_response(str(e), 400)
 
 
+def get_stored_sitemap_response(stored: bytes):
+    """Serves a gzip'd sitemap from the build_sitemaps task as is if the client accepts it"""
+    if "gzip" in request.accept_encodings:
+        response = Response(stored, mimetype="text/xml")
+        response.headers["Content-Encoding"] = "gzip"
+        response.headers["Vary"] = "Accept-Encoding"
+        return response
+    return Response(gzip.decompress(stored), mimetype="text/xml")
+
+
 @bp.route("/sitemaps/default.xml", methods=("GET",))
 def get_base_sitemap():
     try:
@@ -692,6 +706,10 @@ def get_base_sitemap():
 @bp.route("/sitemaps/<string:type>/index.xml", methods=("GET",))
 def get_type_base_sitemap(type):
     try:
+        if type in sitemap_types:
+            stored = get_stored_sitemap_root(type)
+            if stored:
+                return get_stored_sitemap_response(stored)
         db = get_db_read_replica()
         with db.scoped_session() as session:
             xml = ""
@@ -720,6 +738,10 @@ def get_type_sitemap_page(type: str, file_name: str):
                 f"Invalid filepath {file_name}, should be of format <integer>.xml", 400
             )
         page_number = int(number.group(1))
+        if type in sitemap_types:
+            stored = get_stored_sitemap_page(type, page_number)
+            if stored:
+                return get_stored_sitemap_response(stored)
         db = get_db_read_replica()
         with db.scoped_session() as session:
             xml = ""
@@ -3,7 +3,6 @@ import enum
 import json
 import logging
 import random
-import re
 from collections import defaultdict
 from typing import List, Optional, Tuple, TypedDict
 from urllib.parse import quote, urlencode, urljoin
@@ -14,7 +13,10 @@ from sqlalchemy.orm.session import Session
 from sqlalchemy.sql.expression import or_
 
 from src import exceptions
-from src.gated_content.content_access_checker import content_access_checker
+from src.gated_content.content_access_checker import (
+    ContentAccessBatchArgs,
+    content_access_checker,
+)
 from src.gated_content.signature import (
     GatedContentSignature,
     get_gated_content_signature,
@@ -36,12 +38,13 @@ from src.models.users.user_bank import UserBankAccount
 from src.queries import response_name_constants
 from src.queries.get_authorization import is_authorized_request
 from src.queries.get_balances import get_balances
+from src.queries.get_followee_activity import get_followee_reposts, get_followee_saves
 from src.queries.get_track_comment_count import get_tracks_comment_count
 from src.queries.get_unpopulated_tracks import get_unpopulated_tracks
 from src.queries.get_unpopulated_users import get_unpopulated_users
 from src.trending_strategies.trending_type_and_version import TrendingVersion
 from src.utils import helpers, redis_connection
-from src.utils.get_all_nodes import get_all_healthy_content_nodes_cached
+from src.utils.get_all_nodes import get_healthy_content_node_rendezvous
 from src.utils.rendezvous import RendezvousHash
 
 logger = logging.getLogger(__name__)
@@ -489,42 +492,13 @@ def populate_track_metadata(
         )
         user_saved_track_dict = {save[0]: True for save in user_saved_tracks_query}
 
-        # Get current user's followees.
-        followees = session.query(Follow.followee_user_id).filter(
-            Follow.follower_user_id == current_user_id,
-            Follow.is_current == True,
-            Follow.is_delete == False,
+        # build dicts of track id --> followee reposts and saves
+        followee_track_repost_dict = get_followee_reposts(
+            session, current_user_id, track_ids, [RepostType.track]
         )
-
-        # build dict of track id --> followee reposts
-        followee_track_reposts = session.query(Repost).filter(
-            Repost.is_current == True,
-            Repost.is_delete == False,
-            Repost.repost_item_id.in_(track_ids),
-            Repost.repost_type == RepostType.track,
-            Repost.user_id.in_(followees),
-        )
-        followee_track_reposts = helpers.query_result_to_list(followee_track_reposts)
-        for track_repost in followee_track_reposts:
-            if track_repost["repost_item_id"] not in followee_track_repost_dict:
-                followee_track_repost_dict[track_repost["repost_item_id"]] = []
-            followee_track_repost_dict[track_repost["repost_item_id"]].append(
-                track_repost
-            )
-
-        # Build dict of track id --> followee saves.
-        followee_track_saves = session.query(Save).filter(
-            Save.is_current == True,
-            Save.is_delete == False,
-            Save.save_item_id.in_(track_ids),
-            Save.save_type == SaveType.track,
-            Save.user_id.in_(followees),
+        followee_track_save_dict = get_followee_saves(
+            session, current_user_id, track_ids, [SaveType.track]
         )
-        followee_track_saves = helpers.query_result_to_list(followee_track_saves)
-        for track_save in followee_track_saves:
-            if track_save["save_item_id"] not in followee_track_save_dict:
-                followee_track_save_dict[track_save["save_item_id"]] = []
-            followee_track_save_dict[track_save["save_item_id"]].append(track_save)
 
     comment_counts = get_tracks_comment_count(track_ids, current_user_id, session)
 
@@ -641,7 +615,10 @@ class UrlWithMirrors(TypedDict):
 
 
 def get_stream_url_with_mirrors(
-    track: dict, user_id: int | None, is_authorized_as_user: bool
+    track: dict,
+    user_id: int | None,
+    is_authorized_as_user: bool,
+    rendezvous: Optional[RendezvousHash] = None,
 ) -> UrlWithMirrors:
     # If the cid exists and the user has access
     if track.get("track_cid", False) and track.get("access", {}).get("stream", False):
@@ -661,11 +638,14 @@ def get_stream_url_with_mirrors(
                     stream_signature,
                     track["track_cid"],
                     track.get("placement_hosts", None),
+                    rendezvous,
                 )
     return {"url": None, "mirrors": []}
 
 
-def get_preview_url_with_mirrors(track: dict, user_id: int | None) -> UrlWithMirrors:
+def get_preview_url_with_mirrors(
+    track: dict, user_id: int | None, rendezvous: Optional[RendezvousHash] = None
+) -> UrlWithMirrors:
     if track.get("preview_cid"):
         preview_signature = get_gated_content_signature(
             {
@@ -681,12 +661,16 @@ def get_preview_url_with_mirrors(track: dict, user_id: int | None) -> UrlWithMir
                 preview_signature,
                 track["preview_cid"],
                 track.get("placement_hosts", None),
+                rendezvous,
             )
     return {"url": None, "mirrors": []}
 
 
 def get_download_url_with_mirrors(
-    track: dict, user_id: int | None, is_authorized_as_user: bool
+    track: dict,
+    user_id: int | None,
+    is_authorized_as_user: bool,
+    rendezvous: Optional[RendezvousHash] = None,
 ) -> UrlWithMirrors:
     # If the cid exists and the user has access
     if track.get("orig_file_cid", False) and track.get("access", {}).get(
@@ -708,12 +692,16 @@ def get_download_url_with_mirrors(
                     download_signature,
                     track["orig_file_cid"],
                     track.get("placement_hosts", None),
+                    rendezvous,
                 )
     return {"url": None, "mirrors": []}
 
 
 def get_content_url_with_mirrors(
-    signature: GatedContentSignature, cid: str, placement_hosts=None
+    signature: GatedContentSignature,
+    cid: str,
+    placement_hosts=None,
+    rendezvous: Optional[RendezvousHash] = None,
 ) -> UrlWithMirrors:
     params = {"signature": json.dumps(signature)}
 
@@ -726,12 +714,9 @@ def get_content_url_with_mirrors(
     if placement_hosts:
         content_nodes = placement_hosts.split(",")
     else:
-        healthy_nodes = get_all_healthy_content_nodes_cached(redis)
-        if healthy_nodes:
-            rendezvous = RendezvousHash(
-                *[re.sub("/$", "", node["endpoint"].lower()) for node in healthy_nodes]
-            )
-
+        if not rendezvous:
+            rendezvous = get_healthy_content_node_rendezvous(redis)
+        if rendezvous:
             content_nodes = rendezvous.get_n(mirrorCount + 1, cid)
 
     if len(content_nodes) == 0:
@@ -752,11 +737,16 @@ def get_content_url_with_mirrors(
 
 
 def _populate_gated_content_metadata(
-    session, entities, current_user_id, include_playlist_tracks=False
+    session,
+    entities,
+    current_user_id,
+    include_playlist_tracks=False,
+    rendezvous: Optional[RendezvousHash] = None,
 ):
     """Checks if `current_user_id` has access to each entity and populates relevant fields.
 
     Responsible for populating the `access` field of both tracks and playlists.
+    `entities` may mix tracks and playlists, which are checked in one batch.
 
     Additionally responsible for populating `download`, `preview`, `stream`
     fields of tracks with direct to content node URLs and mirrors.
@@ -764,6 +754,8 @@ def _populate_gated_content_metadata(
 
     if not entities:
         return
+    if not rendezvous and any(entity.get("track_id") for entity in entities):
+        rendezvous = get_healthy_content_node_rendezvous(redis)
     if not current_user_id:
         for entity in entities:
             stream_conditions = entity.get("stream_conditions")
@@ -777,23 +769,31 @@ def _populate_gated_content_metadata(
                     entity[
                         response_name_constants.stream
                     ] = get_stream_url_with_mirrors(
-                        entity, current_user_id, is_authorized_as_user=False
+                        entity,
+                        current_user_id,
+                        is_authorized_as_user=False,
+                        rendezvous=rendezvous,
                     )
                     entity[
                         response_name_constants.download
                     ] = get_download_url_with_mirrors(
-                        entity, current_user_id, is_authorized_as_user=False
+                        entity,
+                        current_user_id,
+                        is_authorized_as_user=False,
+                        rendezvous=rendezvous,
                     )
                     entity[
                         response_name_constants.preview
-                    ] = get_preview_url_with_mirrors(entity, current_user_id)
+                    ] = get_preview_url_with_mirrors(
+                        entity, current_user_id, rendezvous
+                    )
             elif stream_conditions:
                 entity[response_name_constants.access] = {
                     "stream": False,
                     "download": False,
                 }
                 entity[response_name_constants.preview] = get_preview_url_with_mirrors(
-                    entity, current_user_id
+                    entity, current_user_id, rendezvous
                 )
             elif download_conditions:
                 entity[response_name_constants.access] = {
@@ -804,11 +804,16 @@ def _populate_gated_content_metadata(
                     entity[
                         response_name_constants.stream
                     ] = get_stream_url_with_mirrors(
-                        entity, current_user_id, is_authorized_as_user=False
+                        entity,
+                        current_user_id,
+                        is_authorized_as_user=False,
+                        rendezvous=rendezvous,
                     )
                     entity[
                         response_name_constants.preview
-                    ] = get_preview_url_with_mirrors(entity, current_user_id)
+                    ] = get_preview_url_with_mirrors(
+                        entity, current_user_id, rendezvous
+                    )
         return
 
     current_user_wallet = (
@@ -825,15 +830,14 @@ def _populate_gated_content_metadata(
         )
         return
 
-    def getContentId(metadata):
-        return (
-            metadata.get("track_id")
-            if "track_id" in metadata
-            else metadata.get("playlist_id")
-        )
+    # track and playlist ids overlap, so content is keyed by type and id
+    def getContentKey(metadata):
+        if "track_id" in metadata:
+            return ("track", metadata.get("track_id"))
+        return ("album", metadata.get("playlist_id"))
 
     gated_content_access_results = {
-        getContentId(metadata): defaultdict() for metadata in entities
+        getContentKey(metadata): defaultdict() for metadata in entities
     }
     gated_entities = list(
         filter(
@@ -842,14 +846,13 @@ def _populate_gated_content_metadata(
             entities,
         )
     )
-    gated_content_ids = set([getContentId(metadata) for metadata in gated_entities])
-    gated_content_access_args = []
-    for entity in gated_entities:
-        content_type = "track" if entity.get("track_id") else "album"
+    gated_content_keys = set([getContentKey(metadata) for metadata in gated_entities])
+    gated_content_access_args: List[ContentAccessBatchArgs] = []
+    for content_type, content_id in gated_content_keys:
         gated_content_access_args.append(
             {
                 "user_id": current_user_id,
-                "content_id": getContentId(entity),
+                "content_id": content_id,
                 "content_type": content_type,
             }
         )
@@ -860,8 +863,8 @@ def _populate_gated_content_metadata(
 
     is_authorized_as_user = is_authorized_request(current_user_id)
 
-    for entity in gated_entities:
-        content_id = getContentId(entity)
+    for content_key in gated_content_keys:
+        content_type, content_id = content_key
         gated_access = gated_content_access[content_type]
 
         has_stream_access = (
@@ -874,27 +877,29 @@ def _populate_gated_content_metadata(
             and content_id in gated_access[current_user_id]
             and gated_access[current_user_id][content_id]["has_download_access"]
         )
-        gated_content_access_results[content_id][
+        gated_content_access_results[content_key][
             "has_stream_access"
         ] = has_stream_access
-        gated_content_access_results[content_id][
+        gated_content_access_results[content_key][
             "has_download_access"
         ] = has_download_access
 
     for entity in entities:
         if "playlist_id" in entity and "tracks" in entity and include_playlist_tracks:
-            _populate_gated_content_metadata(session, entity["tracks"], current_user_id)
-        content_id = getContentId(entity)
-        if content_id not in gated_content_ids:
+            _populate_gated_content_metadata(
+                session, entity["tracks"], current_user_id, rendezvous=rendezvous
+            )
+        content_key = getContentKey(entity)
+        if content_key not in gated_content_keys:
             entity[response_name_constants.access] = {
                 "stream": True,
                 "download": True,
             }
         else:
-            has_stream_access = gated_content_access_results[content_id].get(
+            has_stream_access = gated_content_access_results[content_key].get(
                 "has_stream_access", True
             )
-            has_download_access = gated_content_access_results[content_id].get(
+            has_download_access = gated_content_access_results[content_key].get(
                 "has_download_access", True
             )
             entity[response_name_constants.access] = {
@@ -905,13 +910,13 @@ def _populate_gated_content_metadata(
         if entity.get("track_id"):
             # Populate the stream, download and preview urls
             entity[response_name_constants.stream] = get_stream_url_with_mirrors(
-                entity, current_user_id, is_authorized_as_user
+                entity, current_user_id, is_authorized_as_user, rendezvous
             )
             entity[response_name_constants.download] = get_download_url_with_mirrors(
-                entity, current_user_id, is_authorized_as_user
+                entity, current_user_id, is_authorized_as_user, rendezvous
             )
             entity[response_name_constants.preview] = get_preview_url_with_mirrors(
-                entity, current_user_id
+                entity, current_user_id, rendezvous
             )
 
 
@@ -1115,58 +1120,13 @@ def populate_playlist_metadata(
             save[0]: True for save in user_saved_playlists_query
         }
 
-        # Get current user's followees.
-        followee_user_ids = (
-            session.query(Follow.followee_user_id)
-            .filter(
-                Follow.follower_user_id == current_user_id,
-                Follow.is_current == True,
-                Follow.is_delete == False,
-            )
-            .all()
-        )
-
-        # Build dict of playlist id --> followee reposts.
-        followee_playlist_reposts = (
-            session.query(Repost)
-            .filter(
-                Repost.is_current == True,
-                Repost.is_delete == False,
-                Repost.repost_item_id.in_(playlist_ids),
-                Repost.repost_type.in_(repost_types),
-                Repost.user_id.in_(followee_user_ids),
-            )
-            .all()
+        # build dicts of playlist id --> followee reposts and saves
+        followee_playlist_repost_dict = get_followee_reposts(
+            session, current_user_id, playlist_ids, repost_types
         )
-        followee_playlist_reposts = helpers.query_result_to_list(
-            followee_playlist_reposts
+        followee_playlist_save_dict = get_followee_saves(
+            session, current_user_id, playlist_ids, save_types
         )
-        for playlist_repost in followee_playlist_reposts:
-            if playlist_repost["repost_item_id"] not in followee_playlist_repost_dict:
-                followee_playlist_repost_dict[playlist_repost["repost_item_id"]] = []
-            followee_playlist_repost_dict[playlist_repost["repost_item_id"]].append(
-                playlist_repost
-            )
-
-        # Build dict of playlist id --> followee saves.
-        followee_playlist_saves = (
-            session.query(Save)
-            .filter(
-                Save.is_current == True,
-                Save.is_delete == False,
-                Save.save_item_id.in_(playlist_ids),
-                Save.save_type.in_(save_types),
-                Save.user_id.in_(followee_user_ids),
-            )
-            .all()
-        )
-        followee_playlist_saves = helpers.query_result_to_list(followee_playlist_saves)
-        for playlist_save in followee_playlist_saves:
-            if playlist_save["save_item_id"] not in followee_playlist_save_dict:
-                followee_playlist_save_dict[playlist_save["save_item_id"]] = []
-            followee_playlist_save_dict[playlist_save["save_item_id"]].append(
-                playlist_save
-            )
 
     # has current user unlocked gated tracks?
     # if so, also populate corresponding signatures.
@@ -0,0 +1,113 @@
+import logging
+from typing import Dict, Optional
+
+from src.api.v1.helpers import extend_playlist, extend_track, extend_user
+from src.models.social.repost import RepostType
+from src.models.social.save import SaveType
+from src.queries.get_playlists import add_users_to_playlists
+from src.queries.get_unpopulated_playlists import get_unpopulated_playlists
+from src.queries.get_unpopulated_tracks import get_unpopulated_tracks
+from src.queries.get_unpopulated_users import get_unpopulated_users
+from src.queries.query_helpers import (
+    add_users_to_tracks,
+    populate_playlist_metadata,
+    populate_track_metadata,
+    populate_user_metadata,
+)
+from src.utils.autocomplete_index import (
+    AutocompleteIndex,
+    get_autocomplete_index,
+    search_kinds,
+)
+from src.utils.config import shared_config
+from src.utils.db_session import get_db_read_replica
+from src.utils.get_all_nodes import get_healthy_content_node_rendezvous
+from src.utils.redis_connection import get_redis
+
+logger = logging.getLogger(__name__)
+redis = get_redis()
+
+AUTOCOMPLETE_INDEX_PATH = shared_config["discprov"]["autocomplete_index_path"]
+
+
+def get_local_autocomplete_index() -> Optional[AutocompleteIndex]:
+    return get_autocomplete_index(AUTOCOMPLETE_INDEX_PATH)
+
+
+def search_autocomplete_index(index: AutocompleteIndex, args: dict) -> Dict:
+    """
+    Autocomplete from the in-process index, hydrated from postgres.
+    Takes the same args as search_es_full and returns the same response shape.
+    """
+    search_str = (args.get("query", "") or "").strip()
+    current_user_id = args.get("current_user_id")
+    limit = args.get("limit", 10)
+    offset = args.get("offset", 0)
+    search_type = args.get("kind", "all")
+    kinds = list(search_kinds) if search_type == "all" else [search_type]
+
+    ids_by_kind = index.search(
+        search_str,
+        kinds,
+        limit=limit,
+        offset=offset,
+        include_purchaseable=bool(args.get("include_purchaseable")),
+    )
+
+    response: Dict = {
+        "tracks": [],
+        "saved_tracks": [],
+        "users": [],
+        "followed_users": [],
+        "playlists": [],
+        "saved_playlists": [],
+        "albums": [],
+        "saved_albums": [],
+    }
+
+    rendezvous = get_healthy_content_node_rendezvous(redis)
+    db = get_db_read_replica()
+    with db.scoped_session() as session:
+        user_ids = ids_by_kind.get("users")
+        if user_ids:
+            users = get_unpopulated_users(session, user_ids)
+            users = populate_user_metadata(session, user_ids, users, current_user_id)
+            response["users"] = [
+                extend_user(user, rendezvous=rendezvous) for user in users
+            ]
+
+        track_ids = ids_by_kind.get("tracks")
+        if track_ids:
+            tracks = get_unpopulated_tracks(session, track_ids, filter_deleted=True)
+            track_ids = [track["track_id"] for track in tracks]
+            tracks = populate_track_metadata(
+                session, track_ids, tracks, current_user_id
+            )
+            tracks = add_users_to_tracks(session, tracks, current_user_id)
+            response["tracks"] = [
+                extend_track(track, rendezvous=rendezvous) for track in tracks
+            ]
+
+        for kind in ["playlists", "albums"]:
+            playlist_ids = ids_by_kind.get(kind)
+            if not playlist_ids:
+                continue
+            playlists = get_unpopulated_playlists(
+                session, playlist_ids, filter_deleted=True
+            )
+            playlist_ids = [playlist["playlist_id"] for playlist in playlists]
+            playlists = populate_playlist_metadata(
+                session,
+                playlist_ids,
+                playlists,
+                [RepostType.playlist, RepostType.album],
+                [SaveType.playlist, SaveType.album],
+                current_user_id,
+            )
+            playlists = add_users_to_playlists(playlists, session, current_user_id)
+            response[kind] = [
+                extend_playlist(playlist, rendezvous=rendezvous)
+                for playlist in playlists
+            ]
+
+    return response
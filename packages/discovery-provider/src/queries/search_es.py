@@ -17,10 +17,14 @@ from src.utils.elasticdsl import (
     populate_track_or_playlist_metadata_es,
     populate_user_metadata_es,
 )
+from src.utils.get_all_nodes import get_healthy_content_node_rendezvous
 from src.utils.hardcoded_data import genre_allowlist
 from src.utils.hardcoded_data import moods as mood_allowlist
+from src.utils.prometheus_metric import PrometheusMetric, PrometheusMetricNames
+from src.utils.redis_connection import get_redis
 
 logger = logging.getLogger(__name__)
+redis = get_redis()
 
 lowercase_to_capitalized_genre = {genre.lower(): genre for genre in genre_allowlist}
 
@@ -206,7 +210,9 @@ def search_es_full(args: dict):
         )
 
     mdsl_limit_offset(mdsl, limit, offset)
+    metric = PrometheusMetric(PrometheusMetricNames.SEARCH_DURATION_SECONDS)
     mfound = esclient.msearch(searches=mdsl)
+    metric.save_time({"stage": "msearch"})
 
     response: Dict = {
         "tracks": [],
@@ -361,7 +367,9 @@ def search_tags_es(args: dict):
         )
 
     mdsl_limit_offset(mdsl, limit, offset)
+    metric = PrometheusMetric(PrometheusMetricNames.SEARCH_DURATION_SECONDS)
     mfound = esclient.msearch(searches=mdsl)
+    metric.save_time({"stage": "msearch"})
 
     response: Dict = {
         "tracks": [],
@@ -428,6 +436,7 @@ def finalize_response(
     users_by_id = {}
     current_user = None
 
+    metric = PrometheusMetric(PrometheusMetricNames.SEARCH_DURATION_SECONDS)
     if user_ids:
         ids = [str(id) for id in user_ids]
         users_mget = esclient.mget(index=ES_USERS, ids=ids)
@@ -436,6 +445,8 @@ def finalize_response(
             current_user = users_by_id.get(str(current_user_id))
         for id, user in users_by_id.items():
             users_by_id[id] = populate_user_metadata_es(user, current_user)
+    metric.save_time({"stage": "mget"})
+    metric.reset_timer()
 
     # fetch followed saves + reposts
     if not is_auto_complete:
@@ -443,6 +454,9 @@ def finalize_response(
             current_user, items
         )
 
+    # content node urls of every item are placed with the same rendezvous
+    rendezvous = get_healthy_content_node_rendezvous(redis)
+
     # tracks: finalize
     for k in ["tracks", "saved_tracks"]:
         if k not in response:
@@ -451,12 +465,7 @@ def finalize_response(
         hydrate_user(tracks, users_by_id)
         if not is_auto_complete:
             hydrate_saves_reposts(tracks, follow_saves, follow_reposts)
-        response[k] = [map_track(track, current_user) for track in tracks]
-
-        # batch populate gated track metadata
-        db = get_db_read_replica()
-        with db.scoped_session() as session:
-            _populate_gated_content_metadata(session, response[k], current_user_id)
+        response[k] = [map_track(track, current_user, rendezvous) for track in tracks]
 
     # users: finalize
     for k in ["users", "followed_users"]:
@@ -464,7 +473,7 @@ def finalize_response(
             continue
         users = reorder_users(response[k])
         users = users[:limit]
-        response[k] = [map_user(user, current_user) for user in users]
+        response[k] = [map_user(user, current_user, rendezvous) for user in users]
 
     # playlists: finalize
     for k in ["playlists", "saved_playlists", "albums", "saved_albums"]:
@@ -474,12 +483,30 @@ def finalize_response(
         if not is_auto_complete:
             hydrate_saves_reposts(playlists, follow_saves, follow_reposts)
         hydrate_user(playlists, users_by_id)
-        response[k] = [map_playlist(playlist, current_user) for playlist in playlists]
+        response[k] = [
+            map_playlist(playlist, current_user, rendezvous) for playlist in playlists
+        ]
 
-        # batch populate gated playlist metadata
+    # batch populate gated metadata of the tracks and playlists of every kind
+    gated_content = [
+        item
+        for k in [
+            "tracks",
+            "saved_tracks",
+            "playlists",
+            "saved_playlists",
+            "albums",
+            "saved_albums",
+        ]
+        for item in response.get(k, [])
+    ]
+    if gated_content:
         db = get_db_read_replica()
         with db.scoped_session() as session:
-            _populate_gated_content_metadata(session, response[k], current_user_id)
+            _populate_gated_content_metadata(
+                session, gated_content, current_user_id, rendezvous=rendezvous
+            )
+    metric.save_time({"stage": "hydrate"})
 
     return response
 
@@ -1343,19 +1370,19 @@ def hydrate_saves_reposts(items, follow_saves, follow_reposts):
         item["followee_saves"] = follow_saves[ik]
 
 
-def map_user(user, current_user):
+def map_user(user, current_user, rendezvous=None):
     user = populate_user_metadata_es(user, current_user)
-    user = extend_user(user)
+    user = extend_user(user, rendezvous=rendezvous)
     return user
 
 
-def map_track(track, current_user):
+def map_track(track, current_user, rendezvous=None):
     track = populate_track_or_playlist_metadata_es(track, current_user)
-    track = extend_track(track)
+    track = extend_track(track, rendezvous=rendezvous)
     return track
 
 
-def map_playlist(playlist, current_user):
+def map_playlist(playlist, current_user, rendezvous=None):
     playlist = populate_track_or_playlist_metadata_es(playlist, current_user)
-    playlist = extend_playlist(playlist)
+    playlist = extend_playlist(playlist, rendezvous=rendezvous)
     return playlist
@@ -6,6 +6,10 @@ from flask import Blueprint, request
 from src import api_helpers, exceptions
 from src.api.v1.helpers import parse_bool_param
 from src.queries.query_helpers import get_current_user_id, get_pagination_vars
+from src.queries.search_autocomplete import (
+    get_local_autocomplete_index,
+    search_autocomplete_index,
+)
 from src.queries.search_es import search_es_full, search_tags_es
 
 logger = logging.getLogger(__name__)
@@ -23,6 +27,20 @@ class SearchKind(Enum):
     albums = 5
 
 
+# args the autocomplete index cannot filter on
+search_filter_args = [
+    "only_downloadable",
+    "only_purchaseable",
+    "genres",
+    "moods",
+    "only_verified",
+    "only_with_downloads",
+    "keys",
+    "bpm_min",
+    "bpm_max",
+]
+
+
 # ####### ROUTES ####### #
 
 
@@ -103,6 +121,24 @@ def search_tags(args):
 def search(args):
     """Perform a search. `args` should contain `is_auto_complete`,
     `query`, `kind`, `current_user_id`, and `only_downloadable`
+
+    Anonymous autocomplete is answered from the local autocomplete index once
+    it is built. Anonymous searches without filters fall back to it when
+    elasticsearch is unavailable. The index has nothing to fill the saved and
+    followed sections with, so searches by a user always go to elasticsearch.
     """
+    index = None
+    if not args.get("current_user_id"):
+        index = get_local_autocomplete_index()
+    if index and args.get("is_auto_complete"):
+        return search_autocomplete_index(index, args)
 
-    return search_es_full(args)
+    try:
+        return search_es_full(args)
+    except Exception as e:
+        if not index or any(args.get(arg) for arg in search_filter_args):
+            raise e
+        logger.warning(
+            f"search_queries.py | Elasticsearch unavailable, searching the autocomplete index: {e}"
+        )
+        return search_autocomplete_index(index, args)
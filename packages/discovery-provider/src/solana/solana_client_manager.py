@@ -1,10 +1,16 @@
 import base64
+import json
 import logging
+import os
 import random
 import signal
+import socket
+import threading
 import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from contextlib import contextmanager
-from typing import Optional
+from typing import Dict, Iterable, List, Optional, TypedDict, Union
 
 from solders.pubkey import Pubkey
 from solders.rpc.responses import GetSignaturesForAddressResp, GetTransactionResp
@@ -14,19 +20,263 @@ from solana.rpc.api import Client, Commitment
 from solana.rpc.types import TokenAccountOpts
 from src.exceptions import SolanaTransactionFetchError
 from src.solana.solana_helpers import SPL_TOKEN_ID_PK
+from src.utils.redis_constants import solana_endpoint_stats_redis_key
 
 logger = logging.getLogger(__name__)
 
-# maximum number of times to retry get_confirmed_transaction call
+# maximum number of rounds over all endpoints, one call per endpoint each
 DEFAULT_MAX_RETRIES = 5
-# number of seconds to wait between calls to get_confirmed_transaction
+# number of seconds to wait between rounds
 DELAY_SECONDS = 0.2
 
+# smoothing factor for the per-endpoint latency and error rate EWMAs
+EWMA_ALPHA = 0.2
+# endpoints with an error rate EWMA above this are tried after healthy ones
+UNHEALTHY_ERROR_RATE = 0.5
+# seconds after the last error before an unhealthy endpoint is probed again
+UNHEALTHY_COOLDOWN_SECONDS = 30
+# latencies within the same bucket are considered equal so that endpoints
+# of comparable speed keep their configured order
+LATENCY_BUCKET_SECONDS = 0.05
+# number of recent latency samples kept per endpoint for the hedge percentile
+LATENCY_SAMPLE_SIZE = 100
+# a hedged request is sent once the primary exceeds this latency percentile
+HEDGE_PERCENTILE = 0.95
+DEFAULT_HEDGE_DELAY_SECONDS = 0.5
+MIN_HEDGE_DELAY_SECONDS = 0.05
+MAX_HEDGE_DELAY_SECONDS = 2
+HEDGE_MAX_WORKERS = 32
+# stats of a process that stopped publishing them are dropped after this long
+ENDPOINT_STATS_TTL_SECONDS = 10 * 60
+
+
+class EndpointStatsSnapshot(TypedDict):
+    endpoint: str
+    is_healthy: bool
+    latency_ewma_ms: Optional[float]
+    latency_p95_ms: Optional[float]
+    error_rate_ewma: float
+    requests: int
+    errors: int
+    hedged_requests: int
+    last_error_at: Optional[float]
+
+
+class EndpointStats:
+    """Thread-safe latency and error tracking for a single RPC endpoint."""
+
+    def __init__(self, endpoint: str) -> None:
+        self.endpoint = endpoint
+        self.latency_ewma: Optional[float] = None
+        self.error_rate_ewma = 0.0
+        self.requests = 0
+        self.errors = 0
+        self.hedged_requests = 0
+        self.last_error_at: Optional[float] = None
+        self._latencies: deque = deque(maxlen=LATENCY_SAMPLE_SIZE)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, success: bool) -> None:
+        with self._lock:
+            self.requests += 1
+            self._latencies.append(latency)
+            self.latency_ewma = (
+                latency
+                if self.latency_ewma is None
+                else EWMA_ALPHA * latency + (1 - EWMA_ALPHA) * self.latency_ewma
+            )
+            self.error_rate_ewma = (
+                EWMA_ALPHA * (0 if success else 1)
+                + (1 - EWMA_ALPHA) * self.error_rate_ewma
+            )
+            if not success:
+                self.errors += 1
+                self.last_error_at = time.time()
+
+    def record_hedge(self) -> None:
+        with self._lock:
+            self.hedged_requests += 1
+
+    def is_healthy(self) -> bool:
+        if self.error_rate_ewma <= UNHEALTHY_ERROR_RATE:
+            return True
+        # Let an unhealthy endpoint back in for a probe once it has been quiet
+        return (
+            self.last_error_at is not None
+            and time.time() - self.last_error_at > UNHEALTHY_COOLDOWN_SECONDS
+        )
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._latencies)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(percentile * len(samples)))]
+
+    def sort_key(self):
+        latency_bucket = int((self.latency_ewma or 0) / LATENCY_BUCKET_SECONDS)
+        return (not self.is_healthy(), latency_bucket)
+
+    def snapshot(self) -> EndpointStatsSnapshot:
+        p95 = self.latency_percentile(HEDGE_PERCENTILE)
+        return {
+            "endpoint": self.endpoint,
+            "is_healthy": self.is_healthy(),
+            "latency_ewma_ms": (
+                round(self.latency_ewma * 1000, 2)
+                if self.latency_ewma is not None
+                else None
+            ),
+            "latency_p95_ms": round(p95 * 1000, 2) if p95 is not None else None,
+            "error_rate_ewma": round(self.error_rate_ewma, 4),
+            "requests": self.requests,
+            "errors": self.errors,
+            "hedged_requests": self.hedged_requests,
+            "last_error_at": self.last_error_at,
+        }
+
 
 class SolanaClientManager:
-    def __init__(self, solana_endpoints) -> None:
+    def __init__(self, solana_endpoints, hedge_requests=False) -> None:
         self.endpoints = [_normalize_ep(ep) for ep in solana_endpoints.split(",")]
         self.clients = [Client(endpoint) for endpoint in self.endpoints]
+        self.endpoint_stats = [EndpointStats(endpoint) for endpoint in self.endpoints]
+        self.hedge_requests = hedge_requests
+        self._hedge_executor: Optional[ThreadPoolExecutor] = (
+            ThreadPoolExecutor(
+                max_workers=HEDGE_MAX_WORKERS, thread_name_prefix="solana_hedge"
+            )
+            if hedge_requests
+            else None
+        )
+
+    def get_endpoint_stats(self) -> List[EndpointStatsSnapshot]:
+        """Returns the latency and error stats tracked for every endpoint."""
+        return [stats.snapshot() for stats in self.endpoint_stats]
+
+    def cache_endpoint_stats(self, redis) -> None:
+        """Publishes endpoint stats to redis so the health check can read them
+        from the web process. Each process tracks its own stats, so they are
+        kept per process and merged by merge_endpoint_stats."""
+        try:
+            now = time.time()
+            redis.hset(
+                solana_endpoint_stats_redis_key,
+                f"{socket.gethostname()}:{os.getpid()}",
+                json.dumps({"updated_at": now, "endpoints": self.get_endpoint_stats()}),
+            )
+            redis.expire(solana_endpoint_stats_redis_key, ENDPOINT_STATS_TTL_SECONDS)
+            stale_writers = [
+                writer
+                for writer, published in redis.hgetall(
+                    solana_endpoint_stats_redis_key
+                ).items()
+                if json.loads(published)["updated_at"]
+                < now - ENDPOINT_STATS_TTL_SECONDS
+            ]
+            if stale_writers:
+                redis.hdel(solana_endpoint_stats_redis_key, *stale_writers)
+        except Exception as e:
+            logger.error(
+                f"solana_client_manager.py | cache_endpoint_stats | Failed to cache endpoint stats {e}"
+            )
+
+    def _ordered_indices(self) -> List[int]:
+        """Endpoint indices ordered healthiest and fastest first.
+        Endpoints of comparable speed keep their configured order."""
+        indices = list(range(len(self.clients)))
+        if len(self.endpoint_stats) != len(self.clients):
+            return indices
+        return sorted(indices, key=lambda i: self.endpoint_stats[i].sort_key())
+
+    def _timed_call(self, index: int, fn, *args, **kwargs):
+        """Calls fn, recording its latency and outcome against the endpoint."""
+        stats = self.endpoint_stats[index] if index < len(self.endpoint_stats) else None
+        start = time.monotonic()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception:
+            if stats:
+                stats.record(time.monotonic() - start, success=False)
+            raise
+        if stats:
+            stats.record(time.monotonic() - start, success=True)
+        return result
+
+    def _hedge_delay(self, index: int) -> float:
+        if index >= len(self.endpoint_stats):
+            return DEFAULT_HEDGE_DELAY_SECONDS
+        p95 = self.endpoint_stats[index].latency_percentile(HEDGE_PERCENTILE)
+        if p95 is None:
+            return DEFAULT_HEDGE_DELAY_SECONDS
+        return min(max(p95, MIN_HEDGE_DELAY_SECONDS), MAX_HEDGE_DELAY_SECONDS)
+
+    def _try_all(self, func, message, retries=DEFAULT_MAX_RETRIES, with_timeout=False):
+        """Runs func once per endpoint in health order, for up to retries
+        rounds over the whole endpoint list. Within a round, the next endpoint
+        is hedged in once the current one runs past its latency percentile
+        when hedging is enabled."""
+        for attempt in range(retries):
+            order = self._ordered_indices()
+            try:
+                if with_timeout:
+                    # signal based timeouts do not work on the hedge threads
+                    return _try_all_with_timeout(
+                        self.clients, func, message, order=order
+                    )
+                if self._hedge_executor and len(order) > 1:
+                    return self._hedge_all(func, message, order)
+                return _try_all(self.clients, func, message, order=order)
+            except SolanaTransactionFetchError as e:
+                raise e
+            except Exception:
+                logger.error(
+                    f"solana_client_manager.py | _try_all | Round {attempt + 1} of {retries} failed for function {func}"
+                )
+            if attempt < retries - 1:
+                time.sleep(DELAY_SECONDS)
+        raise Exception(message)
+
+    def _hedge_all(self, func, message, order: List[int]):
+        """Calls func on the first endpoint in order, launching the next one
+        whenever the latest launch is slower than its hedge delay or every
+        launched call has failed. Returns the first successful result."""
+        executor = self._hedge_executor
+        assert executor is not None
+        queued = list(order)
+        pending = set()
+        futures: Dict = {}
+
+        def launch():
+            index = queued.pop(0)
+            future = executor.submit(func, self.clients[index], index)
+            futures[future] = index
+            pending.add(future)
+            return index
+
+        last_launched = launch()
+        while pending:
+            done, _ = wait(
+                pending,
+                timeout=self._hedge_delay(last_launched) if queued else None,
+                return_when=FIRST_COMPLETED,
+            )
+            for future in done:
+                pending.discard(future)
+                try:
+                    return future.result()
+                except SolanaTransactionFetchError as e:
+                    raise e
+                except Exception:
+                    logger.error(
+                        f"solana_client_manager.py | _hedge_all | Failed hedged attempt at index {futures[future]} for function {func}"
+                    )
+            if queued and (not done or not pending):
+                if not done:
+                    self.endpoint_stats[queued[0]].record_hedge()
+                last_launched = launch()
+
+        raise Exception(message)
 
     def get_client(self, randomize=False) -> Client:
         if not self.clients:
@@ -34,7 +284,7 @@ class SolanaClientManager:
                 "solana_client_manager.py | get_client | There are no solana clients"
             )
         if not randomize:
-            return self.clients[0]
+            return self.clients[self._ordered_indices()[0]]
         index = random.randrange(0, len(self.clients))
         return self.clients[index]
 
@@ -45,40 +295,35 @@ class SolanaClientManager:
 
         def handle_get_sol_tx_info(client: Client, index: int) -> GetTransactionResp:
             endpoint = self.endpoints[index]
-            num_retries = retries
-            while num_retries > 0:
-                try:
-                    tx_info: GetTransactionResp = client.get_transaction(
-                        Signature.from_string(tx_sig),
-                        encoding,
-                        max_supported_transaction_version=0,
-                    )
-                    _check_error(tx_info, tx_sig)
-                    if tx_info.value is not None:
-                        return tx_info
-                # We currently only support "legacy" solana transactions. If we encounter
-                # a newer version, raise this specific error so that it can be handled upstream.
-                except SolanaTransactionFetchError as e:
-                    raise e
-                except Exception as e:
-                    logger.debug(
-                        f"solana_client_manager.py | get_sol_tx_info | \
-                            Error fetching tx {tx_sig} from endpoint {endpoint}, {e}",
-                        exc_info=True,
-                    )
-                num_retries -= 1
-                time.sleep(DELAY_SECONDS)
-                logger.error(
-                    f"solana_client_manager.py | get_sol_tx_info | Retrying tx fetch: {tx_sig} with endpoint {endpoint}"
+            try:
+                tx_info: GetTransactionResp = self._timed_call(
+                    index,
+                    client.get_transaction,
+                    Signature.from_string(tx_sig),
+                    encoding,
+                    max_supported_transaction_version=0,
+                )
+                _check_error(tx_info, tx_sig)
+                if tx_info.value is not None:
+                    return tx_info
+            # We currently only support "legacy" solana transactions. If we encounter
+            # a newer version, raise this specific error so that it can be handled upstream.
+            except SolanaTransactionFetchError as e:
+                raise e
+            except Exception as e:
+                logger.debug(
+                    f"solana_client_manager.py | get_sol_tx_info | \
+                        Error fetching tx {tx_sig} from endpoint {endpoint}, {e}",
+                    exc_info=True,
                 )
             raise Exception(
                 f"solana_client_manager.py | get_sol_tx_info | Failed to fetch {tx_sig} with endpoint {endpoint}"
             )
 
-        return _try_all(
-            self.clients,
+        return self._try_all(
             handle_get_sol_tx_info,
             f"solana_client_manager.py | get_sol_tx_info | All requests failed to fetch {tx_sig}",
+            retries,
         )
 
     def get_signatures_for_address(
@@ -102,132 +347,153 @@ class SolanaClientManager:
 
         def handle_get_signatures_for_address(client: Client, index: int):
             endpoint = self.endpoints[index]
-            num_retries = retries
-            while num_retries > 0:
-                try:
-                    transactions: GetSignaturesForAddressResp = (
-                        client.get_signatures_for_address(
-                            Pubkey.from_string(account),
-                            before,
-                            until,
-                            limit,
-                            Commitment("confirmed"),
-                        )
-                    )
-                    return transactions
-                except Exception as e:
-                    logger.error(
-                        f"solana_client_manager.py | handle_get_signatures_for_address | \
-                            Error fetching account {account} from endpoint {endpoint}, {e}",
-                        exc_info=True,
-                    )
-                num_retries -= 1
-                time.sleep(DELAY_SECONDS)
+            try:
+                transactions: GetSignaturesForAddressResp = self._timed_call(
+                    index,
+                    client.get_signatures_for_address,
+                    Pubkey.from_string(account),
+                    before,
+                    until,
+                    limit,
+                    Commitment("confirmed"),
+                )
+                return transactions
+            except Exception as e:
                 logger.error(
-                    f"solana_client_manager.py | handle_get_signatures_for_address | Retrying account fetch: {account} with endpoint {endpoint}"
+                    f"solana_client_manager.py | handle_get_signatures_for_address | \
+                        Error fetching account {account} from endpoint {endpoint}, {e}",
+                    exc_info=True,
                 )
-            raise Exception(
-                f"solana_client_manager.py | handle_get_signatures_for_address | Failed to fetch account {account} with endpoint {endpoint}"
-            )
+                raise e
 
-        return _try_all_with_timeout(
-            self.clients,
+        return self._try_all(
             handle_get_signatures_for_address,
             "solana_client_manager.py | get_signatures_for_address | All requests failed",
+            retries,
+            with_timeout=True,
         )
 
     def get_slot(self, retries=DEFAULT_MAX_RETRIES, encoding="json") -> Optional[int]:
         def _get_slot(client: Client, index):
-            endpoint = self.endpoints[index]
-            num_retries = retries
-            while num_retries > 0:
-                try:
-                    response = client.get_slot(Commitment("confirmed"))
-                    return response.value
-                except Exception as e:
-                    logger.error(
-                        f"solana_client_manager.py | get_slot, {e}",
-                        exc_info=True,
-                    )
-                num_retries -= 1
-                time.sleep(DELAY_SECONDS)
+            try:
+                response = self._timed_call(
+                    index, client.get_slot, Commitment("confirmed")
+                )
+                return response.value
+            except Exception as e:
                 logger.error(
-                    f"solana_client_manager.py | get_slot | Retrying with endpoint {endpoint}"
+                    f"solana_client_manager.py | get_slot | Failed with endpoint {self.endpoints[index]}, {e}",
+                    exc_info=True,
                 )
-            raise Exception(
-                f"solana_client_manager.py | get_slot | Failed with endpoint {endpoint}"
-            )
+                raise e
 
-        return _try_all(
-            self.clients,
+        return self._try_all(
             _get_slot,
             "solana_client_manager.py | get_slot | All requests failed to fetch",
+            retries,
         )
 
     def get_token_accounts_by_owner_json_parsed(
         self, owner: Pubkey, retries=DEFAULT_MAX_RETRIES
     ):
         def _get_token_accounts_by_owner_json_parsed(client: Client, index):
-            endpoint = self.endpoints[index]
-            num_retries = retries
-            while num_retries > 0:
-                try:
-                    response = client.get_token_accounts_by_owner_json_parsed(
-                        owner,
-                        TokenAccountOpts(
-                            program_id=SPL_TOKEN_ID_PK, encoding="jsonParsed"
-                        ),
-                    )
-                    return response.value
-                except Exception as e:
-                    logger.error(
-                        f"solana_client_manager.py | get_token_accounts_by_owner_json_parsed, {e}",
-                        exc_info=True,
-                    )
-                num_retries -= 1
-                time.sleep(DELAY_SECONDS)
+            try:
+                response = self._timed_call(
+                    index,
+                    client.get_token_accounts_by_owner_json_parsed,
+                    owner,
+                    TokenAccountOpts(program_id=SPL_TOKEN_ID_PK, encoding="jsonParsed"),
+                )
+                return response.value
+            except Exception as e:
                 logger.error(
-                    f"solana_client_manager.py | get_token_accounts_by_owner_json_parsed | Retrying with endpoint {endpoint}"
+                    f"solana_client_manager.py | get_token_accounts_by_owner_json_parsed | Failed with endpoint {self.endpoints[index]}, {e}",
+                    exc_info=True,
                 )
-            raise Exception(
-                f"solana_client_manager.py | get_token_accounts_by_owner_json_parsed | Failed with endpoint {endpoint}"
-            )
+                raise e
 
-        return _try_all(
-            self.clients,
+        return self._try_all(
             _get_token_accounts_by_owner_json_parsed,
             "solana_client_manager.py | get_token_accounts_by_owner_json_parsed | All requests failed to fetch",
+            retries,
         )
 
     def get_account_info_json_parsed(
         self, account: Pubkey, retries=DEFAULT_MAX_RETRIES
     ):
         def _get_account_info_json_parsed(client: Client, index):
-            endpoint = self.endpoints[index]
-            num_retries = retries
-            while num_retries > 0:
-                try:
-                    response = client.get_account_info_json_parsed(account)
-                    return response.value
-                except Exception as e:
-                    logger.error(
-                        f"solana_client_manager.py | get_account_info_json_parsed, {e}",
-                        exc_info=True,
-                    )
-                num_retries -= 1
-                time.sleep(DELAY_SECONDS)
+            try:
+                response = self._timed_call(
+                    index, client.get_account_info_json_parsed, account
+                )
+                return response.value
+            except Exception as e:
                 logger.error(
-                    f"solana_client_manager.py | get_account_info_json_parsed | Retrying with endpoint {endpoint}"
+                    f"solana_client_manager.py | get_account_info_json_parsed | Failed with endpoint {self.endpoints[index]}, {e}",
+                    exc_info=True,
                 )
-            raise Exception(
-                f"solana_client_manager.py | get_account_info_json_parsed | Failed with endpoint {endpoint}"
-            )
+                raise e
 
-        return _try_all(
-            self.clients,
+        return self._try_all(
             _get_account_info_json_parsed,
             "solana_client_manager.py | get_account_info_json_parsed | All requests failed to fetch",
+            retries,
+        )
+
+
+def merge_endpoint_stats(
+    published: Iterable[Union[str, bytes]],
+) -> List[EndpointStatsSnapshot]:
+    """
+    Merges the endpoint stats published by each process with
+    cache_endpoint_stats. Counts are summed, averages are weighted by requests,
+    and an endpoint is healthy only if every process finds it healthy.
+    Stats older than ENDPOINT_STATS_TTL_SECONDS are left out.
+    """
+    min_updated_at = time.time() - ENDPOINT_STATS_TTL_SECONDS
+    snapshots_by_endpoint: Dict[str, List[EndpointStatsSnapshot]] = {}
+    for published_stats in published:
+        stats = json.loads(published_stats)
+        if stats["updated_at"] < min_updated_at:
+            continue
+        for snapshot in stats["endpoints"]:
+            snapshots_by_endpoint.setdefault(snapshot["endpoint"], []).append(snapshot)
+
+    def weighted_average(snapshots, field) -> Optional[float]:
+        values = [
+            (snapshot[field], snapshot["requests"])
+            for snapshot in snapshots
+            if snapshot[field] is not None
+        ]
+        if not values:
+            return None
+        total_requests = sum(requests for _, requests in values)
+        if not total_requests:
+            return round(sum(value for value, _ in values) / len(values), 4)
+        return round(
+            sum(value * requests for value, requests in values) / total_requests, 4
+        )
+
+    merged: List[EndpointStatsSnapshot] = []
+    for endpoint, snapshots in snapshots_by_endpoint.items():
+        p95s = [s["latency_p95_ms"] for s in snapshots if s["latency_p95_ms"]]
+        last_errors = [s["last_error_at"] for s in snapshots if s["last_error_at"]]
+        merged.append(
+            {
+                "endpoint": endpoint,
+                "is_healthy": all(s["is_healthy"] for s in snapshots),
+                "latency_ewma_ms": weighted_average(snapshots, "latency_ewma_ms"),
+                # the slowest process, percentiles of the union are not known
+                "latency_p95_ms": max(p95s) if p95s else None,
+                "error_rate_ewma": weighted_average(snapshots, "error_rate_ewma")
+                or 0.0,
+                "requests": sum(s["requests"] for s in snapshots),
+                "errors": sum(s["errors"] for s in snapshots),
+                "hedged_requests": sum(s["hedged_requests"] for s in snapshots),
+                "last_error_at": max(last_errors) if last_errors else None,
+            }
         )
+    return merged
 
 
 @contextmanager
@@ -274,10 +540,13 @@ def _normalize_ep(ep):
         return base64.b64decode(m_ep.encode("utf-8")).decode("utf-8")
 
 
-def _try_all(iterable, func, message, randomize=False):
+def _try_all(iterable, func, message, randomize=False, order=None):
     """Executes a function with retries across the iterable.
-    If all executions fail, raise an exception."""
+    If all executions fail, raise an exception.
+    If order is given, only those indices are tried, in that order."""
     items = list(enumerate(iterable))
+    if order is not None:
+        items = [items[index] for index in order]
     items = items if not randomize else random.sample(items, k=len(items))
     for index, value in items:
         try:
@@ -294,13 +563,16 @@ def _try_all(iterable, func, message, randomize=False):
     raise Exception(message)
 
 
-def _try_all_with_timeout(iterable, func, message, randomize=False):
+def _try_all_with_timeout(iterable, func, message, randomize=False, order=None):
     """Do not use this function with ThreadPoolExecutor,
     doesn't play well with futures
 
     Executes a function with retries across the iterable.
-    If all executions fail, raise an exception."""
+    If all executions fail, raise an exception.
+    If order is given, only those indices are tried, in that order."""
     items = list(enumerate(iterable))
+    if order is not None:
+        items = [items[index] for index in order]
     items = items if not randomize else random.sample(items, k=len(items))
     for index, value in items:
         try:
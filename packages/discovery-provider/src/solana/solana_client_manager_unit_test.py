@@ -1,9 +1,21 @@
+import json
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest import mock
 
 import pytest
 from solders.rpc.responses import GetTransactionResp
 
-from src.solana.solana_client_manager import SolanaClientManager
+from src.solana.solana_client_manager import (
+    ENDPOINT_STATS_TTL_SECONDS,
+    EndpointStats,
+    SolanaClientManager,
+    merge_endpoint_stats,
+)
+from src.utils.redis_constants import solana_endpoint_stats_redis_key
 
 solana_client_manager = SolanaClientManager(
     "https://fake-endpoint.com,https://fake-endpoint-2.com,https://fake-endpoint-3.com"
@@ -22,6 +34,14 @@ example_response_v0 = GetTransactionResp.from_json(
 )
 
 
+@pytest.fixture(autouse=True)
+def reset_endpoint_stats():
+    """Failures recorded by one test should not reorder endpoints in the next"""
+    solana_client_manager.endpoint_stats = [
+        EndpointStats(endpoint) for endpoint in solana_client_manager.endpoints
+    ]
+
+
 @mock.patch("solana.rpc.api.Client")
 def test_get_client(_):
     # test exception raised if no clients
@@ -71,8 +91,8 @@ def test_get_sol_tx_info(_):
         == expected_response
     )
 
-    # test that it retries the same client before moving on to subsequent clients
-    # also test that it will try subsequent clients if first one fails
+    # test that it will try subsequent clients if first one fails
+    # before retrying any client
     client_mocks[0].reset_mock()
     client_mocks[1].reset_mock()
     client_mocks[2].reset_mock()
@@ -88,10 +108,42 @@ def test_get_sol_tx_info(_):
         )
         == expected_response
     )
+    assert client_mocks[0].get_transaction.call_count == 1
+    assert client_mocks[1].get_transaction.call_count == 1
+    assert client_mocks[2].get_transaction.call_count == 1
+
+    # test that it retries every client once all of them have failed
+    client_mocks[0].reset_mock()
+    client_mocks[1].reset_mock()
+    client_mocks[2].reset_mock()
+
+    client_mocks[0].get_transaction.side_effect = [Exception(), expected_response]
+    client_mocks[2].get_transaction.side_effect = Exception()
+    assert (
+        solana_client_manager.get_sol_tx_info(
+            "564oju8DrSrWd9sSjhgDEFxSYQ1TyAR1dStAwbr5WS6kaLT2GHxt5NVwbdm9cE79ovaGyMu8ZgXUBB9EC8F2XT8J",
+            num_retries,
+        )
+        == expected_response
+    )
     assert client_mocks[0].get_transaction.call_count == 2
-    assert client_mocks[1].get_transaction.call_count == 2
+    assert client_mocks[1].get_transaction.call_count == 1
     assert client_mocks[2].get_transaction.call_count == 1
 
+    # test exception raised once every round has failed
+    client_mocks[0].reset_mock()
+    client_mocks[1].reset_mock()
+    client_mocks[2].reset_mock()
+
+    client_mocks[0].get_transaction.side_effect = Exception()
+    with pytest.raises(Exception):
+        solana_client_manager.get_sol_tx_info(
+            "564oju8DrSrWd9sSjhgDEFxSYQ1TyAR1dStAwbr5WS6kaLT2GHxt5NVwbdm9cE79ovaGyMu8ZgXUBB9EC8F2XT8J",
+            num_retries,
+        )
+    for client_mock in client_mocks:
+        assert client_mock.get_transaction.call_count == num_retries
+
 
 @mock.patch("solana.rpc.api.Client")
 def test_get_signatures_for_address(_):
@@ -156,3 +208,201 @@ def test_get_sol_tx_info_v0_transaction(_):
         )
         == expected_response
     )
+
+
+@contextmanager
+def stub_rpc_server(slot=100, latency=0.0, fail=False):
+    """Local JSON-RPC server answering getSlot with injected latency/failures."""
+    calls = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            calls.append(body["method"])
+            time.sleep(latency)
+            if fail:
+                self.send_response(500)
+                self.end_headers()
+                return
+            response = json.dumps(
+                {"jsonrpc": "2.0", "result": slot, "id": body["id"]}
+            ).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(response)))
+            self.end_headers()
+            self.wfile.write(response)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}", calls
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@mock.patch("src.solana.solana_client_manager.DELAY_SECONDS", 0)
+def test_prefers_fastest_endpoint():
+    with stub_rpc_server(slot=1, latency=0.3) as (slow, slow_calls), stub_rpc_server(
+        slot=2
+    ) as (fast, fast_calls):
+        manager = SolanaClientManager(f"{slow},{fast}")
+
+        # Unmeasured endpoints are tried in configured order
+        assert manager.get_slot() == 1
+
+        # Once the fast endpoint has been measured it is preferred
+        manager.endpoint_stats[1].record(0.001, success=True)
+        for _ in range(5):
+            assert manager.get_slot() == 2
+        assert len(slow_calls) == 1
+        assert len(fast_calls) == 5
+
+        stats = manager.get_endpoint_stats()
+        assert stats[0]["endpoint"] == slow
+        assert stats[0]["latency_ewma_ms"] >= 300
+        assert stats[1]["requests"] == 6
+
+
+@mock.patch("src.solana.solana_client_manager.DELAY_SECONDS", 0)
+def test_demotes_failing_endpoint():
+    with stub_rpc_server(fail=True) as (broken, broken_calls), stub_rpc_server(
+        slot=2
+    ) as (healthy, healthy_calls):
+        manager = SolanaClientManager(f"{broken},{healthy}")
+
+        # Each call tries the broken endpoint once before falling over,
+        # until its error rate marks it unhealthy
+        for _ in range(4):
+            assert manager.get_slot(retries=4) == 2
+        assert len(broken_calls) == 4
+
+        # The broken endpoint is now unhealthy and skipped
+        for _ in range(3):
+            assert manager.get_slot(retries=4) == 2
+        assert len(broken_calls) == 4
+        assert len(healthy_calls) == 7
+
+        stats = manager.get_endpoint_stats()
+        assert stats[0]["is_healthy"] == False
+        assert stats[0]["errors"] == 4
+        assert stats[1]["is_healthy"] == True
+
+
+@mock.patch("src.solana.solana_client_manager.DEFAULT_HEDGE_DELAY_SECONDS", 0.1)
+def test_hedges_slow_primary():
+    with stub_rpc_server(slot=1, latency=1.5) as (slow, _), stub_rpc_server(slot=2) as (
+        fast,
+        fast_calls,
+    ):
+        manager = SolanaClientManager(f"{slow},{fast}", hedge_requests=True)
+
+        start = time.monotonic()
+        assert manager.get_slot() == 2
+        assert time.monotonic() - start < 1
+        assert len(fast_calls) == 1
+        assert manager.get_endpoint_stats()[1]["hedged_requests"] == 1
+
+
+@mock.patch("src.solana.solana_client_manager.DELAY_SECONDS", 0)
+def test_hedge_falls_over_on_fast_failure():
+    with stub_rpc_server(fail=True) as (broken, _), stub_rpc_server(fail=True) as (
+        broken_2,
+        _,
+    ), stub_rpc_server(slot=3) as (healthy, _):
+        manager = SolanaClientManager(
+            f"{broken},{broken_2},{healthy}", hedge_requests=True
+        )
+        # Both hedged endpoints fail fast, so the remaining endpoint is tried
+        assert manager.get_slot(retries=1) == 3
+
+
+@mock.patch("src.solana.solana_client_manager.DEFAULT_HEDGE_DELAY_SECONDS", 0.1)
+def test_hedge_covers_every_endpoint():
+    with stub_rpc_server(slot=1, latency=1.5) as (slow, _), stub_rpc_server(
+        slot=2, latency=1.5
+    ) as (slow_2, _), stub_rpc_server(slot=3) as (fast, fast_calls):
+        manager = SolanaClientManager(f"{slow},{slow_2},{fast}", hedge_requests=True)
+
+        # Both slow endpoints are hedged past in turn, within a single round
+        start = time.monotonic()
+        assert manager.get_slot(retries=1) == 3
+        assert time.monotonic() - start < 1
+        assert len(fast_calls) == 1
+        stats = manager.get_endpoint_stats()
+        assert stats[1]["hedged_requests"] == 1
+        assert stats[2]["hedged_requests"] == 1
+
+
+def test_cache_endpoint_stats_per_process(redis_mock):
+    """Each process publishes its own stats, which are merged on read"""
+    endpoints = "https://fake-endpoint.com,https://fake-endpoint-2.com"
+    first = SolanaClientManager(endpoints)
+    second = SolanaClientManager(endpoints)
+    for _ in range(3):
+        first.endpoint_stats[0].record(0.1, success=True)
+    first.endpoint_stats[0].record(0.1, success=False)
+    second.endpoint_stats[0].record(0.3, success=True)
+    for _ in range(5):
+        second.endpoint_stats[1].record(0.2, success=False)
+
+    with mock.patch("os.getpid", return_value=1):
+        first.cache_endpoint_stats(redis_mock)
+    with mock.patch("os.getpid", return_value=2):
+        second.cache_endpoint_stats(redis_mock)
+    # a process publishing again replaces its own stats
+    with mock.patch("os.getpid", return_value=1):
+        first.cache_endpoint_stats(redis_mock)
+
+    published = redis_mock.hgetall(solana_endpoint_stats_redis_key)
+    assert len(published) == 2
+
+    merged = {
+        stats["endpoint"]: stats for stats in merge_endpoint_stats(published.values())
+    }
+    assert merged["https://fake-endpoint.com"]["requests"] == 5
+    assert merged["https://fake-endpoint.com"]["errors"] == 1
+    # weighted by requests, 4 at 100ms and 1 at 300ms
+    assert merged["https://fake-endpoint.com"]["latency_ewma_ms"] == pytest.approx(
+        140, abs=1
+    )
+    assert merged["https://fake-endpoint.com"]["is_healthy"] == True
+    # unhealthy in the second process
+    assert merged["https://fake-endpoint-2.com"]["requests"] == 5
+    assert merged["https://fake-endpoint-2.com"]["is_healthy"] == False
+
+
+def test_merge_endpoint_stats_skips_stale_processes(redis_mock):
+    manager = SolanaClientManager("https://fake-endpoint.com")
+    manager.endpoint_stats[0].record(0.1, success=True)
+
+    with mock.patch("os.getpid", return_value=1):
+        manager.cache_endpoint_stats(redis_mock)
+    assert (
+        len(
+            merge_endpoint_stats(
+                redis_mock.hgetall(solana_endpoint_stats_redis_key).values()
+            )
+        )
+        == 1
+    )
+
+    later = time.time() + ENDPOINT_STATS_TTL_SECONDS + 1
+    with mock.patch("time.time", return_value=later):
+        assert (
+            merge_endpoint_stats(
+                redis_mock.hgetall(solana_endpoint_stats_redis_key).values()
+            )
+            == []
+        )
+        # the next process to publish drops the stale stats
+        with mock.patch("os.getpid", return_value=2):
+            manager.cache_endpoint_stats(redis_mock)
+    assert list(redis_mock.hgetall(solana_endpoint_stats_redis_key)) == [
+        f"{socket.gethostname()}:2".encode()
+    ]
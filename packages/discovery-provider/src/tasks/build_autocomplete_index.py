@@ -0,0 +1,145 @@
+import logging
+import time
+from typing import Any, Dict, Iterator, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm.session import Session
+
+from src.tasks.celery_app import celery
+from src.utils.autocomplete_index import (
+    FLAG_PURCHASEABLE,
+    KIND_ALBUM,
+    KIND_PLAYLIST,
+    KIND_TRACK,
+    KIND_USER,
+    AutocompleteDoc,
+    write_autocomplete_index,
+)
+from src.utils.config import shared_config
+from src.utils.prometheus_metric import save_duration_metric
+
+logger = logging.getLogger(__name__)
+
+BUILD_AUTOCOMPLETE_INDEX_LOCK = "build_autocomplete_index_lock"
+
+AUTOCOMPLETE_INDEX_PATH = shared_config["discprov"]["autocomplete_index_path"]
+
+# only the most followed / reposted documents of each kind are indexed
+MAX_DOCS_PER_KIND = 200000
+
+AUTOCOMPLETE_USERS_QUERY = """
+    select
+        users.user_id as id,
+        concat_ws(' ', users.handle, users.name) as text,
+        coalesce(aggregate_user.follower_count, 0) as score,
+        0 as flags
+    from users
+    left join aggregate_user on aggregate_user.user_id = users.user_id
+    where
+        users.is_current
+        and users.handle is not null
+        and not users.is_deactivated
+        and users.is_available
+    order by score desc, users.user_id
+    limit :limit
+    """
+
+AUTOCOMPLETE_TRACKS_QUERY = """
+    select
+        tracks.track_id as id,
+        concat_ws(' ', tracks.title, users.handle, users.name) as text,
+        coalesce(aggregate_track.repost_count, 0) as score,
+        case
+            when tracks.stream_conditions ? 'usdc_purchase' then :purchaseable
+            else 0
+        end as flags
+    from tracks
+    join users on users.user_id = tracks.owner_id and users.is_current
+    left join aggregate_track on aggregate_track.track_id = tracks.track_id
+    where
+        tracks.is_current
+        and not tracks.is_delete
+        and not tracks.is_unlisted
+        and tracks.is_available
+        and tracks.stem_of is null
+        and not users.is_deactivated
+    order by score desc, tracks.track_id
+    limit :limit
+    """
+
+AUTOCOMPLETE_PLAYLISTS_QUERY = """
+    select
+        playlists.playlist_id as id,
+        concat_ws(' ', playlists.playlist_name, users.handle, users.name) as text,
+        coalesce(aggregate_playlist.repost_count, 0) as score,
+        0 as flags
+    from playlists
+    join users on users.user_id = playlists.playlist_owner_id and users.is_current
+    left join aggregate_playlist
+        on aggregate_playlist.playlist_id = playlists.playlist_id
+    where
+        playlists.is_current
+        and not playlists.is_delete
+        and not playlists.is_private
+        and playlists.is_album = :is_album
+        and not users.is_deactivated
+    order by score desc, playlists.playlist_id
+    limit :limit
+    """
+
+
+def _get_autocomplete_docs(
+    session: Session, max_docs_per_kind: int
+) -> Iterator[AutocompleteDoc]:
+    queries: List[Tuple[int, str, Dict[str, Any]]] = [
+        (KIND_USER, AUTOCOMPLETE_USERS_QUERY, {}),
+        (KIND_TRACK, AUTOCOMPLETE_TRACKS_QUERY, {"purchaseable": FLAG_PURCHASEABLE}),
+        (KIND_PLAYLIST, AUTOCOMPLETE_PLAYLISTS_QUERY, {"is_album": False}),
+        (KIND_ALBUM, AUTOCOMPLETE_PLAYLISTS_QUERY, {"is_album": True}),
+    ]
+    for kind, query, params in queries:
+        rows = session.execute(
+            text(query), {**params, "limit": max_docs_per_kind}
+        ).fetchall()
+        for row in rows:
+            yield AutocompleteDoc(kind, row.id, row.score, row.text, row.flags)
+
+
+def _build_autocomplete_index(
+    session: Session,
+    path: str = AUTOCOMPLETE_INDEX_PATH,
+    max_docs_per_kind: int = MAX_DOCS_PER_KIND,
+):
+    """Writes the autocomplete index of the current db state to path"""
+    return write_autocomplete_index(
+        path, _get_autocomplete_docs(session, max_docs_per_kind)
+    )
+
+
+# ####### CELERY TASKS ####### #
+@celery.task(name="build_autocomplete_index", bind=True)
+@save_duration_metric(metric_group="celery_task")
+def build_autocomplete_index(self):
+    db = build_autocomplete_index.db_read_replica
+    redis = build_autocomplete_index.redis
+    have_lock = False
+    update_lock = redis.lock(BUILD_AUTOCOMPLETE_INDEX_LOCK, timeout=60 * 30)
+    try:
+        have_lock = update_lock.acquire(blocking=False)
+        if have_lock:
+            start_time = time.time()
+            with db.scoped_session() as session:
+                num_docs = _build_autocomplete_index(session)
+            logger.info(
+                f"build_autocomplete_index.py | Indexed {num_docs} docs in: {time.time()-start_time} sec"
+            )
+        else:
+            logger.debug("build_autocomplete_index.py | Failed to acquire lock")
+    except Exception as e:
+        logger.error(
+            "build_autocomplete_index.py | Fatal error in main loop", exc_info=True
+        )
+        raise e
+    finally:
+        if have_lock:
+            update_lock.release()
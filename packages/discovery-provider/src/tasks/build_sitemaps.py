@@ -0,0 +1,124 @@
+import gzip
+import hashlib
+import json
+import logging
+import time
+from typing import Callable, Dict, List, Tuple
+
+from redis import Redis
+from sqlalchemy.orm.session import Session
+
+from src.queries.get_sitemap import (
+    LIMIT,
+    get_entity_page,
+    get_playlist_slugs_after,
+    get_sitemap_index,
+    get_sitemap_index_redis_key,
+    get_sitemap_manifest_redis_key,
+    get_sitemap_shard_redis_key,
+    get_track_slugs_after,
+    get_user_slugs_after,
+)
+from src.tasks.celery_app import celery
+
+logger = logging.getLogger(__name__)
+
+BUILD_SITEMAPS_LOCK = "build_sitemaps_lock"
+
+get_slugs_after_by_type: Dict[str, Callable[..., List[Tuple[int, str]]]] = {
+    "track": get_track_slugs_after,
+    "playlist": get_playlist_slugs_after,
+    "user": get_user_slugs_after,
+}
+
+
+def _get_shard_manifest(rows: List[Tuple[int, str]]) -> dict:
+    digest = hashlib.sha256("\n".join(slug for _, slug in rows).encode()).hexdigest()
+    return {
+        "first_id": rows[0][0],
+        "last_id": rows[-1][0],
+        "count": len(rows),
+        "digest": digest,
+    }
+
+
+def build_sitemap(session: Session, redis: Redis, type: str, limit: int = LIMIT):
+    """
+    Walks the entities of type in id order with keyset pagination and writes
+    each shard of `limit` urls to redis gzip'd, followed by the index.
+    A shard is only re-rendered when its id range or slugs differ from the
+    manifest of the previous build.
+    Returns (num_shards, num_rebuilt).
+    """
+    get_slugs_after = get_slugs_after_by_type[type]
+    manifest_key = get_sitemap_manifest_redis_key(type)
+    cached_manifest = redis.get(manifest_key)
+    prev_manifest: List[dict] = json.loads(cached_manifest) if cached_manifest else []
+
+    manifest: List[dict] = []
+    num_rebuilt = 0
+    after_id = 0
+    while True:
+        rows = get_slugs_after(session, limit, after_id)
+        if not rows:
+            break
+
+        page = len(manifest) + 1
+        shard = _get_shard_manifest(rows)
+        if page > len(prev_manifest) or prev_manifest[page - 1] != shard:
+            xml = get_entity_page([slug for _, slug in rows])
+            redis.set(
+                get_sitemap_shard_redis_key(type, page), gzip.compress(xml, mtime=0)
+            )
+            num_rebuilt += 1
+        manifest.append(shard)
+
+        after_id = rows[-1][0]
+        if len(rows) < limit:
+            break
+
+    # drop shards past the end, e.g. if entities were deleted
+    stale_keys = [
+        get_sitemap_shard_redis_key(type, page)
+        for page in range(len(manifest) + 1, len(prev_manifest) + 1)
+    ]
+    if stale_keys:
+        redis.delete(*stale_keys)
+
+    index = get_sitemap_index(len(manifest), type)
+    redis.set(get_sitemap_index_redis_key(type), gzip.compress(index, mtime=0))
+    # written last so an interrupted build is redone on the next run
+    redis.set(manifest_key, json.dumps(manifest))
+    return len(manifest), num_rebuilt
+
+
+def build_sitemaps(session: Session, redis: Redis, limit: int = LIMIT):
+    for type in get_slugs_after_by_type:
+        start_time = time.time()
+        num_shards, num_rebuilt = build_sitemap(session, redis, type, limit)
+        logger.info(
+            f"build_sitemaps.py | Built {type} sitemaps, rebuilt {num_rebuilt} "
+            f"of {num_shards} shards in {time.time() - start_time} sec"
+        )
+
+
+# ####### CELERY TASKS ####### #
+@celery.task(name="build_sitemaps", bind=True)
+def build_sitemaps_task(self):
+    db = build_sitemaps_task.db_read_replica
+    redis = build_sitemaps_task.redis
+    have_lock = False
+    update_lock = redis.lock(BUILD_SITEMAPS_LOCK, timeout=60 * 30)
+    try:
+        have_lock = update_lock.acquire(blocking=False)
+        if have_lock:
+            with db.scoped_session() as session:
+                build_sitemaps(session, redis)
+        else:
+            logger.info("build_sitemaps.py | Failed to acquire lock")
+    except Exception as e:
+        logger.error("build_sitemaps.py | Fatal error in main loop", exc_info=True)
+        raise e
+    finally:
+        if have_lock:
+            update_lock.release()
@@ -1,14 +1,18 @@
 import logging
-from typing import Optional
+from typing import List, Optional
 
 import grpc
+from google.protobuf.timestamp_pb2 import Timestamp
 
 from src.tasks.core.audiusd_gen.core.v1.service_pb2_grpc import CoreServiceStub
 from src.tasks.core.audiusd_gen.core.v1.types_pb2 import (
+    Block,
     GetBlockRequest,
     GetBlockResponse,
     GetNodeInfoRequest,
     PingRequest,
+    SignedTransaction,
+    Transaction,
 )
 from src.tasks.core.gen.protocol_pb2 import BlockResponse as LegacyBlockResponse
 from src.tasks.core.gen.protocol_pb2 import GetBlockRequest as LegacyGetBlockRequest
@@ -18,8 +22,6 @@ from src.tasks.core.gen.protocol_pb2 import (
 from src.tasks.core.gen.protocol_pb2 import NodeInfoResponse as LegacyNodeInfoResponse
 from src.tasks.core.gen.protocol_pb2 import PingRequest as LegacyPingRequest
 from src.tasks.core.gen.protocol_pb2 import PingResponse as LegacyPingResponse
-from src.tasks.core.gen.protocol_pb2 import SignedTransaction as LegacySignedTransaction
-from src.tasks.core.gen.protocol_pb2 import TransactionResponse
 from src.tasks.core.gen.protocol_pb2_grpc import ProtocolStub
 from src.utils.config import shared_config
 
@@ -90,42 +92,84 @@ class AudiusdClient(CoreClient):
         # Return type: PingResponse (from audiusd_gen)
         return self.core_service.Ping(PingRequest())
 
-    def get_block(self, height: int):
-        # Return type: GetBlockResponse (from audiusd_gen)
+    # Returns the audiusd block under the legacy field names rather than a
+    # legacy BlockResponse, so it differs from the CoreClient signature
+    def get_block(self, height: int) -> "CoreBlock":  # type: ignore[override]
         res: GetBlockResponse = self.core_service.GetBlock(
             GetBlockRequest(height=height)
         )
-        block = res.block
-
-        # Convert transactions by serializing/deserializing
-        converted_transactions = []
-        for tx in block.transactions:
-            legacy_tx = LegacySignedTransaction()
-            legacy_tx.ParseFromString(tx.transaction.SerializeToString())
-            converted_transactions.append(
-                TransactionResponse(
-                    txhash=tx.hash,
-                    block_height=tx.height,
-                    block_hash=tx.hash,
-                    transaction=legacy_tx,
-                )
-            )
-
-        return LegacyBlockResponse(
-            blockhash=block.hash,
-            chainid=block.chain_id,
-            proposer=block.proposer,
-            height=block.height,
-            current_height=res.current_height,
-            timestamp=block.timestamp,
-            transaction_responses=converted_transactions,
-        )
+        return CoreBlock(res)
+
+
+class CoreTransaction:
+    """
+    Exposes an audiusd Transaction under the legacy TransactionResponse
+    field names. The signed transaction is used as is, its plays and
+    manage_entity messages have the same fields as the legacy ones.
+    """
+
+    __slots__ = ("_tx",)
+
+    def __init__(self, tx: Transaction):
+        self._tx = tx
+
+    @property
+    def txhash(self) -> str:
+        return self._tx.hash
+
+    @property
+    def block_height(self) -> int:
+        return self._tx.height
+
+    @property
+    def block_hash(self) -> str:
+        return self._tx.block_hash
+
+    @property
+    def transaction(self) -> SignedTransaction:
+        return self._tx.transaction
+
+
+class CoreBlock:
+    """
+    Exposes an audiusd GetBlockResponse under the legacy BlockResponse field
+    names so the indexers can read it without re-encoding every transaction.
+    """
+
+    __slots__ = ("_block", "current_height", "transaction_responses")
+
+    def __init__(self, res: GetBlockResponse):
+        self._block: Block = res.block
+        self.current_height: int = res.current_height
+        self.transaction_responses: List[CoreTransaction] = [
+            CoreTransaction(tx) for tx in self._block.transactions
+        ]
+
+    @property
+    def blockhash(self) -> str:
+        return self._block.hash
+
+    @property
+    def chainid(self) -> str:
+        return self._block.chain_id
+
+    @property
+    def proposer(self) -> str:
+        return self._block.proposer
+
+    @property
+    def height(self) -> int:
+        return self._block.height
+
+    @property
+    def timestamp(self) -> Timestamp:
+        return self._block.timestamp
 
 
-core_instance: Optional[CoreClient] = None
+core_instance: Optional[AudiusdClient] = None
 
 
-def get_core_instance() -> CoreClient:
+def get_core_instance() -> AudiusdClient:
     # pylint: disable=W0603
     global core_instance
     if not core_instance:
@@ -0,0 +1,93 @@
+from google.protobuf.timestamp_pb2 import Timestamp
+
+from src.tasks.core.audiusd_gen.core.v1.types_pb2 import (
+    Block,
+    GetBlockResponse,
+    ManageEntityLegacy,
+    SignedTransaction,
+    TrackPlay,
+    TrackPlays,
+    Transaction,
+)
+from src.tasks.core.core_client import CoreBlock
+
+
+def make_block_response():
+    manage_entity_tx = Transaction(
+        hash="0xmanage",
+        height=10,
+        block_hash="0xblock",
+        transaction=SignedTransaction(
+            manage_entity=ManageEntityLegacy(
+                user_id=1,
+                entity_type="Track",
+                entity_id=2,
+                action="Create",
+                metadata="{}",
+                signature="0xsig",
+                signer="0xsigner",
+                nonce="0xnonce",
+            )
+        ),
+    )
+    plays_tx = Transaction(
+        hash="0xplays",
+        height=10,
+        block_hash="0xblock",
+        transaction=SignedTransaction(
+            plays=TrackPlays(
+                plays=[
+                    TrackPlay(
+                        user_id="1",
+                        track_id="2",
+                        timestamp=Timestamp(seconds=1700000000),
+                        signature="0xplaysig",
+                        city="Brooklyn",
+                    )
+                ]
+            )
+        ),
+    )
+    return GetBlockResponse(
+        block=Block(
+            height=10,
+            hash="0xblock",
+            chain_id="audius-devnet",
+            proposer="0xproposer",
+            timestamp=Timestamp(seconds=1700000001),
+            transactions=[manage_entity_tx, plays_tx],
+        ),
+        current_height=12,
+    )
+
+
+def test_core_block_exposes_legacy_fields():
+    block = CoreBlock(make_block_response())
+
+    assert block.blockhash == "0xblock"
+    assert block.chainid == "audius-devnet"
+    assert block.proposer == "0xproposer"
+    assert block.height == 10
+    assert block.current_height == 12
+    assert block.timestamp.ToSeconds() == 1700000001
+
+    manage_entity_tx, plays_tx = block.transaction_responses
+    assert manage_entity_tx.txhash == "0xmanage"
+    assert manage_entity_tx.block_height == 10
+    assert manage_entity_tx.block_hash == "0xblock"
+    assert manage_entity_tx.transaction.WhichOneof("transaction") == "manage_entity"
+    assert manage_entity_tx.transaction.manage_entity.entity_id == 2
+    assert manage_entity_tx.transaction.manage_entity.nonce == "0xnonce"
+
+    assert plays_tx.transaction.WhichOneof("transaction") == "plays"
+    (play,) = plays_tx.transaction.plays.plays
+    assert play.track_id == "2"
+    assert play.city == "Brooklyn"
+    assert play.timestamp.ToSeconds() == 1700000000
+
+
+def test_core_block_empty():
+    block = CoreBlock(GetBlockResponse(current_height=12))
+
+    assert block.height == 0
+    assert block.transaction_responses == []
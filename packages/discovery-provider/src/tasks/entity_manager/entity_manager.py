@@ -175,7 +175,7 @@ def entity_manager_update(
     block_number: int,
     block_timestamp: int,
     block_hash: str,
-) -> Tuple[int, Dict[str, Set[(int)]]]:
+) -> Tuple[int, Dict[str, Set]]:
     """
     Process a block of EM transactions.
 
@@ -184,6 +184,9 @@ def entity_manager_update(
     3. Validate transaction.
     4. Create new database record based on a transaction.
     5. Bulk insert new records.
+
+    Returns the number of changes and the changed grant keys under "Grant",
+    whose cached authority the caller drops once the session is committed.
     """
     try:
         update_start_time = time.time()
@@ -192,7 +195,7 @@ def entity_manager_update(
         with challenge_bus.use_scoped_dispatch_queue():
             num_total_changes = 0
 
-            changed_entity_ids: Dict[str, Set[(int)]] = defaultdict(set)
+            changed_entity_ids: Dict[str, Set] = defaultdict(set)
             if not entity_manager_txs:
                 return num_total_changes, changed_entity_ids
 
@@ -515,6 +518,8 @@ def entity_manager_update(
                 session,
             )
 
+            changed_entity_ids["Grant"].update(new_records["Grant"].keys())
+
             num_total_changes += len(new_records)
             # update metrics
             metric_latency.save_time(
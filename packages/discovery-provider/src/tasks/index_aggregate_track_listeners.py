@@ -0,0 +1,255 @@
+import logging
+import time
+
+from sqlalchemy import func, text
+
+from src.models.social.play import Play
+from src.tasks.celery_app import celery
+from src.utils.prometheus_metric import save_duration_metric
+from src.utils.update_indexing_checkpoints import (
+    get_last_indexed_checkpoint,
+    save_indexed_checkpoint,
+)
+
+logger = logging.getLogger(__name__)
+
+AGGREGATE_TRACK_LISTENERS_TABLE_NAME = "aggregate_track_listeners"
+AGGREGATE_TRACK_LISTENERS_LOCK = "index_aggregate_track_listeners_lock"
+
+# max number of play ids counted per run, so catching up on a large backlog
+# is spread across runs instead of holding the lock for minutes
+MAX_PLAYS_PER_RUN = 100_000
+
+# max number of tracks with late plays recomputed from plays per reconcile run
+RECONCILE_BATCH_SIZE = 1000
+
+# Counts distinct (track, user, hour) listens from new plays. An hour is only
+# counted if it is later than the last hour already counted for that listener,
+# so replays within the same hour are not double counted across batches.
+# Tracks with plays for earlier hours are queued for the reconcile task.
+UPSERT_AGGREGATE_TRACK_LISTENERS_QUERY = """
+    WITH new_listens AS (
+        SELECT
+            play_item_id AS track_id,
+            user_id,
+            date_trunc('hour', created_at) AS listened_hour
+        FROM plays
+        WHERE id > :prev_checkpoint
+        AND id <= :new_checkpoint
+        AND user_id IS NOT NULL
+        GROUP BY 1, 2, 3
+    ),
+    listens AS (
+        SELECT new_listens.*, existing.last_listened_hour AS counted_through_hour
+        FROM new_listens
+        LEFT JOIN aggregate_track_listeners existing
+            ON existing.track_id = new_listens.track_id
+            AND existing.user_id = new_listens.user_id
+    ),
+    late_tracks AS (
+        INSERT INTO aggregate_track_listeners_dirty (track_id)
+        SELECT DISTINCT track_id
+        FROM listens
+        WHERE listened_hour < counted_through_hour
+        ON CONFLICT (track_id) DO NOTHING
+    ),
+    counted AS (
+        SELECT
+            track_id,
+            user_id,
+            count(*) FILTER (
+                WHERE counted_through_hour IS NULL
+                OR listened_hour > counted_through_hour
+            ) AS listen_count,
+            max(listened_hour) AS last_listened_hour
+        FROM listens
+        GROUP BY track_id, user_id
+    )
+    INSERT INTO aggregate_track_listeners
+        (track_id, user_id, listen_count, last_listened_hour)
+    SELECT track_id, user_id, listen_count, last_listened_hour
+    FROM counted
+    ON CONFLICT (track_id, user_id)
+    DO UPDATE SET
+        listen_count = aggregate_track_listeners.listen_count + EXCLUDED.listen_count,
+        last_listened_hour = GREATEST(
+            aggregate_track_listeners.last_listened_hour, EXCLUDED.last_listened_hour
+        );
+    """
+
+# Takes the oldest queued tracks off the reconcile queue
+DEQUEUE_DIRTY_TRACKS_QUERY = """
+    DELETE FROM aggregate_track_listeners_dirty
+    WHERE track_id IN (
+        SELECT track_id
+        FROM aggregate_track_listeners_dirty
+        ORDER BY marked_at, track_id
+        LIMIT :batch_size
+    )
+    RETURNING track_id;
+    """
+
+# Merged into the existing counts rather than replacing them: prune_plays
+# deletes old plays, so counts from plays alone can be lower than the counts
+# the incremental path kept for the same listeners.
+RECONCILE_AGGREGATE_TRACK_LISTENERS_QUERY = """
+    INSERT INTO aggregate_track_listeners
+        (track_id, user_id, listen_count, last_listened_hour)
+    SELECT
+        play_item_id,
+        user_id,
+        count(DISTINCT date_trunc('hour', created_at)),
+        max(date_trunc('hour', created_at))
+    FROM plays
+    WHERE play_item_id = ANY(:track_ids)
+    AND user_id IS NOT NULL
+    AND id <= :checkpoint
+    GROUP BY play_item_id, user_id
+    ON CONFLICT (track_id, user_id)
+    DO UPDATE SET
+        listen_count = GREATEST(
+            aggregate_track_listeners.listen_count, EXCLUDED.listen_count
+        ),
+        last_listened_hour = GREATEST(
+            aggregate_track_listeners.last_listened_hour, EXCLUDED.last_listened_hour
+        );
+    """
+
+
+def _index_aggregate_track_listeners(session, max_plays_per_run=MAX_PLAYS_PER_RUN):
+    # get checkpoints
+    prev_id_checkpoint = get_last_indexed_checkpoint(
+        session, AGGREGATE_TRACK_LISTENERS_TABLE_NAME
+    )
+
+    max_play_id = (session.query(func.max(Play.id))).scalar()
+
+    if not max_play_id or max_play_id == prev_id_checkpoint:
+        logger.debug(
+            "index_aggregate_track_listeners.py | Skip update because there are no new plays"
+        )
+        return
+
+    new_id_checkpoint = min(max_play_id, prev_id_checkpoint + max_plays_per_run)
+
+    session.execute(
+        text(UPSERT_AGGREGATE_TRACK_LISTENERS_QUERY),
+        {
+            "prev_checkpoint": prev_id_checkpoint,
+            "new_checkpoint": new_id_checkpoint,
+        },
+    )
+
+    if new_id_checkpoint < max_play_id:
+        logger.info(
+            f"index_aggregate_track_listeners.py | Caught up to play {new_id_checkpoint} "
+            f"of {max_play_id}"
+        )
+
+    # update with new checkpoint
+    save_indexed_checkpoint(
+        session, AGGREGATE_TRACK_LISTENERS_TABLE_NAME, new_id_checkpoint
+    )
+
+
+def _reconcile_aggregate_track_listeners(session, batch_size=RECONCILE_BATCH_SIZE):
+    """
+    Recomputes listener counts from plays for the oldest batch of tracks that
+    had plays counted behind a listener's last counted hour, keeping the
+    existing count where it is higher.
+    Only plays up to the incremental checkpoint are counted so the next
+    incremental run does not count them again.
+    """
+    checkpoint = get_last_indexed_checkpoint(
+        session, AGGREGATE_TRACK_LISTENERS_TABLE_NAME
+    )
+
+    track_ids = [
+        track_id
+        for (track_id,) in session.execute(
+            text(DEQUEUE_DIRTY_TRACKS_QUERY), {"batch_size": batch_size}
+        )
+    ]
+
+    if track_ids:
+        session.execute(
+            text(RECONCILE_AGGREGATE_TRACK_LISTENERS_QUERY),
+            {"track_ids": track_ids, "checkpoint": checkpoint},
+        )
+    return len(track_ids)
+
+
+# ####### CELERY TASKS ####### #
+@celery.task(name="index_aggregate_track_listeners", bind=True)
+@save_duration_metric(metric_group="celery_task")
+def index_aggregate_track_listeners(self):
+    # Cache custom task class properties
+    # Details regarding custom task context can be found in wiki
+    # Custom Task definition can be found in src/app.py
+    db = index_aggregate_track_listeners.db
+    redis = index_aggregate_track_listeners.redis
+    # Define lock acquired boolean
+    have_lock = False
+    # Define redis lock object
+    update_lock = redis.lock(AGGREGATE_TRACK_LISTENERS_LOCK, timeout=60 * 10)
+    try:
+        # Attempt to acquire lock - do not block if unable to acquire
+        have_lock = update_lock.acquire(blocking=False)
+        if have_lock:
+            start_time = time.time()
+
+            with db.scoped_session() as session:
+                _index_aggregate_track_listeners(session)
+
+            logger.debug(
+                f"index_aggregate_track_listeners.py | Finished updating "
+                f"{AGGREGATE_TRACK_LISTENERS_TABLE_NAME} in: {time.time()-start_time} sec"
+            )
+        else:
+            logger.debug(
+                f"index_aggregate_track_listeners.py | Failed to acquire {AGGREGATE_TRACK_LISTENERS_LOCK}"
+            )
+    except Exception as e:
+        logger.error(
+            "index_aggregate_track_listeners.py | Fatal error in main loop",
+            exc_info=True,
+        )
+        raise e
+    finally:
+        if have_lock:
+            update_lock.release()
+
+
+@celery.task(name="reconcile_aggregate_track_listeners", bind=True)
+@save_duration_metric(metric_group="celery_task")
+def reconcile_aggregate_track_listeners(self):
+    db = reconcile_aggregate_track_listeners.db
+    redis = reconcile_aggregate_track_listeners.redis
+    have_lock = False
+    # Shares the incremental task's lock so the checkpoint cannot move mid-reconcile
+    update_lock = redis.lock(AGGREGATE_TRACK_LISTENERS_LOCK, timeout=60 * 10)
+    try:
+        have_lock = update_lock.acquire(blocking=False)
+        if have_lock:
+            start_time = time.time()
+
+            with db.scoped_session() as session:
+                num_tracks = _reconcile_aggregate_track_listeners(session)
+
+            logger.info(
+                f"index_aggregate_track_listeners.py | Reconciled {num_tracks} tracks "
+                f"in: {time.time()-start_time} sec"
+            )
+        else:
+            logger.debug(
+                f"index_aggregate_track_listeners.py | Failed to acquire {AGGREGATE_TRACK_LISTENERS_LOCK}"
+            )
+    except Exception as e:
+        logger.error(
+            "index_aggregate_track_listeners.py | Fatal error in reconcile",
+            exc_info=True,
+        )
+        raise e
+    finally:
+        if have_lock:
+            update_lock.release()
@@ -2,7 +2,7 @@ import json
 import logging
 from datetime import datetime
 from logging import LoggerAdapter
-from typing import Optional, TypedDict, cast
+from typing import Optional, Set, Tuple, TypedDict, cast
 
 from celery.exceptions import SoftTimeLimitExceeded
 from redis import Redis
@@ -13,12 +13,12 @@ from src.challenges.challenge_event_bus import ChallengeEventBus
 from src.models.core.core_indexed_blocks import CoreIndexedBlocks
 from src.models.social.play import Play
 from src.tasks.celery_app import celery
-from src.tasks.core.core_client import CoreClient, get_core_instance
-from src.tasks.core.gen.protocol_pb2 import BlockResponse
+from src.tasks.core.core_client import AudiusdClient, CoreBlock, get_core_instance
 from src.tasks.index_core_cutovers import get_plays_core_cutover, get_sol_cutover
 from src.tasks.index_core_entity_manager import index_core_entity_manager
 from src.tasks.index_core_plays import index_core_plays
 from src.tasks.index_core_side_effects import run_side_effects
+from src.utils.authority_cache import invalidate_grant_authority
 from src.utils.config import shared_config
 from src.utils.core import (
     CoreHealth,
@@ -71,7 +71,7 @@ class IndexingResult(TypedDict):
 # dresses up the core health to look like the solana plays endpoint
 def update_core_listens_health(
     redis: Redis,
-    latest_indexed_block: BlockResponse,
+    latest_indexed_block: CoreBlock,
     core_plays_cutover: int,
     sol_plays_cutover: int,
 ):
@@ -104,7 +104,7 @@ def update_core_listens_health(
 
 def update_core_health(
     redis: Redis,
-    latest_indexed_block: BlockResponse,
+    latest_indexed_block: CoreBlock,
     indexing_plays: bool,
     indexing_em: bool,
 ):
@@ -120,32 +120,48 @@ def update_core_health(
 
 
 def update_latest_block_redis(
-    logger: LoggerAdapter, core: CoreClient, redis: Redis, latest_block: int
+    logger: LoggerAdapter,
+    redis: Redis,
+    latest_block: int,
+    indexed_block: Optional[CoreBlock] = None,
 ):
+    """
+    Caches the chain tip height from node info. The tip hash is only known
+    without another block fetch when the block being indexed is the tip, so
+    until then the hash is cleared rather than left paired with an old height.
+    """
     try:
-        block = core.get_block(latest_block)
-        block_number = block.current_height
-        block_hash = block.blockhash
-        redis.set(latest_block_redis_key, block_number)
-        redis.set(latest_block_hash_redis_key, block_hash)
+        pipe = redis.pipeline()
+        pipe.set(latest_block_redis_key, latest_block)
+        if indexed_block and indexed_block.height == latest_block:
+            pipe.set(latest_block_hash_redis_key, indexed_block.blockhash)
+        else:
+            pipe.delete(latest_block_hash_redis_key)
+        pipe.execute()
     except Exception as e:
         logger.error(f"couldn't update latest redis block: {e}")
 
 
 def update_latest_indexed_block_redis(
-    logger: LoggerAdapter, core: CoreClient, redis: Redis, latest_indexed_block: int
+    logger: LoggerAdapter, redis: Redis, latest_indexed_block: CoreBlock
 ):
     try:
-        block = core.get_block(latest_indexed_block)
-
-        block_number = block.height
-        block_hash = block.blockhash
+        redis.set(most_recent_indexed_block_redis_key, latest_indexed_block.height)
+        redis.set(
+            most_recent_indexed_block_hash_redis_key, latest_indexed_block.blockhash
+        )
+    except Exception as e:
+        logger.error(f"couldn't update latest redis block: {e}")
 
-        redis.set(most_recent_indexed_block_redis_key, block_number)
-        redis.set(most_recent_indexed_block_hash_redis_key, block_hash)
 
+def invalidate_changed_grant_authority(
+    logger: LoggerAdapter, redis: Redis, changed_grant_keys: Set[Tuple[str, int]]
+):
+    """Makes committed grant changes visible to is_authorized_request right away"""
+    try:
+        invalidate_grant_authority(redis, changed_grant_keys)
     except Exception as e:
-        logger.error(f"couldn't update latest redis block: {e}")
+        logger.error(f"couldn't invalidate grant authority: {e}")
 
 
 @celery.task(name="index_core", bind=True, soft_time_limit=500)
@@ -164,11 +180,12 @@ def index_core(self):
         if not have_lock:
             return
 
-        core: CoreClient = get_core_instance()
+        core: AudiusdClient = get_core_instance()
 
         # state that gets populated as indexing job goes on
         # used for updating health check and other things
-        block_indexed: Optional[BlockResponse] = None
+        block_indexed: Optional[CoreBlock] = None
+        changed_grant_keys: Set[Tuple[str, int]] = set()
 
         # execute all of indexing in one db session
         with db.scoped_session() as session:
@@ -213,16 +230,17 @@ def index_core(self):
                 },
             )
 
+            logger.debug("indexing block")
+
+            block = core.get_block(next_block)
+
             update_latest_block_redis(
                 logger=logger,
-                core=core,
                 redis=redis,
                 latest_block=core_node_info.current_height,
+                indexed_block=block,
             )
 
-            logger.debug("indexing block")
-
-            block = core.get_block(next_block)
             if not block:
                 return
 
@@ -243,7 +261,7 @@ def index_core(self):
                 block=block,
             )
 
-            indexed_em_block = index_core_entity_manager(
+            indexed_em_block, changed_grant_keys = index_core_entity_manager(
                 logger=logger,
                 update_task=self,
                 web3=web3,
@@ -298,11 +316,15 @@ def index_core(self):
 
         # after session has been committed, update health checks and other things
         if block_indexed:
+            invalidate_changed_grant_authority(
+                logger=logger,
+                redis=redis,
+                changed_grant_keys=changed_grant_keys,
+            )
             update_latest_indexed_block_redis(
                 logger=logger,
-                core=core,
                 redis=redis,
-                latest_indexed_block=block_indexed.height,
+                latest_indexed_block=block_indexed,
             )
             update_core_health(
                 redis=redis,
@@ -1,6 +1,6 @@
 import logging
 from logging import LoggerAdapter
-from typing import List, Optional
+from typing import List, Set, Tuple
 
 from eth_utils import to_bytes
 from sqlalchemy.orm.session import Session
@@ -10,7 +10,7 @@ from web3.types import TxReceipt
 
 from src.database_task import DatabaseTask
 from src.models.indexing.block import Block
-from src.tasks.core.gen.protocol_pb2 import BlockResponse
+from src.tasks.core.core_client import CoreBlock
 from src.tasks.entity_manager.entity_manager import entity_manager_update
 
 logger = logging.getLogger(__name__)
@@ -21,8 +21,12 @@ def index_core_entity_manager(
     update_task: DatabaseTask,
     web3: Web3,
     session: Session,
-    block: BlockResponse,
-) -> Optional[int]:
+    block: CoreBlock,
+) -> Tuple[int, Set[Tuple[str, int]]]:
+    """
+    Indexes the block's manage entity transactions as the next EM block.
+    Returns that block number and the grant keys changed by the block.
+    """
     tx_receipts: List[TxReceipt] = []
     for tx_res in block.transaction_responses:
         tx = tx_res.transaction
@@ -73,7 +77,7 @@ def index_core_entity_manager(
 
         latest_indexed_block_record.is_current = False
         session.add(next_em_block_model)
-        entity_manager_update(
+        _, changed_entity_ids = entity_manager_update(
             update_task=update_task,
             session=session,
             entity_manager_txs=tx_receipts,
@@ -81,7 +85,7 @@ def index_core_entity_manager(
             block_timestamp=block.timestamp.ToSeconds(),
             block_hash=block.blockhash,
         )
-        return next_em_block
+        return next_em_block, changed_entity_ids["Grant"]
     except Exception as e:
         logger.error(f"entity manager error in core blocks {e}", exc_info=True)
         # raise error so we don't index this block
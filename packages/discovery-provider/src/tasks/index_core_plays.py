@@ -9,7 +9,8 @@ from src.challenges.challenge_event import ChallengeEvent
 from src.challenges.challenge_event_bus import ChallengeEventBus
 from src.models.social.play import Play
 from src.models.tracks.track import Track
-from src.tasks.core.gen.protocol_pb2 import BlockResponse, SignedTransaction
+from src.tasks.core.audiusd_gen.core.v1.types_pb2 import SignedTransaction
+from src.tasks.core.core_client import CoreBlock
 
 
 class PlayInfo(TypedDict):
@@ -38,7 +39,7 @@ def index_core_plays(
     session: Session,
     challenge_bus: ChallengeEventBus,
     latest_indexed_slot: int,
-    block: BlockResponse,
+    block: CoreBlock,
 ) -> Optional[int]:
     indexed_slot: Optional[int] = None
     for tx in block.transaction_responses:
@@ -6,13 +6,12 @@ from src.challenges.challenge_event_bus import ChallengeEventBus
 from src.challenges.trending_challenge import should_trending_challenge_update
 from src.tasks.calculate_trending_challenges import enqueue_trending_challenges
 from src.tasks.celery_app import celery
-from src.tasks.core.core_client import CoreClient
-from src.tasks.core.gen.protocol_pb2 import BlockResponse
+from src.tasks.core.core_client import CoreBlock, CoreClient
 
 
 def run_side_effects(
     logger: LoggerAdapter,
-    block: BlockResponse,
+    block: CoreBlock,
     session: Session,
     core: CoreClient,
     challenge_bus: ChallengeEventBus,
@@ -0,0 +1,198 @@
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import DefaultDict, List
+
+from sqlalchemy import text
+
+from src.tasks.aggregates import get_latest_blocknumber
+from src.tasks.celery_app import celery
+from src.utils.feed_inbox import (
+    FEED_FANOUT_MAX_FOLLOWERS,
+    FEED_WINDOW_DAYS,
+    FeedEntry,
+    add_to_feed_inboxes,
+    drop_feed_inboxes,
+    to_feed_score,
+)
+from src.utils.prometheus_metric import save_duration_metric
+from src.utils.update_indexing_checkpoints import (
+    get_last_indexed_checkpoint,
+    save_indexed_checkpoint,
+)
+
+logger = logging.getLogger(__name__)
+
+FEED_INBOXES_CHECKPOINT_NAME = "feed_inboxes"
+INDEX_FEED_INBOXES_LOCK = "index_feed_inboxes_lock"
+
+# max number of blocks fanned out per run
+MAX_BLOCKS_PER_RUN = 1000
+
+NEW_FEED_ACTIVITY_QUERY = """
+    select
+        owner_id as user_id,
+        'track:' || track_id as item_key,
+        created_at,
+        false as is_repost
+    from tracks
+    where
+        blocknumber > :prev_blocknumber
+        and blocknumber <= :current_blocknumber
+        and is_current
+        and not is_delete
+        and not is_unlisted
+        and stem_of is null
+        and created_at >= :since
+    union all
+    select
+        playlist_owner_id as user_id,
+        'playlist:' || playlist_id as item_key,
+        created_at,
+        false as is_repost
+    from playlists
+    where
+        blocknumber > :prev_blocknumber
+        and blocknumber <= :current_blocknumber
+        and is_current
+        and not is_delete
+        and not is_private
+        and created_at >= :since
+    union all
+    select
+        user_id,
+        case when repost_type = 'track' then 'track:' else 'playlist:' end
+            || repost_item_id as item_key,
+        created_at,
+        true as is_repost
+    from reposts
+    where
+        blocknumber > :prev_blocknumber
+        and blocknumber <= :current_blocknumber
+        and is_current
+        and not is_delete
+        and created_at >= :since
+    """
+
+# followers of user_ids, skipping users with too many followers to fan out to
+FEED_FOLLOWERS_QUERY = """
+    select
+        follows.followee_user_id,
+        follows.follower_user_id
+    from follows
+    join aggregate_user on aggregate_user.user_id = follows.followee_user_id
+    where
+        follows.followee_user_id = any(:user_ids)
+        and follows.is_current
+        and not follows.is_delete
+        and aggregate_user.follower_count <= :max_followers
+    """
+
+
+# users who followed or unfollowed someone, whose inboxes are missing that
+# user's items or still hold them
+FOLLOW_CHANGES_QUERY = """
+    select distinct follower_user_id
+    from follows
+    where
+        blocknumber > :prev_blocknumber
+        and blocknumber <= :current_blocknumber
+        and is_current
+    """
+
+
+def _index_feed_inboxes(session, redis, max_blocks_per_run=MAX_BLOCKS_PER_RUN):
+    """
+    Fans out tracks, playlists and reposts indexed since the last run to the
+    inboxes of their creators' active followers, after dropping the inboxes
+    of users who followed or unfollowed someone.
+    Returns the number of inboxes written to.
+    """
+    current_blocknumber = get_latest_blocknumber(session)
+    if current_blocknumber is None:
+        return 0
+    prev_blocknumber = get_last_indexed_checkpoint(
+        session, FEED_INBOXES_CHECKPOINT_NAME
+    )
+    if not prev_blocknumber:
+        # inboxes are filled from the db on first read, so there is no
+        # history to fan out
+        save_indexed_checkpoint(
+            session, FEED_INBOXES_CHECKPOINT_NAME, current_blocknumber
+        )
+        return 0
+    current_blocknumber = min(
+        current_blocknumber, prev_blocknumber + max_blocks_per_run
+    )
+    if current_blocknumber <= prev_blocknumber:
+        return 0
+
+    block_range = {
+        "prev_blocknumber": prev_blocknumber,
+        "current_blocknumber": current_blocknumber,
+    }
+    drop_feed_inboxes(
+        redis,
+        [row[0] for row in session.execute(text(FOLLOW_CHANGES_QUERY), block_range)],
+    )
+
+    activity = session.execute(
+        text(NEW_FEED_ACTIVITY_QUERY),
+        {
+            **block_range,
+            "since": datetime.utcnow() - timedelta(days=FEED_WINDOW_DAYS),
+        },
+    ).fetchall()
+
+    num_inboxes = 0
+    if activity:
+        followers_by_user_id: DefaultDict[int, List[int]] = defaultdict(list)
+        for followee_user_id, follower_user_id in session.execute(
+            text(FEED_FOLLOWERS_QUERY),
+            {
+                "user_ids": list({row.user_id for row in activity}),
+                "max_followers": FEED_FANOUT_MAX_FOLLOWERS,
+            },
+        ):
+            followers_by_user_id[followee_user_id].append(follower_user_id)
+
+        originals: DefaultDict[int, List[FeedEntry]] = defaultdict(list)
+        reposts: DefaultDict[int, List[FeedEntry]] = defaultdict(list)
+        for row in activity:
+            entries = reposts if row.is_repost else originals
+            entry = (to_feed_score(row.created_at), row.item_key)
+            for follower_user_id in followers_by_user_id[row.user_id]:
+                entries[follower_user_id].append(entry)
+
+        num_inboxes = add_to_feed_inboxes(redis, originals, reposts)
+
+    save_indexed_checkpoint(session, FEED_INBOXES_CHECKPOINT_NAME, current_blocknumber)
+    return num_inboxes
+
+
+# ####### CELERY TASKS ####### #
+@celery.task(name="index_feed_inboxes", bind=True)
+@save_duration_metric(metric_group="celery_task")
+def index_feed_inboxes(self):
+    db = index_feed_inboxes.db
+    redis = index_feed_inboxes.redis
+    have_lock = False
+    update_lock = redis.lock(INDEX_FEED_INBOXES_LOCK, timeout=60 * 10)
+    try:
+        have_lock = update_lock.acquire(blocking=False)
+        if have_lock:
+            start_time = time.time()
+            with db.scoped_session() as session:
+                num_inboxes = _index_feed_inboxes(session, redis)
+            logger.debug(
+                f"index_feed_inboxes.py | Fanned out to {num_inboxes} inboxes in: {time.time()-start_time} sec"
+            )
+        else:
+            logger.debug("index_feed_inboxes.py | Failed to acquire lock")
+    except Exception as e:
+        logger.error("index_feed_inboxes.py | Fatal error in main loop", exc_info=True)
+        raise e
+    finally:
+        if have_lock:
+            update_lock.release()
@@ -1,10 +1,8 @@
 import logging
 import time
-from typing import List
 
-from sqlalchemy import desc, func
+from sqlalchemy import func, text
 
-from src.models.social.hourly_play_counts import HourlyPlayCount
 from src.models.social.play import Play
 from src.tasks.celery_app import celery
 from src.utils.prometheus_metric import save_duration_metric
@@ -17,51 +15,52 @@ logger = logging.getLogger(__name__)
 
 HOURLY_PLAY_COUNTS_TABLE_NAME = "hourly_play_counts"
 
+# max number of play ids counted per run, so catching up on a large backlog
+# is spread across runs instead of holding the lock for minutes
+MAX_PLAYS_PER_RUN = 500_000
+
+# counts every hourly bucket of plays in (prev_checkpoint, new_checkpoint]
+# and upserts them in a single statement
 UPSERT_HOURLY_PLAY_COUNTS_QUERY = """
     INSERT INTO hourly_play_counts (hourly_timestamp, play_count)
-    VALUES(:hourly_timestamp, :play_count)
+    SELECT date_trunc('hour', created_at) AS hourly_timestamp, count(*) AS play_count
+    FROM plays
+    WHERE id > :prev_checkpoint
+    AND id <= :new_checkpoint
+    GROUP BY 1
     ON CONFLICT (hourly_timestamp)
     DO UPDATE SET play_count = hourly_play_counts.play_count + EXCLUDED.play_count;
     """
 
 
-def _index_hourly_play_counts(session):
+def _index_hourly_play_counts(session, max_plays_per_run=MAX_PLAYS_PER_RUN):
     # get checkpoints
     prev_id_checkpoint = get_last_indexed_checkpoint(
         session, HOURLY_PLAY_COUNTS_TABLE_NAME
     )
 
-    new_id_checkpoint = (session.query(func.max(Play.id))).scalar()
+    max_play_id = (session.query(func.max(Play.id))).scalar()
 
-    if not new_id_checkpoint or new_id_checkpoint == prev_id_checkpoint:
+    if not max_play_id or max_play_id == prev_id_checkpoint:
         logger.debug(
             "index_hourly_play_counts.py | Skip update because there are no new plays"
         )
         return
 
-    # get play counts in hourly buckets
-    hourly_play_counts: List[HourlyPlayCount] = (
-        session.query(
-            func.date_trunc("hour", Play.created_at).label("hourly_timestamp"),
-            func.count(Play.id).label("play_count"),
-        )
-        .filter(Play.id > prev_id_checkpoint)
-        .filter(Play.id <= new_id_checkpoint)
-        .group_by(func.date_trunc("hour", Play.created_at))
-        .order_by(desc("hourly_timestamp"))
-        .all()
+    new_id_checkpoint = min(max_play_id, prev_id_checkpoint + max_plays_per_run)
+
+    session.execute(
+        text(UPSERT_HOURLY_PLAY_COUNTS_QUERY),
+        {
+            "prev_checkpoint": prev_id_checkpoint,
+            "new_checkpoint": new_id_checkpoint,
+        },
     )
 
-    # upsert hourly play count
-    # on first population, this will execute an insert for each hour
-    # subsequent updates should include 1 or 2 upserts
-    for hourly_play_count in hourly_play_counts:
-        session.execute(
-            UPSERT_HOURLY_PLAY_COUNTS_QUERY,
-            {
-                "hourly_timestamp": hourly_play_count.hourly_timestamp,
-                "play_count": hourly_play_count.play_count,
-            },
+    if new_id_checkpoint < max_play_id:
+        logger.info(
+            f"index_hourly_play_counts.py | Caught up to play {new_id_checkpoint} "
+            f"of {max_play_id}"
         )
 
     # update with new checkpoint
@@ -1,6 +1,8 @@
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
 
 import requests
 
@@ -34,6 +36,11 @@ logger = logging.getLogger(__name__)
 
 discovery_node_service_type = bytes("discovery-node", "utf-8")
 
+# number of discovery nodes fetched from at once
+FETCH_CONCURRENCY = 16
+# seconds to wait on all nodes before merging what has been fetched so far
+FETCH_DEADLINE_SECONDS = 15
+
 
 def get_metrics(endpoint: str, start_time: int):
     try:
@@ -71,6 +78,27 @@ def get_metrics(endpoint: str, start_time: int):
         return None, None
 
 
+def fetch_from_nodes(
+    fetch: Callable[[str], Any], endpoints: List[str]
+) -> Dict[str, Any]:
+    """
+    Calls fetch for each endpoint concurrently and returns the results by endpoint.
+    Nodes that have not answered within FETCH_DEADLINE_SECONDS are left out.
+    """
+    if not endpoints:
+        return {}
+    executor = ThreadPoolExecutor(max_workers=min(FETCH_CONCURRENCY, len(endpoints)))
+    futures = {executor.submit(fetch, endpoint): endpoint for endpoint in endpoints}
+    done, not_done = wait(futures, timeout=FETCH_DEADLINE_SECONDS)
+    # Don't wait on the stragglers, their results are dropped
+    executor.shutdown(wait=False, cancel_futures=True)
+    for future in not_done:
+        logger.warning(
+            f"index_metrics.py | {futures[future]} did not respond within {FETCH_DEADLINE_SECONDS}s"
+        )
+    return {futures[future]: future.result() for future in done}
+
+
 def consolidate_metrics_from_other_nodes(self, db, redis):
     """
     Get recent route and app metrics from all other discovery nodes
@@ -79,10 +107,10 @@ def consolidate_metrics_from_other_nodes(self, db, redis):
     """
     all_nodes = get_all_discovery_nodes_cached(redis) or []
 
-    visited_node_timestamps_str = redis.get(metrics_visited_nodes)
-    visited_node_timestamps = (
-        json.loads(visited_node_timestamps_str) if visited_node_timestamps_str else {}
-    )
+    visited_node_timestamps = {
+        node.decode(): timestamp.decode()
+        for node, timestamp in redis.hgetall(metrics_visited_nodes).items()
+    }
 
     now = datetime.utcnow()
     one_iteration_ago = now - timedelta(minutes=METRICS_INTERVAL)
@@ -121,50 +149,68 @@ def consolidate_metrics_from_other_nodes(self, db, redis):
                 else:
                     new_personal_app_metrics[app_name] = count
 
-    # Merge route metrics with other nodes and separately persist personal metrics
-    are_personal_metrics = True
-    merge_route_metrics(new_personal_route_metrics, end_time, db, are_personal_metrics)
-    merge_app_metrics(new_personal_app_metrics, end_time, db)
-
-    # Merge & persist metrics for other nodes
-    for node in all_nodes:
+    # Fetch metrics from other nodes since they were last visited
+    other_nodes = [
+        node["endpoint"]
+        for node in all_nodes
         # Skip self
-        if node["delegateOwnerWallet"] == shared_config["delegate"]["owner_wallet"]:
-            continue
-        start_time_str = (
-            visited_node_timestamps[node["endpoint"]]
-            if node["endpoint"] in visited_node_timestamps
-            else one_iteration_ago_str
-        )
+        if node["delegateOwnerWallet"] != shared_config["delegate"]["owner_wallet"]
+    ]
+    start_times = {}
+    for endpoint in other_nodes:
+        start_time_str = visited_node_timestamps.get(endpoint, one_iteration_ago_str)
         start_time_obj = datetime.strptime(start_time_str, datetime_format_secondary)
-        start_time = int(start_time_obj.timestamp())
-        new_route_metrics, new_app_metrics = get_metrics(node["endpoint"], start_time)
+        start_times[endpoint] = int(start_time_obj.timestamp())
+    node_metrics = fetch_from_nodes(
+        lambda endpoint: get_metrics(endpoint, start_times[endpoint]), other_nodes
+    )
 
-        logger.debug(
-            f"did attempt to receive route and app metrics from {node} at {start_time_obj} ({start_time})"
+    new_visited_node_timestamps = {}
+    with db.scoped_session() as session:
+        # Merge route metrics with other nodes and separately persist personal metrics
+        are_personal_metrics = True
+        merge_route_metrics(
+            new_personal_route_metrics, end_time, session, are_personal_metrics
         )
+        merge_app_metrics(new_personal_app_metrics, end_time, session)
+
+        # Merge & persist metrics for other nodes
+        for endpoint in other_nodes:
+            new_route_metrics, new_app_metrics = node_metrics.get(
+                endpoint, (None, None)
+            )
 
-        # add other nodes' summed unique daily and monthly counts to this node's
-        if new_route_metrics:
             logger.debug(
-                f"summed unique metrics from {node}: {new_route_metrics['summed']}"
+                f"did attempt to receive route and app metrics from {endpoint} since {start_times[endpoint]}"
+            )
+
+            # add other nodes' summed unique daily and monthly counts to this node's
+            if new_route_metrics:
+                logger.debug(
+                    f"summed unique metrics from {endpoint}: {new_route_metrics['summed']}"
+                )
+                summed_unique_daily_count += new_route_metrics["summed"]["daily"]
+                summed_unique_monthly_count += new_route_metrics["summed"]["monthly"]
+                new_route_metrics = new_route_metrics["deduped"]
+
+            are_personal_metrics = False
+            merge_route_metrics(
+                new_route_metrics or {}, end_time, session, are_personal_metrics
             )
-            summed_unique_daily_count += new_route_metrics["summed"]["daily"]
-            summed_unique_monthly_count += new_route_metrics["summed"]["monthly"]
-            new_route_metrics = new_route_metrics["deduped"]
+            merge_app_metrics(new_app_metrics or {}, end_time, session)
 
-        are_personal_metrics = False
-        merge_route_metrics(new_route_metrics or {}, end_time, db, are_personal_metrics)
-        merge_app_metrics(new_app_metrics or {}, end_time, db)
+            if new_route_metrics is not None and new_app_metrics is not None:
+                new_visited_node_timestamps[endpoint] = end_time
 
-        if new_route_metrics is not None and new_app_metrics is not None:
-            visited_node_timestamps[node["endpoint"]] = end_time
-            redis.set(metrics_visited_nodes, json.dumps(visited_node_timestamps))
+        # persist updated summed unique counts
+        persist_summed_unique_counts(
+            session, end_time, summed_unique_daily_count, summed_unique_monthly_count
+        )
 
-    # persist updated summed unique counts
-    persist_summed_unique_counts(
-        db, end_time, summed_unique_daily_count, summed_unique_monthly_count
-    )
+    # Only move the cursors once the merged metrics are committed
+    if new_visited_node_timestamps:
+        redis.hset(metrics_visited_nodes, mapping=new_visited_node_timestamps)
+    visited_node_timestamps.update(new_visited_node_timestamps)
 
     logger.debug(f"visited node timestamps: {visited_node_timestamps}")
 
@@ -226,10 +272,11 @@ def update_historical_metrics(
     daily_app_metrics,
     monthly_app_metrics,
 ):
-    update_historical_daily_route_metrics(db, daily_route_metrics)
-    update_historical_monthly_route_metrics(db, monthly_route_metrics)
-    update_historical_daily_app_metrics(db, daily_app_metrics)
-    update_historical_monthly_app_metrics(db, monthly_app_metrics)
+    with db.scoped_session() as session:
+        update_historical_daily_route_metrics(session, daily_route_metrics)
+        update_historical_monthly_route_metrics(session, monthly_route_metrics)
+        update_historical_daily_app_metrics(session, daily_app_metrics)
+        update_historical_monthly_app_metrics(session, monthly_app_metrics)
 
 
 def synchronize_all_node_metrics(self, db, redis):
@@ -242,11 +289,11 @@ def synchronize_all_node_metrics(self, db, redis):
     daily_app_metrics = {}
     monthly_app_metrics = {}
     all_nodes = get_all_discovery_nodes_cached(redis) or []
-    for node in all_nodes:
-        historical_metrics = get_historical_metrics(node["endpoint"])
-        logger.debug(
-            f"got historical metrics from {node['endpoint']}: {historical_metrics}"
-        )
+    endpoints = [node["endpoint"] for node in all_nodes]
+    node_historical_metrics = fetch_from_nodes(get_historical_metrics, endpoints)
+    for endpoint in endpoints:
+        historical_metrics = node_historical_metrics.get(endpoint)
+        logger.debug(f"got historical metrics from {endpoint}: {historical_metrics}")
         if historical_metrics:
             update_route_metrics_count(
                 daily_route_metrics, historical_metrics["routes"]["daily"]
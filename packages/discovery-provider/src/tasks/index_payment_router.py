@@ -1037,6 +1037,7 @@ def index_payment_router(self):
                 redis_keys.solana.payment_router.last_completed_at,
                 datetime.now(timezone.utc).timestamp(),
             )
+            index_payment_router.solana_client_manager.cache_endpoint_stats(redis)
         else:
             logger.debug("index_payment_router.py | Failed to acquire lock")
 
@@ -652,6 +652,7 @@ def index_rewards_manager(self):
                 redis_keys.solana.reward_manager.last_completed_at,
                 datetime.now(timezone.utc).timestamp(),
             )
+            index_rewards_manager.solana_client_manager.cache_endpoint_stats(redis)
         else:
             logger.debug("index_rewards_manager.py | Failed to acquire lock")
     except Exception as e:
@@ -636,6 +636,7 @@ def index_spl_token(self):
                 redis_keys.solana.spl_token.last_completed_at,
                 datetime.now(timezone.utc).timestamp(),
             )
+            index_spl_token.solana_client_manager.cache_endpoint_stats(redis)
     except Exception as e:
         logger.error("index_spl_token.py | Fatal error in main loop", exc_info=True)
         raise e
@@ -802,6 +802,7 @@ def index_user_bank(self):
                 redis_keys.solana.user_bank.last_completed_at,
                 datetime.now(timezone.utc).timestamp(),
             )
+            index_user_bank.solana_client_manager.cache_endpoint_stats(redis)
         else:
             logger.debug("index_user_bank.py | Failed to acquire lock")
 
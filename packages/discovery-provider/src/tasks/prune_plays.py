@@ -1,15 +1,30 @@
+import csv
+import gzip
 import logging
+import os
 import time
 from datetime import datetime, timedelta
+from typing import List, Optional
 
-from sqlalchemy import text
+from sqlalchemy import event, text
 
 from src.tasks.celery_app import celery
-from src.utils.prometheus_metric import save_duration_metric
+from src.utils.config import shared_config
+from src.utils.prometheus_metric import (
+    PrometheusMetric,
+    PrometheusMetricNames,
+    save_duration_metric,
+)
 
 logger = logging.getLogger(__name__)
 
-PLAYS_ARCHIVE_TABLE_NAME = "plays_archive"
+# Plays older than the retention window are pruned. The cutoff is computed
+# on every run so the window slides forward with the worker.
+DEFAULT_RETENTION_DAYS = int(shared_config["discprov"]["plays_retention_days"])
+
+# When set, pruned plays are written to gzip'd csv files in this directory
+# before they are removed
+PLAYS_ARCHIVE_DIR = shared_config["discprov"]["plays_archive_dir"] or None
 
 PRUNE_PLAYS_QUERY = """
     with to_prune as (
@@ -23,38 +38,148 @@ PRUNE_PLAYS_QUERY = """
             plays.created_at asc
         limit
             :max_batch
+    ),
+    pruned as (
+        delete from
+            plays
+        where
+            id in (select id from to_prune)
+        returning
+            plays.*
     )
-    delete from
-        plays
-    where
-        id in (select id from to_prune)
     """
 
-# Prune up to the cutoff date
-# start at all plays before 2020 (328751 total)
-# TODO move to a sliding window
-current_date = datetime.now()
-year_before_current_date = current_date - timedelta(days=400)
-DEFAULT_CUTOFF_TIMESTAMP = datetime.fromisoformat(year_before_current_date.isoformat())
+PRUNED_BYTES_QUERY = (
+    PRUNE_PLAYS_QUERY
+    + """
+    select
+        coalesce(sum(pg_column_size(pruned.*)), 0) as pruned_bytes
+    from
+        pruned
+    """
+)
+
+PRUNED_ROWS_QUERY = (
+    PRUNE_PLAYS_QUERY
+    + """
+    select
+        pruned.*,
+        pg_column_size(pruned.*) as pruned_bytes
+    from
+        pruned
+    order by
+        pruned.id asc
+    """
+)
 
 # max number of plays to prune per run
 # 50000 max * 8 runs a day = 400000 plays per day
 DEFAULT_MAX_BATCH = 50000
 
 
+def get_prune_cutoff_timestamp(retention_days: int = DEFAULT_RETENTION_DAYS):
+    return datetime.now() - timedelta(days=retention_days)
+
+
+def _record_bytes_deleted(num_bytes: int):
+    # pg_column_size of the deleted rows. The space only becomes reusable
+    # after vacuum, and the relation itself does not shrink.
+    PrometheusMetric(PrometheusMetricNames.PRUNE_PLAYS_BYTES_DELETED_TOTAL).save(
+        num_bytes
+    )
+
+
+def _run_after_transaction(session, on_commit, on_rollback):
+    """Runs on_commit once the session commits, or on_rollback if it rolls back"""
+    done = False
+
+    def after_commit(_session):
+        nonlocal done
+        if not done:
+            done = True
+            on_commit()
+
+    def after_rollback(_session):
+        nonlocal done
+        if not done:
+            done = True
+            on_rollback()
+
+    event.listen(session, "after_commit", after_commit)
+    event.listen(session, "after_rollback", after_rollback)
+
+
+def _stage_archive(session, archive_dir: str, name: str, columns: List[str], rows):
+    """
+    Writes rows to <archive_dir>/<name>.csv.gz.tmp, and moves it to
+    <archive_dir>/<name>.csv.gz only once the session commits, so an archive
+    never holds plays whose delete was rolled back.
+    Returns the number of rows.
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f"{name}.csv.gz")
+    tmp_path = f"{path}.tmp"
+    num_rows = 0
+    with gzip.open(tmp_path, "wt", newline="") as archive:
+        writer = csv.writer(archive)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow(row)
+            num_rows += 1
+
+    def publish():
+        os.replace(tmp_path, path)
+        logger.info(f"prune_plays.py | Archived {num_rows} plays to {path}")
+
+    def discard():
+        os.remove(tmp_path)
+        logger.warning(f"prune_plays.py | Discarded {tmp_path} after rollback")
+
+    _run_after_transaction(session, publish, discard)
+    return num_rows
+
+
+def _delete_expired_plays(
+    session, cutoff_timestamp: datetime, max_batch: int, archive_dir: Optional[str]
+):
+    """Deletes at most max_batch plays before the cutoff"""
+    params = {"cutoff_timestamp": cutoff_timestamp, "max_batch": max_batch}
+    if not archive_dir:
+        pruned_bytes = session.execute(text(PRUNED_BYTES_QUERY), params).scalar()
+    else:
+        result = session.execute(text(PRUNED_ROWS_QUERY), params)
+        columns = [column for column in result.keys() if column != "pruned_bytes"]
+        rows = result.fetchall()
+        pruned_bytes = sum(row["pruned_bytes"] for row in rows)
+        if rows:
+            _stage_archive(
+                session,
+                archive_dir,
+                f"plays_{rows[0]['id']}_{rows[-1]['id']}",
+                columns,
+                ([row[column] for column in columns] for row in rows),
+            )
+
+    if pruned_bytes:
+        _record_bytes_deleted(pruned_bytes)
+    return pruned_bytes
+
+
 def _prune_plays(
     session,
-    cutoff_timestamp=DEFAULT_CUTOFF_TIMESTAMP,
+    cutoff_timestamp: Optional[datetime] = None,
     max_batch=DEFAULT_MAX_BATCH,
+    archive_dir: Optional[str] = PLAYS_ARCHIVE_DIR,
 ):
-    # archive and prune plays at most max_batch plays before cutoff_timestamp
-    session.execute(
-        text(PRUNE_PLAYS_QUERY),
-        {
-            "cutoff_timestamp": cutoff_timestamp,
-            "max_batch": max_batch,
-        },
-    )
+    """
+    Prunes at most max_batch plays created before cutoff_timestamp, defaulting
+    to the retention window ending now.
+    Returns the number of bytes of plays deleted.
+    """
+    if cutoff_timestamp is None:
+        cutoff_timestamp = get_prune_cutoff_timestamp()
+
+    return _delete_expired_plays(session, cutoff_timestamp, max_batch, archive_dir)
 
 
 # ####### CELERY TASKS ####### #
@@ -78,10 +203,10 @@ def prune_plays(self):
             logger.debug("prune_plays.py | Started pruning plays")
 
             with db.scoped_session() as session:
-                _prune_plays(session)
+                deleted_bytes = _prune_plays(session)
 
             logger.debug(
-                f"prune_plays.py | Finished pruning in: {time.time()-start_time} sec"
+                f"prune_plays.py | Finished pruning {deleted_bytes} bytes in: {time.time()-start_time} sec"
             )
         else:
             logger.debug("prune_plays.py | Failed to acquire prune_plays_lock")
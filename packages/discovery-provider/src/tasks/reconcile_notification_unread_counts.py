@@ -0,0 +1,160 @@
+import json
+import logging
+import time
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.orm.session import Session
+
+from src.models.notifications.notification import NotificationUnreadCount
+from src.queries.get_notifications import (
+    NOTIFICATION_UNREAD_COUNTS_PENDING_KEY,
+    NotificationType,
+    get_unread_notification_counts_by_type,
+)
+from src.tasks.celery_app import celery
+from src.utils.prometheus_metric import save_duration_metric
+
+logger = logging.getLogger(__name__)
+
+RECONCILE_NOTIFICATION_UNREAD_COUNTS_LOCK = "reconcile_notification_unread_counts_lock"
+
+# max number of users whose counts are created per run
+MAX_PENDING_USERS_PER_RUN = 1000
+# max number of dirty users whose counts are recounted per run, oldest first
+RECONCILE_BATCH_SIZE = 1000
+
+# Created dirty, since notifications committed while counting are not seen by
+# the count nor by the triggers until the row exists
+INSERT_NOTIFICATION_UNREAD_COUNTS_QUERY = """
+    INSERT INTO notification_unread_counts
+        (user_id, seen_at, counts, reconciled_at, dirty_at)
+    VALUES (:user_id, :seen_at, cast(:counts as jsonb), :now, :now)
+    ON CONFLICT (user_id) DO NOTHING;
+    """
+
+# Locks the row so that triggers incrementing it wait for the recount
+LOCK_DIRTY_NOTIFICATION_UNREAD_COUNTS_QUERY = """
+    SELECT user_id
+    FROM notification_unread_counts
+    WHERE user_id = :user_id AND dirty_at IS NOT NULL
+    FOR UPDATE;
+    """
+
+UPDATE_NOTIFICATION_UNREAD_COUNTS_QUERY = """
+    UPDATE notification_unread_counts
+    SET
+        seen_at = :seen_at,
+        counts = cast(:counts as jsonb),
+        reconciled_at = :now,
+        dirty_at = NULL
+    WHERE user_id = :user_id;
+    """
+
+
+def _count_notification_unread_counts(session: Session, user_id: int):
+    """
+    Counts the unread notification groups of user_id for
+    notification_unread_counts. Announcements are counted on read instead.
+    """
+    seen_at, counts = get_unread_notification_counts_by_type(session, user_id)
+    counts.pop(str(NotificationType.ANNOUNCEMENT), None)
+    return {"user_id": user_id, "seen_at": seen_at, "counts": json.dumps(counts)}
+
+
+def _recount_notification_unread_counts(session: Session, user_id: int) -> bool:
+    """
+    Replaces the counts of user_id with counts from the notification table if
+    the row is dirty, and commits. The row is locked from before counting until
+    the commit, so no trigger increment is overwritten.
+    """
+    is_dirty = session.execute(
+        text(LOCK_DIRTY_NOTIFICATION_UNREAD_COUNTS_QUERY), {"user_id": user_id}
+    ).first()
+    if is_dirty:
+        session.execute(
+            text(UPDATE_NOTIFICATION_UNREAD_COUNTS_QUERY),
+            {
+                **_count_notification_unread_counts(session, user_id),
+                "now": datetime.utcnow(),
+            },
+        )
+    session.commit()
+    return bool(is_dirty)
+
+
+def _reconcile_notification_unread_counts(
+    session: Session,
+    redis,
+    max_pending_users=MAX_PENDING_USERS_PER_RUN,
+    batch_size=RECONCILE_BATCH_SIZE,
+):
+    """
+    Creates counts for users that read their unread count without having
+    counts, then recounts the dirty rows, oldest first.
+    Returns the number of users counted.
+    """
+    pending_user_ids = [
+        int(user_id)
+        for user_id in redis.spop(
+            NOTIFICATION_UNREAD_COUNTS_PENDING_KEY, max_pending_users
+        )
+        or []
+    ]
+    now = datetime.utcnow()
+    for user_id in pending_user_ids:
+        session.execute(
+            text(INSERT_NOTIFICATION_UNREAD_COUNTS_QUERY),
+            {**_count_notification_unread_counts(session, user_id), "now": now},
+        )
+    session.commit()
+
+    dirty_user_ids = [
+        user_id
+        for (user_id,) in session.query(NotificationUnreadCount.user_id)
+        .filter(
+            NotificationUnreadCount.dirty_at != None,
+            # recounted next run, once the triggers maintain their rows
+            NotificationUnreadCount.user_id.notin_(pending_user_ids),
+        )
+        .order_by(NotificationUnreadCount.dirty_at, NotificationUnreadCount.user_id)
+        .limit(batch_size)
+        .all()
+    ]
+    num_recounted = sum(
+        _recount_notification_unread_counts(session, user_id)
+        for user_id in dirty_user_ids
+    )
+    return len(pending_user_ids) + num_recounted
+
+
+# ####### CELERY TASKS ####### #
+@celery.task(name="reconcile_notification_unread_counts", bind=True)
+@save_duration_metric(metric_group="celery_task")
+def reconcile_notification_unread_counts(self):
+    db = reconcile_notification_unread_counts.db
+    redis = reconcile_notification_unread_counts.redis
+    have_lock = False
+    update_lock = redis.lock(RECONCILE_NOTIFICATION_UNREAD_COUNTS_LOCK, timeout=60 * 10)
+    try:
+        have_lock = update_lock.acquire(blocking=False)
+        if have_lock:
+            start_time = time.time()
+            with db.scoped_session() as session:
+                num_users = _reconcile_notification_unread_counts(session, redis)
+            logger.debug(
+                f"reconcile_notification_unread_counts.py | Counted {num_users} users in: {time.time()-start_time} sec"
+            )
+        else:
+            logger.debug(
+                "reconcile_notification_unread_counts.py | Failed to acquire lock"
+            )
+    except Exception as e:
+        logger.error(
+            "reconcile_notification_unread_counts.py | Fatal error in main loop",
+            exc_info=True,
+        )
+        raise e
+    finally:
+        if have_lock:
+            update_lock.release()
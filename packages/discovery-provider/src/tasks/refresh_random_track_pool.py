@@ -0,0 +1,89 @@
+import logging
+import time
+
+from sqlalchemy import text
+from sqlalchemy.orm.session import Session
+
+from src.tasks.celery_app import celery
+from src.utils.prometheus_metric import save_duration_metric
+
+logger = logging.getLogger(__name__)
+
+REFRESH_RANDOM_TRACK_POOL_LOCK = "refresh_random_track_pool_lock"
+
+# Tracks eligible for get_random_tracks, see 0169_random_track_pool.sql
+RANDOM_TRACK_POOL_QUERY = """
+    SELECT
+        row_number() OVER (ORDER BY au.follower_count DESC, t.track_id ASC) AS ordinal,
+        t.track_id,
+        au.follower_count
+    FROM tracks t
+    JOIN aggregate_user au ON au.user_id = t.owner_id
+    WHERE t.is_current IS TRUE
+        AND t.is_delete IS FALSE
+        AND t.is_unlisted IS FALSE
+        AND t.stem_of IS NULL
+    """
+
+# Ordinals shift whenever a track is added or an owner's follower count
+# changes, so most rows change each refresh. The pool is built into a new
+# table instead of updated in place, and get_random_tracks keeps reading the
+# previous pool until the swap.
+BUILD_RANDOM_TRACK_POOL_QUERY = f"""
+    CREATE TABLE random_track_pool_next AS {RANDOM_TRACK_POOL_QUERY};
+    CREATE UNIQUE INDEX idx_random_track_pool_next_ordinal
+    ON random_track_pool_next (ordinal);
+    CREATE INDEX idx_random_track_pool_next_follower_count
+    ON random_track_pool_next (follower_count, ordinal DESC);
+    ANALYZE random_track_pool_next;
+    """
+
+# Dropping the previous pool waits for the queries reading it. Give up
+# rather than queue get_random_tracks behind the swap for long.
+SWAP_RANDOM_TRACK_POOL_QUERY = """
+    SET LOCAL lock_timeout = '10s';
+    DROP TABLE random_track_pool;
+    ALTER TABLE random_track_pool_next RENAME TO random_track_pool;
+    ALTER INDEX idx_random_track_pool_next_ordinal
+    RENAME TO idx_random_track_pool_ordinal;
+    ALTER INDEX idx_random_track_pool_next_follower_count
+    RENAME TO idx_random_track_pool_follower_count;
+    """
+
+
+def _refresh_random_track_pool(session: Session):
+    """
+    Rebuilds random_track_pool and swaps it in, in the session's transaction,
+    so a failed refresh leaves the previous pool in place
+    """
+    session.execute(text(BUILD_RANDOM_TRACK_POOL_QUERY))
+    session.execute(text(SWAP_RANDOM_TRACK_POOL_QUERY))
+
+
+# ####### CELERY TASKS ####### #
+@celery.task(name="refresh_random_track_pool", bind=True)
+@save_duration_metric(metric_group="celery_task")
+def refresh_random_track_pool(self):
+    db = refresh_random_track_pool.db
+    redis = refresh_random_track_pool.redis
+    have_lock = False
+    update_lock = redis.lock(REFRESH_RANDOM_TRACK_POOL_LOCK, timeout=60 * 30)
+    try:
+        have_lock = update_lock.acquire(blocking=False)
+        if have_lock:
+            start_time = time.time()
+            with db.scoped_session() as session:
+                _refresh_random_track_pool(session)
+            logger.info(
+                f"refresh_random_track_pool.py | Refreshed random track pool in: {time.time()-start_time} sec"
+            )
+        else:
+            logger.debug("refresh_random_track_pool.py | Failed to acquire lock")
+    except Exception as e:
+        logger.error(
+            "refresh_random_track_pool.py | Fatal error in main loop", exc_info=True
+        )
+        raise e
+    finally:
+        if have_lock:
+            update_lock.release()
@@ -0,0 +1,171 @@
+import logging
+import time
+from datetime import datetime
+from typing import List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm.session import Session
+
+from src.models.users.related_artist import RelatedArtistsState
+from src.queries.get_related_artists import MAX_RELATED_ARTISTS
+from src.tasks.celery_app import celery
+from src.utils.prometheus_metric import save_duration_metric
+
+logger = logging.getLogger(__name__)
+
+REFRESH_RELATED_ARTISTS_LOCK = "refresh_related_artists_lock"
+
+# max number of artists marked stale by the triggers refreshed per run, in the
+# order they were marked
+STALE_BATCH_SIZE = 500
+# number of least recently refreshed artists refreshed per run, so that changes
+# to their related artists' follower counts and genres are picked up eventually
+SWEEP_BATCH_SIZE = 100
+
+DELETE_RELATED_ARTISTS_QUERY = """
+    DELETE FROM related_artists WHERE user_id = ANY(:user_ids);
+    """
+
+# Same ranking as _genre_based_sql in get_related_artists, for many artists
+INSERT_RELATED_ARTISTS_QUERY = """
+    INSERT INTO related_artists
+        (user_id, related_artist_user_id, score, rank, created_at)
+    SELECT
+        a.user_id,
+        r.user_id,
+        r.follower_count,
+        row_number() OVER (
+            PARTITION BY a.user_id
+            ORDER BY r.genre_rank ASC, r.follower_count DESC, r.user_id ASC
+        ),
+        :now
+    FROM unnest(cast(:user_ids AS integer[])) AS a(user_id)
+    CROSS JOIN LATERAL (
+        SELECT au.user_id, au.follower_count, g.genre_rank
+        FROM (
+            SELECT
+                genre,
+                rank() OVER (ORDER BY count(*) DESC) AS genre_rank
+            FROM tracks t
+            WHERE t.is_current IS TRUE
+                AND t.is_delete IS FALSE
+                AND t.is_unlisted IS FALSE
+                AND t.is_available IS TRUE
+                AND t.stem_of IS NULL
+                AND t.owner_id = a.user_id
+            GROUP BY genre
+            ORDER BY count(*) DESC, genre
+            LIMIT 5
+        ) g
+        JOIN aggregate_user au
+            ON au.dominant_genre = g.genre
+            AND au.follower_count < (
+                SELECT follower_count * 3
+                FROM aggregate_user
+                WHERE user_id = a.user_id
+            )
+        WHERE au.user_id != a.user_id
+        ORDER BY g.genre_rank ASC, au.follower_count DESC, au.user_id ASC
+        LIMIT :max_related_artists
+    ) r;
+    """
+
+# Only clears artists that were not marked again since they were selected. A
+# mark made meanwhile bumps changed_at, and this update waits on the row lock
+# of a mark that has not committed yet.
+MARK_REFRESHED_QUERY = """
+    UPDATE related_artists_state
+    SET is_stale = false, refreshed_at = :now
+    FROM unnest(
+        cast(:user_ids AS integer[]),
+        cast(:changed_ats AS timestamp[])
+    ) AS refreshed(user_id, changed_at)
+    WHERE related_artists_state.user_id = refreshed.user_id
+        AND related_artists_state.changed_at = refreshed.changed_at;
+    """
+
+
+def _refresh_related_artists_for(session: Session, artists: List[Tuple[int, datetime]]):
+    """Recomputes the related artists of (user_id, changed_at) artists"""
+    if not artists:
+        return
+    user_ids = [user_id for user_id, _ in artists]
+    now = datetime.utcnow()
+    session.execute(text(DELETE_RELATED_ARTISTS_QUERY), {"user_ids": user_ids})
+    session.execute(
+        text(INSERT_RELATED_ARTISTS_QUERY),
+        {
+            "user_ids": user_ids,
+            "now": now,
+            "max_related_artists": MAX_RELATED_ARTISTS,
+        },
+    )
+    session.execute(
+        text(MARK_REFRESHED_QUERY),
+        {
+            "user_ids": user_ids,
+            "changed_ats": [changed_at for _, changed_at in artists],
+            "now": now,
+        },
+    )
+
+
+def _refresh_related_artists(
+    session: Session,
+    stale_batch_size=STALE_BATCH_SIZE,
+    sweep_batch_size=SWEEP_BATCH_SIZE,
+):
+    """
+    Refreshes the related artists of artists whose track genres or follower
+    count changed, longest stale first, then of the least recently refreshed
+    artists.
+    Returns the number of artists refreshed.
+    """
+    stale_artists = (
+        session.query(RelatedArtistsState.user_id, RelatedArtistsState.changed_at)
+        .filter(RelatedArtistsState.is_stale == True)
+        .order_by(RelatedArtistsState.stale_at, RelatedArtistsState.user_id)
+        .limit(stale_batch_size)
+        .all()
+    )
+    sweep_artists = (
+        session.query(RelatedArtistsState.user_id, RelatedArtistsState.changed_at)
+        .filter(RelatedArtistsState.is_stale == False)
+        .order_by(RelatedArtistsState.refreshed_at)
+        .limit(sweep_batch_size)
+        .all()
+    )
+    artists = [
+        (user_id, changed_at) for user_id, changed_at in stale_artists + sweep_artists
+    ]
+    _refresh_related_artists_for(session, artists)
+    return len(artists)
+
+
+# ####### CELERY TASKS ####### #
+@celery.task(name="refresh_related_artists", bind=True)
+@save_duration_metric(metric_group="celery_task")
+def refresh_related_artists(self):
+    db = refresh_related_artists.db
+    redis = refresh_related_artists.redis
+    have_lock = False
+    update_lock = redis.lock(REFRESH_RELATED_ARTISTS_LOCK, timeout=60 * 10)
+    try:
+        have_lock = update_lock.acquire(blocking=False)
+        if have_lock:
+            start_time = time.time()
+            with db.scoped_session() as session:
+                num_artists = _refresh_related_artists(session)
+            logger.debug(
+                f"refresh_related_artists.py | Refreshed {num_artists} artists in: {time.time()-start_time} sec"
+            )
+        else:
+            logger.debug("refresh_related_artists.py | Failed to acquire lock")
+    except Exception as e:
+        logger.error(
+            "refresh_related_artists.py | Fatal error in main loop", exc_info=True
+        )
+        raise e
+    finally:
+        if have_lock:
+            update_lock.release()
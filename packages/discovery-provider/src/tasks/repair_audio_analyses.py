@@ -1,10 +1,12 @@
+import json
 import random
 import re
-from typing import List
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Set
 
 import requests
 from redis import Redis
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, text
 from sqlalchemy.orm import load_only
 from sqlalchemy.orm.session import Session
 
@@ -20,6 +22,29 @@ logger = StructuredLogger(__name__)
 REPAIR_AUDIO_ANALYSES_LOCK = "repair_audio_analyses_lock"
 DEFAULT_LOCK_TIMEOUT_SECONDS = 30 * 60  # 30 minutes
 BATCH_SIZE = 1000
+# number of tracks whose analyses are fetched at once
+FETCH_CONCURRENCY = 16
+REQUEST_TIMEOUT_SECONDS = 5
+# seconds before a slow node is hedged with the next node
+HEDGE_DELAY_SECONDS = 1
+
+# Fields missing from an update keep their current value
+UPDATE_TRACK_ANALYSES_QUERY = """
+    UPDATE tracks t
+    SET
+        musical_key = coalesce(u.musical_key, t.musical_key),
+        bpm = coalesce(u.bpm, t.bpm),
+        audio_analysis_error_count = coalesce(
+            u.audio_analysis_error_count, t.audio_analysis_error_count
+        )
+    FROM jsonb_to_recordset(cast(:updates as jsonb)) AS u(
+        track_id integer,
+        musical_key varchar,
+        bpm double precision,
+        audio_analysis_error_count integer
+    )
+    WHERE t.track_id = u.track_id AND t.is_current = true;
+"""
 
 
 def valid_musical_key(musical_key):
@@ -72,79 +97,138 @@ def select_content_nodes(redis: Redis):
     return random.sample(endpoints, min(5, len(endpoints)))
 
 
+def get_analysis_endpoint(node: str, track: Track) -> str:
+    if not track.audio_upload_id:
+        return f"{node}/tracks/legacy/{track.track_cid}/analysis"
+    return f"{node}/uploads/{track.audio_upload_id}"
+
+
+def fetch_json(endpoint: str):
+    resp = requests.get(endpoint, timeout=REQUEST_TIMEOUT_SECONDS)
+    resp.raise_for_status()
+    return resp.json()
+
+
+def fetch_analysis(
+    executor: ThreadPoolExecutor, track: Track, nodes: List[str]
+) -> Optional[Dict]:
+    """
+    Returns the analysis of the track from the first node that answers, or None.
+    Nodes are tried in order. The next node is tried as soon as one fails, or
+    alongside one that has not answered within HEDGE_DELAY_SECONDS.
+    """
+    queued = list(nodes)
+    pending: Set[Future] = set()
+
+    def launch():
+        node = queued.pop(0)
+        pending.add(executor.submit(fetch_json, get_analysis_endpoint(node, track)))
+
+    if not queued:
+        return None
+    launch()
+    while pending:
+        done, _ = wait(
+            pending,
+            timeout=HEDGE_DELAY_SECONDS if queued else None,
+            return_when=FIRST_COMPLETED,
+        )
+        for future in done:
+            pending.discard(future)
+            try:
+                return future.result()
+            except Exception:
+                # Fallback to another random content node
+                continue
+        # every finished request failed, or the pending ones are slow
+        if queued:
+            launch()
+    return None
+
+
+def fetch_analyses(tracks: List[Track], nodes: List[str]) -> List[Optional[Dict]]:
+    """Fetches the analyses of tracks, FETCH_CONCURRENCY tracks at a time"""
+    track_executor = ThreadPoolExecutor(max_workers=FETCH_CONCURRENCY)
+    # hedged requests may outlive their track, so requests get their own pool
+    request_executor = ThreadPoolExecutor(max_workers=FETCH_CONCURRENCY * 2)
+    try:
+        return list(
+            track_executor.map(
+                lambda track: fetch_analysis(request_executor, track, nodes), tracks
+            )
+        )
+    finally:
+        track_executor.shutdown(wait=False)
+        request_executor.shutdown(wait=False, cancel_futures=True)
+
+
+def get_track_update(track: Track, data: Dict) -> Optional[Dict]:
+    """Returns the analysis fields of track to update from the node response"""
+    legacy_track = not track.audio_upload_id
+    results_key = "results" if legacy_track else "audio_analysis_results"
+    error_count_key = "error_count" if legacy_track else "audio_analysis_error_count"
+    results = data.get(results_key, {})
+    if not results:
+        results = {}
+    error_count = data.get(error_count_key, 0)
+    key = results.get("key", None) or results.get("Key", None)
+    bpm = results.get("bpm", None) or results.get("BPM", None)
+
+    # Fill in missing analysis results and err count if present
+    update: Dict = {}
+    if key and not track.musical_key and not track.is_custom_musical_key:
+        if valid_musical_key(key):
+            update["musical_key"] = key
+    if bpm and not track.bpm and not track.is_custom_bpm:
+        if valid_bpm(bpm):
+            update["bpm"] = bpm
+    if error_count != track.audio_analysis_error_count:
+        update["audio_analysis_error_count"] = error_count
+
+    if error_count >= 3:
+        logger.warning(
+            f"repair_audio_analyses.py | Track ID {track.track_id} (track_cid: {track.track_cid}, audio_upload_id: {track.audio_upload_id}) failed audio analysis >= 3 times"
+        )
+    if not update:
+        return None
+    return {"track_id": track.track_id, **update}
+
+
 def repair(session: Session, redis: Redis):
     # Query batch of tracks that are missing key or bpm and have err counts < 3 from db
     tracks = query_tracks(session)
     session.commit()  # Close tx
     session.expunge_all()  # Detach all instances so they can be referenced without a session
 
+    # Only analyze streamable tracks
+    tracks = [track for track in tracks if track.track_cid]
     nodes = select_content_nodes(redis)
-    num_tracks_updated = 0
-    for track in tracks:
-        if not track.track_cid:
-            # Only analyze streamable tracks
+    analyses = fetch_analyses(tracks, nodes)
+
+    updates = []
+    for track, data in zip(tracks, analyses):
+        if data is None:
             continue
-        legacy_track = not track.audio_upload_id
-        for node in nodes:
-            try:
-                # Query random content node for the audio upload id
-                endpoint = (
-                    f"{node}/tracks/legacy/{track.track_cid}/analysis"
-                    if legacy_track
-                    else f"{node}/uploads/{track.audio_upload_id}"
-                )
-                resp = requests.get(endpoint, timeout=5)
-                resp.raise_for_status()
-                data = resp.json()
-            except Exception:
-                # Fallback to another random content node
-                continue
+        update = get_track_update(track, data)
+        if update:
+            updates.append(update)
 
-            results_key = "results" if legacy_track else "audio_analysis_results"
-            error_count_key = (
-                "error_count" if legacy_track else "audio_analysis_error_count"
+    if updates:
+        # Update all repaired tracks in one tx
+        try:
+            session.execute(
+                text(UPDATE_TRACK_ANALYSES_QUERY), {"updates": json.dumps(updates)}
             )
-            results = data.get(results_key, {})
-            if not results:
-                results = {}
-            error_count = data.get(error_count_key, 0)
-            key = results.get("key", None) or results.get("Key", None)
-            bpm = results.get("bpm", None) or results.get("BPM", None)
-
-            # Fill in missing analysis results and err count if present
-            track_updated = False
-            if key and not track.musical_key and not track.is_custom_musical_key:
-                if valid_musical_key(key):
-                    track_updated = True
-                    track.musical_key = key
-            if bpm and not track.bpm and not track.is_custom_bpm:
-                if valid_bpm(bpm):
-                    track_updated = True
-                    track.bpm = bpm
-            if error_count != track.audio_analysis_error_count:
-                track_updated = True
-                track.audio_analysis_error_count = error_count
-            if track_updated:
-                # Update track in a tx
-                try:
-                    session.merge(track)
-                    session.commit()
-                    num_tracks_updated += 1
-                except Exception as e:
-                    logger.error(
-                        f"repair_audio_analyses.py | Error committing track update for track ID {track.track_id}",
-                        exc_info=True,
-                    )
-                    raise e
-
-            if error_count >= 3:
-                logger.warning(
-                    f"repair_audio_analyses.py | Track ID {track.track_id} (track_cid: {track.track_cid}, audio_upload_id: {track.audio_upload_id}) failed audio analysis >= 3 times"
-                )
-            break
+            session.commit()
+        except Exception as e:
+            logger.error(
+                f"repair_audio_analyses.py | Error committing updates for {len(updates)} tracks",
+                exc_info=True,
+            )
+            raise e
 
     logger.info(
-        f"repair_audio_analyses.py | updated {num_tracks_updated} tracks. last track ID processed: {tracks[-1].track_id if len(tracks) > 0 else None}"
+        f"repair_audio_analyses.py | updated {len(updates)} tracks. last track ID processed: {tracks[-1].track_id if len(tracks) > 0 else None}"
     )
 
 
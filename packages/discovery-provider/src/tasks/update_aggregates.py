@@ -1,11 +1,30 @@
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 
+from sqlalchemy import text
+
+from src.tasks.aggregates import get_latest_blocknumber
 from src.tasks.celery_app import celery
-from src.utils.prometheus_metric import save_duration_metric
+from src.utils.prometheus_metric import (
+    PrometheusMetric,
+    PrometheusMetricNames,
+    save_duration_metric,
+)
+from src.utils.redis_constants import update_aggregates_last_full_recompute_redis_key
+from src.utils.update_indexing_checkpoints import (
+    get_last_indexed_checkpoint,
+    save_indexed_checkpoint,
+)
 
 logger = logging.getLogger(__name__)
 
+UPDATE_AGGREGATES_CHECKPOINT = "update_aggregates"
+
+# Between full recomputes only tracks and playlists with new activity are
+# recounted. The full recompute catches drift from anything that changes
+# counts without writing a new blocknumber.
+FULL_RECOMPUTE_INTERVAL = timedelta(hours=1)
+
 update_aggregate_playlist_query = """
 with playlist_saves as (
     select
@@ -42,17 +61,22 @@ new_aggregate_playlist as (
         aggregate_playlist ap
         left join playlist_saves ps on ap.playlist_id = ps.save_item_id
         left join playlist_reposts pr on ap.playlist_id = pr.repost_item_id
+),
+updated as (
+    update
+        aggregate_playlist ap
+    set
+        save_count = nap.save_count,
+        repost_count = nap.repost_count
+    from new_aggregate_playlist nap
+    where
+        ap.playlist_id = nap.playlist_id
+        and (ap.save_count != nap.save_count or ap.repost_count != nap.repost_count)
+    returning ap.playlist_id
 )
-update
-    aggregate_playlist ap
-set
-    save_count = nap.save_count,
-    repost_count = nap.repost_count
-from new_aggregate_playlist nap
-where
-    ap.playlist_id = nap.playlist_id
-    and (ap.save_count != nap.save_count or ap.repost_count != nap.repost_count)
-returning ap.playlist_id;
+select
+    (select count(*) from new_aggregate_playlist) as rows_scanned,
+    (select count(*) from updated) as rows_updated;
 """
 
 update_aggregate_track_query = """
@@ -106,23 +130,206 @@ new_aggregate_track as (
     left join track_saves ps on ap.track_id = ps.save_item_id
     left join track_reposts pr on ap.track_id = pr.repost_item_id
     left join track_comments pc on ap.track_id = pc.comment_entity_id
+),
+updated as (
+  update
+    aggregate_track at
+  set
+    save_count = nat.save_count,
+    repost_count = nat.repost_count,
+    comment_count = nat.comment_count
+  from
+    new_aggregate_track nat
+  where
+    at.track_id = nat.track_id
+    and (
+      at.save_count != nat.save_count
+      or at.repost_count != nat.repost_count
+      or at.comment_count != nat.comment_count
+    )
+  returning at.track_id
 )
-update
-  aggregate_track at
-set
-  save_count = nat.save_count,
-  repost_count = nat.repost_count,
-  comment_count = nat.comment_count
-from
-  new_aggregate_track nat
-where
-  at.track_id = nat.track_id
-  and (
-    at.save_count != nat.save_count
-    or at.repost_count != nat.repost_count
-    or at.comment_count != nat.comment_count
-  )
-returning at.track_id;
+select
+  (select count(*) from new_aggregate_track) as rows_scanned,
+  (select count(*) from updated) as rows_updated;
+"""
+
+# Incremental variants of the queries above. Only items with a save, repost or
+# comment written in (prev_blocknumber, current_blocknumber] are recounted.
+# Rows are updated in place with a new blocknumber on every change, so the
+# changed item ids are found by blocknumber and their counts recomputed from
+# the item indexes rather than applying +/- deltas to the stored counts.
+incremental_update_aggregate_playlist_query = """
+with changed_playlists as (
+    select save_item_id as playlist_id
+    from saves
+    where
+        blocknumber > :prev_blocknumber
+        and blocknumber <= :current_blocknumber
+        and (save_type = 'playlist' or save_type = 'album')
+    union
+    select repost_item_id as playlist_id
+    from reposts
+    where
+        blocknumber > :prev_blocknumber
+        and blocknumber <= :current_blocknumber
+        and (repost_type = 'playlist' or repost_type = 'album')
+),
+playlist_saves as (
+    select
+        save_item_id,
+        count(*) as save_count
+    from
+        saves s
+        join changed_playlists cp on s.save_item_id = cp.playlist_id
+    where
+        s.is_current is true
+        and s.is_delete is false
+        and (s.save_type = 'playlist' or s.save_type = 'album')
+    group by
+        save_item_id
+),
+playlist_reposts as (
+    select
+        repost_item_id,
+        count(*) as repost_count
+    from
+        reposts r
+        join changed_playlists cp on r.repost_item_id = cp.playlist_id
+    where
+        r.is_current is true
+        and r.is_delete is false
+        and (r.repost_type = 'playlist' or r.repost_type = 'album')
+    group by
+        repost_item_id
+),
+new_aggregate_playlist as (
+    select
+        ap.playlist_id,
+        coalesce(ps.save_count, 0) as save_count,
+        coalesce(pr.repost_count, 0) as repost_count
+    from
+        aggregate_playlist ap
+        join changed_playlists cp on ap.playlist_id = cp.playlist_id
+        left join playlist_saves ps on ap.playlist_id = ps.save_item_id
+        left join playlist_reposts pr on ap.playlist_id = pr.repost_item_id
+),
+updated as (
+    update
+        aggregate_playlist ap
+    set
+        save_count = nap.save_count,
+        repost_count = nap.repost_count
+    from new_aggregate_playlist nap
+    where
+        ap.playlist_id = nap.playlist_id
+        and (ap.save_count != nap.save_count or ap.repost_count != nap.repost_count)
+    returning ap.playlist_id
+)
+select
+    (select count(*) from new_aggregate_playlist) as rows_scanned,
+    (select count(*) from updated) as rows_updated;
+"""
+
+incremental_update_aggregate_track_query = """
+with changed_tracks as (
+  select save_item_id as track_id
+  from saves
+  where
+    blocknumber > :prev_blocknumber
+    and blocknumber <= :current_blocknumber
+    and save_type = 'track'
+  union
+  select repost_item_id as track_id
+  from reposts
+  where
+    blocknumber > :prev_blocknumber
+    and blocknumber <= :current_blocknumber
+    and repost_type = 'track'
+  union
+  select entity_id as track_id
+  from comments
+  where
+    blocknumber > :prev_blocknumber
+    and blocknumber <= :current_blocknumber
+    and entity_type = 'Track'
+),
+track_saves as (
+  select
+    save_item_id,
+    count(*) as save_count
+  from
+    saves s
+    join changed_tracks ct on s.save_item_id = ct.track_id
+  where
+    s.is_current is true
+    and s.is_delete is false
+    and s.save_type = 'track'
+  group by
+    save_item_id
+),
+track_reposts as (
+  select
+    repost_item_id,
+    count(*) as repost_count
+  from
+    reposts r
+    join changed_tracks ct on r.repost_item_id = ct.track_id
+  where
+    r.is_current is true
+    and r.is_delete is false
+    and r.repost_type = 'track'
+  group by
+    repost_item_id
+),
+track_comments as (
+  select
+    entity_id as comment_entity_id,
+    count(*) as comment_count
+  from
+    comments c
+    join changed_tracks ct on c.entity_id = ct.track_id
+  where
+    c.is_delete is false
+    and c.is_visible is true
+    and c.entity_type = 'Track'
+  group by
+    comment_entity_id
+),
+new_aggregate_track as (
+  select
+    ap.track_id,
+    coalesce(ps.save_count, 0) as save_count,
+    coalesce(pr.repost_count, 0) as repost_count,
+    coalesce(pc.comment_count, 0) as comment_count
+  from
+    aggregate_track ap
+    join changed_tracks ct on ap.track_id = ct.track_id
+    left join track_saves ps on ap.track_id = ps.save_item_id
+    left join track_reposts pr on ap.track_id = pr.repost_item_id
+    left join track_comments pc on ap.track_id = pc.comment_entity_id
+),
+updated as (
+  update
+    aggregate_track at
+  set
+    save_count = nat.save_count,
+    repost_count = nat.repost_count,
+    comment_count = nat.comment_count
+  from
+    new_aggregate_track nat
+  where
+    at.track_id = nat.track_id
+    and (
+      at.save_count != nat.save_count
+      or at.repost_count != nat.repost_count
+      or at.comment_count != nat.comment_count
+    )
+  returning at.track_id
+)
+select
+  (select count(*) from new_aggregate_track) as rows_scanned,
+  (select count(*) from updated) as rows_updated;
 """
 
 update_aggregate_user_query = """
@@ -307,7 +514,25 @@ returning aggregate_user.user_id;
 """
 
 
-def _update_aggregates(session):
+def _update_aggregate_table(session, table_name, query, mode, params=None):
+    start_time = datetime.now()
+    rows_scanned, rows_updated = session.execute(text(query), params or {}).first()
+    PrometheusMetric(PrometheusMetricNames.UPDATE_AGGREGATES_ROWS_SCANNED_LATEST).save(
+        rows_scanned, {"table_name": table_name, "mode": mode}
+    )
+    logger.info(
+        f"update_aggregates.py | {mode} update of {table_name} scanned {rows_scanned} "
+        f"rows and updated {rows_updated} in {datetime.now() - start_time}"
+    )
+
+
+def _update_aggregates(session, full_recompute=True):
+    """
+    Refreshes aggregate_user and user scores, then aggregate_track and
+    aggregate_playlist. With full_recompute, track and playlist counts are
+    recomputed for every row to correct any drift. Otherwise only items with
+    saves, reposts or comments since the last run are recounted.
+    """
     start_time = datetime.now()
 
     logger.debug("update_aggregates.py | updating aggregates...")
@@ -324,19 +549,55 @@ def _update_aggregates(session):
         f"update_aggregates.py | updated user scores {updated_user_ids} in {datetime.now() - start_time}"
     )
 
-    start_time = datetime.now()
-
-    updated_track_ids = session.execute(update_aggregate_track_query).fetchall()
-    logger.debug(
-        f"update_aggregates.py | updated aggregate_track {updated_track_ids} in {datetime.now() - start_time}"
+    prev_blocknumber = get_last_indexed_checkpoint(
+        session, UPDATE_AGGREGATES_CHECKPOINT
     )
+    current_blocknumber = get_latest_blocknumber(session)
 
-    start_time = datetime.now()
-    updated_playlist_ids = session.execute(update_aggregate_playlist_query).fetchall()
-    logger.debug(
-        f"update_aggregates.py | updated aggregate_playlist {updated_playlist_ids} in {datetime.now() - start_time}"
-    )
-    return
+    # nothing to count from on the first run, so recompute everything
+    if full_recompute or not prev_blocknumber:
+        _update_aggregate_table(
+            session, "aggregate_track", update_aggregate_track_query, "full"
+        )
+        _update_aggregate_table(
+            session, "aggregate_playlist", update_aggregate_playlist_query, "full"
+        )
+    elif current_blocknumber and current_blocknumber > prev_blocknumber:
+        params = {
+            "prev_blocknumber": prev_blocknumber,
+            "current_blocknumber": current_blocknumber,
+        }
+        _update_aggregate_table(
+            session,
+            "aggregate_track",
+            incremental_update_aggregate_track_query,
+            "incremental",
+            params,
+        )
+        _update_aggregate_table(
+            session,
+            "aggregate_playlist",
+            incremental_update_aggregate_playlist_query,
+            "incremental",
+            params,
+        )
+    else:
+        logger.debug(
+            "update_aggregates.py | Skip track and playlist update because there are no new blocks"
+        )
+
+    if current_blocknumber:
+        save_indexed_checkpoint(
+            session, UPDATE_AGGREGATES_CHECKPOINT, current_blocknumber
+        )
+
+
+def _should_full_recompute(redis):
+    last_full_recompute = redis.get(update_aggregates_last_full_recompute_redis_key)
+    if not last_full_recompute:
+        return True
+    elapsed = datetime.now().timestamp() - float(last_full_recompute)
+    return elapsed >= FULL_RECOMPUTE_INTERVAL.total_seconds()
 
 
 # ####### CELERY TASKS ####### #
@@ -356,8 +617,14 @@ def update_aggregates(self):
     try:
         have_lock = update_lock.acquire(blocking=False)
         if have_lock:
+            full_recompute = _should_full_recompute(redis)
             with db.scoped_session() as session:
-                _update_aggregates(session)
+                _update_aggregates(session, full_recompute)
+            if full_recompute:
+                redis.set(
+                    update_aggregates_last_full_recompute_redis_key,
+                    datetime.now().timestamp(),
+                )
 
         else:
             logger.debug("update_aggregates.py | Failed to acquire lock")
@@ -10,6 +10,7 @@ from sqlalchemy import desc
 
 from src.models.users.user import User
 from src.utils import db_session
+from src.utils.authority_cache import get_cached_signature_authority
 
 logger = logging.getLogger(__name__)
 
@@ -17,31 +18,37 @@ MESSAGE_HEADER = "Encoded-Data-Message"
 SIGNATURE_HEADER = "Encoded-Data-Signature"
 
 
+def _get_user_id_for_wallet(wallet: str) -> int | None:
+    db = db_session.get_db_read_replica()
+    with db.scoped_session() as session:
+        user = (
+            session.query(User.user_id)
+            .filter(
+                # Convert checksum wallet to lowercase
+                User.wallet == wallet,
+                User.is_current == True,
+            )
+            # In the case that multiple wallets match (not enforced on the data layer),
+            # pick the user that was created first.
+            .order_by(desc(User.handle.isnot(None)), User.created_at.asc())
+            .first()
+        )
+        return user.user_id if user else None
+
+
 def recover_authority_from_signature_headers() -> tuple[int | None, str | None]:
     message = request.headers.get(MESSAGE_HEADER)
     signature = request.headers.get(SIGNATURE_HEADER)
     if message and signature:
-        encoded_to_recover = encode_defunct(text=message)
-        wallet = Account.recover_message(encoded_to_recover, signature=signature)
-        wallet_lower = wallet.lower()
-        db = db_session.get_db_read_replica()
-        with db.scoped_session() as session:
-            user = (
-                session.query(User.user_id)
-                .filter(
-                    # Convert checksum wallet to lowercase
-                    User.wallet == wallet_lower,
-                    User.is_current == True,
-                )
-                # In the case that multiple wallets match (not enforced on the data layer),
-                # pick the user that was created first.
-                .order_by(desc(User.handle.isnot(None)), User.created_at.asc())
-                .first()
-            )
-            if user:
-                return user.user_id, wallet_lower
-            else:
-                return None, wallet_lower
+
+        def recover_wallet():
+            encoded_to_recover = encode_defunct(text=message)
+            wallet = Account.recover_message(encoded_to_recover, signature=signature)
+            return wallet.lower()
+
+        return get_cached_signature_authority(
+            message, signature, recover_wallet, _get_user_id_for_wallet
+        )
     return None, None
 
 
@@ -0,0 +1,146 @@
+"""
+Caches for resolving who signed a request and what they have been granted.
+
+Signature recovery and grant checks can run several times per request
+(auth_middleware, gated content, manager checks), and clients re-send the
+same signed message across many requests. Answers are memoized on flask.g
+for the request and in redis with a short TTL across requests. Grant
+entries are invalidated by the indexer when a grant changes.
+"""
+
+import hashlib
+import json
+import logging
+from typing import Callable, Optional, Tuple
+
+from flask import g, has_request_context
+
+from src.utils import redis_connection
+from src.utils.prometheus_metric import PrometheusMetric, PrometheusMetricNames
+
+logger = logging.getLogger(__name__)
+
+SIGNATURE_AUTHORITY_TTL_SEC = 5 * 60
+GRANT_AUTHORITY_TTL_SEC = 30
+
+signature_authority_cache_prefix = "signature_authority"
+grant_authority_cache_prefix = "grant_authority"
+
+
+def _record_lookup(check: str, source: str):
+    PrometheusMetric(PrometheusMetricNames.AUTHORITY_CACHE_LOOKUPS_TOTAL).save(
+        1, {"check": check, "source": source}
+    )
+
+
+def _get_request_memo(name: str) -> Optional[dict]:
+    if not has_request_context():
+        return None
+    if name not in g:
+        setattr(g, name, {})
+    return getattr(g, name)
+
+
+def get_signature_authority_cache_key(message: str, signature: str) -> str:
+    digest = hashlib.sha256(f"{message}:{signature}".encode()).hexdigest()
+    return f"{signature_authority_cache_prefix}:{digest}"
+
+
+def get_grant_authority_cache_key(grantee_address: str, user_id: int) -> str:
+    return f"{grant_authority_cache_prefix}:{grantee_address.lower()}:{user_id}"
+
+
+def get_cached_signature_authority(
+    message: str,
+    signature: str,
+    recover_wallet: Callable[[], str],
+    get_user_id: Callable[[str], Optional[int]],
+) -> Tuple[Optional[int], str]:
+    """
+    Returns the (user_id, wallet) that signed message. The recovered wallet
+    never changes for a (message, signature) so it is always cached. The user
+    is only cached once found, so a wallet that signs up shows up right away.
+    """
+    memo = _get_request_memo("signature_authority")
+    memo_key = (message, signature)
+    if memo is not None and memo_key in memo:
+        _record_lookup("signature", "request")
+        return memo[memo_key]
+
+    redis = redis_connection.get_redis()
+    cache_key = get_signature_authority_cache_key(message, signature)
+    cached = None
+    try:
+        cached_value = redis.get(cache_key)
+        if cached_value:
+            cached = json.loads(cached_value)
+    except Exception as e:
+        logger.warning(f"authority_cache.py | Unable to read {cache_key}: {e}")
+
+    if cached and cached["user_id"] is not None:
+        _record_lookup("signature", "redis")
+        authority = (cached["user_id"], cached["wallet"])
+    else:
+        if cached:
+            _record_lookup("signature", "redis")
+            wallet = cached["wallet"]
+        else:
+            _record_lookup("signature", "recovered")
+            wallet = recover_wallet()
+        authority = (get_user_id(wallet), wallet)
+        try:
+            redis.set(
+                cache_key,
+                json.dumps({"user_id": authority[0], "wallet": wallet}),
+                ex=SIGNATURE_AUTHORITY_TTL_SEC,
+            )
+        except Exception as e:
+            logger.warning(f"authority_cache.py | Unable to cache {cache_key}: {e}")
+
+    if memo is not None:
+        memo[memo_key] = authority
+    return authority
+
+
+def get_cached_grant_authority(
+    grantee_address: str, user_id: int, check_grant: Callable[[], bool]
+) -> bool:
+    """Returns whether grantee_address has an active grant from user_id"""
+    memo = _get_request_memo("grant_authority")
+    memo_key = (grantee_address, user_id)
+    if memo is not None and memo_key in memo:
+        _record_lookup("grant", "request")
+        return memo[memo_key]
+
+    redis = redis_connection.get_redis()
+    cache_key = get_grant_authority_cache_key(grantee_address, user_id)
+    cached_value = None
+    try:
+        cached_value = redis.get(cache_key)
+    except Exception as e:
+        logger.warning(f"authority_cache.py | Unable to read {cache_key}: {e}")
+
+    if cached_value is not None:
+        _record_lookup("grant", "redis")
+        is_granted = cached_value == b"1"
+    else:
+        _record_lookup("grant", "checked")
+        is_granted = bool(check_grant())
+        try:
+            redis.set(cache_key, "1" if is_granted else "0", ex=GRANT_AUTHORITY_TTL_SEC)
+        except Exception as e:
+            logger.warning(f"authority_cache.py | Unable to cache {cache_key}: {e}")
+
+    if memo is not None:
+        memo[memo_key] = is_granted
+    return is_granted
+
+
+def invalidate_grant_authority(redis, grant_keys):
+    """Drops cached grant checks for the (grantee_address, user_id) keys"""
+    cache_keys = [
+        get_grant_authority_cache_key(grantee_address, user_id)
+        for grantee_address, user_id in grant_keys
+    ]
+    if cache_keys:
+        redis.delete(*cache_keys)
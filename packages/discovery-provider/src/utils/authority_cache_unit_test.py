@@ -0,0 +1,83 @@
+from unittest.mock import MagicMock
+
+import flask
+
+from src.utils.authority_cache import (
+    get_cached_grant_authority,
+    get_cached_signature_authority,
+    invalidate_grant_authority,
+)
+
+app = flask.Flask(__name__)
+
+
+def test_signature_authority_memoized_per_request(redis_mock):
+    recover_wallet = MagicMock(return_value="0xwallet")
+    get_user_id = MagicMock(return_value=1)
+
+    with app.test_request_context():
+        for _ in range(3):
+            assert get_cached_signature_authority(
+                "message", "signature", recover_wallet, get_user_id
+            ) == (1, "0xwallet")
+
+    assert recover_wallet.call_count == 1
+    assert get_user_id.call_count == 1
+
+
+def test_signature_authority_cached_across_requests(redis_mock):
+    recover_wallet = MagicMock(return_value="0xwallet")
+    get_user_id = MagicMock(return_value=1)
+
+    for _ in range(2):
+        with app.test_request_context():
+            assert get_cached_signature_authority(
+                "message", "signature", recover_wallet, get_user_id
+            ) == (1, "0xwallet")
+
+    assert recover_wallet.call_count == 1
+    assert get_user_id.call_count == 1
+
+    # a different signature is recovered on its own
+    with app.test_request_context():
+        get_cached_signature_authority(
+            "message", "other signature", recover_wallet, get_user_id
+        )
+    assert recover_wallet.call_count == 2
+
+
+def test_signature_authority_rechecks_missing_user(redis_mock):
+    """A wallet without a user is not recovered again, but the user is looked up again"""
+    recover_wallet = MagicMock(return_value="0xwallet")
+    get_user_id = MagicMock(return_value=None)
+
+    with app.test_request_context():
+        assert get_cached_signature_authority(
+            "message", "signature", recover_wallet, get_user_id
+        ) == (None, "0xwallet")
+
+    get_user_id.return_value = 1
+    with app.test_request_context():
+        assert get_cached_signature_authority(
+            "message", "signature", recover_wallet, get_user_id
+        ) == (1, "0xwallet")
+
+    assert recover_wallet.call_count == 1
+    assert get_user_id.call_count == 2
+
+
+def test_grant_authority_invalidated(redis_mock):
+    check_grant = MagicMock(return_value=True)
+
+    for _ in range(2):
+        with app.test_request_context():
+            assert get_cached_grant_authority("0xWallet", 1, check_grant)
+            assert get_cached_grant_authority("0xWallet", 1, check_grant)
+    assert check_grant.call_count == 1
+
+    check_grant.return_value = False
+    invalidate_grant_authority(redis_mock, [("0xwallet", 1)])
+
+    with app.test_request_context():
+        assert not get_cached_grant_authority("0xWallet", 1, check_grant)
+    assert check_grant.call_count == 2
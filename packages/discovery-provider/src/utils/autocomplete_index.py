@@ -0,0 +1,363 @@
+"""
+In-process autocomplete index over user handles and names, track titles and
+playlist names.
+
+The index is built from postgres by the build_autocomplete_index task and
+written to a single file. Web workers mmap the file read-only so all gunicorn
+workers share one copy through the page cache, and pick up a rebuilt file
+when it is swapped in.
+
+Documents are stored in rank order (most followed / reposted first), so the
+rank of a document is its position and posting lists sorted by position are
+also sorted by rank. A query is answered by walking the candidates of its
+most selective token in rank order and checking the remaining tokens against
+the document text, with a trigram lookup for misspellings when there are no
+prefix matches.
+"""
+
+import heapq
+import logging
+import mmap
+import os
+import struct
+import time
+import unicodedata
+from array import array
+from collections import Counter, defaultdict
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+logger = logging.getLogger(__name__)
+
+KIND_USER = 0
+KIND_TRACK = 1
+KIND_PLAYLIST = 2
+KIND_ALBUM = 3
+
+# search kinds to document kinds
+search_kinds = {
+    "users": KIND_USER,
+    "tracks": KIND_TRACK,
+    "playlists": KIND_PLAYLIST,
+    "albums": KIND_ALBUM,
+}
+
+FLAG_PURCHASEABLE = 1
+
+# tokens up to this length are looked up in a table of their top documents
+# instead of expanding every term they prefix
+SHORT_PREFIX_LENGTH = 3
+SHORT_PREFIX_MAX_POSTINGS = 5000
+TRIGRAM_MAX_POSTINGS = 2000
+# max candidates checked per query, bounds the latency of unselective queries
+MAX_CANDIDATES_SCANNED = 20000
+# share of query trigrams a document needs to be a fuzzy match
+MIN_TRIGRAM_SIMILARITY = 0.5
+
+MAGIC = b"ACIX"
+VERSION = 1
+HEADER = struct.Struct("<4sII")
+SECTION = struct.Struct("<QQ")
+# doc kinds, ids, flags, text offsets and text, then terms, short prefixes
+# and trigrams as (term offsets, posting offsets, postings, term blob)
+NUM_SECTIONS = 17
+
+RELOAD_CHECK_INTERVAL_SEC = 30
+
+
+class AutocompleteDoc(NamedTuple):
+    kind: int
+    id: int
+    score: float
+    text: str
+    flags: int = 0
+
+
+def normalize(text: Optional[str]) -> List[str]:
+    """Lowercased, accent-free alphanumeric tokens of text"""
+    if not text:
+        return []
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    chars = [
+        c if c.isalnum() else " " for c in decomposed if not unicodedata.combining(c)
+    ]
+    return "".join(chars).split()
+
+
+def trigrams(tokens: List[str]) -> List[str]:
+    text = f" {' '.join(tokens)} "
+    return list({text[i : i + 3] for i in range(len(text) - 2)})
+
+
+def _encode_dictionary(postings_by_term: Mapping[str, Iterable[int]]):
+    """Sorted terms as offsets into a utf-8 blob, each with a posting list"""
+    terms = sorted(term.encode() for term in postings_by_term)
+    term_offsets = array("I", [0])
+    posting_offsets = array("I", [0])
+    postings = array("I")
+    blob = bytearray()
+    for term in terms:
+        blob += term
+        term_offsets.append(len(blob))
+        postings.extend(sorted(set(postings_by_term[term.decode()])))
+        posting_offsets.append(len(postings))
+    return [term_offsets, posting_offsets, postings, bytes(blob)]
+
+
+def write_autocomplete_index(path: str, docs: Iterable[AutocompleteDoc]):
+    """Builds the index of docs and atomically replaces the file at path"""
+    ranked = sorted(docs, key=lambda doc: (-doc.score, doc.kind, doc.id))
+
+    kinds = array("B")
+    ids = array("I")
+    flags = array("B")
+    text_offsets = array("I", [0])
+    text_blob = bytearray()
+    terms: Dict[str, List[int]] = defaultdict(list)
+    short_prefixes: Dict[str, List[int]] = defaultdict(list)
+    trigram_postings: Dict[str, List[int]] = defaultdict(list)
+
+    for position, doc in enumerate(ranked):
+        tokens = normalize(doc.text)
+        kinds.append(doc.kind)
+        ids.append(doc.id)
+        flags.append(doc.flags)
+        text_blob += " ".join(tokens).encode()
+        text_offsets.append(len(text_blob))
+
+        prefixes = set()
+        for token in set(tokens):
+            terms[token].append(position)
+            for length in range(1, min(len(token), SHORT_PREFIX_LENGTH) + 1):
+                prefixes.add(token[:length])
+        for prefix in prefixes:
+            if len(short_prefixes[prefix]) < SHORT_PREFIX_MAX_POSTINGS:
+                short_prefixes[prefix].append(position)
+        for trigram in trigrams(tokens):
+            if len(trigram_postings[trigram]) < TRIGRAM_MAX_POSTINGS:
+                trigram_postings[trigram].append(position)
+
+    sections: List[Union[array, bytes]] = [
+        kinds,
+        ids,
+        flags,
+        text_offsets,
+        bytes(text_blob),
+    ]
+    sections += _encode_dictionary(terms)
+    sections += _encode_dictionary(short_prefixes)
+    sections += _encode_dictionary(trigram_postings)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        header_size = HEADER.size + SECTION.size * len(sections)
+        f.write(b"\0" * header_size)
+        locations = []
+        for section in sections:
+            data = bytes(section)
+            # keep every section 4-byte aligned for memoryview.cast
+            f.write(b"\0" * (-f.tell() % 4))
+            locations.append((f.tell(), len(data)))
+            f.write(data)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, len(ranked)))
+        for location in locations:
+            f.write(SECTION.pack(*location))
+    os.replace(tmp_path, path)
+    return len(ranked)
+
+
+class _Dictionary:
+    def __init__(self, term_offsets, posting_offsets, postings, blob):
+        self.term_offsets = term_offsets
+        self.posting_offsets = posting_offsets
+        self.postings = postings
+        self.blob = blob
+        self.num_terms = len(term_offsets) - 1
+
+    def term(self, i: int) -> bytes:
+        return bytes(self.blob[self.term_offsets[i] : self.term_offsets[i + 1]])
+
+    def bisect(self, key: bytes) -> int:
+        lo, hi = 0, self.num_terms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.term(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def posting_list(self, i: int):
+        return self.postings[self.posting_offsets[i] : self.posting_offsets[i + 1]]
+
+    def get(self, term: str):
+        key = term.encode()
+        i = self.bisect(key)
+        if i < self.num_terms and self.term(i) == key:
+            return self.posting_list(i)
+        return self.postings[0:0]
+
+    def prefix_range(self, prefix: str) -> Tuple[int, int]:
+        key = prefix.encode()
+        # 0xff never occurs in utf-8, so it sorts after every term with the prefix
+        return self.bisect(key), self.bisect(key + b"\xff")
+
+
+class AutocompleteIndex:
+    def __init__(self, buffer):
+        self._buffer = buffer
+        view = memoryview(buffer)
+        magic, version, num_docs = HEADER.unpack_from(view, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("Not an autocomplete index")
+        self.num_docs = num_docs
+
+        sections = []
+        for i in range(NUM_SECTIONS):
+            start, length = SECTION.unpack_from(view, HEADER.size + SECTION.size * i)
+            sections.append(view[start : start + length])
+        (kinds, ids, flags, text_offsets, text_blob) = sections[:5]
+        self.kinds = kinds.cast("B")
+        self.ids = ids.cast("I")
+        self.flags = flags.cast("B")
+        self.text_offsets = text_offsets.cast("I")
+        self.text_blob = text_blob
+        self.terms, self.short_prefixes, self.trigrams = [
+            _Dictionary(
+                sections[i].cast("I"),
+                sections[i + 1].cast("I"),
+                sections[i + 2].cast("I"),
+                sections[i + 3],
+            )
+            for i in (5, 9, 13)
+        ]
+
+    @classmethod
+    def open(cls, path: str) -> "AutocompleteIndex":
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(buffer)
+
+    def text(self, position: int) -> str:
+        start, end = self.text_offsets[position], self.text_offsets[position + 1]
+        return bytes(self.text_blob[start:end]).decode()
+
+    def _candidates(self, token: str) -> Iterator[int]:
+        """Positions of docs with a token starting with token, in rank order"""
+        if len(token) <= SHORT_PREFIX_LENGTH:
+            yield from self.short_prefixes.get(token)
+            return
+        lo, hi = self.terms.prefix_range(token)
+        last = None
+        for position in heapq.merge(
+            *[self.terms.posting_list(i) for i in range(lo, hi)]
+        ):
+            if position != last:
+                yield position
+                last = position
+
+    def _fuzzy_candidates(self, tokens: List[str]) -> List[int]:
+        query_trigrams = trigrams(tokens)
+        counts: Counter = Counter()
+        for trigram in query_trigrams:
+            counts.update(self.trigrams.get(trigram))
+        min_count = max(1, int(len(query_trigrams) * MIN_TRIGRAM_SIMILARITY))
+        matches = [
+            (-count, position)
+            for position, count in counts.items()
+            if count >= min_count
+        ]
+        return [position for _, position in sorted(matches)]
+
+    def search(
+        self,
+        query: str,
+        kinds: Iterable[str],
+        limit: int = 10,
+        offset: int = 0,
+        include_purchaseable: bool = False,
+    ) -> Dict[str, List[int]]:
+        """Returns the ids of the best matches of query for each search kind"""
+        wanted = {search_kinds[kind]: kind for kind in kinds}
+        results: Dict[str, List[int]] = {kind: [] for kind in wanted.values()}
+        tokens = normalize(query)
+        if not tokens:
+            return results
+        needed = offset + limit
+
+        def add(position: int, results: Dict[str, List[int]]):
+            kind = wanted.get(self.kinds[position])
+            if kind not in results or len(results[kind]) >= needed:
+                return
+            if not include_purchaseable and self.flags[position] & FLAG_PURCHASEABLE:
+                return
+            results[kind].append(position)
+
+        def is_full(results: Dict[str, List[int]]):
+            return all(len(found) >= needed for found in results.values())
+
+        # the longest token has the fewest candidates
+        selective = max(tokens, key=len)
+        others = [token for token in tokens if token is not selective]
+        for num_scanned, position in enumerate(self._candidates(selective)):
+            if num_scanned >= MAX_CANDIDATES_SCANNED or is_full(results):
+                break
+            if others:
+                doc_tokens = self.text(position).split()
+                if not all(
+                    any(doc_token.startswith(token) for doc_token in doc_tokens)
+                    for token in others
+                ):
+                    continue
+            add(position, results)
+
+        # misspellings are only looked up for kinds without any prefix match
+        fuzzy_results = {kind: found for kind, found in results.items() if not found}
+        if fuzzy_results and len(" ".join(tokens)) >= 3:
+            for position in self._fuzzy_candidates(tokens):
+                if is_full(fuzzy_results):
+                    break
+                add(position, fuzzy_results)
+
+        return {
+            kind: [self.ids[position] for position in found[offset:needed]]
+            for kind, found in results.items()
+        }
+
+
+_index: Optional[AutocompleteIndex] = None
+_index_mtime: Optional[float] = None
+_last_checked_at = 0.0
+
+
+def get_autocomplete_index(path: str) -> Optional[AutocompleteIndex]:
+    """
+    Returns the index at path, reopening it at most every
+    RELOAD_CHECK_INTERVAL_SEC if the file was replaced. None if not built yet.
+    """
+    # pylint: disable=W0603
+    global _index, _index_mtime, _last_checked_at
+    now = time.monotonic()
+    if _index is not None and now - _last_checked_at < RELOAD_CHECK_INTERVAL_SEC:
+        return _index
+    _last_checked_at = now
+    try:
+        mtime = os.stat(path).st_mtime
+        if _index is None or mtime != _index_mtime:
+            _index = AutocompleteIndex.open(path)
+            _index_mtime = mtime
+    except FileNotFoundError:
+        _index = None
+    except Exception as e:
+        logger.error(f"autocomplete_index.py | Unable to open {path}: {e}")
+    return _index
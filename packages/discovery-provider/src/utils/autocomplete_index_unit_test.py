@@ -0,0 +1,86 @@
+import os
+
+from src.utils import autocomplete_index
+from src.utils.autocomplete_index import (
+    FLAG_PURCHASEABLE,
+    KIND_ALBUM,
+    KIND_PLAYLIST,
+    KIND_TRACK,
+    KIND_USER,
+    AutocompleteDoc,
+    AutocompleteIndex,
+    get_autocomplete_index,
+    normalize,
+    write_autocomplete_index,
+)
+
+docs = [
+    AutocompleteDoc(KIND_USER, 1, 1000, "taylorswift Taylor Swift"),
+    AutocompleteDoc(KIND_USER, 2, 10, "taylormade Taylor Made"),
+    AutocompleteDoc(KIND_USER, 3, 500, "deadmau5 deadmau5"),
+    AutocompleteDoc(KIND_TRACK, 10, 50, "Love Story taylorswift Taylor Swift"),
+    AutocompleteDoc(KIND_TRACK, 11, 80, "Lové Song deadmau5", FLAG_PURCHASEABLE),
+    AutocompleteDoc(KIND_TRACK, 12, 5, "Strobe deadmau5 deadmau5"),
+    AutocompleteDoc(KIND_PLAYLIST, 20, 3, "Love Songs taylormade Taylor Made"),
+    AutocompleteDoc(KIND_ALBUM, 30, 90, "folklore taylorswift Taylor Swift"),
+]
+
+
+def build(tmp_path, docs=docs):
+    path = str(tmp_path / "autocomplete.idx")
+    write_autocomplete_index(path, docs)
+    return path, AutocompleteIndex.open(path)
+
+
+def test_normalize():
+    assert normalize("Lové  Song (feat. DJ)") == ["love", "song", "feat", "dj"]
+    assert normalize(None) == []
+
+
+def test_search_prefix_in_rank_order(tmp_path):
+    _, index = build(tmp_path)
+    assert index.search("tay", ["users"]) == {"users": [1, 2]}
+    assert index.search("taylorm", ["users"]) == {"users": [2]}
+    assert index.search("tay", ["users"], limit=1, offset=1) == {"users": [2]}
+    assert index.search("", ["users"]) == {"users": []}
+
+
+def test_search_multiple_tokens_and_kinds(tmp_path):
+    _, index = build(tmp_path)
+    assert index.search("love taylor", ["tracks", "playlists"]) == {
+        "tracks": [10],
+        "playlists": [20],
+    }
+    assert index.search("folk", ["tracks", "albums"]) == {
+        "tracks": [],
+        "albums": [30],
+    }
+
+
+def test_search_excludes_purchaseable(tmp_path):
+    _, index = build(tmp_path)
+    assert index.search("love s", ["tracks"]) == {"tracks": [10]}
+    assert index.search("love s", ["tracks"], include_purchaseable=True) == {
+        "tracks": [11, 10]
+    }
+
+
+def test_search_fuzzy(tmp_path):
+    _, index = build(tmp_path)
+    assert index.search("folklroe", ["albums"]) == {"albums": [30]}
+    assert index.search("deadmau6", ["users"]) == {"users": [3]}
+
+
+def test_get_autocomplete_index_reloads(tmp_path, monkeypatch):
+    monkeypatch.setattr(autocomplete_index, "RELOAD_CHECK_INTERVAL_SEC", 0)
+    path = str(tmp_path / "autocomplete.idx")
+    assert get_autocomplete_index(path) is None
+
+    write_autocomplete_index(path, docs)
+    assert get_autocomplete_index(path).search("strobe", ["tracks"]) == {"tracks": [12]}
+
+    write_autocomplete_index(path, docs[:3])
+    # the rebuilt file is picked up by its mtime
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 1))
+    assert get_autocomplete_index(path).search("strobe", ["tracks"]) == {"tracks": []}
@@ -137,5 +137,5 @@ try:
     shared_config["serviceLocation"]["serviceLatitude"] = latitude
     shared_config["serviceLocation"]["serviceLongitude"] = longitude
 
-except (KeyError, RuntimeError) as e:
+except (KeyError, RuntimeError, requests.exceptions.RequestException) as e:
     logger.error(f"""Failed to get latitude and/or longitude : {e}""")
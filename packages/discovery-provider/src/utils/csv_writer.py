@@ -1,25 +1,32 @@
 import csv
 from io import StringIO
-from typing import List
+from typing import Iterable
 
 
-# Write CSV to string buffer before returning the contents of the string.
-# This function takes a list of dictionaries, where each dictionary represents a row.
+# Streams CSV in chunks of rows_per_chunk rows, so only one chunk is held in
+# memory at a time. This function takes an iterable of dictionaries, where each
+# dictionary represents a row, e.g. a generator over a server side cursor.
 # Example:
 #   rows = [{"name": "John", "age": 30}, {"name": "Jane", "age": 25}]
-#   write_csv_string(rows)
+#   "".join(stream_csv_string(rows))
 # Returns:
 #    name,age
 #    John,30
 #    Jane,25
-def write_csv_string(rows: List[dict]):
-    if not rows:
-        return ""
-
-    fieldnames = list(rows[0].keys())
+def stream_csv_string(rows: Iterable[dict], rows_per_chunk: int = 1000):
     output = StringIO()
-    writer = csv.DictWriter(output, fieldnames=fieldnames)
-    writer.writeheader()
-    writer.writerows(rows)
-
-    return output.getvalue()
+    writer = None
+    num_buffered = 0
+    for row in rows:
+        if writer is None:
+            writer = csv.DictWriter(output, fieldnames=list(row.keys()))
+            writer.writeheader()
+        writer.writerow(row)
+        num_buffered += 1
+        if num_buffered == rows_per_chunk:
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate(0)
+            num_buffered = 0
+    if num_buffered:
+        yield output.getvalue()
@@ -0,0 +1,157 @@
+"""
+Per-user feed inboxes kept in redis.
+
+Each inbox is a sorted set of item keys ("track:1", "playlist:2") scored by
+when the item entered the feed. New tracks, playlists and reposts are fanned
+out on write by the index_feed_inboxes task, but only to followers that have
+an inbox, i.e. that read their feed within FEED_INBOX_TTL_SEC. Users with more
+than FEED_FANOUT_MAX_FOLLOWERS followers are skipped on write and their items
+are pulled from the database when a follower reads their feed. Inboxes of
+users who follow or unfollow someone are dropped and refilled on their next
+read.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from redis import Redis
+
+from src import exceptions
+
+FEED_INBOX_MAX_ITEMS = 1000
+FEED_INBOX_TTL_SEC = 7 * 24 * 60 * 60
+FEED_FANOUT_MAX_FOLLOWERS = 5000
+# only activity from the last FEED_WINDOW_DAYS is part of the feed
+FEED_WINDOW_DAYS = 30
+
+feed_inbox_prefix = "feed_inbox"
+
+# Marks an inbox as filled even if the user follows no one, so that an empty
+# feed is not refilled on every read. Real entries always have a score > 0.
+FEED_INBOX_SENTINEL = "sentinel"
+
+# (score, item_key)
+FeedEntry = Tuple[float, str]
+
+
+def get_feed_inbox_key(user_id: int) -> str:
+    return f"{feed_inbox_prefix}:{user_id}"
+
+
+def to_feed_score(timestamp: datetime) -> float:
+    """Feed scores are epoch seconds of the naive UTC timestamps in the db"""
+    return timestamp.replace(tzinfo=timezone.utc).timestamp()
+
+
+def from_feed_score(score: float) -> datetime:
+    return datetime.fromtimestamp(score, tz=timezone.utc).replace(tzinfo=None)
+
+
+def encode_feed_cursor(entry: FeedEntry) -> str:
+    score, item_key = entry
+    payload = json.dumps([score, item_key]).encode()
+    return base64.urlsafe_b64encode(payload).decode()
+
+
+def decode_feed_cursor(cursor: Optional[str]) -> Optional[FeedEntry]:
+    if not cursor:
+        return None
+    try:
+        score, item_key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return (float(score), str(item_key))
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise exceptions.ArgumentError(f"Invalid feed cursor {cursor}") from e
+
+
+def is_after_cursor(entry: FeedEntry, cursor: Optional[FeedEntry]) -> bool:
+    """Entries are ordered by score then item_key, both descending"""
+    return cursor is None or entry < cursor
+
+
+def fill_feed_inbox(redis: Redis, user_id: int, entries: Iterable[FeedEntry]):
+    """Replaces the inbox of user_id with entries pulled on read"""
+    key = get_feed_inbox_key(user_id)
+    mapping: Dict[Union[str, bytes], float] = {FEED_INBOX_SENTINEL: 0}
+    for score, item_key in entries:
+        mapping[item_key] = score
+    pipe = redis.pipeline()
+    pipe.delete(key)
+    pipe.zadd(key, mapping)
+    pipe.zremrangebyrank(key, 0, -(FEED_INBOX_MAX_ITEMS + 1))
+    pipe.expire(key, FEED_INBOX_TTL_SEC)
+    pipe.execute()
+
+
+def touch_feed_inbox(redis: Redis, user_id: int) -> bool:
+    """Extends the inbox of an active reader. Returns whether it exists."""
+    return bool(redis.expire(get_feed_inbox_key(user_id), FEED_INBOX_TTL_SEC))
+
+
+def drop_feed_inboxes(redis: Redis, user_ids: Iterable[int]):
+    """
+    Drops inboxes that are missing the items of newly followed users or still
+    hold items of users no longer followed. They are refilled from the db on
+    next read.
+    """
+    keys = [get_feed_inbox_key(user_id) for user_id in user_ids]
+    if keys:
+        redis.delete(*keys)
+
+
+def get_feed_inbox_entries(
+    redis: Redis, user_id: int, cursor: Optional[FeedEntry], limit: int
+) -> List[FeedEntry]:
+    """Returns up to limit entries after cursor, newest first"""
+    max_score: Union[str, float] = "+inf" if cursor is None else cursor[0]
+    # entries tied with the cursor score are fetched again and skipped below
+    num_tied = 0
+    if cursor is not None:
+        num_tied = redis.zcount(get_feed_inbox_key(user_id), cursor[0], cursor[0])
+    members = redis.zrevrangebyscore(
+        get_feed_inbox_key(user_id),
+        max_score,
+        "(0",
+        start=0,
+        num=limit + num_tied,
+        withscores=True,
+    )
+    entries = [(score, member.decode()) for member, score in members]
+    return [entry for entry in entries if is_after_cursor(entry, cursor)][:limit]
+
+
+def add_to_feed_inboxes(
+    redis: Redis,
+    originals: Dict[int, List[FeedEntry]],
+    reposts: Dict[int, List[FeedEntry]],
+):
+    """
+    Fans entries out to the inboxes of the given follower ids that exist.
+    An original overwrites the score of a repost of the same item, a repost
+    keeps the score of an item that is already in the inbox.
+    """
+    follower_ids = list(set(originals) | set(reposts))
+    if not follower_ids:
+        return 0
+
+    pipe = redis.pipeline()
+    for follower_id in follower_ids:
+        pipe.exists(get_feed_inbox_key(follower_id))
+    active_follower_ids = [
+        follower_id
+        for follower_id, exists in zip(follower_ids, pipe.execute())
+        if exists
+    ]
+
+    pipe = redis.pipeline()
+    for follower_id in active_follower_ids:
+        key = get_feed_inbox_key(follower_id)
+        if follower_id in reposts:
+            pipe.zadd(key, {k: s for s, k in reposts[follower_id]}, nx=True)
+        if follower_id in originals:
+            pipe.zadd(key, {k: s for s, k in originals[follower_id]})
+        pipe.zremrangebyrank(key, 0, -(FEED_INBOX_MAX_ITEMS + 1))
+    pipe.execute()
+    return len(active_follower_ids)
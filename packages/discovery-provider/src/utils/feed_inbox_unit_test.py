@@ -0,0 +1,107 @@
+from datetime import datetime
+
+import fakeredis
+import pytest
+
+from src import exceptions
+from src.utils import feed_inbox
+from src.utils.feed_inbox import (
+    add_to_feed_inboxes,
+    decode_feed_cursor,
+    drop_feed_inboxes,
+    encode_feed_cursor,
+    fill_feed_inbox,
+    from_feed_score,
+    get_feed_inbox_entries,
+    get_feed_inbox_key,
+    to_feed_score,
+)
+
+
+def test_feed_cursor_round_trip():
+    entry = (to_feed_score(datetime(2024, 1, 2, 3, 4, 5)), "track:1")
+    assert decode_feed_cursor(encode_feed_cursor(entry)) == entry
+    assert from_feed_score(entry[0]) == datetime(2024, 1, 2, 3, 4, 5)
+    assert decode_feed_cursor(None) is None
+    with pytest.raises(exceptions.ArgumentError):
+        decode_feed_cursor("not a cursor")
+
+
+def test_add_to_feed_inboxes_only_active():
+    redis = fakeredis.FakeStrictRedis()
+    fill_feed_inbox(redis, 1, [(100, "track:1")])
+
+    num_inboxes = add_to_feed_inboxes(
+        redis,
+        originals={1: [(300, "track:3")], 2: [(300, "track:3")]},
+        reposts={1: [(200, "track:1"), (200, "track:2")]},
+    )
+    assert num_inboxes == 1
+    assert not redis.exists(get_feed_inbox_key(2))
+    # a repost keeps the score of an item already in the inbox
+    assert get_feed_inbox_entries(redis, 1, None, 10) == [
+        (300, "track:3"),
+        (200, "track:2"),
+        (100, "track:1"),
+    ]
+
+    # an original takes over the score of a repost
+    add_to_feed_inboxes(redis, originals={1: [(150, "track:2")]}, reposts={})
+    assert get_feed_inbox_entries(redis, 1, None, 10) == [
+        (300, "track:3"),
+        (150, "track:2"),
+        (100, "track:1"),
+    ]
+
+
+def test_get_feed_inbox_entries_pages_through_ties():
+    redis = fakeredis.FakeStrictRedis()
+    entries = [(200, "track:9")] + [(100, f"track:{i}") for i in range(5)]
+    fill_feed_inbox(redis, 1, entries)
+
+    pages = []
+    cursor = None
+    while True:
+        page = get_feed_inbox_entries(redis, 1, cursor, 2)
+        if not page:
+            break
+        pages.append(page)
+        cursor = page[-1]
+
+    assert pages == [
+        [(200, "track:9"), (100, "track:4")],
+        [(100, "track:3"), (100, "track:2")],
+        [(100, "track:1"), (100, "track:0")],
+    ]
+
+
+def test_fill_feed_inbox_empty_and_bounded(monkeypatch):
+    redis = fakeredis.FakeStrictRedis()
+    fill_feed_inbox(redis, 1, [])
+    # an empty feed is still marked as filled
+    assert redis.exists(get_feed_inbox_key(1))
+    assert get_feed_inbox_entries(redis, 1, None, 10) == []
+
+    monkeypatch.setattr(feed_inbox, "FEED_INBOX_MAX_ITEMS", 3)
+    add_to_feed_inboxes(
+        redis,
+        originals={1: [(i, f"track:{i}") for i in range(1, 6)]},
+        reposts={},
+    )
+    assert get_feed_inbox_entries(redis, 1, None, 10) == [
+        (5, "track:5"),
+        (4, "track:4"),
+        (3, "track:3"),
+    ]
+
+
+def test_drop_feed_inboxes():
+    redis = fakeredis.FakeStrictRedis()
+    for user_id in [1, 2]:
+        fill_feed_inbox(redis, user_id, [(1.0, "track:1")])
+
+    drop_feed_inboxes(redis, [1, 3])
+    drop_feed_inboxes(redis, [])
+
+    assert not redis.exists(get_feed_inbox_key(1))
+    assert redis.exists(get_feed_inbox_key(2))
@@ -1,6 +1,7 @@
 import asyncio
 import logging
-from typing import Dict, List, Tuple
+import re
+from typing import Dict, List, Optional, Tuple
 
 import aiohttp
 from web3 import Web3
@@ -9,6 +10,7 @@ from src.utils import web3_provider
 from src.utils.config import shared_config
 from src.utils.helpers import is_fqdn, load_eth_abi_values
 from src.utils.redis_cache import get_json_cached_key
+from src.utils.rendezvous import RendezvousHash
 
 logger = logging.getLogger(__name__)
 
@@ -138,6 +140,19 @@ def get_all_healthy_content_nodes_cached(redis) -> List[Dict[str, str]]:
     return get_json_cached_key(redis, ALL_HEALTHY_CONTENT_NODES_CACHE_KEY)
 
 
+def get_healthy_content_node_rendezvous(redis) -> Optional[RendezvousHash]:
+    """
+    Rendezvous hash over the healthy content nodes, or None if there are none.
+    Build it once and reuse it when generating many content urls.
+    """
+    healthy_nodes = get_all_healthy_content_nodes_cached(redis)
+    if not healthy_nodes:
+        return None
+    return RendezvousHash(
+        *[re.sub("/$", "", node["endpoint"].lower()) for node in healthy_nodes]
+    )
+
+
 async def get_node_if_healthy(content_node: Dict[str, str]):
     try:
         async with aiohttp.ClientSession() as session:
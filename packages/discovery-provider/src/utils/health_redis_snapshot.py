@@ -0,0 +1,52 @@
+from typing import List, Optional
+
+from redis import Redis
+
+
+class HealthRedisSnapshot:
+    """
+    The redis values read by get_health, fetched in one pipelined round trip.
+    Stands in for the redis client in the health helpers, which only read.
+    Keys that were not fetched up front are read from redis.
+    """
+
+    def __init__(
+        self,
+        redis: Redis,
+        keys: List[str],
+        set_keys: List[str],
+        hash_keys: Optional[List[str]] = None,
+    ):
+        self._redis = redis
+        hash_keys = hash_keys or []
+        pipe = redis.pipeline(transaction=False)
+        pipe.mget(keys)
+        for key in set_keys:
+            pipe.scard(key)
+        for key in hash_keys:
+            pipe.hgetall(key)
+        values, *rest = pipe.execute()
+        self._values = dict(zip(keys, values))
+        self._cardinalities = dict(zip(set_keys, rest[: len(set_keys)]))
+        self._hashes = dict(zip(hash_keys, rest[len(set_keys) :]))
+
+    def get(self, key: str):
+        if key in self._values:
+            return self._values[key]
+        return self._redis.get(key)
+
+    def scard(self, key: str):
+        if key in self._cardinalities:
+            return self._cardinalities[key]
+        return self._redis.scard(key)
+
+    def hgetall(self, key: str):
+        if key in self._hashes:
+            return self._hashes[key]
+        return self._redis.hgetall(key)
+
+    def delete(self, *keys: str):
+        for key in keys:
+            self._values.pop(key, None)
+            self._hashes.pop(key, None)
+        return self._redis.delete(*keys)
@@ -0,0 +1,49 @@
+from unittest import mock
+
+from src.utils.health_redis_snapshot import HealthRedisSnapshot
+
+
+def test_health_redis_snapshot_reads_in_one_pipeline(redis_mock):
+    """Tests that the snapshot fetches its keys once and falls back to redis"""
+    redis_mock.set("a", "1")
+    redis_mock.set("c", "3")
+    redis_mock.set("unfetched", "4")
+    redis_mock.sadd("set", "x", "y")
+    redis_mock.hset("hash", "field", "5")
+
+    with mock.patch.object(
+        redis_mock, "pipeline", wraps=redis_mock.pipeline
+    ) as redis_pipeline:
+        snapshot = HealthRedisSnapshot(
+            redis_mock, ["a", "b", "c"], ["set", "empty"], ["hash"]
+        )
+    assert redis_pipeline.call_count == 1
+
+    redis_mock.set("a", "changed")
+    with mock.patch.object(
+        redis_mock, "get", wraps=redis_mock.get
+    ) as redis_get, mock.patch.object(
+        redis_mock, "scard", wraps=redis_mock.scard
+    ) as redis_scard:
+        assert snapshot.get("a") == b"1"
+        assert snapshot.get("b") is None
+        assert snapshot.get("c") == b"3"
+        assert snapshot.scard("set") == 2
+        assert snapshot.scard("empty") == 0
+        assert snapshot.hgetall("hash") == {b"field": b"5"}
+        assert redis_get.call_count == 0
+        assert redis_scard.call_count == 0
+
+        assert snapshot.get("unfetched") == b"4"
+        assert redis_get.call_count == 1
+
+
+def test_health_redis_snapshot_delete(redis_mock):
+    """Tests that deleted keys are gone from both the snapshot and redis"""
+    redis_mock.set("a", "1")
+    snapshot = HealthRedisSnapshot(redis_mock, ["a"], [])
+
+    snapshot.delete("a")
+
+    assert redis_mock.get("a") is None
+    assert snapshot.get("a") is None
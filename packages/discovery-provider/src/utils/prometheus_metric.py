@@ -3,7 +3,7 @@ from functools import wraps
 from time import time
 from typing import Callable, Dict
 
-from prometheus_client import Gauge, Histogram, Summary
+from prometheus_client import Counter, Gauge, Histogram, Summary
 
 logger = logging.getLogger(__name__)
 
@@ -92,6 +92,7 @@ class PrometheusMetricNames:
     * [Official docs](https://prometheus.io/docs/practices/naming)
     """
 
+    AUTHORITY_CACHE_LOOKUPS_TOTAL = "authority_cache_lookups_total"
     CELERY_TASK_ACTIVE_DURATION_SECONDS = "celery_task_active_duration_seconds"
     CELERY_TASK_DURATION_SECONDS = "celery_task_duration_seconds"
     CELERY_TASK_LAST_DURATION_SECONDS = "celery_task_last_duration_seconds"
@@ -100,7 +101,10 @@ class PrometheusMetricNames:
     INDEX_BLOCKS_DURATION_SECONDS = "index_blocks_duration_seconds"
     INDEX_METRICS_DURATION_SECONDS = "index_metrics_duration_seconds"
     INDEX_TRENDING_DURATION_SECONDS = "index_trending_duration_seconds"
+    PRUNE_PLAYS_BYTES_DELETED_TOTAL = "prune_plays_bytes_deleted_total"
+    SEARCH_DURATION_SECONDS = "search_duration_seconds"
     UPDATE_AGGREGATE_TABLE_DURATION_SECONDS = "update_aggregate_table_duration_seconds"
+    UPDATE_AGGREGATES_ROWS_SCANNED_LATEST = "update_aggregates_rows_scanned_latest"
     UPDATE_TRENDING_VIEW_DURATION_SECONDS = "update_trending_view_duration_seconds"
     ENTITY_MANAGER_UPDATE_CHANGED_LATEST = "entity_manager_update_changed_latest"
     ENTITY_MANAGER_UPDATE_DURATION_SECONDS = "entity_manager_update_duration_seconds"
@@ -138,6 +142,14 @@ A few example labels:
 * `task_name` when similar CeleryTasks use the same helper code from different callers
 """
 PrometheusRegistry = {
+    PrometheusMetricNames.AUTHORITY_CACHE_LOOKUPS_TOTAL: Counter(
+        f"{METRIC_PREFIX}_{PrometheusMetricNames.AUTHORITY_CACHE_LOOKUPS_TOTAL}",
+        "Signature and grant checks by where the answer came from",
+        (
+            "check",
+            "source",
+        ),
+    ),
     PrometheusMetricNames.CELERY_TASK_ACTIVE_DURATION_SECONDS: Gauge(
         f"{METRIC_PREFIX}_{PrometheusMetricNames.CELERY_TASK_ACTIVE_DURATION_SECONDS}",
         "How long the currently running celery task has been running",
@@ -188,6 +200,15 @@ PrometheusRegistry = {
         f"{METRIC_PREFIX}_{PrometheusMetricNames.INDEX_TRENDING_DURATION_SECONDS}",
         "Runtimes for src.task.index_trending:index_trending()",
     ),
+    PrometheusMetricNames.PRUNE_PLAYS_BYTES_DELETED_TOTAL: Counter(
+        f"{METRIC_PREFIX}_{PrometheusMetricNames.PRUNE_PLAYS_BYTES_DELETED_TOTAL}",
+        "Bytes of plays rows deleted by src.task.prune_plays",
+    ),
+    PrometheusMetricNames.SEARCH_DURATION_SECONDS: Histogram(
+        f"{METRIC_PREFIX}_{PrometheusMetricNames.SEARCH_DURATION_SECONDS}",
+        "Runtimes for the stages of src.queries.search_es searches",
+        ("stage",),
+    ),
     PrometheusMetricNames.UPDATE_AGGREGATE_TABLE_DURATION_SECONDS: Histogram(
         f"{METRIC_PREFIX}_{PrometheusMetricNames.UPDATE_AGGREGATE_TABLE_DURATION_SECONDS}",
         "Runtimes for src.task.aggregates:update_aggregate_table()",
@@ -196,6 +217,15 @@ PrometheusRegistry = {
             "task_name",
         ),
     ),
+    PrometheusMetricNames.UPDATE_AGGREGATES_ROWS_SCANNED_LATEST: Gauge(
+        f"{METRIC_PREFIX}_{PrometheusMetricNames.UPDATE_AGGREGATES_ROWS_SCANNED_LATEST}",
+        "Rows scanned by the last src.task.update_aggregates run",
+        (
+            "table_name",
+            "mode",
+        ),
+        multiprocess_mode="liveall",
+    ),
     PrometheusMetricNames.UPDATE_TRENDING_VIEW_DURATION_SECONDS: Histogram(
         f"{METRIC_PREFIX}_{PrometheusMetricNames.UPDATE_TRENDING_VIEW_DURATION_SECONDS}",
         "Runtimes for src.task.index_trending:update_view()",
@@ -251,6 +281,8 @@ class PrometheusMetric:
             this_metric.set(value)
         elif isinstance(this_metric, Summary):
             this_metric.observe(value)
+        elif isinstance(this_metric, Counter):
+            this_metric.inc(value)
 
     @classmethod
     def register_collector(cls, name, collector_func):
@@ -17,6 +17,9 @@ trending_tracks_last_completion_redis_key = "trending:tracks:last-completion"
 trending_playlists_last_completion_redis_key = "trending-playlists:last-completion"
 challenges_last_processed_event_redis_key = "challenges:last-processed-event"
 user_balances_refresh_last_completion_redis_key = "user_balances:last-completion"
+update_aggregates_last_full_recompute_redis_key = (
+    "update_aggregates:last-full-recompute"
+)
 latest_legacy_play_db_key = "latest_legacy_play_db_key"
 oldest_unarchived_play_key = "oldest_unarchived_play_key"
 
@@ -30,6 +33,10 @@ latest_sol_play_db_tx_key = "latest_sol_program_tx:play:db"
 # Used to get the latest processed slot of each indexing task, using the global slots instead of the per-program slots
 latest_sol_plays_slot_key = "latest_sol_slot:plays"
 
+# Hash of process (host:pid) to the per-endpoint latency and error stats
+# published by its SolanaClientManager
+solana_endpoint_stats_redis_key = "solana:endpoint_stats"
+
 
 class SolanaIndexerStatus(NamedTuple):
     last_tx: str
@@ -46,7 +46,8 @@ SYNCHRONIZE_METRICS_INTERVAL = 60
 metrics_prefix = "API_METRICS"
 metrics_routes = "routes"
 metrics_applications = "applications"
-metrics_visited_nodes = "visited_nodes"
+# hash of discovery node endpoint to the end time of its last merged metrics
+metrics_visited_nodes = "visited_nodes_cursors"
 personal_route_metrics = "personal_route_metrics"
 daily_route_metrics = "daily_route_metrics"
 personal_daily_route_metrics = "personal_daily_route_metrics"
@@ -110,300 +111,290 @@ def parse_metrics_key(key):
 
 
 def persist_summed_unique_counts(
-    db, timestamp, summed_unique_daily_count, summed_unique_monthly_count
+    session, timestamp, summed_unique_daily_count, summed_unique_monthly_count
 ):
     day_str = timestamp.split(":")[0]
     month_str = f"{day_str[:7]}/01"
     day = datetime.strptime(day_str, day_format).date()
     month = datetime.strptime(month_str, day_format).date()
-    with db.scoped_session() as session:
-        day_unique_record = (
-            session.query(AggregateDailyUniqueUsersMetrics)
-            .filter(AggregateDailyUniqueUsersMetrics.timestamp == day)
-            .first()
+    day_unique_record = (
+        session.query(AggregateDailyUniqueUsersMetrics)
+        .filter(AggregateDailyUniqueUsersMetrics.timestamp == day)
+        .first()
+    )
+    if day_unique_record:
+        logger.debug(
+            f"summed unique count record for day {day} before update: {day_unique_record.summed_count}"
         )
-        if day_unique_record:
-            logger.debug(
-                f"summed unique count record for day {day} before update: {day_unique_record.summed_count}"
-            )
-            day_unique_record.summed_count = max(
-                day_unique_record.summed_count or 0, summed_unique_daily_count
-            )
-            logger.debug(
-                f"summed unique count record for day {day} after update: {day_unique_record.summed_count}"
-            )
-            session.add(day_unique_record)
+        day_unique_record.summed_count = max(
+            day_unique_record.summed_count or 0, summed_unique_daily_count
+        )
+        logger.debug(
+            f"summed unique count record for day {day} after update: {day_unique_record.summed_count}"
+        )
+        session.add(day_unique_record)
 
-        month_unique_record = (
-            session.query(AggregateMonthlyUniqueUsersMetric)
-            .filter(AggregateMonthlyUniqueUsersMetric.timestamp == month)
-            .first()
+    month_unique_record = (
+        session.query(AggregateMonthlyUniqueUsersMetric)
+        .filter(AggregateMonthlyUniqueUsersMetric.timestamp == month)
+        .first()
+    )
+    if month_unique_record:
+        logger.debug(
+            f"summed unique count record for month {month} before update: \
+            {month_unique_record.summed_count}"
         )
-        if month_unique_record:
-            logger.debug(
-                f"summed unique count record for month {month} before update: \
-                {month_unique_record.summed_count}"
-            )
-            month_unique_record.summed_count = max(
-                month_unique_record.summed_count or 0, summed_unique_monthly_count
-            )
-            logger.debug(
-                f"summed unique count record for month {month} after update: \
-                {month_unique_record.summed_count}"
-            )
-            session.add(month_unique_record)
+        month_unique_record.summed_count = max(
+            month_unique_record.summed_count or 0, summed_unique_monthly_count
+        )
+        logger.debug(
+            f"summed unique count record for month {month} after update: \
+            {month_unique_record.summed_count}"
+        )
+        session.add(month_unique_record)
 
 
 def persist_route_metrics(
-    db, day, month, count, unique_daily_count, unique_monthly_count
+    session, day, month, count, unique_daily_count, unique_monthly_count
 ):
-    with db.scoped_session() as session:
-        day_unique_record = (
-            session.query(AggregateDailyUniqueUsersMetrics)
-            .filter(AggregateDailyUniqueUsersMetrics.timestamp == day)
-            .first()
+    day_unique_record = (
+        session.query(AggregateDailyUniqueUsersMetrics)
+        .filter(AggregateDailyUniqueUsersMetrics.timestamp == day)
+        .first()
+    )
+    if day_unique_record:
+        logger.debug(
+            f"unique count record for day {day} before adding new unique count \
+            {unique_daily_count}: {day_unique_record.count} + "
         )
-        if day_unique_record:
-            logger.debug(
-                f"unique count record for day {day} before adding new unique count \
-                {unique_daily_count}: {day_unique_record.count} + "
-            )
-            day_unique_record.count += unique_daily_count
-            logger.debug(
-                f"unique count record for day {day} after adding new unique count \
-                {unique_daily_count}: {day_unique_record.count}"
-            )
+        day_unique_record.count += unique_daily_count
+        logger.debug(
+            f"unique count record for day {day} after adding new unique count \
+            {unique_daily_count}: {day_unique_record.count}"
+        )
+    else:
+        day_unique_record = AggregateDailyUniqueUsersMetrics(
+            timestamp=day, count=unique_daily_count
+        )
+        logger.debug(
+            f"new record for daily unique count with day {day} and unique count {unique_daily_count}"
+        )
+    session.add(day_unique_record)
+
+    day_total_record = (
+        session.query(AggregateDailyTotalUsersMetrics)
+        .filter(AggregateDailyTotalUsersMetrics.timestamp == day)
+        .first()
+    )
+    if day_total_record:
+        logger.debug(
+            f"total count record for day {day} before adding new total count \
+            {count}: {day_total_record.count}"
+        )
+        day_total_record.count += count
+        logger.debug(
+            f"total count record for day {day} after adding new total count \
+            {count}: {day_total_record.count}"
+        )
+    else:
+        day_total_record = AggregateDailyTotalUsersMetrics(timestamp=day, count=count)
+        logger.debug(
+            f"new record for daily total count with day {day} and total count {count}"
+        )
+    session.add(day_total_record)
+
+    month_unique_record = (
+        session.query(AggregateMonthlyUniqueUsersMetric)
+        .filter(AggregateMonthlyUniqueUsersMetric.timestamp == month)
+        .first()
+    )
+    if month_unique_record:
+        logger.debug(
+            f"unique count record for month {month} before adding new unique count \
+            {unique_monthly_count}: {month_unique_record.count}"
+        )
+        month_unique_record.count += unique_monthly_count
+        logger.debug(
+            f"unique count record for month {month} after adding new unique count \
+            {unique_monthly_count}: {month_unique_record.count}"
+        )
+    else:
+        month_unique_record = AggregateMonthlyUniqueUsersMetric(
+            timestamp=month, count=unique_monthly_count
+        )
+        logger.debug(
+            f"new record for monthly unique count with month {month} and unique count \
+            {unique_monthly_count}"
+        )
+    session.add(month_unique_record)
+
+    month_total_record = (
+        session.query(AggregateMonthlyTotalUsersMetric)
+        .filter(AggregateMonthlyTotalUsersMetric.timestamp == month)
+        .first()
+    )
+    if month_total_record:
+        logger.debug(
+            f"total count record for month {month} before adding new total count \
+            {count}: {month_total_record.count}"
+        )
+        month_total_record.count += count
+        logger.debug(
+            f"total count record for month {month} after adding new total count \
+            {count}: {month_total_record.count}"
+        )
+    else:
+        month_total_record = AggregateMonthlyTotalUsersMetric(
+            timestamp=month, count=count
+        )
+        logger.debug(
+            f"new record for monthly total count with month {month} and total count {count}"
+        )
+    session.add(month_total_record)
+
+
+# Expected to be called after calling persist_route_metrics with these day, month params
+def _persist_personal_route_metrics(
+    session, day, month, count, unique_daily_count, unique_monthly_count
+):
+    day_unique_record = (
+        session.query(AggregateDailyUniqueUsersMetrics)
+        .filter(AggregateDailyUniqueUsersMetrics.timestamp == day)
+        .first()
+    )
+    # A record for this day should exist at this point
+    if day_unique_record:
+        logger.debug(
+            f"personal unique count record for day {day} before adding new unique count \
+            {unique_daily_count}: {day_unique_record.personal_count} + "
+        )
+        if not day_unique_record.personal_count:
+            day_unique_record.personal_count = unique_daily_count
         else:
-            day_unique_record = AggregateDailyUniqueUsersMetrics(
-                timestamp=day, count=unique_daily_count
-            )
-            logger.debug(
-                f"new record for daily unique count with day {day} and unique count {unique_daily_count}"
-            )
+            day_unique_record.personal_count += unique_daily_count
+        logger.debug(
+            f"personal unique count record for day {day} after adding new unique count \
+            {unique_daily_count}: {day_unique_record.personal_count}"
+        )
         session.add(day_unique_record)
 
-        day_total_record = (
-            session.query(AggregateDailyTotalUsersMetrics)
-            .filter(AggregateDailyTotalUsersMetrics.timestamp == day)
-            .first()
+    day_total_record = (
+        session.query(AggregateDailyTotalUsersMetrics)
+        .filter(AggregateDailyTotalUsersMetrics.timestamp == day)
+        .first()
+    )
+    # A record for this day should exist at this point
+    if day_total_record:
+        logger.debug(
+            f"personal total count record for day {day} before adding new total count \
+            {count}: {day_total_record.personal_count}"
         )
-        if day_total_record:
-            logger.debug(
-                f"total count record for day {day} before adding new total count \
-                {count}: {day_total_record.count}"
-            )
-            day_total_record.count += count
-            logger.debug(
-                f"total count record for day {day} after adding new total count \
-                {count}: {day_total_record.count}"
-            )
+        if not day_total_record.personal_count:
+            day_total_record.personal_count = count
         else:
-            day_total_record = AggregateDailyTotalUsersMetrics(
-                timestamp=day, count=count
-            )
-            logger.debug(
-                f"new record for daily total count with day {day} and total count {count}"
-            )
+            day_total_record.personal_count += count
+        logger.debug(
+            f"personal total count record for day {day} after adding new total count \
+            {count}: {day_total_record.personal_count}"
+        )
         session.add(day_total_record)
 
-        month_unique_record = (
-            session.query(AggregateMonthlyUniqueUsersMetric)
-            .filter(AggregateMonthlyUniqueUsersMetric.timestamp == month)
-            .first()
+    month_unique_record = (
+        session.query(AggregateMonthlyUniqueUsersMetric)
+        .filter(AggregateMonthlyUniqueUsersMetric.timestamp == month)
+        .first()
+    )
+    # A record for this month should exist at this point
+    if month_unique_record:
+        logger.debug(
+            f"personal unique count record for month {month} before adding new unique count \
+            {unique_monthly_count}: {month_unique_record.personal_count}"
         )
-        if month_unique_record:
-            logger.debug(
-                f"unique count record for month {month} before adding new unique count \
-                {unique_monthly_count}: {month_unique_record.count}"
-            )
-            month_unique_record.count += unique_monthly_count
-            logger.debug(
-                f"unique count record for month {month} after adding new unique count \
-                {unique_monthly_count}: {month_unique_record.count}"
-            )
+        if not month_unique_record.personal_count:
+            month_unique_record.personal_count = unique_monthly_count
         else:
-            month_unique_record = AggregateMonthlyUniqueUsersMetric(
-                timestamp=month, count=unique_monthly_count
-            )
-            logger.debug(
-                f"new record for monthly unique count with month {month} and unique count \
-                {unique_monthly_count}"
-            )
+            month_unique_record.personal_count += unique_monthly_count
+        logger.debug(
+            f"personal unique count record for month {month} after adding new unique count \
+            {unique_monthly_count}: {month_unique_record.personal_count}"
+        )
         session.add(month_unique_record)
 
-        month_total_record = (
-            session.query(AggregateMonthlyTotalUsersMetric)
-            .filter(AggregateMonthlyTotalUsersMetric.timestamp == month)
-            .first()
+    month_total_record = (
+        session.query(AggregateMonthlyTotalUsersMetric)
+        .filter(AggregateMonthlyTotalUsersMetric.timestamp == month)
+        .first()
+    )
+    # A record for this month should exist at this point
+    if month_total_record:
+        logger.debug(
+            f"personal total count record for month {month} before adding new total count \
+            {count}: {month_total_record.personal_count}"
         )
-        if month_total_record:
-            logger.debug(
-                f"total count record for month {month} before adding new total count \
-                {count}: {month_total_record.count}"
-            )
-            month_total_record.count += count
-            logger.debug(
-                f"total count record for month {month} after adding new total count \
-                {count}: {month_total_record.count}"
-            )
+        if not month_total_record.personal_count:
+            month_total_record.personal_count = count
         else:
-            month_total_record = AggregateMonthlyTotalUsersMetric(
-                timestamp=month, count=count
-            )
-            logger.debug(
-                f"new record for monthly total count with month {month} and total count {count}"
-            )
+            month_total_record.personal_count += count
+        logger.debug(
+            f"personal total count record for month {month} after adding new total count \
+            {count}: {month_total_record.personal_count}"
+        )
         session.add(month_total_record)
 
 
-# Expected to be called after calling persist_route_metrics with these day, month params
-def _persist_personal_route_metrics(
-    db, day, month, count, unique_daily_count, unique_monthly_count
-):
-    with db.scoped_session() as session:
-        day_unique_record = (
-            session.query(AggregateDailyUniqueUsersMetrics)
-            .filter(AggregateDailyUniqueUsersMetrics.timestamp == day)
+def persist_app_metrics(session, day, month, app_count):
+    for application_name, count in app_count.items():
+        day_record = (
+            session.query(AggregateDailyAppNameMetric)
+            .filter(AggregateDailyAppNameMetric.timestamp == day)
+            .filter(AggregateDailyAppNameMetric.application_name == application_name)
             .first()
         )
-        # A record for this day should exist at this point
-        if day_unique_record:
+        if day_record:
             logger.debug(
-                f"personal unique count record for day {day} before adding new unique count \
-                {unique_daily_count}: {day_unique_record.personal_count} + "
+                f"daily app record for day {day} and application {application_name} \
+                before adding new count {count}: {day_record.count}"
             )
-            if not day_unique_record.personal_count:
-                day_unique_record.personal_count = unique_daily_count
-            else:
-                day_unique_record.personal_count += unique_daily_count
+            day_record.count += count
             logger.debug(
-                f"personal unique count record for day {day} after adding new unique count \
-                {unique_daily_count}: {day_unique_record.personal_count}"
+                f"daily app record for day {day} and application {application_name} \
+                after adding new count {count}: {day_record.count}"
             )
-            session.add(day_unique_record)
-
-        day_total_record = (
-            session.query(AggregateDailyTotalUsersMetrics)
-            .filter(AggregateDailyTotalUsersMetrics.timestamp == day)
-            .first()
-        )
-        # A record for this day should exist at this point
-        if day_total_record:
-            logger.debug(
-                f"personal total count record for day {day} before adding new total count \
-                {count}: {day_total_record.personal_count}"
+        else:
+            day_record = AggregateDailyAppNameMetric(
+                timestamp=day, application_name=application_name, count=count
             )
-            if not day_total_record.personal_count:
-                day_total_record.personal_count = count
-            else:
-                day_total_record.personal_count += count
             logger.debug(
-                f"personal total count record for day {day} after adding new total count \
-                {count}: {day_total_record.personal_count}"
+                f"new record for daily app record with day {day}, \
+                application {application_name}, and count {count}"
             )
-            session.add(day_total_record)
+        session.add(day_record)
 
-        month_unique_record = (
-            session.query(AggregateMonthlyUniqueUsersMetric)
-            .filter(AggregateMonthlyUniqueUsersMetric.timestamp == month)
+        month_record = (
+            session.query(AggregateMonthlyAppNameMetric)
+            .filter(AggregateMonthlyAppNameMetric.timestamp == month)
+            .filter(AggregateMonthlyAppNameMetric.application_name == application_name)
             .first()
         )
-        # A record for this month should exist at this point
-        if month_unique_record:
+        if month_record:
             logger.debug(
-                f"personal unique count record for month {month} before adding new unique count \
-                {unique_monthly_count}: {month_unique_record.personal_count}"
+                f"monthly app record for month {month} and application {application_name} \
+                before adding new count {count}: {month_record.count}"
             )
-            if not month_unique_record.personal_count:
-                month_unique_record.personal_count = unique_monthly_count
-            else:
-                month_unique_record.personal_count += unique_monthly_count
+            month_record.count += count
             logger.debug(
-                f"personal unique count record for month {month} after adding new unique count \
-                {unique_monthly_count}: {month_unique_record.personal_count}"
+                f"monthly app record for month {month} and application {application_name} \
+                after adding new count {count}: {month_record.count}"
             )
-            session.add(month_unique_record)
-
-        month_total_record = (
-            session.query(AggregateMonthlyTotalUsersMetric)
-            .filter(AggregateMonthlyTotalUsersMetric.timestamp == month)
-            .first()
-        )
-        # A record for this month should exist at this point
-        if month_total_record:
-            logger.debug(
-                f"personal total count record for month {month} before adding new total count \
-                {count}: {month_total_record.personal_count}"
+        else:
+            month_record = AggregateMonthlyAppNameMetric(
+                timestamp=month, application_name=application_name, count=count
             )
-            if not month_total_record.personal_count:
-                month_total_record.personal_count = count
-            else:
-                month_total_record.personal_count += count
             logger.debug(
-                f"personal total count record for month {month} after adding new total count \
-                {count}: {month_total_record.personal_count}"
+                f"new record for monthly app record with month {month}, \
+                application {application_name}, and count {count}"
             )
-            session.add(month_total_record)
-
-
-def persist_app_metrics(db, day, month, app_count):
-    with db.scoped_session() as session:
-        for application_name, count in app_count.items():
-            day_record = (
-                session.query(AggregateDailyAppNameMetric)
-                .filter(AggregateDailyAppNameMetric.timestamp == day)
-                .filter(
-                    AggregateDailyAppNameMetric.application_name == application_name
-                )
-                .first()
-            )
-            if day_record:
-                logger.debug(
-                    f"daily app record for day {day} and application {application_name} \
-                    before adding new count {count}: {day_record.count}"
-                )
-                day_record.count += count
-                logger.debug(
-                    f"daily app record for day {day} and application {application_name} \
-                    after adding new count {count}: {day_record.count}"
-                )
-            else:
-                day_record = AggregateDailyAppNameMetric(
-                    timestamp=day, application_name=application_name, count=count
-                )
-                logger.debug(
-                    f"new record for daily app record with day {day}, \
-                    application {application_name}, and count {count}"
-                )
-            session.add(day_record)
-
-            month_record = (
-                session.query(AggregateMonthlyAppNameMetric)
-                .filter(AggregateMonthlyAppNameMetric.timestamp == month)
-                .filter(
-                    AggregateMonthlyAppNameMetric.application_name == application_name
-                )
-                .first()
-            )
-            if month_record:
-                logger.debug(
-                    f"monthly app record for month {month} and application {application_name} \
-                    before adding new count {count}: {month_record.count}"
-                )
-                month_record.count += count
-                logger.debug(
-                    f"monthly app record for month {month} and application {application_name} \
-                    after adding new count {count}: {month_record.count}"
-                )
-            else:
-                month_record = AggregateMonthlyAppNameMetric(
-                    timestamp=month, application_name=application_name, count=count
-                )
-                logger.debug(
-                    f"new record for monthly app record with month {month}, \
-                    application {application_name}, and count {count}"
-                )
-            session.add(month_record)
+        session.add(month_record)
 
 
 def cache_metrics(metrics, day, month, metric_type, daily_key, monthly_key):
@@ -480,7 +471,7 @@ def cache_metrics(metrics, day, month, metric_type, daily_key, monthly_key):
     return unique_daily_count, unique_monthly_count, app_count
 
 
-def merge_metrics(metrics, end_time, metric_type, db, are_personal_metrics):
+def merge_metrics(metrics, end_time, metric_type, session, are_personal_metrics):
     """
     Merge this node's metrics to those received from other discovery nodes:
         Update unique and total, daily and monthly metrics for routes and apps
@@ -514,7 +505,7 @@ def merge_metrics(metrics, end_time, metric_type, db, are_personal_metrics):
     )
     if metric_type == "route":
         persist_route_metrics(
-            db,
+            session,
             day_obj,
             month_obj,
             sum(metrics.values()),
@@ -522,7 +513,7 @@ def merge_metrics(metrics, end_time, metric_type, db, are_personal_metrics):
             unique_monthly_count,
         )
     else:
-        persist_app_metrics(db, day_obj, month_obj, app_count)
+        persist_app_metrics(session, day_obj, month_obj, app_count)
 
     if metric_type == "route" and are_personal_metrics:
         # Persist this node's personal metrics
@@ -538,7 +529,7 @@ def merge_metrics(metrics, end_time, metric_type, db, are_personal_metrics):
             personal_monthly_route_metrics,
         )
         _persist_personal_route_metrics(
-            db,
+            session,
             day_obj,
             month_obj,
             sum(metrics.values()),
@@ -547,12 +538,12 @@ def merge_metrics(metrics, end_time, metric_type, db, are_personal_metrics):
         )
 
 
-def merge_route_metrics(metrics, end_time, db, are_personal_metrics):
-    merge_metrics(metrics, end_time, "route", db, are_personal_metrics)
+def merge_route_metrics(metrics, end_time, session, are_personal_metrics):
+    merge_metrics(metrics, end_time, "route", session, are_personal_metrics)
 
 
-def merge_app_metrics(metrics, end_time, db):
-    merge_metrics(metrics, end_time, "app", db, False)
+def merge_app_metrics(metrics, end_time, session):
+    merge_metrics(metrics, end_time, "app", session, False)
 
 
 def get_redis_metrics(redis_handle, start_time, metric_type):
@@ -613,8 +604,8 @@ def get_summed_unique_metrics(start_time):
 
 
 def get_aggregate_metrics_info():
-    info_str = REDIS.get(metrics_visited_nodes)
-    return json.loads(info_str) if info_str else {}
+    info = REDIS.hgetall(metrics_visited_nodes)
+    return {node.decode(): timestamp.decode() for node, timestamp in info.items()}
 
 
 def update_personal_metrics(key, old_timestamp, timestamp, value, metric_type):